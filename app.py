@@ -1,7 +1,7 @@
-import hashlib
 import streamlit as st
 import os
 import logging
+import time
 
 # --- FRONTEND IMPORTS ---
 from modules.frontend.theme import ThemeManager
@@ -20,12 +20,32 @@ from modules.reporting.persistence import check_git_tracking
 from modules.domain import SessionType, classify_session_type, classify_ramp_test
 
 # --- SERVICES IMPORTS ---
-from services import calculate_header_metrics, prepare_session_record, prepare_sticky_header_data
+from services import (
+    RiderParams,
+    SessionBundle,
+    content_hash,
+    prepare_session_record,
+    prepare_sticky_header_data,
+)
 
 # --- CONSTANTS ---
 MIN_POWER_SAMPLES_FOR_RAMP = 300
 
 
+def _classify_session(df_raw, filename):
+    """Session type and, for power files, the detailed ramp classification."""
+    session_type = classify_session_type(df_raw, filename)
+
+    # Store detailed ramp classification for gating decisions
+    ramp_classification = None
+    if "watts" in df_raw.columns or "power" in df_raw.columns:
+        power_col = "watts" if "watts" in df_raw.columns else "power"
+        power = df_raw[power_col].dropna()
+        if len(power) >= MIN_POWER_SAMPLES_FOR_RAMP:
+            ramp_classification = classify_ramp_test(power)
+    return session_type, ramp_classification
+
+
 # --- TAB REGISTRY (OCP) ---
 class TabRegistry:
     """Registry for UI tabs to support Open/Closed Principle."""
@@ -81,22 +101,140 @@ class TabRegistry:
         "power_trends": ("modules.ui.power_trends_ui", "render_power_trends_tab"),
     }
 
+    # Optional background warm-up of a tab's heavy analysis, called with
+    # the tab's own render arguments (see modules.ui.prefetch)
+    _prefetchers = {
+        "hrv": ("modules.ui.hrv", "prefetch_hrv_tab"),
+        "drift_maps": ("modules.ui.drift_maps_ui", "prefetch_drift_maps_tab"),
+        "tte": ("modules.ui.tte_ui", "prefetch_tte_tab"),
+        "w_prime_reconstitution": (
+            "modules.ui.w_prime_reconstitution_ui",
+            "prefetch_w_prime_reconstitution_tab",
+        ),
+        "mpa": ("modules.ui.mpa_ui", "prefetch_mpa_tab"),
+    }
+
+    # Tabs prefetched after each on-demand rerun
+    PREFETCH_TABS = 2
+
+    @staticmethod
+    def _resolve(module_path, func_name):
+        import importlib
+
+        return getattr(importlib.import_module(module_path), func_name)
+
     @classmethod
     def render(cls, tab_name, *args, **kwargs):
-        """Dynamic dispatcher for tab rendering (Lazy loading)."""
+        """Dynamic dispatcher for tab rendering (Lazy loading).
+
+        The render time is kept in ``st.session_state["tab_timings"]``.
+        """
         if tab_name not in cls._tabs:
             st.error(f"Unknown tab: {tab_name}")
             return
 
-        module_path, func_name = cls._tabs[tab_name]
+        start = time.perf_counter()
         try:
-            import importlib
-
-            module = importlib.import_module(module_path)
-            func = getattr(module, func_name)
+            func = cls._resolve(*cls._tabs[tab_name])
             return func(*args, **kwargs)
         except Exception as e:
             st.error(f"Error loading tab {tab_name}: {e}")
+        finally:
+            timings = st.session_state.setdefault("tab_timings", {})
+            timings[tab_name] = time.perf_counter() - start
+
+    @classmethod
+    def prefetch(cls, tab_name, *args, **kwargs):
+        """Warm up a tab's heavy analysis in the background, if it has a prefetcher."""
+        if tab_name not in cls._prefetchers:
+            return
+        try:
+            cls._resolve(*cls._prefetchers[tab_name])(*args, **kwargs)
+        except Exception as e:
+            logger.debug(f"Prefetch of tab {tab_name} failed: {e}")
+
+    @classmethod
+    def render_layout(cls, layout, on_demand=True, extras=None):  # noqa: C901
+        """Render grouped tabs; returns the names of the tabs rendered.
+
+        Args:
+            layout: [(group label, [(tab label, tab name, render args), ...]), ...]
+            on_demand: Run only the selected tab's renderer. Tab switches then
+                trigger a rerun, and the heavy analyses of the tabs most
+                likely opened next are prefetched in the background.
+                Otherwise every tab renders on every rerun.
+            extras: {tab name: callable} rendered below that tab's content.
+        """
+        from modules.ui import prefetch
+
+        extras = extras or {}
+
+        def tabs(labels, key):
+            if on_demand:
+                return st.tabs(labels, key=key, on_change="rerun")
+            return st.tabs(labels)
+
+        def is_closed(container):
+            # .open is only tracked for on-demand (keyed, rerunning) tabs
+            return on_demand and getattr(container, "open", None) is False
+
+        rendered = []
+        groups = tabs([label for label, _ in layout], "nav_group")
+        pairs = zip(layout, groups, strict=True)
+        for group_idx, ((group_label, entries), group) in enumerate(pairs):
+            if is_closed(group):
+                continue
+            with group:
+                UIComponents.show_breadcrumb(group_label)
+                containers = tabs([label for label, _, _ in entries], f"nav_tab_{group_idx}")
+                for (_, tab_name, args), container in zip(entries, containers, strict=True):
+                    if is_closed(container):
+                        continue
+                    with container:
+                        cls.render(tab_name, *args)
+                        if tab_name in extras:
+                            extras[tab_name]()
+                    rendered.append(tab_name)
+
+        if on_demand and len(rendered) == 1:
+            current = rendered[0]
+            prefetch.record_transition(st.session_state.get("nav_current_tab"), current)
+            st.session_state["nav_current_tab"] = current
+
+            # Candidates: the rest of the current group from the next tab on,
+            # then every other tab
+            order = [tab_name for _, entries in layout for _, tab_name, _ in entries]
+            group_names = next(
+                [tab_name for _, tab_name, _ in entries]
+                for _, entries in layout
+                if current in {tab_name for _, tab_name, _ in entries}
+            )
+            pos = group_names.index(current)
+            neighbours = group_names[pos + 1 :] + group_names[:pos]
+            candidates = neighbours + [t for t in order if t not in neighbours]
+            args_by_tab = {
+                tab_name: args for _, entries in layout for _, tab_name, args in entries
+            }
+            prefetchable = [t for t in candidates if t in cls._prefetchers]
+            for tab_name in prefetch.likely_next(current, prefetchable, cls.PREFETCH_TABS):
+                cls.prefetch(tab_name, *args_by_tab[tab_name])
+        return rendered
+
+    @staticmethod
+    def render_timings(rendered):
+        """Sidebar summary of this rerun's tab render times and the time skipped."""
+        timings = st.session_state.get("tab_timings", {})
+        with st.sidebar.expander("⏱️ Czasy zakładek"):
+            total = sum(timings.get(t, 0.0) for t in rendered)
+            st.caption(f"Ten rerun: {len(rendered)} zakł., {total * 1000:.0f} ms")
+            for tab_name in rendered:
+                st.text(f"{tab_name}: {timings.get(tab_name, 0.0) * 1000:.0f} ms")
+            skipped = {t: v for t, v in timings.items() if t not in rendered}
+            if skipped:
+                st.caption(
+                    f"Pominięte (wg ostatniego pomiaru): {len(skipped)} zakł., "
+                    f"~{sum(skipped.values()) * 1000:.0f} ms zaoszczędzone"
+                )
 
 
 def render_tab_content(tab_name, *args, **kwargs):
@@ -142,50 +280,36 @@ if uploaded_file is not None:
 
     with st.spinner("Przetwarzanie danych..."):
         try:
-            df_raw = load_data(uploaded_file)
+            # --- SESSION BUNDLE (memoized per file content) ---
+            # Reruns reuse every artifact whose own inputs did not change
+            file_hash = content_hash(uploaded_file.getvalue())
+            bundle = st.session_state.get("session_bundle")
+            if bundle is None or bundle.content_hash != file_hash:
+                bundle = SessionBundle(load_data(uploaded_file), file_hash, uploaded_file.name)
+                st.session_state["session_bundle"] = bundle
+            df_raw = bundle.df_raw
 
             # --- SESSION TYPE CLASSIFICATION (MUST run first) ---
-
-            # Check if we already processed this file (content-based hash)
-            uploaded_file.seek(0)
-            current_file_hash = hashlib.md5(uploaded_file.read()).hexdigest()
-            uploaded_file.seek(0)
-            cached_hash = st.session_state.get("current_file_hash")
-            
-            if cached_hash != current_file_hash:
-                # New file - process and cache
-                session_type = classify_session_type(df_raw, uploaded_file.name)
-                st.session_state["session_type"] = session_type
-                st.session_state["current_file_hash"] = current_file_hash
-                
-                # Store detailed ramp classification for gating decisions
-                ramp_classification = None
-                if "watts" in df_raw.columns or "power" in df_raw.columns:
-                    power_col = "watts" if "watts" in df_raw.columns else "power"
-                    power = df_raw[power_col].dropna()
-                    if len(power) >= MIN_POWER_SAMPLES_FOR_RAMP:
-                        ramp_classification = classify_ramp_test(power)
-                        st.session_state["ramp_classification"] = ramp_classification
-            else:
-                # Use cached values
-                session_type = st.session_state.get("session_type")
-                ramp_classification = st.session_state.get("ramp_classification")
+            session_type, ramp_classification = bundle.memoized(
+                "session_type", (), lambda: _classify_session(df_raw, uploaded_file.name)
+            )
+            st.session_state["session_type"] = session_type
+            st.session_state["ramp_classification"] = ramp_classification
+            st.session_state["current_file_hash"] = file_hash
 
             # --- PROCESSING PIPELINE (SRP/DIP) ---
-            from services.session_orchestrator import process_uploaded_session
-
-            df_plot, df_plot_resampled, metrics, error_msg = process_uploaded_session(
-                df_raw, cp_input, w_prime_input, rider_weight, vt1_watts, vt2_watts
-            )
+            rider_params = RiderParams(cp_input, w_prime_input, rider_weight, vt1_watts, vt2_watts)
+            analysis, error_msg = bundle.analyze(rider_params)
 
             if error_msg:
                 st.error(f"Błąd analizy: {error_msg}")
                 st.stop()
 
-            # Extract intermediate results from metrics (DIP: metrics acts as a container here)
-            decoupling_percent = metrics.pop("_decoupling_percent", 0.0)
-            drift_z2 = metrics.pop("_drift_z2", 0.0)
-            # FIXED: _df_clean_pl removed from metrics - use df_raw directly
+            df_plot = analysis.df_plot
+            df_plot_resampled = analysis.df_plot_resampled
+            metrics = analysis.metrics
+            decoupling_percent = analysis.decoupling_percent
+            drift_z2 = analysis.drift_z2
             df_clean_pl = df_raw
 
             state.set_data_loaded()
@@ -193,7 +317,11 @@ if uploaded_file is not None:
             # AI Section (Optional/Non-critical)
             if MLX_AVAILABLE and os.path.exists(MODEL_FILE):
                 try:
-                    auto_pred = predict_only(df_plot_resampled)
+                    auto_pred = bundle.memoized(
+                        "ai_hr",
+                        (cp_input, w_prime_input),
+                        lambda: predict_only(df_plot_resampled),
+                    )
                     if auto_pred is not None:
                         df_plot_resampled["ai_hr"] = auto_pred
                 except Exception as e:
@@ -206,14 +334,22 @@ if uploaded_file is not None:
     # --- RENDER DASHBOARD ---
 
     # 1. Header Metrics
-    np_header, if_header, tss_header = calculate_header_metrics(df_plot, cp_input)
+    np_header, if_header, tss_header = bundle.header_metrics(cp_input)
 
-    # Auto-save
-    try:
+    # Auto-save (once per file and rider parameters)
+    def _autosave() -> int:
         session_data = prepare_session_record(
             uploaded_file.name, df_plot, metrics, np_header, if_header, tss_header
         )
-        SessionStore().add_session(SessionRecord(**session_data))
+        session_id = SessionStore().add_session(SessionRecord(**session_data))
+        if "watts" in df_plot.columns:
+            from modules.cache_utils import get_mmp_store
+
+            get_mmp_store().add_session_curve(session_id, session_data["date"], df_plot["watts"])
+        return session_id
+
+    try:
+        bundle.memoized("autosave", rider_params, _autosave)
     except Exception as e:
         logger.warning(f"Auto-save failed: {e}")
 
@@ -288,259 +424,170 @@ if uploaded_file is not None:
 
         alert_report = AlertReport()
 
-    # Layout Tabs
-    tab_overview, tab_performance, tab_intelligence, tab_physiology, tab_cycling = st.tabs(
-        ["📊 Overview", "⚡ Performance", "🧠 Intelligence", "🫀 Physiology", "🚴 Cycling"]
-    )
-
-    with tab_overview:
-        UIComponents.show_breadcrumb("📊 Overview")
-        t1, t2, t3, t4, t5 = st.tabs(
-            ["📋 Raport z KPI", "📊 Podsumowanie", "📅 Load (PMC)", "🔀 Compare", "📈 Moc w czasie"]
-        )
-        with t1:
-            render_tab_content(
-                "report",
-                df_plot,
-                df_plot_resampled,
-                metrics,
-                rider_weight,
-                cp_input,
-                decoupling_percent,
-                drift_z2,
-                vt1_vent,
-                vt2_vent,
-            )
-        with t2:
-            render_tab_content(
-                "summary",
-                df_plot,
-                df_plot_resampled,
-                metrics,
-                training_notes,
-                uploaded_file.name,
-                cp_input,
-                w_prime_input,
-                rider_weight,
-                vt1_watts,
-                vt2_watts,
-                vt1_watts,  # FIXED: lt1_watts - use VT1 as proxy (VT1 ≈ LT1)
-                vt2_watts,  # FIXED: lt2_watts - use VT2 as proxy (VT2 ≈ LT2)
-            )
-            st.divider()
-            with st.expander("📄 Eksport raportu PDF"):
-                if st.button("Generuj raport PDF", key="btn_gen_pdf"):
-                    with st.spinner("Generowanie PDF…"):
-                        try:
-                            from modules.cache_utils import cached_generate_summary_pdf
-
-                            pdf_bytes = cached_generate_summary_pdf(
-                                df_plot,
-                                metrics,
-                                cp_input,
-                                w_prime_input,
-                                rider_weight,
-                                vt1_watts,
-                                vt2_watts,
-                                vt1_watts,  # lt1 proxy
-                                vt2_watts,  # lt2 proxy
-                                st.session_state.get("threshold_result"),
-                                st.session_state.get("smo2_result"),
-                                uploaded_file.name,
-                            )
-                            st.session_state["summary_pdf_bytes"] = pdf_bytes
-                        except Exception as e:
-                            logger.warning(f"PDF generation failed: {e}")
-                            st.error(f"Nie udało się wygenerować PDF: {e}")
-                if st.session_state.get("summary_pdf_bytes"):
-                    st.download_button(
-                        "⬇️ Pobierz PDF",
-                        data=st.session_state["summary_pdf_bytes"],
-                        file_name=f"raport_{uploaded_file.name}.pdf",
-                        mime="application/pdf",
-                        key="dl_summary_pdf",
-                    )
-        with t3:
-            render_tab_content("load")
-        with t4:
-            render_tab_content("compare")
-        with t5:
-            render_tab_content("power_trends")
-
-    with tab_performance:
-        UIComponents.show_breadcrumb("⚡ Performance")
-        t1, t2, t3, t4, t5, t6, t7, t8, t9 = st.tabs(
+    def _render_pdf_export():
+        st.divider()
+        with st.expander("📄 Eksport raportu PDF"):
+            if st.button("Generuj raport PDF", key="btn_gen_pdf"):
+                with st.spinner("Generowanie PDF…"):
+                    try:
+                        from modules.cache_utils import cached_generate_summary_pdf
+
+                        pdf_bytes = cached_generate_summary_pdf(
+                            df_plot,
+                            metrics,
+                            cp_input,
+                            w_prime_input,
+                            rider_weight,
+                            vt1_watts,
+                            vt2_watts,
+                            vt1_watts,  # lt1 proxy
+                            vt2_watts,  # lt2 proxy
+                            st.session_state.get("threshold_result"),
+                            st.session_state.get("smo2_result"),
+                            uploaded_file.name,
+                        )
+                        st.session_state["summary_pdf_bytes"] = pdf_bytes
+                    except Exception as e:
+                        logger.warning(f"PDF generation failed: {e}")
+                        st.error(f"Nie udało się wygenerować PDF: {e}")
+            if st.session_state.get("summary_pdf_bytes"):
+                st.download_button(
+                    "⬇️ Pobierz PDF",
+                    data=st.session_state["summary_pdf_bytes"],
+                    file_name=f"raport_{uploaded_file.name}.pdf",
+                    mime="application/pdf",
+                    key="dl_summary_pdf",
+                )
+
+    session_args = (df_plot, df_plot_resampled, metrics, rider_weight, cp_input, w_prime_input)
+
+    # Layout Tabs: (group, [(tab label, registry name, render args), ...])
+    tab_layout = [
+        (
+            "📊 Overview",
             [
-                "🔋 Power",
-                "🦵 Biomech",
-                "📐 Model",
-                "❤️ HR",
-                "🧬 Hematology",
-                "📈 Drift Maps",
-                "⏱️ TTE",
-                "🔗 W'bal Recon",
-                "🛡️ Durability",
-            ]
-        )
-        with t1:
-            render_tab_content(
-                "power",
-                df_plot,
-                df_plot_resampled,
-                cp_input,
-                w_prime_input,
-                rider_weight,
-                metrics.get("vo2_max_est", 0),
-            )
-        with t2:
-            render_tab_content("biomech", df_plot, df_plot_resampled)
-        with t3:
-            render_tab_content("model", df_plot, cp_input, w_prime_input)
-        with t4:
-            render_tab_content("heart_rate", df_plot)
-        with t5:
-            render_tab_content("hemo", df_plot)
-        with t6:
-            render_tab_content("drift_maps", df_plot)
-        with t7:
-            render_tab_content("tte", df_plot, cp_input, uploaded_file.name)
-        with t8:
-            render_tab_content(
-                "w_prime_reconstitution",
-                df_plot,
-                df_plot_resampled,
-                metrics,
-                rider_weight,
-                cp_input,
-                w_prime_input,
-            )
-        with t9:
-            render_tab_content(
-                "durability",
-                df_plot,
-                df_plot_resampled,
-                metrics,
-                rider_weight,
-                cp_input,
-                w_prime_input,
-            )
-
-    with tab_intelligence:
-        UIComponents.show_breadcrumb("🧠 Intelligence")
-        t1, t2, t3, t4, t5 = st.tabs(
+                (
+                    "📋 Raport z KPI",
+                    "report",
+                    (
+                        df_plot,
+                        df_plot_resampled,
+                        metrics,
+                        rider_weight,
+                        cp_input,
+                        decoupling_percent,
+                        drift_z2,
+                        vt1_vent,
+                        vt2_vent,
+                    ),
+                ),
+                (
+                    "📊 Podsumowanie",
+                    "summary",
+                    (
+                        df_plot,
+                        df_plot_resampled,
+                        metrics,
+                        training_notes,
+                        uploaded_file.name,
+                        cp_input,
+                        w_prime_input,
+                        rider_weight,
+                        vt1_watts,
+                        vt2_watts,
+                        vt1_watts,  # FIXED: lt1_watts - use VT1 as proxy (VT1 ≈ LT1)
+                        vt2_watts,  # FIXED: lt2_watts - use VT2 as proxy (VT2 ≈ LT2)
+                    ),
+                ),
+                ("📅 Load (PMC)", "load", ()),
+                ("🔀 Compare", "compare", ()),
+                ("📈 Moc w czasie", "power_trends", ()),
+            ],
+        ),
+        (
+            "⚡ Performance",
             [
-                "🍎 Nutrition",
-                "🚧 Limiters",
-                "🏁 Race Predictor",
-                "📊 Training Distribution",
-                "🔁 Intervals",
-            ]
-        )
-        with t1:
-            render_tab_content("nutrition", df_plot, cp_input, vt1_watts, vt2_watts)
-        with t2:
-            render_tab_content("limiters", df_plot, cp_input, vt2_vent)
-        with t3:
-            render_tab_content(
-                "race_predictor",
-                df_plot,
-                df_plot_resampled,
-                metrics,
-                rider_weight,
-                cp_input,
-                w_prime_input,
-            )
-        with t4:
-            render_tab_content(
-                "training_distribution",
-                df_plot,
-                df_plot_resampled,
-                metrics,
-                rider_weight,
-                cp_input,
-                w_prime_input,
-            )
-        with t5:
-            render_tab_content(
-                "intervals",
-                df_plot,
-                df_plot_resampled,
-                cp_input,
-                rider_weight,
-                rider_age,
-                is_male,
-            )
-
-    with tab_physiology:
-        UIComponents.show_breadcrumb("🫀 Physiology")
-        t1, t2, t3, t4, t5, t6, t7 = st.tabs(
+                (
+                    "🔋 Power",
+                    "power",
+                    (
+                        df_plot,
+                        df_plot_resampled,
+                        cp_input,
+                        w_prime_input,
+                        rider_weight,
+                        metrics.get("vo2_max_est", 0),
+                    ),
+                ),
+                ("🦵 Biomech", "biomech", (df_plot, df_plot_resampled)),
+                ("📐 Model", "model", (df_plot, cp_input, w_prime_input)),
+                ("❤️ HR", "heart_rate", (df_plot,)),
+                ("🧬 Hematology", "hemo", (df_plot,)),
+                ("📈 Drift Maps", "drift_maps", (df_plot,)),
+                ("⏱️ TTE", "tte", (df_plot, cp_input, uploaded_file.name)),
+                ("🔗 W'bal Recon", "w_prime_reconstitution", session_args),
+                ("🛡️ Durability", "durability", session_args),
+            ],
+        ),
+        (
+            "🧠 Intelligence",
             [
-                "💓 HRV",
-                "🩸 SmO2",
-                "🫁 Ventilation",
-                "🌡️ Thermal",
-                "🔥 Heat Strain",
-                "🚨 Alerts",
-                "🩸 Progi SmO2",
-            ]
-        )
-        with t1:
-            render_tab_content("hrv", df_clean_pl)
-        with t2:
-            render_tab_content("smo2", df_plot, training_notes, uploaded_file.name)
-        with t3:
-            render_tab_content("vent", df_plot, training_notes, uploaded_file.name)
-        with t4:
-            render_tab_content("thermal", df_plot)
-        with t5:
-            render_tab_content(
-                "heat_strain",
-                df_plot,
-                df_plot_resampled,
-                metrics,
-                rider_weight,
-                cp_input,
-                w_prime_input,
-                params.get("hr_max"),
-                params.get("hr_rest"),
-                rider_age,
-                is_male,
-            )
-        with t6:
-            render_tab_content("alerts", alert_report)
-        with t7:
-            render_tab_content(
-                "smo2_thresholds",
-                df_plot,
-                training_notes,
-                uploaded_file.name,
-                cp_input,
-            )
-
-    with tab_cycling:
-        UIComponents.show_breadcrumb("🚴 Cycling")
-        t1, t2, t3, t4, t5, t6 = st.tabs(
+                ("🍎 Nutrition", "nutrition", (df_plot, cp_input, vt1_watts, vt2_watts)),
+                ("🚧 Limiters", "limiters", (df_plot, cp_input, vt2_vent)),
+                ("🏁 Race Predictor", "race_predictor", session_args),
+                ("📊 Training Distribution", "training_distribution", session_args),
+                (
+                    "🔁 Intervals",
+                    "intervals",
+                    (df_plot, df_plot_resampled, cp_input, rider_weight, rider_age, is_male),
+                ),
+            ],
+        ),
+        (
+            "🫀 Physiology",
             [
-                "🎯 MPA",
-                "🧪 VLaMax",
-                "♻️ Aerobic Efficiency",
-                "📈 Training Impact",
-                "🗓️ Banister",
-                "📅 Periodization",
-            ]
-        )
-        with t1:
-            render_tab_content("mpa", df_plot, cp_input, w_prime_input)
-        with t2:
-            render_tab_content("vlamax", df_plot, cp_input, w_prime_input, rider_weight)
-        with t3:
-            render_tab_content("aerobic_efficiency", df_plot, cp_input)
-        with t4:
-            render_tab_content("training_impact", df_plot, cp_input, w_prime_input)
-        with t5:
-            render_tab_content("banister")
-        with t6:
-            render_tab_content("periodization")
+                ("💓 HRV", "hrv", (df_clean_pl,)),
+                ("🩸 SmO2", "smo2", (df_plot, training_notes, uploaded_file.name)),
+                ("🫁 Ventilation", "vent", (df_plot, training_notes, uploaded_file.name)),
+                ("🌡️ Thermal", "thermal", (df_plot,)),
+                (
+                    "🔥 Heat Strain",
+                    "heat_strain",
+                    session_args
+                    + (params.get("hr_max"), params.get("hr_rest"), rider_age, is_male),
+                ),
+                ("🚨 Alerts", "alerts", (alert_report,)),
+                (
+                    "🩸 Progi SmO2",
+                    "smo2_thresholds",
+                    (df_plot, training_notes, uploaded_file.name, cp_input),
+                ),
+            ],
+        ),
+        (
+            "🚴 Cycling",
+            [
+                ("🎯 MPA", "mpa", (df_plot, cp_input, w_prime_input)),
+                ("🧪 VLaMax", "vlamax", (df_plot, cp_input, w_prime_input, rider_weight)),
+                ("♻️ Aerobic Efficiency", "aerobic_efficiency", (df_plot, cp_input)),
+                ("📈 Training Impact", "training_impact", (df_plot, cp_input, w_prime_input)),
+                ("🗓️ Banister", "banister", ()),
+                ("📅 Periodization", "periodization", ()),
+            ],
+        ),
+    ]
+
+    # On-demand navigation: only the selected tab's renderer runs
+    on_demand = st.sidebar.toggle(
+        "⚡ Renderuj tylko aktywną zakładkę",
+        value=True,
+        key="nav_on_demand",
+        help="Wyłącz, aby przeliczać wszystkie zakładki przy każdej zmianie (tryb klasyczny).",
+    )
+    rendered_tabs = TabRegistry.render_layout(
+        tab_layout, on_demand=on_demand, extras={"summary": _render_pdf_export}
+    )
+    TabRegistry.render_timings(rendered_tabs)
 
 else:
     st.sidebar.info("Wgraj plik.")
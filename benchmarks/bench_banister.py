@@ -0,0 +1,68 @@
+"""
+Benchmark: Banister prediction and model fitting over a 4-year history.
+
+Compares the previous per-day decay-vector prediction (O(n²)) with the
+recursive engine, and times a full parameter fit against 150 markers.
+
+Usage:
+    python benchmarks/bench_banister.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.calculations.banister import (  # noqa: E402
+    BanisterModel,
+    fit_banister_model,
+    simulate_banister,
+)
+
+N_DAYS = 4 * 365
+N_MARKERS = 150
+
+
+def _decay_vector_performance(model: BanisterModel, tss: np.ndarray) -> np.ndarray:
+    out = np.empty(len(tss))
+    for n in range(len(tss)):
+        decay = np.arange(n + 1)[::-1]
+        fitness = model.k1 * np.sum(tss[: n + 1] * np.exp(-decay / model.tau1))
+        fatigue = model.k2 * np.sum(tss[: n + 1] * np.exp(-decay / model.tau2))
+        out[n] = model.p0 + fitness - fatigue
+    return out
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    tss = np.where(rng.random(N_DAYS) < 0.7, np.clip(rng.normal(80, 30, N_DAYS), 0, None), 0.0)
+    model = BanisterModel(k1=0.08, k2=0.25, tau1=38.0, tau2=9.0, p0=250.0)
+
+    simulate_banister(tss[:10], 1.0, 2.0, 42.0, 7.0)  # JIT warm-up
+
+    t0 = time.perf_counter()
+    reference = _decay_vector_performance(model, tss)
+    t_loop = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    perf, _, _ = simulate_banister(tss, model.k1, model.k2, model.tau1, model.tau2, model.p0)
+    t_engine = time.perf_counter() - t0
+
+    days = np.sort(rng.choice(N_DAYS, N_MARKERS, replace=False))
+    values = perf[0, days] + rng.normal(0, 3.0, N_MARKERS)
+    t0 = time.perf_counter()
+    fit = fit_banister_model(tss, days, values)
+    t_fit = time.perf_counter() - t0
+
+    print(f"History: {N_DAYS} days")
+    print(f"decay vector per day:  {t_loop * 1000:9.1f} ms")
+    print(f"recursive engine:      {t_engine * 1000:9.1f} ms")
+    print(f"speed-up: {t_loop / t_engine:.0f}x   max abs diff: {np.abs(perf[0] - reference).max():.2e}")
+    print(f"fit ({N_MARKERS} markers): {t_fit * 1000:9.1f} ms  -> {fit.model}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark: content fingerprinting of a 4-hour 1 Hz session.
+
+Usage:
+    python benchmarks/bench_fingerprint.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.cache_utils import make_cache_key  # noqa: E402
+from modules.fingerprint import clear_fingerprint_memo, fingerprint, is_xxhash_available  # noqa: E402
+
+N_SECONDS = 4 * 3600
+N_CHANNELS = 24
+REPEATS = 20
+
+
+def _make_session() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    data = {"time": np.arange(N_SECONDS, dtype=float)}
+    for i in range(N_CHANNELS):
+        data[f"ch_{i}"] = rng.normal(200, 30, N_SECONDS)
+    return pd.DataFrame(data)
+
+
+def _best_ms(func) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main() -> None:
+    df = _make_session()
+    mb = df.memory_usage(deep=True).sum() / 1e6
+    print(f"Session: {len(df)} rows x {df.shape[1]} cols ({mb:.1f} MB)")
+    print(f"Hasher: {'xxh3_128' if is_xxhash_available() else 'blake2b'}")
+
+    def cold():
+        clear_fingerprint_memo()
+        fingerprint(df)
+
+    print(f"fingerprint (cold):        {_best_ms(cold):8.3f} ms")
+    fingerprint(df)
+    print(f"fingerprint (memoized):    {_best_ms(lambda: fingerprint(df)):8.3f} ms")
+    print(
+        f"hash_pandas_object (old):  "
+        f"{_best_ms(lambda: pd.util.hash_pandas_object(df).sum()):8.3f} ms"
+    )
+    print(f"make_cache_key (memoized): {_best_ms(lambda: make_cache_key(df, 300, 'watts')):8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark: FIT export of a 5-hour ride and of a 20-session batch.
+
+"Before" replays the former hot path: per-sample datetime + timedelta and
+struct.pack for every field, then the nibble-table CRC byte by byte (the
+former session message did not pack, so only records and CRC are timed).
+"After" is the full FitExporter.export with the structured-array encoder
+and table CRC, and export_batch for the ZIP.
+
+Usage:
+    python benchmarks/bench_fit_export.py
+"""
+
+import struct
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.export.fit_exporter import FitExporter  # noqa: E402
+
+N_SECONDS = 5 * 3600
+N_BATCH = 20
+START = datetime(2024, 5, 1, 7, 30)
+METRICS = {"avg_watts": 220, "avg_hr": 140, "np": 235, "tss": 250, "work_kj": 3900}
+
+_NIBBLE_TABLE = [
+    0x0000, 0xCC01, 0xD801, 0x1400, 0xF001, 0x3C00, 0x2800, 0xE401,
+    0xA001, 0x6C00, 0x7800, 0xB401, 0x5000, 0x9C01, 0x8801, 0x4400,
+]
+
+
+def _session() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "time": np.arange(N_SECONDS, dtype=float),
+        "watts": np.clip(rng.normal(220, 60, N_SECONDS), 0, None),
+        "heartrate": rng.normal(140, 10, N_SECONDS),
+        "cadence": rng.normal(90, 5, N_SECONDS),
+        "velocity_smooth": rng.normal(9, 1, N_SECONDS),
+    })
+
+
+def _legacy(df: pd.DataFrame) -> bytes:
+    epoch = FitExporter.FIT_EPOCH
+    time_values = df["time"].values
+    power, hr = df["watts"].values, df["heartrate"].values
+    cadence, speed = df["cadence"].values, df["velocity_smooth"].values
+    out = []
+    for i in range(len(df)):
+        ts = int((START + timedelta(seconds=float(time_values[i])) - epoch).total_seconds())
+        parts = [
+            struct.pack("<I", ts),
+            struct.pack("<H", max(0, min(65535, int(float(power[i]))))),
+            struct.pack("<B", max(0, min(255, int(float(hr[i]))))),
+            struct.pack("<B", max(0, min(255, int(float(cadence[i]))))),
+            struct.pack("<H", max(0, min(65535, int(float(speed[i]) * 1000)))),
+        ]
+        out.append(b"\x04" + b"".join(parts))
+    data = b"".join(out)
+
+    crc = 0
+    for byte in data:
+        tmp = _NIBBLE_TABLE[crc & 0xF]
+        crc = ((crc >> 4) & 0x0FFF) ^ tmp ^ _NIBBLE_TABLE[byte & 0xF]
+        tmp = _NIBBLE_TABLE[crc & 0xF]
+        crc = ((crc >> 4) & 0x0FFF) ^ tmp ^ _NIBBLE_TABLE[(byte >> 4) & 0xF]
+    return data + struct.pack("<H", crc)
+
+
+def _best_of(fn, repeat=3) -> float:
+    elapsed = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        elapsed.append(time.perf_counter() - t0)
+    return min(elapsed)
+
+
+def main() -> None:
+    df = _session()
+    exporter = FitExporter()
+    exporter.export(df.iloc[:10], METRICS, START)  # JIT warm-up
+
+    single_before = _best_of(lambda: _legacy(df))
+    single_after = _best_of(lambda: exporter.export(df, METRICS, START))
+    batch = [(f"ride_{i}", df, METRICS, START + timedelta(days=i)) for i in range(N_BATCH)]
+    batch_before = _best_of(lambda: [_legacy(d) for _, d, _, _ in batch], repeat=1)
+    batch_after = _best_of(lambda: exporter.export_batch(batch), repeat=1)
+
+    size_kb = len(exporter.export(df, METRICS, START)) / 1024
+    print(f"Ride: {N_SECONDS:,} records ({size_kb:.0f} kB FIT); batch: {N_BATCH} rides to ZIP")
+    print(f"{'':8} {'1 ride':>10} {'batch':>10}")
+    print(f"{'before':8} {single_before * 1000:8.0f}ms {batch_before:9.2f}s")
+    print(f"{'after':8} {single_after * 1000:8.1f}ms {batch_after:9.2f}s")
+    print(f"speed-up: {single_before / single_after:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: ingesting a 5-hour ride from FIT vs its CSV conversion.
+
+"Before" is the former path: the FIT file converted to CSV outside the app,
+then loaded with load_data_uncached (conversion time not counted). "After"
+is load_data_uncached on the FIT file itself, decoded by modules.fit_reader.
+
+Usage:
+    python benchmarks/bench_fit_import.py
+"""
+
+import io
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.export.fit_exporter import FitExporter  # noqa: E402
+from modules.utils import load_data_uncached  # noqa: E402
+
+N_SECONDS = 5 * 3600
+START = datetime(2024, 5, 1, 7, 30)
+METRICS = {"avg_watts": 220, "avg_hr": 140, "np": 235, "tss": 250, "work_kj": 3900}
+
+
+def _session() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "time": np.arange(N_SECONDS, dtype=float),
+        "watts": np.clip(rng.normal(220, 60, N_SECONDS), 0, None).round(),
+        "heartrate": rng.normal(140, 10, N_SECONDS).round(),
+        "cadence": rng.normal(90, 5, N_SECONDS).round(),
+        "velocity_smooth": rng.normal(9, 1, N_SECONDS).round(3),
+    })
+
+
+def _best_of(fn, repeat=5) -> float:
+    elapsed = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        elapsed.append(time.perf_counter() - t0)
+    return min(elapsed)
+
+
+def main() -> None:
+    df = _session()
+    fit_bytes = FitExporter().export(df, METRICS, START)
+    csv_bytes = df.to_csv(index=False).encode()
+    load_data_uncached(io.BytesIO(fit_bytes))  # JIT warm-up
+
+    before = _best_of(lambda: load_data_uncached(io.BytesIO(csv_bytes)))
+    after = _best_of(lambda: load_data_uncached(io.BytesIO(fit_bytes)))
+
+    print(f"Ride: {N_SECONDS:,} records; FIT {len(fit_bytes) / 1024:.0f} kB, "
+          f"CSV {len(csv_bytes) / 1024:.0f} kB")
+    print(f"before (CSV):  {before * 1000:7.1f}ms")
+    print(f"after (FIT):   {after * 1000:7.1f}ms")
+    print(f"speed-up: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Benchmark: load a 1M-row session CSV with load_data.
+
+"Before" replays the former path: the whole file read eagerly by Polars,
+converted to pandas, then re-processed in copied 50k-row chunks with
+row-by-row HRV cleaning and pd.to_numeric. "After" is the streaming, typed
+scan in load_data_uncached. Each path runs in its own process, and the
+peak RSS (VmHWM, reset after imports) is read from /proc, so Linux only.
+
+Usage:
+    python benchmarks/bench_load_data.py
+"""
+
+import gc
+import io
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+N_ROWS = 1_000_000
+
+
+def _write_csv(path: Path) -> None:
+    rng = np.random.default_rng(0)
+    t = np.arange(N_ROWS)
+    hrv = np.round(rng.normal(45, 5, N_ROWS), 1).astype(str).astype(object)
+    hrv[::7] = [f"{a:.0f}:{a + 4:.0f}" for a in rng.normal(45, 5, len(hrv[::7]))]
+    pd.DataFrame({
+        "Time": t,
+        "Power": np.round(200 + 40 * np.sin(t / 300) + rng.normal(0, 15, N_ROWS)).astype(int),
+        "HR": np.round(140 + rng.normal(0, 3, N_ROWS)).astype(int),
+        "Cadence": np.round(rng.normal(90, 4, N_ROWS)).astype(int),
+        "SmO2": np.round(65 + rng.normal(0, 2, N_ROWS), 1),
+        "VE": np.round(60 + rng.normal(0, 5, N_ROWS), 2),
+        "hrv": hrv,
+    }).to_csv(path, index=False)
+
+
+def _clean_hrv_value(val: str) -> float:
+    val = val.strip().lower()
+    if val == "nan" or val == "":
+        return np.nan
+    if ":" in val:
+        try:
+            parts = [float(x) for x in val.split(":") if x]
+            return np.mean(parts) if parts else np.nan
+        except ValueError:
+            return np.nan
+    try:
+        return float(val)
+    except ValueError:
+        return np.nan
+
+
+def _legacy(path: Path) -> pd.DataFrame:
+    import polars as pl
+
+    from modules.utils import _NUMERIC_DTYPES, normalize_columns_pandas
+
+    with open(path, "rb") as f:
+        df = pl.read_csv(io.BytesIO(f.read())).to_pandas()
+    chunks = []
+    for start in range(0, len(df), 50_000):
+        chunk = normalize_columns_pandas(df.iloc[start : start + 50_000].copy())
+        if "hrv" in chunk.columns:
+            chunk["hrv"] = chunk["hrv"].astype(str).apply(_clean_hrv_value)
+            chunk["hrv"] = pd.to_numeric(chunk["hrv"], errors="coerce")
+            chunk["hrv"] = chunk["hrv"].interpolate(method="linear").ffill().bfill()
+        for col in _NUMERIC_DTYPES:
+            if col in chunk.columns:
+                chunk[col] = pd.to_numeric(chunk[col], errors="coerce")
+        chunks.append(chunk)
+        del chunk
+        gc.collect()
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _streaming(path: Path) -> pd.DataFrame:
+    from modules.utils import load_data_uncached
+
+    with open(path, "rb") as f:
+        return load_data_uncached(f)
+
+
+def _memory_mb(field: str) -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    raise KeyError(field)
+
+
+def _run(mode: str, path: Path) -> None:
+    """Child process: load once and print timings and memory as JSON."""
+    import polars  # noqa: F401
+
+    import modules.utils  # noqa: F401  (import cost is not part of the load)
+
+    gc.collect()
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")  # reset the peak RSS to the current RSS
+    base_mb = _memory_mb("VmRSS")
+    t0 = time.perf_counter()
+    df = _legacy(path) if mode == "before" else _streaming(path)
+    elapsed = time.perf_counter() - t0
+    print(json.dumps({
+        "seconds": elapsed,
+        "peak_mb": _memory_mb("VmHWM"),
+        "base_mb": base_mb,
+        "frame_mb": df.memory_usage(deep=True).sum() / 1024 / 1024,
+        "hrv_mean": float(df["hrv"].mean()),
+    }))
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "--run":
+        _run(sys.argv[2], Path(sys.argv[3]))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "session.csv"
+        _write_csv(path)
+        size_mb = path.stat().st_size / 1024 / 1024
+        print(f"{N_ROWS:,} rows, {size_mb:.0f} MB CSV\n")
+
+        results = {}
+        for mode in ("before", "after"):
+            out = subprocess.run(
+                [sys.executable, __file__, "--run", mode, str(path)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            results[mode] = json.loads(out.strip().splitlines()[-1])
+
+    print(f"{'':8} {'load':>9} {'peak RSS':>10} {'over base':>10} {'frame':>9}")
+    for mode, r in results.items():
+        print(
+            f"{mode:8} {r['seconds']:8.2f}s {r['peak_mb']:8.0f}MB "
+            f"{r['peak_mb'] - r['base_mb']:8.0f}MB {r['frame_mb']:7.0f}MB"
+        )
+    before, after = results["before"], results["after"]
+    print(f"\nspeedup: {before['seconds'] / after['seconds']:.1f}x")
+    print(f"HRV mean before/after: {before['hrv_mean']:.4f} / {after['hrv_mean']:.4f}")
+
+
+if __name__ == "__main__":
+    main()
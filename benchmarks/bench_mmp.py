@@ -0,0 +1,55 @@
+"""
+Benchmark: full 1 s – 3600 s PDC on a 5-hour 1 Hz ride.
+
+Compares one pandas rolling mean per duration with the shared
+cumulative-sum MMP engine.
+
+Usage:
+    python benchmarks/bench_mmp.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.calculations.mmp import compute_mmp_curve  # noqa: E402
+
+N_SECONDS = 5 * 3600
+MAX_DURATION = 3600
+
+
+def _rolling_pdc(power: pd.Series) -> np.ndarray:
+    filled = power.fillna(0)
+    return np.array(
+        [filled.rolling(d, min_periods=d).mean().max() for d in range(1, MAX_DURATION + 1)]
+    )
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    power = pd.Series(rng.gamma(4.0, 55.0, N_SECONDS))
+
+    compute_mmp_curve(power[:100], 10)  # JIT warm-up
+
+    t0 = time.perf_counter()
+    reference = _rolling_pdc(power)
+    t_rolling = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    curve = compute_mmp_curve(power, MAX_DURATION)
+    t_engine = time.perf_counter() - t0
+
+    max_err = np.nanmax(np.abs(curve - reference))
+    print(f"Ride: {N_SECONDS} s, durations 1..{MAX_DURATION}")
+    print(f"pandas rolling per duration: {t_rolling * 1000:9.1f} ms")
+    print(f"cumsum MMP engine:           {t_engine * 1000:9.1f} ms")
+    print(f"speed-up: {t_rolling / t_engine:.1f}x   max abs diff: {max_err:.2e} W")
+
+
+if __name__ == "__main__":
+    main()
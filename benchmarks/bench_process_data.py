@@ -0,0 +1,110 @@
+"""
+Benchmark: process_data on an 8-hour session recorded at 2 Hz.
+
+"Before" replays the former pandas chain (interpolate, Timedelta resample,
+interpolate, per-gap .loc masking, one rolling mean per smoothed column);
+"after" is the regrid kernel path. Time is the best of 5 runs; peak memory
+is the tracemalloc peak of a separate run (NumPy and pandas buffers are
+traced).
+
+Usage:
+    python benchmarks/bench_process_data.py
+"""
+
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.calculations import process_data  # noqa: E402
+from modules.calculations.common import WINDOW_LONG, WINDOW_SHORT  # noqa: E402
+from modules.calculations.data_processing import (  # noqa: E402
+    GAP_THRESHOLD_SECONDS,
+    SMOOTH_COLUMNS,
+)
+
+N_SAMPLES = 8 * 3600 * 2
+
+
+def _session() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    t = np.arange(N_SAMPLES) * 0.5
+    t[N_SAMPLES // 3:] += 600  # coffee stop
+    t[2 * N_SAMPLES // 3:] += 45
+    df = pd.DataFrame({"time": t})
+    for col in ["watts", "heartrate", "cadence", "smo2", "thb", "torque",
+                "core_temperature", "tymeventilation", "tymebreathrate", "velocity_smooth"]:
+        values = rng.normal(100, 10, N_SAMPLES)
+        values[rng.random(N_SAMPLES) < 0.02] = np.nan
+        df[col] = values.astype(np.float32)
+    df["altitude"] = np.cumsum(rng.normal(0, 0.1, N_SAMPLES))
+    return df
+
+
+def _legacy(df: pd.DataFrame) -> pd.DataFrame:
+    df_pd = df.copy()
+    df_pd = df_pd.dropna(subset=["time"]).sort_values("time").reset_index(drop=True)
+    diffs = df_pd["time"].diff()
+    gaps = []
+    for idx in df_pd["time"].index[diffs > GAP_THRESHOLD_SECONDS]:
+        prev_idx = df_pd["time"].index[df_pd["time"].index.get_loc(idx) - 1]
+        gaps.append((float(df_pd["time"].loc[prev_idx]), float(df_pd["time"].loc[idx])))
+    df_pd["time_dt"] = pd.to_timedelta(df_pd["time"], unit="s")
+    df_pd = df_pd.set_index("time_dt")
+    num_cols = df_pd.select_dtypes(include=["float64", "float32", "int64"]).columns.tolist()
+    df_pd[num_cols] = (
+        df_pd[num_cols].interpolate(method="linear", limit=GAP_THRESHOLD_SECONDS).ffill().bfill()
+    )
+    out = df_pd.select_dtypes(include=[np.number]).resample("1s").mean()
+    out = out.interpolate(method="linear", limit=GAP_THRESHOLD_SECONDS)
+    out = out.ffill(limit=5).bfill(limit=5)
+    out["time"] = out.index.total_seconds()
+    out["time_min"] = out["time"] / 60.0
+    result = out.copy()
+    cols = result.select_dtypes(include=[np.number]).columns.difference(["time", "time_min"])
+    for gap_start, gap_end in gaps:
+        in_gap = (result["time"] > gap_start) & (result["time"] < gap_end)
+        result.loc[in_gap, cols] = np.nan
+    for col in SMOOTH_COLUMNS:
+        if col in result.columns:
+            result[f"{col}_smooth"] = result[col].rolling(WINDOW_LONG, min_periods=1).mean()
+            result[f"{col}_smooth_5s"] = result[col].rolling(WINDOW_SHORT, min_periods=1).mean()
+    return result.reset_index(drop=True)
+
+
+def _measure(fn, df):
+    elapsed = []
+    for _ in range(5):
+        t0 = time.perf_counter()
+        out = fn(df)
+        elapsed.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    fn(df)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return out, min(elapsed), peak / 1024 / 1024
+
+
+def main() -> None:
+    df = _session()
+    process_data(df.iloc[:200])  # JIT warm-up
+
+    before, t_before, m_before = _measure(_legacy, df)
+    after, t_after, m_after = _measure(process_data, df)
+    pd.testing.assert_frame_equal(after, before, check_exact=True)
+
+    input_mb = df.memory_usage().sum() / 1024 / 1024
+    print(f"Session: {N_SAMPLES:,} samples ({input_mb:.0f} MB) -> {len(after):,} rows at 1 Hz")
+    print(f"{'':8} {'time':>9} {'peak memory':>12}")
+    print(f"{'before':8} {t_before * 1000:7.0f}ms {m_before:10.0f}MB")
+    print(f"{'after':8} {t_after * 1000:7.0f}ms {m_after:10.0f}MB")
+    print(f"speed-up: {t_before / t_after:.1f}x   output identical: yes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark: SmO2 3-segment breakpoint search on a 20-minute ramp.
+
+Compares the former coarse (20 W) + fine (2 W) loop over
+``_fit_piecewise_3segment`` with the prefix-sum engine evaluating the
+full 1 W grid.
+
+Usage:
+    python benchmarks/bench_segmented_regression.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.calculations.smo2_breakpoints import (  # noqa: E402
+    _fit_piecewise_3segment,
+    _two_phase_breakpoint_search,
+)
+
+N_POINTS = 1200
+BP1_RANGE = (200.0, 320.0)
+BP2_RANGE = (300.0, 420.0)
+MIN_SEPARATION = 40.0
+
+
+def _legacy_search(x, y):
+    """Coarse/fine double loop as shipped before the prefix-sum engine."""
+    best = (np.inf, None, None)
+
+    def scan(bp1_values, bp2_values):
+        nonlocal best
+        for bp1 in bp1_values:
+            for bp2 in bp2_values:
+                if bp2 <= bp1 + MIN_SEPARATION:
+                    continue
+                rss, _ = _fit_piecewise_3segment(x, y, bp1, bp2)
+                if rss < best[0]:
+                    best = (rss, bp1, bp2)
+
+    scan(np.arange(*BP1_RANGE, 20), np.arange(*BP2_RANGE, 20))
+    _, c1, c2 = best
+    scan(
+        np.arange(max(BP1_RANGE[0], c1 - 15), min(BP1_RANGE[1], c1 + 17), 2),
+        np.arange(max(BP2_RANGE[0], c2 - 15), min(BP2_RANGE[1], c2 + 17), 2),
+    )
+    return best
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    x = np.linspace(150, 450, N_POINTS) + rng.normal(0, 3, N_POINTS)
+    y = np.where(x < 290, 70 - 0.01 * (x - 150), 68.6 - 0.08 * (x - 290))
+    y = np.where(x >= 380, y - 0.25 * (x - 380), y) + rng.normal(0, 0.4, N_POINTS)
+
+    t0 = time.perf_counter()
+    legacy_rss, legacy_bp1, legacy_bp2 = _legacy_search(x, y)
+    t_legacy = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    bp1, bp2, _, rss = _two_phase_breakpoint_search(x, y, BP1_RANGE, BP2_RANGE, MIN_SEPARATION)
+    t_engine = time.perf_counter() - t0
+
+    print(f"Ramp: {N_POINTS} points")
+    print(f"legacy coarse+fine loop: {t_legacy * 1000:8.1f} ms  "
+          f"bp=({legacy_bp1:.0f}, {legacy_bp2:.0f}) rss={legacy_rss:.3f}")
+    print(f"prefix-sum full 1 W grid: {t_engine * 1000:7.1f} ms  "
+          f"bp=({bp1:.0f}, {bp2:.0f}) rss={rss:.3f}")
+    print(f"speed-up: {t_legacy / t_engine:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark: insert and read 10k sessions in SessionStore.
+
+"Before" replays the former access pattern - a fresh rollback-journal
+connection and commit per session, and a fully materialized read. "After"
+uses the pooled WAL connection with add_sessions_bulk (executemany) and the
+streaming iter_sessions cursor.
+
+Usage:
+    python benchmarks/bench_session_store.py
+"""
+
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.db import SessionRecord, SessionStore  # noqa: E402
+from modules.db.connection import close_connection  # noqa: E402
+from modules.db.session_store import _UPSERT_SQL, _record_params  # noqa: E402
+
+N_SESSIONS = 10_000
+
+
+def _records():
+    start = date(2015, 1, 1)
+    return [
+        SessionRecord(
+            date=(start + timedelta(days=i // 2)).isoformat(),
+            filename=f"ride_{i}.csv",
+            duration_sec=3600,
+            tss=80.0,
+            np=240.0,
+            mmp_5m=310.0,
+        )
+        for i in range(N_SESSIONS)
+    ]
+
+
+def _legacy(db_path: Path, records) -> tuple:
+    SessionStore(db_path)  # schema only
+    close_connection(db_path)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("PRAGMA journal_mode=DELETE")
+
+    t0 = time.perf_counter()
+    for record in records:
+        with sqlite3.connect(db_path) as conn:
+            conn.execute(_UPSERT_SQL, _record_params(record))
+            conn.commit()
+            conn.execute(
+                "SELECT id FROM sessions WHERE date = ? AND filename = ?",
+                (record.date, record.filename),
+            ).fetchone()
+    t_insert = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT * FROM sessions ORDER BY date DESC").fetchall()
+        n = len([SessionRecord(*r[:19]) for r in rows])
+    t_read = time.perf_counter() - t0
+    return t_insert, t_read, n
+
+
+def _pooled(db_path: Path, records) -> tuple:
+    store = SessionStore(db_path)
+
+    t0 = time.perf_counter()
+    for i in range(0, len(records), 500):
+        store.add_sessions_bulk(records[i : i + 500])
+    t_insert = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    n = sum(1 for _ in store.iter_sessions())
+    t_read = time.perf_counter() - t0
+    close_connection(db_path)
+    return t_insert, t_read, n
+
+
+def main() -> None:
+    records = _records()
+    with tempfile.TemporaryDirectory() as tmp:
+        before = _legacy(Path(tmp) / "legacy.db", records)
+        after = _pooled(Path(tmp) / "pooled.db", records)
+
+    print(f"Sessions: {N_SESSIONS}")
+    print(f"{'':28s}{'insert':>10s}{'read':>10s}")
+    print(f"{'per-call connect (before)':28s}{before[0]:9.2f}s{before[1]:9.3f}s")
+    print(f"{'pooled WAL + bulk (after)':28s}{after[0]:9.2f}s{after[1]:9.3f}s")
+    print(f"insert speed-up: {before[0] / after[0]:.0f}x   rows read: {before[2]} / {after[2]}")
+
+
+if __name__ == "__main__":
+    main()
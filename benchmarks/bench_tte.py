@@ -0,0 +1,96 @@
+"""
+Benchmark: TTE curve (80-120% FTP) and match-burn count for a 5-hour ride.
+
+"Before" replays the former code: compute_tte's per-sample Python run-length
+loop once per target, and count_match_burns' Python hysteresis loop.
+"After" is longest_runs (all targets in one kernel pass) and the Numba
+count_match_burns.
+
+Usage:
+    python benchmarks/bench_tte.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.calculations import count_match_burns  # noqa: E402
+from modules.tte import TTE_CURVE_PCTS, compute_tte, longest_runs  # noqa: E402
+
+N_SECONDS = 5 * 3600
+FTP = 250.0
+W_PRIME = 20000.0
+
+
+def _session() -> pd.Series:
+    rng = np.random.default_rng(0)
+    steps = rng.choice([180.0, 220.0, 250.0, 280.0, 320.0], 400)
+    power = np.repeat(steps, rng.integers(10, 90, 400))[:N_SECONDS]
+    return pd.Series(power + rng.normal(0, 8, len(power)))
+
+
+def _legacy_tte(power_series: pd.Series, target_pct: float) -> int:
+    target_power = FTP * (target_pct / 100.0)
+    power = power_series.fillna(0).values
+    in_range = (power >= target_power * 0.95) & (power <= target_power * 1.05)
+    max_duration = 0
+    current_duration = 0
+    for val in in_range:
+        if val:
+            current_duration += 1
+            max_duration = max(max_duration, current_duration)
+        else:
+            current_duration = 0
+    return max_duration
+
+
+def _legacy_burns(w_bal: np.ndarray, threshold: float) -> int:
+    burns = 0
+    below_threshold = False
+    for val in w_bal:
+        if val < threshold and not below_threshold:
+            burns += 1
+            below_threshold = True
+        elif val >= threshold * 1.5:
+            below_threshold = False
+    return burns
+
+
+def _best_of(fn, repeat=5) -> float:
+    elapsed = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        elapsed.append(time.perf_counter() - t0)
+    return min(elapsed)
+
+
+def main() -> None:
+    power = _session()
+    w_bal = W_PRIME * (0.5 + 0.5 * np.sin(np.arange(len(power)) / 120))
+    longest_runs(power.iloc[:10], TTE_CURVE_PCTS, FTP)  # JIT warm-up
+    count_match_burns(w_bal[:10], W_PRIME)
+
+    single_before = _best_of(lambda: _legacy_tte(power, 100.0))
+    curve_before = _best_of(lambda: [_legacy_tte(power, p) for p in TTE_CURVE_PCTS], repeat=3)
+    single_after = _best_of(lambda: compute_tte(power, 100.0, FTP))
+    curve_after = _best_of(lambda: longest_runs(power, TTE_CURVE_PCTS, FTP))
+    burns_before = _best_of(lambda: _legacy_burns(w_bal, W_PRIME * 0.3))
+    burns_after = _best_of(lambda: count_match_burns(w_bal, W_PRIME))
+
+    print(f"Ride: {len(power):,} s; curve: {len(TTE_CURVE_PCTS)} targets")
+    print(f"{'':8} {'1 target':>10} {'curve':>10} {'burns':>10}")
+    print(f"{'before':8} {single_before * 1000:8.2f}ms {curve_before * 1000:8.2f}ms "
+          f"{burns_before * 1000:8.2f}ms")
+    print(f"{'after':8} {single_after * 1000:8.2f}ms {curve_after * 1000:8.2f}ms "
+          f"{burns_after * 1000:8.2f}ms")
+    print(f"curve after / 1 target before: {curve_after / single_before:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark: calculate_w_prime_balance on a 5-hour session at 1 Hz.
+
+"Before" replays the former path: the frame copied, serialized to Parquet,
+read back, and run through the fastmath differential kernel. "After" is the
+shared W' engine on the frame's own arrays, cold (memo cleared before every
+run) and warm (same session, memo hit). Time is the best of 5 runs; peak
+memory is the tracemalloc peak of a separate run.
+
+Usage:
+    python benchmarks/bench_w_prime.py
+"""
+
+import io
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from numba import jit
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.calculations import calculate_w_prime_balance, process_data  # noqa: E402
+from modules.calculations import w_prime as w_prime_module  # noqa: E402
+
+N_SECONDS = 5 * 3600
+CP = 270.0
+W_PRIME = 20000.0
+
+
+def _session() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    t = np.arange(N_SECONDS, dtype=float)
+    raw = pd.DataFrame({"time": t})
+    raw["watts"] = np.clip(230 + 120 * np.sin(t / 240) + rng.normal(0, 35, N_SECONDS), 0, None)
+    for col in ["heartrate", "cadence", "smo2", "thb", "torque", "core_temperature",
+                "tymeventilation", "tymebreathrate", "velocity_smooth", "altitude"]:
+        raw[col] = rng.normal(100, 10, N_SECONDS)
+    return process_data(raw)
+
+
+@jit(nopython=True, fastmath=True)
+def _legacy_kernel(watts, time, cp, w_prime_cap):
+    n = len(watts)
+    w_bal = np.empty(n, dtype=np.float64)
+    curr_w = w_prime_cap
+    prev_time = time[0]
+    tau_base = w_prime_cap / cp * 300.0
+    for i in range(n):
+        if i == 0:
+            dt = 1.0
+        else:
+            dt = time[i] - prev_time
+            if dt <= 0:
+                dt = 1.0
+            prev_time = time[i]
+        power_diff = cp - watts[i]
+        if power_diff > 0:
+            tau = tau_base * (cp / max(watts[i], 1.0))
+            delta = (w_prime_cap - curr_w) / tau * dt
+        else:
+            delta = power_diff * dt
+        curr_w += delta
+        if curr_w > w_prime_cap:
+            curr_w = w_prime_cap
+        elif curr_w < 0:
+            curr_w = 0.0
+        w_bal[i] = curr_w
+    return w_bal
+
+
+def _legacy(df: pd.DataFrame) -> pd.DataFrame:
+    df_pd = df.copy()
+    bio = io.BytesIO()
+    df_pd.to_parquet(bio, index=False)
+    df_pd = pd.read_parquet(io.BytesIO(bio.getvalue()))
+    watts = df_pd["watts"].to_numpy(dtype=np.float64)
+    time_arr = df_pd["time"].to_numpy(dtype=np.float64)
+    df_pd["w_prime_balance"] = _legacy_kernel(watts, time_arr, CP, W_PRIME)
+    return df_pd
+
+
+def _cold(df: pd.DataFrame) -> pd.DataFrame:
+    w_prime_module._balances.clear()
+    return calculate_w_prime_balance(df, CP, W_PRIME)
+
+
+def _warm(df: pd.DataFrame) -> pd.DataFrame:
+    return calculate_w_prime_balance(df, CP, W_PRIME)
+
+
+def _measure(fn, df):
+    elapsed = []
+    for _ in range(5):
+        t0 = time.perf_counter()
+        out = fn(df)
+        elapsed.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    fn(df)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return out, min(elapsed), peak / 1024 / 1024
+
+
+def main() -> None:
+    df = _session()
+    _legacy(df.iloc[:100])  # JIT warm-up
+    _cold(df.iloc[:100])
+
+    results = {
+        "before": _measure(_legacy, df),
+        "cold": _measure(_cold, df),
+        "warm": _measure(_warm, df),
+    }
+    before = results["before"][0]["w_prime_balance"].to_numpy()
+    after = results["cold"][0]["w_prime_balance"].to_numpy()
+
+    frame_mb = df.memory_usage().sum() / 1024 / 1024
+    print(f"Session: {len(df):,} rows x {df.shape[1]} columns ({frame_mb:.0f} MB)")
+    print(f"{'':8} {'time':>10} {'peak memory':>12}")
+    for name, (_, seconds, peak_mb) in results.items():
+        print(f"{name:8} {seconds * 1000:8.2f}ms {peak_mb:10.2f}MB")
+    print(f"speed-up (cold): {results['before'][1] / results['cold'][1]:.0f}x")
+    print(f"max |before - after|: {np.abs(before - after).max():.2e} J")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Ramp Test Report Migration Script.
+
+Moves the inline 1 Hz time series of archived ramp-test reports into
+Parquet sidecar files (see modules/reporting/timeseries_store.py).
+
+Usage:
+    python migrate_ramp_reports.py                   # reports/ramp_tests
+    python migrate_ramp_reports.py --dir some/archive
+"""
+import argparse
+import sys
+from pathlib import Path
+
+from modules.reporting.timeseries_store import migrate_archive
+
+
+def _archive_size(base_dir: Path) -> int:
+    return sum(p.stat().st_size for p in base_dir.rglob("*") if p.is_file())
+
+
+def migrate(base_dir: Path):
+    if not base_dir.exists():
+        print(f"❌ Archive not found: {base_dir}")
+        sys.exit(1)
+
+    size_before = _archive_size(base_dir)
+    print(f"Migrating reports in {base_dir} ({size_before / 1e6:.1f} MB)...")
+    converted, skipped = migrate_archive(base_dir)
+    size_after = _archive_size(base_dir)
+
+    print(f"✅ Converted: {converted}, already migrated / without time series: {skipped}")
+    print(f"   Archive size: {size_before / 1e6:.1f} MB -> {size_after / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move ramp test time series to sidecar files")
+    parser.add_argument(
+        "--dir", default="reports/ramp_tests", help="Report archive directory"
+    )
+    args = parser.parse_args()
+
+    migrate(Path(args.dir))
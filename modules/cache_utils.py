@@ -3,6 +3,9 @@ Caching layer for expensive computations.
 
 Provides memoization for CPU-intensive operations with TTL support.
 Uses diskcache as a simple alternative to Redis (no external dependencies).
+
+DataFrame, Series and ndarray arguments are keyed by a content fingerprint
+(see modules.fingerprint), so sessions of identical shape never share an entry.
 """
 
 import hashlib
@@ -24,6 +27,7 @@ except ImportError:
     Cache = None
 
 from modules.config import Config
+from modules.fingerprint import FINGERPRINT_VERSION, fingerprint
 
 T = TypeVar("T")
 
@@ -32,9 +36,9 @@ _cache: Optional[Cache] = None
 
 
 def get_cache() -> Optional[Cache]:
-    """Get or create global cache instance."""
+    """Get or create global cache instance (None if diskcache is missing or disabled)."""
     global _cache
-    if not _CACHE_AVAILABLE:
+    if not _CACHE_AVAILABLE or not Config.DISK_CACHE_ENABLED:
         return None
 
     if _cache is None:
@@ -104,7 +108,7 @@ def cache_result(ttl: int = 3600, key_func: Optional[Callable] = None):
 def _generate_cache_key(func_name: str, args: tuple, kwargs: dict) -> str:
     """Generate a deterministic cache key from function arguments."""
     # Convert arguments to hashable form
-    key_parts = [func_name]
+    key_parts = [f"v{FINGERPRINT_VERSION}", func_name]
 
     for arg in args:
         key_parts.append(_hash_arg(arg))
@@ -119,19 +123,18 @@ def _generate_cache_key(func_name: str, args: tuple, kwargs: dict) -> str:
 def _hash_arg(arg: Any) -> str:
     """Convert argument to hashable string representation."""
     if isinstance(arg, pd.DataFrame):
-        # Hash based on column names and shape (not full data for performance)
-        cols = ",".join(sorted(arg.columns))
-        return f"DF:{cols}:{len(arg)}"
+        return f"DF:{fingerprint(arg)}"
     elif isinstance(arg, pd.Series):
-        return f"SER:{arg.name}:{len(arg)}"
+        return f"SER:{fingerprint(arg)}"
     elif isinstance(arg, np.ndarray):
-        return f"ARR:{arg.shape}:{arg.dtype}"
+        return f"ARR:{fingerprint(arg)}"
     elif isinstance(arg, (list, tuple)):
-        return f"LIST:{len(arg)}"
+        return f"{type(arg).__name__.upper()}:[" + ",".join(_hash_arg(a) for a in arg) + "]"
     elif isinstance(arg, dict):
-        return f"DICT:{len(arg)}"
+        items = sorted((repr(k), _hash_arg(v)) for k, v in arg.items())
+        return "DICT:{" + ",".join(f"{k}:{v}" for k, v in items) + "}"
     else:
-        return str(arg)
+        return repr(arg)
 
 
 def _invalidate_cache(func_name: str, args: tuple, kwargs: dict, key_func: Optional[Callable]):
@@ -160,14 +163,7 @@ def clear_cache():
 
 def make_cache_key(*args) -> str:
     """Generate an in-memory cache key from arguments. DataFrames are hashed by content."""
-    import pandas as pd
-
-    parts = []
-    for a in args:
-        if isinstance(a, pd.DataFrame):
-            parts.append(str(pd.util.hash_pandas_object(a).sum()))
-        else:
-            parts.append(repr(a))
+    parts = [_hash_arg(a) for a in args]
     return hashlib.md5("|".join(parts).encode()).hexdigest()
 
 
@@ -239,3 +235,18 @@ def get_session_store() -> "SessionStore":  # noqa: F821
         return SessionStore()
 
     return _get_store()
+
+
+def get_mmp_store() -> "MMPStore":  # noqa: F821
+    """Get cached MMPStore singleton.
+
+    Keeps the in-memory MMP matrix and envelope alive across Streamlit reruns.
+    """
+    import streamlit as st
+    from modules.db import MMPStore
+
+    @st.cache_resource
+    def _get_store() -> "MMPStore":
+        return MMPStore()
+
+    return _get_store()
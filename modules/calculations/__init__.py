@@ -28,6 +28,11 @@ Dla wstecznej kompatybilności, wszystkie funkcje są re-eksportowane z tego mod
 # ============================================================
 
 from .w_prime import (
+    W_PRIME_MODELS,
+    CPWPrimeFit,
+    w_prime_balance,
+    w_prime_sweep,
+    fit_cp_w_prime,
     calculate_w_prime_balance,
     calculate_w_prime_fast,
     # Recovery Score (NEW)
@@ -253,6 +258,11 @@ from .polars_adapter import (
 # Eksport wszystkich symboli dla import *
 __all__ = [
     # W' Balance
+    "W_PRIME_MODELS",
+    "CPWPrimeFit",
+    "w_prime_balance",
+    "w_prime_sweep",
+    "fit_cp_w_prime",
     "calculate_w_prime_balance",
     "calculate_w_prime_fast",
     "calculate_w_prime_biexp",
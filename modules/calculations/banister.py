@@ -9,12 +9,27 @@ Pure functions — no Streamlit imports.
 
 from __future__ import annotations
 
+import logging
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 import numpy as np
 
+from modules.numba_utils import is_numba_available, njit
+
+logger = logging.getLogger(__name__)
+
+# Performance markers available per session for model fitting
+FIT_MARKERS: Dict[str, str] = {
+    "mmp_20m": "MMP 20 min",
+    "mmp_5m": "MMP 5 min",
+    "cp": "CP (2-punktowe, 5/20 min)",
+}
+
+# Minimum number of marker days needed to fit the five model parameters
+MIN_FIT_MARKERS = 8
+
 
 @dataclass
 class BanisterModel:
@@ -38,6 +53,16 @@ class BanisterPrediction:
     tsb: float
 
 
+@dataclass
+class BanisterFit:
+    """Model calibrated against performance markers."""
+
+    model: BanisterModel
+    rmse: float
+    r_squared: float
+    n_markers: int
+
+
 @dataclass
 class TSSRecommendation:
     """Recommended TSS for a specific day during taper."""
@@ -59,6 +84,264 @@ def default_banister_model() -> BanisterModel:
     return BanisterModel()
 
 
+@njit(cache=True)
+def _impulse_kernel(tss: np.ndarray, decay: np.ndarray) -> np.ndarray:
+    """r[p, n] = r[p, n-1] * decay[p] + tss[n] for each decay factor."""
+    out = np.empty((len(decay), len(tss)))
+    for p in range(len(decay)):
+        acc = 0.0
+        d = decay[p]
+        for n in range(len(tss)):
+            acc = acc * d + tss[n]
+            out[p, n] = acc
+    return out
+
+
+def _impulse_numpy(tss: np.ndarray, decay: np.ndarray) -> np.ndarray:
+    out = np.empty((len(decay), len(tss)))
+    acc = np.zeros(len(decay))
+    for n in range(len(tss)):
+        acc = acc * decay + tss[n]
+        out[:, n] = acc
+    return out
+
+
+def impulse_response(tss: Sequence[float], taus: Iterable[float]) -> np.ndarray:
+    """Exponentially weighted TSS sums for several time constants at once.
+
+    R(n) = sum(TSS(i) * exp(-(n-i)/tau)) for i=0..n, computed with the
+    recursion R(n) = R(n-1) * exp(-1/tau) + TSS(n) in O(n) per tau.
+
+    Returns:
+        Array of shape (len(taus), len(tss)).
+    """
+    tss_arr = np.nan_to_num(np.asarray(tss, dtype=np.float64), nan=0.0)
+    decay = np.exp(-1.0 / np.asarray(list(taus), dtype=np.float64))
+    if len(decay) == 0 or len(tss_arr) == 0:
+        return np.zeros((len(decay), len(tss_arr)))
+    if is_numba_available():
+        return _impulse_kernel(tss_arr, decay)
+    return _impulse_numpy(tss_arr, decay)
+
+
+def simulate_banister(
+    tss: Sequence[float], k1, k2, tau1, tau2, p0=0.0
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Evaluate a batch of parameter sets over one TSS history.
+
+    Parameters broadcast against each other to P parameter sets; each
+    distinct tau is simulated only once.
+
+    Returns:
+        (performance, fitness, fatigue), each of shape (P, len(tss)).
+        Fitness and fatigue are the unweighted impulse responses, so
+        performance = p0 + k1 * fitness - k2 * fatigue.
+    """
+    params = (np.asarray(v, dtype=np.float64) for v in (k1, k2, tau1, tau2, p0))
+    k1, k2, tau1, tau2, p0 = (a.ravel() for a in np.broadcast_arrays(*params))
+    taus, inverse = np.unique(np.concatenate([tau1, tau2]), return_inverse=True)
+    responses = impulse_response(tss, taus)
+    fitness = responses[inverse[: len(tau1)]]
+    fatigue = responses[inverse[len(tau1) :]]
+    performance = p0[:, None] + k1[:, None] * fitness - k2[:, None] * fatigue
+    return performance, fitness, fatigue
+
+
+def _fit_linear_gains(
+    fitness: np.ndarray, fatigue: np.ndarray, y: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Least-squares (p0, k1, k2) for every (tau1, tau2) pair of a grid.
+
+    With the time constants fixed the model is linear in the gains, so each
+    pair is a 3x3 normal-equation solve built from a handful of dot products.
+
+    Args:
+        fitness: (T1, m) fitness responses at the marker days.
+        fatigue: (T2, m) fatigue responses at the marker days.
+        y: (m,) marker values.
+
+    Returns:
+        (theta, rss) with shapes (T1, T2, 3) and (T1, T2).
+    """
+    m = float(len(y))
+    t1, t2 = len(fitness), len(fatigue)
+    sf = np.broadcast_to(fitness.sum(axis=1)[:, None], (t1, t2))
+    sg = np.broadcast_to(fatigue.sum(axis=1)[None, :], (t1, t2))
+    sff = np.broadcast_to((fitness * fitness).sum(axis=1)[:, None], (t1, t2))
+    sgg = np.broadcast_to((fatigue * fatigue).sum(axis=1)[None, :], (t1, t2))
+    sfg = fitness @ fatigue.T
+    sfy = np.broadcast_to((fitness @ y)[:, None], (t1, t2))
+    sgy = np.broadcast_to((fatigue @ y)[None, :], (t1, t2))
+    sy = float(y.sum())
+
+    # Columns of the design matrix: [1, fitness, -fatigue]
+    a = np.empty((t1, t2, 3, 3))
+    a[..., 0, 0] = m
+    a[..., 0, 1] = a[..., 1, 0] = sf
+    a[..., 0, 2] = a[..., 2, 0] = -sg
+    a[..., 1, 1] = sff
+    a[..., 1, 2] = a[..., 2, 1] = -sfg
+    a[..., 2, 2] = sgg
+    b = np.stack([np.full((t1, t2), sy), sfy, -sgy], axis=-1)
+
+    theta = np.einsum("...ij,...j->...i", np.linalg.pinv(a), b)
+    rss = float(y @ y) - 2 * np.einsum("...i,...i->...", theta, b) + np.einsum(
+        "...i,...ij,...j->...", theta, a, theta
+    )
+    return theta, np.maximum(rss, 0.0)
+
+
+def fit_banister_model(
+    tss_history: Sequence[float],
+    marker_days: Sequence[int],
+    marker_values: Sequence[float],
+    tau1_bounds: Tuple[float, float] = (10.0, 90.0),
+    tau2_bounds: Tuple[float, float] = (2.0, 30.0),
+    grid_size: int = 40,
+) -> Optional[BanisterFit]:
+    """Calibrate k1, k2, tau1, tau2 and p0 against measured performance.
+
+    A log-spaced (tau1, tau2) grid is searched with the linear gains solved
+    in closed form for every pair (``_fit_linear_gains``); the best pair
+    with non-negative gains and tau1 > tau2 is then polished by bounded
+    nonlinear least squares over all five parameters.
+
+    Args:
+        tss_history: Daily TSS, one value per day (rest days = 0).
+        marker_days: Day index into ``tss_history`` of each marker.
+        marker_values: Performance marker (e.g. MMP 20 min in W) per marker day.
+        tau1_bounds: Search range of the fitness time constant (days).
+        tau2_bounds: Search range of the fatigue time constant (days).
+        grid_size: Grid points per time constant.
+
+    Returns:
+        BanisterFit, or None with fewer than ``MIN_FIT_MARKERS`` usable markers
+        or no physiologically valid solution.
+    """
+    tss_arr = np.nan_to_num(np.asarray(tss_history, dtype=np.float64), nan=0.0)
+    days = np.asarray(marker_days, dtype=np.int64)
+    y = np.asarray(marker_values, dtype=np.float64)
+    ok = (days >= 0) & (days < len(tss_arr)) & np.isfinite(y)
+    days, y = days[ok], y[ok]
+    if len(y) < MIN_FIT_MARKERS or not tss_arr.any():
+        return None
+
+    tau1_grid = np.geomspace(*tau1_bounds, grid_size)
+    tau2_grid = np.geomspace(*tau2_bounds, grid_size)
+    fitness = impulse_response(tss_arr, tau1_grid)[:, days]
+    fatigue = impulse_response(tss_arr, tau2_grid)[:, days]
+
+    theta, rss = _fit_linear_gains(fitness, fatigue, y)
+    valid = (
+        (theta[..., 1] >= 0)
+        & (theta[..., 2] >= 0)
+        & (tau1_grid[:, None] > tau2_grid[None, :])
+        & np.isfinite(rss)
+    )
+    if not valid.any():
+        return None
+    i, j = np.unravel_index(np.argmin(np.where(valid, rss, np.inf)), rss.shape)
+    p0, k1, k2 = theta[i, j]
+    tau1, tau2 = tau1_grid[i], tau2_grid[j]
+    best_rss = float(rss[i, j])
+
+    try:
+        from scipy.optimize import least_squares
+
+        def residuals(params: np.ndarray) -> np.ndarray:
+            perf, _, _ = simulate_banister(tss_arr, *params[1:], params[0])
+            return perf[0, days] - y
+
+        lower = [-np.inf, 0.0, 0.0, tau1_bounds[0], tau2_bounds[0]]
+        upper = [np.inf, np.inf, np.inf, tau1_bounds[1], tau2_bounds[1]]
+        x0 = np.clip([p0, k1, k2, tau1, tau2], lower, upper)
+        result = least_squares(residuals, x0, bounds=(lower, upper), x_scale="jac")
+        polished_rss = float(np.sum(result.fun**2))
+        if result.success and result.x[3] > result.x[4] and polished_rss < best_rss:
+            p0, k1, k2, tau1, tau2 = result.x
+            best_rss = polished_rss
+    except (ImportError, ValueError) as e:
+        logger.debug("Banister fit refinement skipped: %s", e)
+
+    ss_tot = float(np.sum((y - y.mean()) ** 2))
+    return BanisterFit(
+        model=BanisterModel(
+            k1=float(k1), k2=float(k2), tau1=float(tau1), tau2=float(tau2), p0=float(p0)
+        ),
+        rmse=float(np.sqrt(best_rss / len(y))),
+        r_squared=1.0 - best_rss / ss_tot if ss_tot > 0 else 0.0,
+        n_markers=int(len(y)),
+    )
+
+
+def _record_marker(record, marker: str) -> Optional[float]:
+    if marker == "cp":
+        p5 = getattr(record, "mmp_5m", None)
+        p20 = getattr(record, "mmp_20m", None)
+        if not p5 or not p20:
+            return None
+        # Two-point work-time model: W = CP * t + W'
+        cp = (p20 * 1200.0 - p5 * 300.0) / 900.0
+        return cp if 0 < cp <= p20 else None
+    value = getattr(record, marker, None)
+    return float(value) if value else None
+
+
+def banister_fit_inputs(
+    records: Iterable,
+    marker: str = "mmp_20m",
+    near_max_pct: float = 0.9,
+    window_days: int = 90,
+) -> Tuple[Optional[datetime], np.ndarray, np.ndarray, np.ndarray]:
+    """Daily TSS and performance markers from session records.
+
+    A session's MMP is only a performance test if the athlete actually went
+    hard, so per day the best marker is kept and only days reaching
+    ``near_max_pct`` of the trailing ``window_days`` best are used.
+
+    Args:
+        records: SessionRecord-like objects (``date``, ``tss`` and MMP fields).
+        marker: Key of ``FIT_MARKERS``.
+        near_max_pct: Fraction of the trailing best a marker must reach (0 keeps all).
+        window_days: Length of the trailing window.
+
+    Returns:
+        (start_date, daily_tss, marker_days, marker_values); start_date is
+        None when there are no records.
+    """
+    tss_by_day: Dict[str, float] = {}
+    marker_by_day: Dict[str, float] = {}
+    for r in records:
+        day = r.date if isinstance(r.date, str) else r.date.strftime("%Y-%m-%d")
+        day = day[:10]
+        tss_by_day[day] = tss_by_day.get(day, 0.0) + float(getattr(r, "tss", 0) or 0)
+        value = _record_marker(r, marker)
+        if value is not None:
+            marker_by_day[day] = max(value, marker_by_day.get(day, value))
+
+    if not tss_by_day:
+        return None, np.zeros(0), np.zeros(0, dtype=np.int64), np.zeros(0)
+
+    start = datetime.strptime(min(tss_by_day), "%Y-%m-%d")
+    end = datetime.strptime(max(tss_by_day), "%Y-%m-%d")
+    daily_tss = np.zeros((end - start).days + 1)
+    for day, tss in tss_by_day.items():
+        daily_tss[(datetime.strptime(day, "%Y-%m-%d") - start).days] = tss
+
+    items = sorted(
+        ((datetime.strptime(d, "%Y-%m-%d") - start).days, v) for d, v in marker_by_day.items()
+    )
+    days = np.array([d for d, _ in items], dtype=np.int64)
+    values = np.array([v for _, v in items], dtype=np.float64)
+    if near_max_pct > 0 and len(days):
+        lo = np.searchsorted(days, days - window_days, side="right")
+        trailing_best = np.array([values[a : b + 1].max() for b, a in enumerate(lo)])
+        keep = values >= near_max_pct * trailing_best
+        days, values = days[keep], values[keep]
+
+    return start, daily_tss, days, values
+
+
 def predict_performance(
     model: BanisterModel,
     tss_history: List[float],
@@ -70,6 +353,9 @@ def predict_performance(
     Fatigue(n) = k2 * sum(TSS(i) * exp(-(n-i)/tau2)) for i=0..n
     Performance = P0 + Fitness - Fatigue
 
+    The sums are evaluated recursively (see ``impulse_response``), so the
+    cost is linear in the history length.
+
     Args:
         model: BanisterModel with parameters k1, k2, tau1, tau2, p0.
         tss_history: Historical daily TSS values (most recent last).
@@ -83,45 +369,220 @@ def predict_performance(
 
     tss_arr = np.array(tss_history, dtype=float)
     n_history = len(tss_arr)
-    n_total = n_history + days_ahead
+    all_tss = np.zeros(n_history + max(days_ahead, 0))
+    all_tss[:n_history] = tss_arr
+
+    performance, fitness, fatigue = simulate_banister(
+        all_tss, model.k1, model.k2, model.tau1, model.tau2, model.p0
+    )
+    # Approximate CTL/ATL: the unweighted impulse responses
+    ctl = fitness[0] if model.k1 != 0 else np.zeros(len(all_tss))
+    atl = fatigue[0] if model.k2 != 0 else np.zeros(len(all_tss))
 
     today = datetime.now().date()
     start_date = today - timedelta(days=n_history - 1)
 
-    predictions: List[BanisterPrediction] = []
+    return [
+        BanisterPrediction(
+            date=(start_date + timedelta(days=n)).strftime("%Y-%m-%d"),
+            predicted_performance=round(float(performance[0, n]), 1),
+            ctl=round(float(ctl[n]), 1),
+            atl=round(float(atl[n]), 1),
+            tsb=round(float(ctl[n] - atl[n]), 1),
+        )
+        for n in range(len(all_tss))
+    ]
+
+
+@dataclass
+class TaperPlan:
+    """Optimized daily TSS leading into a target date."""
+
+    recommendations: List[TSSRecommendation]
+    tss: np.ndarray
+    predicted_performance: np.ndarray  # per plan day, after that day's load
+    target_performance: float
+    maintenance_performance: float  # target-day form when holding TSS at CTL
+
+
+# Penalty per missing intensity day: larger than any achievable TSS gain
+_INTENSITY_SHORTFALL_PENALTY = 1e9
+
+
+def _performance_from_pmc(
+    tss: np.ndarray, current_ctl: float, current_atl: float, model: BanisterModel
+) -> np.ndarray:
+    """Predicted performance over ``tss`` starting from the PMC's CTL/ATL.
 
-    for n in range(n_total):
-        tss_day = tss_arr[n] if n < n_history else 0.0
+    CTL/ATL are normalized EWMAs: a steady load L gives CTL = L but an
+    impulse response of L / (1 - exp(-1/tau)), hence the rescaling of the
+    initial state.
+    """
+    steps = np.arange(1, len(tss) + 1)
+    decay1, decay2 = np.exp(-1.0 / model.tau1), np.exp(-1.0 / model.tau2)
+    _, fitness, fatigue = simulate_banister(tss, model.k1, model.k2, model.tau1, model.tau2)
+    fitness = fitness[0] + current_ctl / (1.0 - decay1) * decay1**steps
+    fatigue = fatigue[0] + current_atl / (1.0 - decay2) * decay2**steps
+    return model.p0 + model.k1 * fitness - model.k2 * fatigue
 
-        # Calculate fitness and fatigue using impulse-response
-        fitness = 0.0
-        fatigue = 0.0
 
-        for i in range(n + 1):
-            tss_i = tss_arr[i] if i < n_history else 0.0
-            decay_days = n - i
+def _schedule_intensity(
+    v_normal: np.ndarray, v_intensity: np.ndarray, week: np.ndarray, required: Dict[int, int]
+) -> np.ndarray:
+    """Pick intensity days maximizing the total gain (dynamic programming).
 
-            fitness += model.k1 * tss_i * np.exp(-decay_days / model.tau1)
-            fatigue += model.k2 * tss_i * np.exp(-decay_days / model.tau2)
+    Each week should contain ``required[week]`` intensity days (a shortfall
+    is heavily penalized, so infeasible weeks get as many as fit) and two
+    intensity days are never back to back.
 
-        performance = model.p0 + fitness - fatigue
+    Returns:
+        Boolean mask of intensity days.
+    """
+    n = len(v_normal)
+    if n == 0:
+        return np.zeros(0, dtype=bool)
+
+    # State: (intensity days so far this week, previous day was intensity)
+    values: Dict[Tuple[int, bool], float] = {(0, False): 0.0}
+    back: List[Dict[Tuple[int, bool], Tuple[Tuple[int, bool], bool]]] = []
+    for i in range(n):
+        new_week = i > 0 and week[i] != week[i - 1]
+        closing_need = required.get(int(week[i - 1]), 0) if new_week else 0
+        cap = required.get(int(week[i]), 0)
+        nxt: Dict[Tuple[int, bool], float] = {}
+        ptr: Dict[Tuple[int, bool], Tuple[Tuple[int, bool], bool]] = {}
+        for state, v in values.items():
+            count, prev = state
+            if new_week:
+                v -= _INTENSITY_SHORTFALL_PENALTY * max(0, closing_need - count)
+                count = 0
+            options = [(False, v + v_normal[i])]
+            if not prev and np.isfinite(v_intensity[i]):
+                options.append((True, v + v_intensity[i]))
+            for hard, value in options:
+                key = (min(count + hard, cap), hard)
+                if value > nxt.get(key, -np.inf):
+                    nxt[key] = value
+                    ptr[key] = (state, hard)
+        values = nxt
+        back.append(ptr)
+
+    need = required.get(int(week[-1]), 0)
+    state = max(
+        values, key=lambda k: values[k] - _INTENSITY_SHORTFALL_PENALTY * max(0, need - k[0])
+    )
+    mask = np.zeros(n, dtype=bool)
+    for i in range(n - 1, -1, -1):
+        state, mask[i] = back[i][state]
+    return mask
+
+
+def plan_taper(
+    current_ctl: float,
+    current_atl: float,
+    target_date: datetime,
+    days_out: int = 14,
+    model: Optional[BanisterModel] = None,
+    max_daily_tss: Optional[float] = None,
+    min_daily_tss: float = 0.0,
+    rest_days: Iterable[int] = (),
+    min_intensity_days: int = 1,
+    intensity_tss: Optional[float] = None,
+) -> TaperPlan:
+    """Daily TSS maximizing predicted performance on the target date.
+
+    With fixed time constants the Banister model is linear in the daily
+    loads, so the marginal effect of a day's TSS on target-day performance
+    is the closed form k1 * exp(-d/tau1) - k2 * exp(-d/tau2), d days before
+    the target. Each free day therefore takes its upper bound while that
+    effect is positive and its lower bound afterwards; intensity days
+    (at least ``intensity_tss``) are placed where they cost least by
+    ``_schedule_intensity``. The plan is exact for the model and takes
+    milliseconds.
 
-        # Approximate CTL/ATL using EWMA for context
-        ctl = fitness / model.k1 if model.k1 != 0 else 0.0
-        atl = fatigue / model.k2 if model.k2 != 0 else 0.0
+    Args:
+        current_ctl: Current Chronic Training Load.
+        current_atl: Current Acute Training Load.
+        target_date: Date of target event/race (planned as a rest day).
+        days_out: Number of plan days, ending on the target date.
+        model: Banister parameters (default: literature values).
+        max_daily_tss: Daily TSS cap (default: 1.5 x CTL).
+        min_daily_tss: Minimum TSS on non-rest days.
+        rest_days: Weekdays without training (0 = Monday ... 6 = Sunday).
+        min_intensity_days: Intensity days required per week (counted back from the target).
+        intensity_tss: Minimum TSS of an intensity day (default: CTL).
 
-        date_str = (start_date + timedelta(days=n)).strftime("%Y-%m-%d")
-        predictions.append(
-            BanisterPrediction(
-                date=date_str,
-                predicted_performance=round(performance, 1),
-                ctl=round(ctl, 1),
-                atl=round(atl, 1),
-                tsb=round(ctl - atl, 1),
+    Returns:
+        TaperPlan with per-day recommendations and predicted performance.
+    """
+    model = model or default_banister_model()
+    n = max(int(days_out), 1)
+    ctl = max(float(current_ctl), 0.0)
+    hi_cap = float(max_daily_tss) if max_daily_tss is not None else round(1.5 * ctl)
+    intensity = float(intensity_tss) if intensity_tss is not None else round(ctl)
+    intensity = min(max(intensity, min_daily_tss), hi_cap)
+    rest = set(rest_days)
+
+    dates = [target_date - timedelta(days=n - 1 - d) for d in range(n)]
+    days_before = np.arange(n - 1, -1, -1, dtype=np.float64)
+    gain = model.k1 * np.exp(-days_before / model.tau1) - model.k2 * np.exp(
+        -days_before / model.tau2
+    )
+
+    is_rest = np.array([dt.weekday() in rest for dt in dates])
+    is_rest[-1] = True  # race day
+    lo = np.where(is_rest, 0.0, min(min_daily_tss, hi_cap))
+    hi = np.where(is_rest, 0.0, hi_cap)
+
+    x_normal = np.where(gain > 0, hi, lo)
+    x_intensity = np.where(gain > 0, hi, np.maximum(lo, intensity))
+    v_normal = gain * x_normal
+    v_intensity = np.where(is_rest | (intensity <= 0), -np.inf, gain * x_intensity)
+
+    week = (n - 1 - np.arange(n)) // 7
+    week_len = np.bincount(week)
+    required = {
+        w: int(np.ceil(min_intensity_days * week_len[w] / 7.0)) for w in range(len(week_len))
+    }
+    hard = _schedule_intensity(v_normal, v_intensity, week, required)
+    tss = np.round(np.where(hard, x_intensity, x_normal))
+
+    performance = _performance_from_pmc(tss, current_ctl, current_atl, model)
+    maintenance = _performance_from_pmc(
+        np.where(is_rest, 0.0, ctl), current_ctl, current_atl, model
+    )
+
+    recommendations = []
+    for d in range(n):
+        phase, notes = _describe_day(d == n - 1, is_rest[d], hard[d], gain[d])
+        recommendations.append(
+            TSSRecommendation(
+                date=dates[d].strftime("%Y-%m-%d"),
+                recommended_tss=float(tss[d]),
+                taper_phase=phase,
+                notes=notes,
             )
         )
 
-    return predictions
+    return TaperPlan(
+        recommendations=recommendations,
+        tss=tss,
+        predicted_performance=performance,
+        target_performance=float(performance[-1]),
+        maintenance_performance=float(maintenance[-1]),
+    )
+
+
+def _describe_day(race_day: bool, rest: bool, hard: bool, gain: float) -> Tuple[str, str]:
+    if race_day:
+        return "Zawody", "Dzień startowy — rozgrzewka i aktywacja przed startem."
+    if rest:
+        return "Odpoczynek", "Dzień wolny od treningu."
+    if hard:
+        return "Akcent intensywności", "Krótkie interwały (>VT2). Utrzymuj intensywność."
+    if gain > 0:
+        return "Budowanie formy", "Obciążenie nadal podnosi formę w dniu startu."
+    return "Taper", "Redukcja objętości — zmęczenie musi opaść przed startem."
 
 
 def optimize_peaking(
@@ -129,13 +590,12 @@ def optimize_peaking(
     current_atl: float,
     target_date: datetime,
     days_out: int = 14,
+    **constraints,
 ) -> List[TSSRecommendation]:
     """Calculate optimal taper TSS to peak at target date.
 
-    Taper strategy based on Mujika & Padilla (2003):
-    - Reduce volume 40-60% over 2 weeks
-    - Maintain intensity (neuromuscular stimulus)
-    - Progressive reduction: 40% week 1, 60% week 2
+    Thin wrapper over ``plan_taper``; ``constraints`` are its keyword
+    arguments (model, max_daily_tss, rest_days, min_intensity_days, ...).
 
     Args:
         current_ctl: Current Chronic Training Load.
@@ -146,41 +606,8 @@ def optimize_peaking(
     Returns:
         List of TSSRecommendation for each taper day.
     """
-    recommendations: List[TSSRecommendation] = []
-
-    for d in range(days_out):
-        date = target_date - timedelta(days=days_out - 1 - d)
-        days_from_start = d + 1
-        date_str = date.strftime("%Y-%m-%d")
-
-        if days_from_start <= 7:
-            # Week 1: reduce by 40%
-            taper_pct = 0.60
-            phase = "Taper — tydzień 1"
-            notes = "Redukcja objętości o 40%. Utrzymuj intensywność."
-        elif days_from_start <= 12:
-            # Week 2: reduce by 60%
-            taper_pct = 0.40
-            phase = "Taper — tydzień 2"
-            notes = "Redukcja objętości o 60%. Krótkie interwały (>VT2)."
-        else:
-            # Race week: very light
-            taper_pct = 0.25
-            phase = "Tydzień startowy"
-            notes = "Lekkie zakładki aktywacyjne. Regeneracja."
-
-        recommended_tss = round(current_ctl * taper_pct, 0)
-
-        recommendations.append(
-            TSSRecommendation(
-                date=date_str,
-                recommended_tss=recommended_tss,
-                taper_phase=phase,
-                notes=notes,
-            )
-        )
-
-    return recommendations
+    plan = plan_taper(current_ctl, current_atl, target_date, days_out, **constraints)
+    return plan.recommendations
 
 
 def predict_performance_fast(
@@ -188,51 +615,5 @@ def predict_performance_fast(
     tss_history: List[float],
     days_ahead: int = 14,
 ) -> List[BanisterPrediction]:
-    """Vectorized performance prediction for speed.
-
-    Same as predict_performance but uses numpy vectorization
-    for large TSS histories (>60 days).
-    """
-    if not tss_history:
-        return []
-
-    tss_arr = np.array(tss_history, dtype=float)
-    n_history = len(tss_arr)
-    n_total = n_history + days_ahead
-
-    today = datetime.now().date()
-    start_date = today - timedelta(days=n_history - 1)
-
-    # Build index arrays
-    indices = np.arange(n_total)
-    all_tss = np.zeros(n_total)
-    all_tss[:n_history] = tss_arr
-
-    predictions: List[BanisterPrediction] = []
-
-    # Compute cumulative CTL/ATL equivalents
-    for n in range(n_total):
-        decay_range = np.arange(n + 1)
-        decay_fitness = np.exp(-decay_range[::-1] / model.tau1)
-        decay_fatigue = np.exp(-decay_range[::-1] / model.tau2)
-        tss_slice = all_tss[: n + 1]
-
-        fitness = float(model.k1 * np.sum(tss_slice * decay_fitness))
-        fatigue = float(model.k2 * np.sum(tss_slice * decay_fatigue))
-
-        performance = model.p0 + fitness - fatigue
-        ctl = fitness / model.k1 if model.k1 != 0 else 0.0
-        atl = fatigue / model.k2 if model.k2 != 0 else 0.0
-
-        date_str = (start_date + timedelta(days=n)).strftime("%Y-%m-%d")
-        predictions.append(
-            BanisterPrediction(
-                date=date_str,
-                predicted_performance=round(performance, 1),
-                ctl=round(ctl, 1),
-                atl=round(atl, 1),
-                tsb=round(ctl - atl, 1),
-            )
-        )
-
-    return predictions
+    """Alias of ``predict_performance``, which is now linear in history length."""
+    return predict_performance(model, tss_history, days_ahead)
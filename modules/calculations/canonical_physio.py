@@ -12,9 +12,11 @@ This module provides:
 """
 
 from dataclasses import dataclass, field
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterable, List
 import logging
 
+from modules.calculations.mmp import compute_mmp
+
 logger = logging.getLogger("Tri_Dashboard.CanonicalPhysio")
 
 
@@ -160,6 +162,33 @@ def select_canonical_vo2max(
     return metric
 
 
+def session_mmp(
+    data: Dict[str, Any],
+    time_series: Optional[Dict[str, List]] = None,
+    durations: Iterable[int] = (1, 300),
+) -> Dict[int, Optional[float]]:
+    """
+    Session MMP for ``durations`` (None where unavailable).
+
+    Values come from the report's precomputed ``power_duration_curve`` when
+    it has them; the rest are computed from ``time_series["power_watts"]``
+    in one cumulative-sum pass (NaN samples count as 0 W).
+    """
+    pdc = data.get("power_duration_curve") or {}
+    precomputed = {
+        int(d): p
+        for d, p in zip(pdc.get("durations_sec", []), pdc.get("powers_watts", []), strict=False)
+        if p is not None and p > 0
+    }
+    mmp = {int(d): precomputed.get(int(d)) for d in durations}
+
+    missing = [d for d, p in mmp.items() if p is None]
+    power_data = time_series.get("power_watts", []) if (missing and time_series) else []
+    if len(power_data) > 0:
+        mmp.update(compute_mmp(power_data, missing))
+    return mmp
+
+
 def build_canonical_physiology(  # noqa: C901
     data: Dict[str, Any], time_series: Optional[Dict[str, List]] = None
 ) -> CanonicalPhysiology:
@@ -207,12 +236,14 @@ def build_canonical_physiology(  # noqa: C901
             value=w_prime_j / 1000, source="cp_model", confidence=0.80
         )
 
+    # Best 1 s / 5 min power, precomputed or from one pass over the series
+    mmp = session_mmp(data, time_series, (1, 300))
+    mmp_5m = mmp[300] or 0
+
     # === Pmax ===
     pmax = data.get("metadata", {}).get("pmax_watts", 0)
-    if not pmax and time_series:
-        power_data = time_series.get("power_watts", [])
-        if power_data:
-            pmax = max(power_data)
+    if not pmax:
+        pmax = mmp[1] or 0
     if pmax:
         physio.pmax_watts = CanonicalMetric(value=pmax, source="peak_power", confidence=0.90)
 
@@ -237,18 +268,8 @@ def build_canonical_physiology(  # noqa: C901
 
     # Source 4: Calculate from 5-min MMP (ONLY if metrics.vo2max is not available)
     # Note: metrics.vo2max is calculated using pandas rolling (same as UI) so it's preferred
-    if "acsm_5min" not in vo2max_candidates and time_series and weight_kg > 0:
-        power_data = time_series.get("power_watts", [])
-        if len(power_data) >= 300:
-            # Find 5-min MMP using rolling window
-            window = 300
-            mmp_5m = 0
-            for i in range(len(power_data) - window + 1):
-                avg = sum(power_data[i : i + window]) / window
-                if avg > mmp_5m:
-                    mmp_5m = avg
-            if mmp_5m > 0:
-                vo2max_candidates["mmp_5min"] = mmp_5m  # Will be converted
+    if "acsm_5min" not in vo2max_candidates and weight_kg > 0 and mmp_5m > 0:
+        vo2max_candidates["mmp_5min"] = mmp_5m  # Will be converted
 
     # Source 5: Estimate from CP (lowest priority)
     if cp and cp > 0:
@@ -260,29 +281,20 @@ def build_canonical_physiology(  # noqa: C901
     # =========================================================================
     # CONSISTENCY ASSERTION (light - logs divergence, doesn't block)
     # =========================================================================
-    if physio.vo2max.is_valid() and time_series and weight_kg > 0:
-        # Calculate time_series estimate for comparison
-        power_data = time_series.get("power_watts", [])
-        if len(power_data) >= 300:
-            window = 300
-            ts_mmp5 = 0
-            for i in range(len(power_data) - window + 1):
-                avg = sum(power_data[i : i + window]) / window
-                if avg > ts_mmp5:
-                    ts_mmp5 = avg
-            if ts_mmp5 > 0:
-                ts_vo2max = calculate_vo2max_acsm(ts_mmp5, weight_kg)
-                divergence = abs(physio.vo2max.value - ts_vo2max)
-
-                # Log if divergence > 5 ml/kg/min (significant)
-                if divergence > 5:
-                    logger.warning(
-                        f"VO2max divergence detected: metrics={physio.vo2max.value:.1f} vs "
-                        f"time_series={ts_vo2max:.1f} (Δ={divergence:.1f} ml/kg/min). "
-                        f"Using metrics (pandas rolling) as canonical."
-                    )
-                    # Store divergence for debugging
-                    physio.vo2max.alternatives["time_series_estimate"] = round(ts_vo2max, 2)
+    if physio.vo2max.is_valid() and weight_kg > 0 and mmp_5m > 0:
+        # Session MMP estimate for comparison
+        ts_vo2max = calculate_vo2max_acsm(mmp_5m, weight_kg)
+        divergence = abs(physio.vo2max.value - ts_vo2max)
+
+        # Log if divergence > 5 ml/kg/min (significant)
+        if divergence > 5:
+            logger.warning(
+                f"VO2max divergence detected: metrics={physio.vo2max.value:.1f} vs "
+                f"time_series={ts_vo2max:.1f} (Δ={divergence:.1f} ml/kg/min). "
+                f"Using metrics (pandas rolling) as canonical."
+            )
+            # Store divergence for debugging
+            physio.vo2max.alternatives["time_series_estimate"] = round(ts_vo2max, 2)
 
     # === VLaMax (always estimated) ===
     if cp > 0 and pmax > 0:
@@ -318,6 +330,7 @@ __all__ = [
     "calculate_vo2max_acsm",
     "select_canonical_vo2max",
     "build_canonical_physiology",
+    "session_mmp",
     "format_canonical_for_report",
     "VO2MAX_SOURCE_PRIORITY",
 ]
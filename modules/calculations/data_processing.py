@@ -5,15 +5,26 @@ import logging
 from typing import Union, Any, List, Tuple
 import numpy as np
 import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
 
 logger = logging.getLogger(__name__)
 
 from .common import ensure_pandas, WINDOW_LONG, WINDOW_SHORT
+from .regrid import gap_mask, regrid, rolling_means, time_bins
 
 # Gaps longer than this threshold (in seconds) are treated as recording pauses
 # and will NOT be interpolated - they are preserved as NaN.
 GAP_THRESHOLD_SECONDS = 30
 
+# Columns that get `_smooth` (WINDOW_LONG) and `_smooth_5s` (WINDOW_SHORT) versions
+SMOOTH_COLUMNS = [
+    'watts', 'heartrate', 'cadence', 'smo2', 'torque', 'core_temperature',
+    'skin_temperature', 'velocity_smooth', 'tymebreathrate', 'tymeventilation', 'thb'
+]
+
+# Runs of empty 1 s bins left after interpolation are carried at most this far
+EDGE_FILL_SECONDS = 5
+
 
 def _detect_time_gaps(
     time_values: pd.Series, threshold: float = GAP_THRESHOLD_SECONDS
@@ -27,14 +38,12 @@ def _detect_time_gaps(
     Returns:
         List of (gap_start, gap_end) tuples marking recording pauses.
     """
-    diffs = time_values.diff()
-    gap_mask = diffs > threshold
-    gap_indices = time_values.index[gap_mask]
+    t = np.asarray(time_values, dtype=np.float64)
+    ends = np.flatnonzero(np.diff(t) > threshold) + 1
     gaps: List[Tuple[float, float]] = []
-    for idx in gap_indices:
-        prev_idx = time_values.index[time_values.index.get_loc(idx) - 1]
-        gap_start = float(time_values.loc[prev_idx])
-        gap_end = float(time_values.loc[idx])
+    for idx in ends:
+        gap_start = float(t[idx - 1])
+        gap_end = float(t[idx])
         gaps.append((gap_start, gap_end))
         logger.info(
             "Detected recording gap: %.0fs -> %.0fs (%.0fs pause)",
@@ -43,31 +52,6 @@ def _detect_time_gaps(
     return gaps
 
 
-def _mask_gaps_in_resampled(
-    df: pd.DataFrame, gaps: List[Tuple[float, float]]
-) -> pd.DataFrame:
-    """Set all numeric columns to NaN for rows that fall inside detected gaps.
-
-    Operates on a DataFrame whose 'time' column holds elapsed seconds.
-    A small margin (1 s) on each side is kept so edge points remain valid.
-
-    Args:
-        df: Resampled DataFrame with a 'time' column.
-        gaps: List of (gap_start, gap_end) from _detect_time_gaps.
-
-    Returns:
-        New DataFrame with gap regions set to NaN.
-    """
-    if not gaps:
-        return df
-    result = df.copy()
-    num_cols = result.select_dtypes(include=[np.number]).columns.difference(['time', 'time_min'])
-    for gap_start, gap_end in gaps:
-        in_gap = (result['time'] > gap_start) & (result['time'] < gap_end)
-        result.loc[in_gap, num_cols] = np.nan
-    return result
-
-
 def process_data(df: Union[pd.DataFrame, Any]) -> pd.DataFrame:
     """Process raw data: resample, smooth, and add time columns.
 
@@ -78,6 +62,10 @@ def process_data(df: Union[pd.DataFrame, Any]) -> pd.DataFrame:
     4. Interpolates only small gaps (< GAP_THRESHOLD_SECONDS)
     5. Creates smoothed versions of key metrics
 
+    All numeric columns are regridded together as one (columns x samples)
+    array by ``regrid.regrid``, and the smoothed columns come from one
+    batched ``regrid.rolling_means`` call. The input frame is not modified.
+
     Args:
         df: Raw DataFrame from CSV/file
 
@@ -86,64 +74,81 @@ def process_data(df: Union[pd.DataFrame, Any]) -> pd.DataFrame:
     """
     df_pd = ensure_pandas(df)
 
-    if 'time' not in df_pd.columns:
-        df_pd['time'] = np.arange(len(df_pd)).astype(float)
-    df_pd['time'] = pd.to_numeric(df_pd['time'], errors='coerce')
-
-    # Remove rows with NaN time before creating index
-    df_pd = df_pd.dropna(subset=['time'])
-
-    # Fill missing time values sequentially if there are duplicates or gaps
-    if df_pd['time'].isna().any() or len(df_pd) == 0:
-        df_pd['time'] = np.arange(len(df_pd)).astype(float)
-
-    df_pd = df_pd.sort_values('time').reset_index(drop=True)
+    if 'time' in df_pd.columns:
+        time = pd.to_numeric(df_pd['time'], errors='coerce').to_numpy(dtype=np.float64)
+    else:
+        time = np.arange(len(df_pd), dtype=np.float64)
+
+    # Numeric columns in frame order; a missing time column goes last
+    columns = [c for c in df_pd.columns if c != 'time' and is_numeric_dtype(df_pd[c])
+               and not is_bool_dtype(df_pd[c])]
+    names = list(df_pd.columns) if 'time' in df_pd.columns else list(df_pd.columns) + ['time']
+    names = [c for c in names if c == 'time' or c in columns]
+
+    # Drop rows without a time stamp and sort by time; rows stays None when
+    # the frame is already clean and sorted, so columns are used as they are
+    valid = np.flatnonzero(~np.isnan(time))
+    rows = valid[np.argsort(time[valid], kind='quicksort')]
+    if len(rows) == len(time) and np.array_equal(rows, np.arange(len(time))):
+        rows = None
+    else:
+        time = time[rows]
 
     # Detect large recording gaps BEFORE resampling
-    time_gaps = _detect_time_gaps(df_pd['time'])
-
-    df_pd['time_dt'] = pd.to_timedelta(df_pd['time'], unit='s')
-
-    # Ensure index has no NaN
-    df_pd = df_pd[df_pd['time_dt'].notna()]
-    df_pd = df_pd.set_index('time_dt')
-
-    num_cols = df_pd.select_dtypes(include=['float64', 'int64']).columns.tolist()
-    if num_cols:
-        df_pd[num_cols] = df_pd[num_cols].interpolate(method='linear', limit=GAP_THRESHOLD_SECONDS).ffill().bfill()
-
-    try:
-        df_numeric = df_pd.select_dtypes(include=[np.number])
-        df_resampled = df_numeric.resample('1s').mean()
-        # Only interpolate small gaps — limit prevents bridging recording pauses
-        df_resampled = df_resampled.interpolate(method='linear', limit=GAP_THRESHOLD_SECONDS)
-        # Forward/backward fill only small remaining edge NaNs (up to 5s)
-        df_resampled = df_resampled.ffill(limit=5).bfill(limit=5)
-    except Exception as e:
-        logger.warning(f"Resampling failed, using original data: {e}")
-        df_resampled = df_pd
-
-    df_resampled['time'] = df_resampled.index.total_seconds()
-    df_resampled['time_min'] = df_resampled['time'] / 60.0
-
-    # Restore NaN in detected gap regions so charts show breaks, not fake data
-    df_resampled = _mask_gaps_in_resampled(df_resampled, time_gaps)
-
-    # Create smoothed versions of key columns
-    smooth_cols = [
-        'watts', 'heartrate', 'cadence', 'smo2', 'torque', 'core_temperature',
-        'skin_temperature', 'velocity_smooth', 'tymebreathrate', 'tymeventilation', 'thb'
-    ]
-    
-    for col in smooth_cols:
-        if col in df_resampled.columns:
-            df_resampled[f'{col}_smooth'] = df_resampled[col].rolling(
-                window=WINDOW_LONG, min_periods=1
-            ).mean()
-            df_resampled[f'{col}_smooth_5s'] = df_resampled[col].rolling(
-                window=WINDOW_SHORT, min_periods=1
-            ).mean()
-
-    df_resampled = df_resampled.reset_index(drop=True)
-
-    return df_resampled
+    time_gaps = _detect_time_gaps(time)
+
+    bins, bin_time = time_bins(time)
+    n_bins = len(bin_time)
+    mask = gap_mask(bin_time, time_gaps)
+
+    # Output columns: numeric input columns, time_min, then the smoothed
+    # versions (a name already present is overwritten in place)
+    smooth = [c for c in SMOOTH_COLUMNS if c in columns]
+    smooth_names = [(f'{c}_smooth', f'{c}_smooth_5s') for c in smooth]
+    derived = {'time', 'time_min'} | {name for pair in smooth_names for name in pair}
+    output = list(names)
+    output += [c for c in ['time_min', *(n for pair in smooth_names for n in pair)]
+               if c not in names]
+
+    # float32 columns are averaged in float32 (as pandas does) and stay
+    # float32; everything else lands in one float64 block the kernels
+    # write into directly, so the frame is built without further copies
+    regridded = [c for c in columns if c not in derived]
+    cols32 = [c for c in regridded if df_pd[c].dtype == np.float32]
+    cols64 = [c for c in output if c not in cols32]
+    row64 = {c: i for i, c in enumerate(cols64)}
+    row32 = {c: i for i, c in enumerate(cols32)}
+    block = np.empty((len(cols64), n_bins))
+    block32 = np.empty((len(cols32), n_bins), dtype=np.float32)
+    block[row64['time']] = bin_time
+    block[row64['time_min']] = bin_time / 60.0
+
+    for cols, dtype, out, rows_out in (
+        ([c for c in regridded if c not in row32], np.float64, block, row64),
+        (cols32, np.float32, block32, row32),
+    ):
+        if not cols:
+            continue
+        values = np.empty((len(cols), len(time)), dtype=dtype)
+        for i, col in enumerate(cols):
+            column = df_pd[col].to_numpy(dtype=dtype, na_value=np.nan)
+            values[i] = column if rows is None else column[rows]
+        # Only float64/float32/int64 columns get the sample-level fill
+        prefill = np.array([df_pd[c].dtype.name in ('float64', 'float32', 'int64') for c in cols])
+        regrid(
+            values, bins, n_bins, prefill, mask, GAP_THRESHOLD_SECONDS, EDGE_FILL_SECONDS,
+            out=out, out_rows=np.array([rows_out[c] for c in cols], dtype=np.int64),
+        )
+        del values
+
+    # Smoothed versions of key columns, all windows in one pass
+    if smooth:
+        source = np.vstack([block[row64[c]] if c in row64 else block32[row32[c]] for c in smooth])
+        out_rows = np.array([[row64[pair[w]] for pair in smooth_names] for w in (0, 1)])
+        rolling_means(source, [WINDOW_LONG, WINDOW_SHORT], out=block, out_rows=out_rows)
+
+    result = pd.DataFrame(block.T, columns=cols64, copy=False)
+    for position, col in enumerate(output):
+        if col in row32:
+            result.insert(position, col, block32[row32[col]])
+    return result
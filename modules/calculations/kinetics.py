@@ -16,6 +16,8 @@ from typing import Optional, Dict, List
 from scipy.optimize import curve_fit
 from scipy import stats, signal
 
+from .segmented_regression import PrefixSums
+
 
 def normalize_smo2_series(series: pd.Series) -> pd.Series:
     """
@@ -419,6 +421,56 @@ def detect_physiological_state(df_window: pd.DataFrame, smo2_col: str = "smo2")
             return {"state": "STEADY_STATE", "confidence": 0.9, "details": "All signals stable"}
 
 
+# Per-window slope thresholds of detect_physiological_state (units per second)
+_STATE_SMO2_SLOPE = 0.05
+_STATE_HR_SLOPE = 0.05
+_STATE_WATTS_SLOPE = 0.5
+
+
+def _window_slopes(
+    t: np.ndarray, values: np.ndarray, lo: np.ndarray, hi: np.ndarray
+) -> np.ndarray:
+    """OLS slope of ``values`` vs ``t`` over every index window ``[lo, hi)``.
+
+    Prefix sums make each window O(1). Windows containing a NaN get a NaN
+    slope, as ``stats.linregress`` would return.
+    """
+    nan = np.isnan(values)
+    nan_count = np.concatenate(([0], np.cumsum(nan)))
+    slope, _, _ = PrefixSums(t, np.where(nan, 0.0, values)).slope_stderr(lo, hi)
+    return np.where(nan_count[hi] - nan_count[lo] > 0, np.nan, slope)
+
+
+def _classify_state_windows(
+    n_points: np.ndarray, slope_watts: np.ndarray, slope_hr: np.ndarray, slope_smo2: np.ndarray
+):
+    """Vectorized ``detect_physiological_state`` decision tree.
+
+    Returns:
+        (states, confidences) arrays, one entry per window.
+    """
+    with np.errstate(invalid="ignore"):
+        conditions = [
+            n_points < 10,
+            slope_smo2 > _STATE_SMO2_SLOPE,
+            (slope_smo2 < -_STATE_SMO2_SLOPE) & (slope_watts < -_STATE_WATTS_SLOPE),
+            slope_smo2 < -_STATE_SMO2_SLOPE,
+            slope_hr > _STATE_HR_SLOPE,
+            slope_watts > _STATE_WATTS_SLOPE,
+        ]
+    states = np.select(
+        conditions,
+        ["NIEZNANY", "RECOVERY", "FATIGUE", "NON_STEADY", "NON_STEADY", "RAMP_UP"],
+        default="STEADY_STATE",
+    )
+    confidences = np.select(
+        conditions,
+        [0.0, np.minimum(1.0, slope_smo2 * 10), 0.8, 0.9, 0.7, 0.8],
+        default=0.9,
+    )
+    return states, confidences
+
+
 def generate_state_timeline(
     df: pd.DataFrame, window_size_sec: int = 30, step_sec: int = 10
 ) -> List[Dict[str, any]]:
@@ -426,6 +478,10 @@ def generate_state_timeline(
     Generate a timeline of physiological states using a sliding window.
     Merges consecutive same states.
 
+    Window slopes for power, HR and SmO2 are computed for all windows at
+    once from prefix sums, classified in bulk with the same rules as
+    detect_physiological_state, and merged by run-length encoding.
+
     Args:
         df: Full session DataFrame
         window_size_sec: Size of analysis window
@@ -437,63 +493,45 @@ def generate_state_timeline(
     if "time" not in df.columns:
         return []
 
-    segments = []
+    time_all = df["time"].to_numpy(dtype=np.float64)
+    keep = ~np.isnan(time_all)
+    if not keep.any():
+        return []
+    order = np.argsort(time_all[keep], kind="stable")
+    t = time_all[keep][order]
+    t_min, t_max = t[0], t[-1]
+
+    starts = np.arange(t_min, t_max - window_size_sec, step_sec)
+    lo = np.searchsorted(t, starts, side="left")
+    hi = np.searchsorted(t, starts + window_size_sec, side="left")
+    used = (hi - lo) >= 5
+    starts, lo, hi = starts[used], lo[used], hi[used]
+    if len(starts) == 0:
+        return []
 
-    t_min = df["time"].min()
-    t_max = df["time"].max()
-
-    current_state = None
-    current_segment_start = t_min
-    current_confidences = []
-
-    for t_start in np.arange(t_min, t_max - window_size_sec, step_sec):
-        t_end = t_start + window_size_sec
-
-        # Slice window
-        mask = (df["time"] >= t_start) & (df["time"] < t_end)
-        window = df.loc[mask]
-
-        if len(window) < 5:
-            continue
-
-        res = detect_physiological_state(window)
-        state = res["state"]
-        conf = res["confidence"]
-
-        if current_state is None:
-            current_state = state
-            current_segment_start = t_start
-            current_confidences = [conf]
-
-        elif state != current_state:
-            # State changed, close previous segment
-            avg_conf = sum(current_confidences) / len(current_confidences)
-            segments.append(
-                {
-                    "start": float(current_segment_start),
-                    "end": float(t_start),
-                    "state": current_state,
-                    "confidence": float(avg_conf),
-                }
-            )
-
-            # Start new
-            current_state = state
-            current_segment_start = t_start
-            current_confidences = [conf]
-        else:
-            # Same state, extend
-            current_confidences.append(conf)
+    def slopes(column: str) -> np.ndarray:
+        if column not in df.columns:
+            return np.zeros(len(starts))
+        values = df[column].to_numpy(dtype=np.float64)[keep][order]
+        return _window_slopes(t, values, lo, hi)
+
+    states, confidences = _classify_state_windows(
+        hi - lo, slopes("watts"), slopes("hr"), slopes("smo2")
+    )
 
-    # Close last segment
-    if current_state:
-        avg_conf = sum(current_confidences) / len(current_confidences)
+    # Run-length encode consecutive windows with the same state
+    run_starts = np.flatnonzero(np.concatenate(([True], states[1:] != states[:-1])))
+    run_ends = np.append(run_starts[1:], len(states))
+    conf_list = confidences.tolist()
+
+    segments = []
+    for a, b in zip(run_starts, run_ends, strict=True):
         segments.append(
             {
-                "start": float(current_segment_start),
-                "end": float(t_max),
-                "state": current_state,
-                "confidence": float(avg_conf),
+                "start": float(starts[a]),
+                "end": float(starts[b]) if b < len(states) else float(t_max),
+                "state": str(states[a]),
+                "confidence": float(sum(conf_list[a:b]) / (b - a)),
             }
         )
 
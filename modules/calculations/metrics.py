@@ -166,12 +166,14 @@ def calculate_vo2max(mmp_5m, rider_weight: float) -> float:
     return 16.61 + 8.87 * power_per_kg
 
 
-def calculate_trend(x, y):
+def calculate_trend(x, y, x_eval=None):
     """Calculate linear trend line.
 
     Args:
         x: X values (usually time)
         y: Y values (metric to trend)
+        x_eval: X values to evaluate the fitted line at (default: x), e.g.
+            the downsampled plot axis when fitting on the full-resolution data
 
     Returns:
         Array of trend values or None
@@ -182,6 +184,6 @@ def calculate_trend(x, y):
             return None
         z = np.polyfit(x[idx], y[idx], 1)
         p = np.poly1d(z)
-        return p(x)
+        return p(x if x_eval is None else x_eval)
     except (ValueError, TypeError, np.linalg.LinAlgError):
         return None
@@ -0,0 +1,149 @@
+"""
+Mean-Maximal Power (MMP) engine.
+
+Computes the best average power for any set of durations from a single
+cumulative-sum buffer instead of one pandas rolling mean per duration.
+Shared by the PDC functions, session records and the history importer.
+
+Power is assumed to be sampled at 1 Hz; NaN samples count as 0 W
+(coasting / dropouts), matching the existing PDC convention. With
+``skip_nan`` windows that contain a NaN are left out instead, like pandas
+``rolling(d).mean().max()``.
+"""
+
+from typing import Dict, Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from modules.numba_utils import is_numba_available, njit
+
+PowerLike = Union[pd.Series, np.ndarray, list]
+
+# Longest duration of the full PDC grid (1 s – 60 min)
+MMP_MAX_DURATION = 3600
+
+
+@njit(cache=True)
+def _mmp_kernel(csum: np.ndarray, durations: np.ndarray) -> np.ndarray:
+    """Best window sum / duration for each duration, from a cumulative sum."""
+    n = len(csum) - 1
+    out = np.full(len(durations), np.nan)
+    for k in range(len(durations)):
+        d = durations[k]
+        if d <= 0 or d > n:
+            continue
+        best = csum[d] - csum[0]
+        for i in range(1, n - d + 1):
+            s = csum[i + d] - csum[i]
+            if s > best:
+                best = s
+        out[k] = best / d
+    return out
+
+
+def _mmp_numpy(csum: np.ndarray, durations: np.ndarray) -> np.ndarray:
+    n = len(csum) - 1
+    out = np.full(len(durations), np.nan)
+    for k, d in enumerate(durations):
+        if 0 < d <= n:
+            out[k] = np.max(csum[d:] - csum[:-d]) / d
+    return out
+
+
+@njit(cache=True)
+def _mmp_kernel_skip_nan(csum: np.ndarray, nans: np.ndarray, durations: np.ndarray) -> np.ndarray:
+    """Like _mmp_kernel, over the windows without NaN samples (``nans`` = NaN count cumsum)."""
+    n = len(csum) - 1
+    out = np.full(len(durations), np.nan)
+    for k in range(len(durations)):
+        d = durations[k]
+        if d <= 0 or d > n:
+            continue
+        best = -np.inf
+        for i in range(n - d + 1):
+            if nans[i + d] == nans[i]:
+                s = csum[i + d] - csum[i]
+                if s > best:
+                    best = s
+        if best > -np.inf:
+            out[k] = best / d
+    return out
+
+
+def _mmp_numpy_skip_nan(csum: np.ndarray, nans: np.ndarray, durations: np.ndarray) -> np.ndarray:
+    n = len(csum) - 1
+    out = np.full(len(durations), np.nan)
+    for k, d in enumerate(durations):
+        if 0 < d <= n:
+            sums = np.where(nans[d:] == nans[:-d], csum[d:] - csum[:-d], -np.inf)
+            best = np.max(sums)
+            if best > -np.inf:
+                out[k] = best / d
+    return out
+
+
+def power_cumsum(power: PowerLike) -> np.ndarray:
+    """Cumulative power buffer (length n + 1, leading zero) with NaN → 0."""
+    arr = np.asarray(power, dtype=np.float64)
+    csum = np.empty(len(arr) + 1, dtype=np.float64)
+    csum[0] = 0.0
+    np.cumsum(np.nan_to_num(arr, nan=0.0), out=csum[1:])
+    return csum
+
+
+def mmp_from_cumsum(csum: np.ndarray, durations: Iterable[int]) -> np.ndarray:
+    """MMP for each duration from a prebuilt ``power_cumsum`` buffer.
+
+    Returns:
+        Float array aligned with ``durations``; NaN where the session is
+        shorter than the duration.
+    """
+    durs = np.asarray(list(durations), dtype=np.int64)
+    if len(durs) == 0:
+        return np.empty(0)
+    if is_numba_available():
+        return _mmp_kernel(csum, durs)
+    return _mmp_numpy(csum, durs)
+
+
+def compute_mmp_curve(
+    power: PowerLike, max_duration: int = MMP_MAX_DURATION, skip_nan: bool = False
+) -> np.ndarray:
+    """Full mean-maximal power curve for every integer duration.
+
+    Args:
+        power: Power values at 1Hz
+        max_duration: Longest duration in seconds
+        skip_nan: Leave out windows containing NaN instead of counting NaN as 0 W
+
+    Returns:
+        Array of length ``max_duration``; element ``d - 1`` is the MMP for
+        ``d`` seconds (NaN if the session is shorter than ``d``, or with
+        ``skip_nan`` if every window of ``d`` seconds has a NaN).
+    """
+    csum = power_cumsum(power)
+    durations = np.arange(1, max_duration + 1, dtype=np.int64)
+    missing = np.isnan(np.asarray(power, dtype=np.float64)) if skip_nan else None
+    if missing is None or not missing.any():
+        return mmp_from_cumsum(csum, durations)
+
+    nans = np.concatenate(([0], np.cumsum(missing, dtype=np.int64)))
+    if is_numba_available():
+        return _mmp_kernel_skip_nan(csum, nans, durations)
+    return _mmp_numpy_skip_nan(csum, nans, durations)
+
+
+def compute_mmp(power: PowerLike, durations: Iterable[int]) -> Dict[int, Optional[float]]:
+    """MMP for a list of durations as a dict (None where data is too short).
+
+    Example:
+        >>> compute_mmp(df["watts"], [5, 60, 300, 1200])
+        {5: 812.4, 60: 455.0, 300: 341.2, 1200: None}
+    """
+    durations = list(durations)
+    values = mmp_from_cumsum(power_cumsum(power), durations)
+    return {
+        int(d): (float(v) if np.isfinite(v) else None)
+        for d, v in zip(durations, values, strict=True)
+    }
@@ -7,7 +7,10 @@ from typing import Union, Any, Tuple
 import numpy as np
 import pandas as pd
 
+from modules.numba_utils import njit
+
 from .common import ensure_pandas, DEFAULT_PDC_DURATIONS
+from .mmp import compute_mmp
 
 
 def calculate_normalized_power(
@@ -201,25 +204,7 @@ def calculate_power_duration_curve(df_pl: Union[pd.DataFrame, Any], durations: l
     if durations is None:
         durations = DEFAULT_PDC_DURATIONS
 
-    watts = df["watts"].fillna(0).values
-    n = len(watts)
-
-    results = {}
-    for duration in durations:
-        if n < duration:
-            results[duration] = None
-            continue
-
-        # Rolling mean for this duration
-        rolling = pd.Series(watts).rolling(window=duration, min_periods=duration).mean()
-        mmp = rolling.max()
-
-        if pd.notna(mmp):
-            results[duration] = float(mmp)
-        else:
-            results[duration] = None
-
-    return results
+    return compute_mmp(df["watts"].to_numpy(), durations)
 
 
 @lru_cache(maxsize=128)
@@ -253,6 +238,21 @@ def calculate_fatigue_resistance_index(mmp_5min: float, mmp_20min: float) -> flo
     return mmp_20min / mmp_5min
 
 
+@njit(cache=True)
+def _count_burns_kernel(w_bal: np.ndarray, threshold: float, recovery: float) -> int:
+    """Drops below ``threshold``, re-armed once the balance is back to ``recovery``."""
+    burns = 0
+    below_threshold = False
+    for i in range(len(w_bal)):
+        val = w_bal[i]
+        if val < threshold and not below_threshold:
+            burns += 1
+            below_threshold = True
+        elif val >= recovery:
+            below_threshold = False
+    return burns
+
+
 def count_match_burns(
     w_bal: np.ndarray, w_prime_capacity: float, threshold_pct: float = 0.3
 ) -> int:
@@ -276,19 +276,10 @@ def count_match_burns(
         return 0
 
     threshold = w_prime_capacity * threshold_pct
-    burns = 0
-    below_threshold = False
-
-    for val in w_bal:
-        if val < threshold and not below_threshold:
-            # Just dropped below threshold
-            burns += 1
-            below_threshold = True
-        elif val >= threshold * 1.5:  # Recovery buffer
-            # Recovered enough to count next drop as new match
-            below_threshold = False
-
-    return burns
+    # Recovery buffer: back to 1.5x threshold before the next drop counts
+    return int(
+        _count_burns_kernel(np.asarray(w_bal, dtype=np.float64), threshold, threshold * 1.5)
+    )
 
 
 def calculate_power_zones_time(
@@ -0,0 +1,423 @@
+"""
+1 Hz regridding core for ``process_data``.
+
+Replaces the pandas chain (interpolate -> Timedelta index ->
+``resample('1s').mean()`` -> interpolate -> ffill/bfill -> gap masking ->
+one rolling mean per smoothed column) with kernels over a contiguous
+(columns x samples) float array. Each column is filled, binned, averaged,
+re-filled and masked in one pass, and all smoothed columns are produced by
+one batched rolling kernel.
+
+The kernels reproduce the pandas semantics they replace, including the
+compensated (Kahan) sums of groupby/rolling means and float32 accumulation
+for float32 columns, so results match the former implementation.
+"""
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from modules.numba_utils import is_numba_available, njit
+
+NS_PER_SECOND = 1_000_000_000
+
+
+# ---------------------------------------------------------------------------
+# Numba kernels
+# ---------------------------------------------------------------------------
+
+
+@njit(cache=True)
+def _fill_linear(y: np.ndarray, limit: int, edges: bool) -> None:  # noqa: C901
+    """In place: ``interpolate(method='linear', limit=limit)``; with ``edges``
+    also ``.ffill().bfill()``."""
+    n = len(y)
+    prev = -1
+    i = 0
+    while i < n:
+        if y[i] == y[i]:
+            prev = i
+            i += 1
+            continue
+        j = i
+        while j < n and y[j] != y[j]:
+            j += 1
+        if prev < 0:
+            # Leading run: never interpolated, only back-filled
+            if edges and j < n:
+                for p in range(i, j):
+                    y[p] = y[j]
+        elif j == n:
+            # Trailing run: np.interp clamps to the last valid value
+            stop = n if edges else min(n, i + limit)
+            for p in range(i, stop):
+                y[p] = y[prev]
+        else:
+            slope = (y[j] - y[prev]) / (j - prev)
+            stop = min(j, i + limit)
+            for p in range(i, stop):
+                y[p] = slope * (p - prev) + y[prev]
+            if edges and stop > i:
+                for p in range(stop, j):
+                    y[p] = y[stop - 1]
+        i = j
+
+
+@njit(cache=True)
+def _ffill_limit(y: np.ndarray, limit: int) -> None:
+    """In place: ``ffill(limit=limit)``."""
+    last = np.nan
+    run = 0
+    for i in range(len(y)):
+        if y[i] == y[i]:
+            last = y[i]
+            run = 0
+        else:
+            run += 1
+            if run <= limit:
+                y[i] = last
+
+
+@njit(cache=True)
+def _bfill_limit(y: np.ndarray, limit: int) -> None:
+    """In place: ``bfill(limit=limit)``."""
+    nxt = np.nan
+    run = 0
+    for i in range(len(y) - 1, -1, -1):
+        if y[i] == y[i]:
+            nxt = y[i]
+            run = 0
+        else:
+            run += 1
+            if run <= limit:
+                y[i] = nxt
+
+
+@njit(cache=True)
+def _regrid_kernel(  # noqa: C901
+    values: np.ndarray,
+    bins: np.ndarray,
+    n_bins: int,
+    prefill: np.ndarray,
+    mask: np.ndarray,
+    limit: int,
+    edge_limit: int,
+    out: np.ndarray,
+    out_rows: np.ndarray,
+) -> None:
+    """Fill, bin-average, re-fill and mask each row of ``values`` onto ``n_bins`` bins.
+
+    Row ``c`` is written to ``out[out_rows[c]]``. Bin means are accumulated
+    in the dtype of ``values`` with Kahan compensation, like pandas'
+    groupby mean.
+    """
+    k, n = values.shape
+    raw = np.empty(n)
+    work = np.empty(n, dtype=values.dtype)
+    sums = np.empty(n_bins, dtype=values.dtype)
+    comp = np.empty(n_bins, dtype=values.dtype)
+    counts = np.empty(n_bins, dtype=values.dtype)
+    grid = np.empty(n_bins)
+    for c in range(k):
+        if prefill[c]:
+            # Interpolate in float64, then store in the column dtype
+            for i in range(n):
+                raw[i] = values[c, i]
+            _fill_linear(raw, limit, True)
+            for i in range(n):
+                work[i] = raw[i]
+        else:
+            for i in range(n):
+                work[i] = values[c, i]
+
+        sums[:] = 0
+        comp[:] = 0
+        counts[:] = 0
+        for i in range(n):
+            val = work[i]
+            if val == val:
+                b = bins[i]
+                counts[b] += 1
+                y = val - comp[b]
+                t = sums[b] + y
+                comp[b] = t - sums[b] - y
+                if comp[b] != comp[b]:
+                    comp[b] = 0
+                sums[b] = t
+        for b in range(n_bins):
+            grid[b] = sums[b] / counts[b] if counts[b] > 0 else np.nan
+
+        _fill_linear(grid, limit, False)
+        _ffill_limit(grid, edge_limit)
+        _bfill_limit(grid, edge_limit)
+        row = out_rows[c]
+        for b in range(n_bins):
+            out[row, b] = np.nan if mask[b] else grid[b]
+
+
+@njit(cache=True)
+def _rolling_mean_kernel(  # noqa: C901
+    values: np.ndarray, windows: np.ndarray, out: np.ndarray, out_rows: np.ndarray
+) -> None:
+    """Trailing ``rolling(w, min_periods=1).mean()`` of each row for each window.
+
+    Row ``c`` for window ``wi`` is written to ``out[out_rows[wi, c]]``.
+    Mirrors pandas' fixed-window mean: compensated add/remove sums, exact
+    results for runs of identical values and sign clamping.
+    """
+    k, n = values.shape
+    for wi in range(len(windows)):
+        w = windows[wi]
+        for c in range(k):
+            nobs = 0
+            neg = 0
+            same = 0
+            prev_value = np.nan
+            sum_x = 0.0
+            comp_add = 0.0
+            comp_remove = 0.0
+            row = out_rows[wi, c]
+            for i in range(n):
+                if i >= w:
+                    val = values[c, i - w]
+                    if val == val:
+                        nobs -= 1
+                        y = -val - comp_remove
+                        t = sum_x + y
+                        comp_remove = t - sum_x - y
+                        sum_x = t
+                        if np.signbit(val):
+                            neg -= 1
+                val = values[c, i]
+                if val == val:
+                    nobs += 1
+                    y = val - comp_add
+                    t = sum_x + y
+                    comp_add = t - sum_x - y
+                    sum_x = t
+                    if np.signbit(val):
+                        neg += 1
+                    if val == prev_value:
+                        same += 1
+                    else:
+                        same = 1
+                    prev_value = val
+                if nobs > 0:
+                    result = sum_x / nobs
+                    if same >= nobs:
+                        result = prev_value
+                    elif neg == 0 and result < 0:
+                        result = 0.0
+                    elif neg == nobs and result > 0:
+                        result = 0.0
+                    out[row, i] = result
+                else:
+                    out[row, i] = np.nan
+
+
+# ---------------------------------------------------------------------------
+# NumPy fallbacks (same semantics, vectorized over rows)
+# ---------------------------------------------------------------------------
+
+
+def _neighbours(valid: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Index of the previous (-1 if none) and next (n if none) valid sample per row."""
+    n = valid.shape[1]
+    pos = np.arange(n)
+    prev = np.maximum.accumulate(np.where(valid, pos, -1), axis=1)
+    nxt = np.minimum.accumulate(np.where(valid, pos, n)[:, ::-1], axis=1)[:, ::-1]
+    return prev, nxt
+
+
+def _fill_linear_numpy(y: np.ndarray, limit: int, edges: bool) -> np.ndarray:
+    n = y.shape[1]
+    valid = ~np.isnan(y)
+    prev, nxt = _neighbours(valid)
+    rows = np.arange(y.shape[0])[:, None]
+    y_prev = y[rows, np.maximum(prev, 0)]
+    y_next = y[rows, np.minimum(nxt, n - 1)]
+    dist = np.arange(n) - prev
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = (y_next - y_prev) / (nxt - prev)
+        interp = slope * np.minimum(dist, limit) + y_prev
+    interior = ~valid & (prev >= 0) & (nxt < n)
+    trailing = ~valid & (prev >= 0) & (nxt == n)
+    if not edges:
+        interior &= dist <= limit
+        trailing &= dist <= limit
+    out = y.copy()
+    out[interior] = interp[interior]
+    out[trailing] = y_prev[trailing]
+    if edges:
+        leading = ~valid & (prev < 0) & (nxt < n)
+        out[leading] = y_next[leading]
+    return out
+
+
+def _ffill_limit_numpy(y: np.ndarray, limit: int) -> np.ndarray:
+    n = y.shape[1]
+    prev, _ = _neighbours(~np.isnan(y))
+    fill = (prev >= 0) & (np.arange(n) - prev <= limit)
+    rows = np.arange(y.shape[0])[:, None]
+    return np.where(fill, y[rows, np.maximum(prev, 0)], y)
+
+
+def _bfill_limit_numpy(y: np.ndarray, limit: int) -> np.ndarray:
+    return _ffill_limit_numpy(y[:, ::-1], limit)[:, ::-1]
+
+
+def _regrid_numpy(values, bins, n_bins, prefill, mask, limit, edge_limit) -> np.ndarray:
+    work = values.copy()
+    if prefill.any():
+        work[prefill] = _fill_linear_numpy(values[prefill].astype(np.float64), limit, True)
+    grid = np.empty((len(values), n_bins))
+    for c, row in enumerate(work):
+        valid = ~np.isnan(row)
+        sums = np.bincount(bins[valid], weights=row[valid], minlength=n_bins)
+        counts = np.bincount(bins[valid], minlength=n_bins)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            grid[c] = np.where(counts > 0, sums / counts, np.nan).astype(values.dtype)
+    grid = _fill_linear_numpy(grid, limit, False)
+    grid = _bfill_limit_numpy(_ffill_limit_numpy(grid, edge_limit), edge_limit)
+    grid[:, mask] = np.nan
+    return grid.astype(values.dtype)
+
+
+def _rolling_mean_numpy(values: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    k, n = values.shape
+    valid = ~np.isnan(values)
+    csum = np.zeros((k, n + 1))
+    ccount = np.zeros((k, n + 1))
+    np.cumsum(np.where(valid, values, 0.0), axis=1, out=csum[:, 1:])
+    np.cumsum(valid, axis=1, out=ccount[:, 1:])
+    out = np.empty((len(windows), k, n))
+    end = np.arange(1, n + 1)
+    for wi, w in enumerate(windows):
+        start = np.maximum(end - w, 0)
+        count = ccount[:, end] - ccount[:, start]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[wi] = np.where(count > 0, (csum[:, end] - csum[:, start]) / count, np.nan)
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+
+def time_bins(time: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """1 s bin of each sample and the start time (s) of every bin.
+
+    Bins start at the first sample, like ``resample('1s')`` on a Timedelta
+    index built from ``time``.
+
+    Args:
+        time: Sorted sample times in seconds
+
+    Returns:
+        (bin index per sample, bin start times in seconds)
+    """
+    # Same arithmetic as pandas' float -> timedelta64[ns] cast (whole seconds
+    # and the fraction rounded to 1 ns converted separately), without its
+    # per-element loop
+    time = np.asarray(time, dtype=np.float64)
+    whole = time.astype(np.int64)
+    frac = np.round(time - whole, 9)
+    ns = whole * NS_PER_SECOND + (frac * NS_PER_SECOND).astype(np.int64)
+    if len(ns) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    bins = (ns - ns[0]) // NS_PER_SECOND
+    starts = ns[0] + np.arange(bins[-1] + 1, dtype=np.int64) * NS_PER_SECOND
+    return bins, starts / NS_PER_SECOND
+
+
+def gap_mask(bin_time: np.ndarray, gaps: Sequence[Tuple[float, float]]) -> np.ndarray:
+    """Bins strictly inside any of the (start, end) recording gaps."""
+    mask = np.zeros(len(bin_time), dtype=bool)
+    for gap_start, gap_end in gaps:
+        lo = np.searchsorted(bin_time, gap_start, side="right")
+        hi = np.searchsorted(bin_time, gap_end, side="left")
+        mask[lo:hi] = True
+    return mask
+
+
+def regrid(
+    values: np.ndarray,
+    bins: np.ndarray,
+    n_bins: int,
+    prefill: np.ndarray,
+    mask: np.ndarray,
+    limit: int,
+    edge_limit: int,
+    out: Optional[np.ndarray] = None,
+    out_rows: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Average each row of ``values`` into ``n_bins`` bins with gap-limited filling.
+
+    Per row: if ``prefill``, interpolate gaps of up to ``limit`` samples and
+    carry edge values; average into bins; interpolate runs of up to ``limit``
+    empty bins; carry values at most ``edge_limit`` bins forward and back;
+    finally blank the bins in ``mask``.
+
+    Args:
+        values: (columns x samples) float32 or float64 array
+        bins: Bin index of each sample
+        n_bins: Number of output bins
+        prefill: Per-row flag for the sample-level fill
+        mask: Bins to set to NaN
+        limit: Longest run interpolated, in samples and in bins
+        edge_limit: Longest run carried forward/backward after interpolation
+        out: Array to write into (default: a new columns x n_bins array in
+            the dtype of ``values``)
+        out_rows: Row of ``out`` for each row of ``values``
+
+    Returns:
+        ``out``
+    """
+    values = np.ascontiguousarray(values)
+    prefill = np.asarray(prefill, dtype=np.bool_)
+    if out is None:
+        out = np.empty((len(values), n_bins), dtype=values.dtype)
+    if out_rows is None:
+        out_rows = np.arange(len(values))
+    if is_numba_available():
+        _regrid_kernel(values, bins, n_bins, prefill, mask, limit, edge_limit, out, out_rows)
+    else:
+        out[out_rows] = _regrid_numpy(values, bins, n_bins, prefill, mask, limit, edge_limit)
+    return out
+
+
+def rolling_means(
+    values: np.ndarray,
+    windows: Sequence[int],
+    out: Optional[np.ndarray] = None,
+    out_rows: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Trailing ``rolling(w, min_periods=1).mean()`` of every row for every window.
+
+    Args:
+        values: (columns x samples) array
+        windows: Window lengths in samples
+        out: 2-D float64 array to write into (default: a new
+            windows x columns x samples array)
+        out_rows: (windows x columns) row of ``out`` for each result
+
+    Returns:
+        ``out``
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    windows = np.asarray(windows, dtype=np.int64)
+    k, n = values.shape
+    if out is None:
+        out = np.empty((len(windows), k, n))
+        target = out.reshape(len(windows) * k, n)
+        out_rows = np.arange(len(windows) * k).reshape(len(windows), k)
+    else:
+        target = out
+    if is_numba_available():
+        _rolling_mean_kernel(values, windows, target, np.asarray(out_rows, dtype=np.int64))
+    else:
+        means = _rolling_mean_numpy(values, windows)
+        for wi in range(len(windows)):
+            target[out_rows[wi]] = means[wi]
+    return out
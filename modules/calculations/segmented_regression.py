@@ -0,0 +1,234 @@
+"""
+Closed-form segmented (piecewise linear) regression engine.
+
+Prefix sums of x, y, x², xy and y² give the least-squares fit of any
+contiguous segment in O(1), so the RSS of every candidate breakpoint (or
+breakpoint pair) is evaluated as one vectorized NumPy expression instead of
+refitting ``linregress`` per candidate.
+
+Used by:
+- smo2_breakpoints: 2-segment (continuous) and 3-segment threshold searches
+- ventilatory: index-based 2-segment VT breakpoint search and the
+  sliding-window slope / standard error of the VT transition zones
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Relative tolerance below which a segment's x-variance counts as zero
+# (scipy.stats.linregress refuses to fit identical x values)
+_DEGENERATE_RTOL = 1e-12
+
+
+class PrefixSums:
+    """Cumulative sums of (x, y, x², xy, y²) over a fixed point order.
+
+    Data are centered on their means first to keep the sums well conditioned.
+    All segment queries are half-open ``[lo, hi)`` index ranges and accept
+    arrays, returning arrays of the broadcast shape.
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        self.n = len(x)
+        self.x0 = float(x.mean()) if self.n else 0.0
+        self.y0 = float(y.mean()) if self.n else 0.0
+        xc = x - self.x0
+        yc = y - self.y0
+        self._scale = float(np.max(np.abs(xc))) ** 2 if self.n else 0.0
+
+        self._p = np.zeros((5, self.n + 1))
+        np.cumsum(xc, out=self._p[0, 1:])
+        np.cumsum(yc, out=self._p[1, 1:])
+        np.cumsum(xc * xc, out=self._p[2, 1:])
+        np.cumsum(xc * yc, out=self._p[3, 1:])
+        np.cumsum(yc * yc, out=self._p[4, 1:])
+
+    def sums(self, lo, hi) -> Tuple[np.ndarray, ...]:
+        """Raw centered sums (count, Σx, Σy, Σx², Σxy, Σy²) over ``[lo, hi)``."""
+        lo, hi = np.broadcast_arrays(np.asarray(lo), np.asarray(hi))
+        d = self._p[:, hi] - self._p[:, lo]
+        return (hi - lo).astype(np.float64), d[0], d[1], d[2], d[3], d[4]
+
+    def ols(self, lo, hi) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Least-squares line per segment.
+
+        Returns:
+            (slope, intercept, rss, valid) in original (uncentered) units.
+            ``valid`` is False for segments with < 2 points or constant x.
+        """
+        cnt, sx, sy, sxx, sxy, syy = self.sums(lo, hi)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mx = np.where(cnt > 0, sx / cnt, 0.0)
+            my = np.where(cnt > 0, sy / cnt, 0.0)
+            dxx = sxx - sx * mx
+            dxy = sxy - sx * my
+            dyy = syy - sy * my
+            valid = (cnt >= 2) & (dxx > _DEGENERATE_RTOL * np.maximum(cnt * self._scale, 1e-300))
+            slope = np.where(valid, dxy / np.where(valid, dxx, 1.0), np.nan)
+            rss = np.where(valid, np.maximum(dyy - slope * dxy, 0.0), np.nan)
+        intercept = (my + self.y0) - slope * (mx + self.x0)
+        return slope, intercept, rss, valid
+
+    def slope_stderr(self, lo, hi) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """OLS slope and its standard error per segment (as ``linregress``).
+
+        Returns:
+            (slope, stderr, valid); invalid segments get slope = stderr = 0.
+            Two-point segments have a stderr of 0, like ``linregress``.
+        """
+        cnt, sx, sy, sxx, sxy, syy = self.sums(lo, hi)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mx = np.where(cnt > 0, sx / cnt, 0.0)
+            my = np.where(cnt > 0, sy / cnt, 0.0)
+            dxx = sxx - sx * mx
+            dxy = sxy - sx * my
+            dyy = syy - sy * my
+            valid = (cnt >= 2) & (dxx > _DEGENERATE_RTOL * np.maximum(cnt * self._scale, 1e-300))
+            safe_dxx = np.where(valid, dxx, 1.0)
+            slope = np.where(valid, dxy / safe_dxx, 0.0)
+            rss = np.maximum(dyy - slope * dxy, 0.0)
+            dof = np.where(cnt > 2, cnt - 2, 1.0)
+            stderr = np.where(valid & (cnt > 2), np.sqrt(rss / dof / safe_dxx), 0.0)
+        return slope, stderr, valid
+
+    def mean_y(self, lo, hi) -> np.ndarray:
+        cnt, _, sy, _, _, _ = self.sums(lo, hi)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(cnt > 0, sy / cnt, np.nan) + self.y0
+
+    def mean_x(self, lo, hi) -> np.ndarray:
+        cnt, sx, _, _, _, _ = self.sums(lo, hi)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(cnt > 0, sx / cnt, np.nan) + self.x0
+
+    def line_rss(self, lo, hi, slope, intercept) -> np.ndarray:
+        """RSS of a given line ``y = slope * x + intercept`` over ``[lo, hi)``."""
+        cnt, sx, sy, sxx, sxy, syy = self.sums(lo, hi)
+        # Residual in centered coordinates: yc - slope * xc - c
+        c = intercept + slope * self.x0 - self.y0
+        rss = (
+            syy
+            - 2 * slope * sxy
+            - 2 * c * sy
+            + slope * slope * sxx
+            + 2 * slope * c * sx
+            + cnt * c * c
+        )
+        return np.where(cnt > 0, np.maximum(rss, 0.0), 0.0)
+
+
+def _sorted_by_x(x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    order = np.argsort(x, kind="stable")
+    return np.asarray(x, dtype=np.float64)[order], np.asarray(y, dtype=np.float64)[order]
+
+
+def two_segment_index_fits(
+    x: np.ndarray, y: np.ndarray, min_segment_size: int = 3
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Independent OLS fits on both sides of every split index.
+
+    The split ``i`` puts points ``[0, i)`` in segment 1 and ``[i, n)`` in
+    segment 2 (points taken in the given order).
+
+    Returns:
+        (split_indices, sse, slope1, slope2, valid)
+    """
+    n = len(x)
+    splits = np.arange(min_segment_size, n - min_segment_size)
+    ps = PrefixSums(x, y)
+    s1, _, rss1, ok1 = ps.ols(0, splits)
+    s2, _, rss2, ok2 = ps.ols(splits, n)
+    return splits, rss1 + rss2, s1, s2, ok1 & ok2
+
+
+def two_segment_threshold_rss(
+    x: np.ndarray, y: np.ndarray, breakpoints: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """RSS of the continuous 2-segment model for each breakpoint value.
+
+    Segment 1 (``x < bp``) is an OLS line; segment 2 (``x >= bp``) uses its
+    own OLS slope but is anchored to segment 1 at ``bp``. Degenerate
+    segments follow the fallbacks of ``smo2_breakpoints._fit_piecewise_2segment``.
+
+    Returns:
+        (rss, slope1, slope2); rss is inf where the fit is undefined.
+    """
+    bps = np.asarray(breakpoints, dtype=np.float64)
+    y_first = float(np.asarray(y, dtype=np.float64)[0])
+    xs, ys = _sorted_by_x(x, y)
+    n = len(xs)
+    ps = PrefixSums(xs, ys)
+    k = np.searchsorted(xs, bps, side="left")
+    n1 = k
+    n2 = n - k
+
+    s1_ols, c1_ols, rss1_ols, ok1 = ps.ols(0, k)
+    s2_ols, _, _, ok2 = ps.ols(k, n)
+
+    s1 = np.where(n1 >= 2, s1_ols, 0.0)
+    c1 = np.where(n1 >= 2, c1_ols, ps.mean_y(0, k))
+    rss1 = np.where(n1 >= 2, rss1_ols, 0.0)
+    s2 = np.where(n2 >= 2, s2_ols, s1)
+
+    y_bp = np.where(n1 > 0, s1 * bps + c1, y_first)
+    c2 = y_bp - s2 * bps
+    rss2 = ps.line_rss(k, n, s2, c2)
+
+    bad = ((n1 >= 2) & ~ok1) | ((n2 >= 2) & ~ok2)
+    rss = np.where(bad, np.inf, rss1 + rss2)
+    return rss, s1, s2
+
+
+def three_segment_threshold_rss(
+    x: np.ndarray, y: np.ndarray, bp1: np.ndarray, bp2: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """RSS of independent OLS fits on ``x < bp1``, ``bp1 <= x < bp2``, ``x >= bp2``.
+
+    ``bp1`` and ``bp2`` broadcast against each other (e.g. a column and a
+    row vector for a full grid). Degenerate segments follow the fallbacks of
+    ``smo2_breakpoints._fit_piecewise_3segment``.
+
+    Returns:
+        (rss, slope1, slope2, slope3); rss is inf where the fit is undefined.
+    """
+    xs, ys = _sorted_by_x(x, y)
+    n = len(xs)
+    ps = PrefixSums(xs, ys)
+    k1 = np.searchsorted(xs, np.asarray(bp1, dtype=np.float64), side="left")
+    k2 = np.searchsorted(xs, np.asarray(bp2, dtype=np.float64), side="left")
+    k1, k2 = np.broadcast_arrays(k1, k2)
+    k2 = np.maximum(k1, k2)
+    counts = (k1, k2 - k1, n - k2)
+    bounds = ((0, k1), (k1, k2), (k2, n))
+
+    rss = np.zeros(k1.shape)
+    bad = np.zeros(k1.shape, dtype=bool)
+    slopes = []
+    prev_slope = np.zeros(k1.shape)
+    for seg, ((lo, hi), cnt) in enumerate(zip(bounds, counts, strict=True)):
+        s_ols, _, r_ols, ok = ps.ols(lo, hi)
+        slope = np.where(cnt >= 2, s_ols, prev_slope)
+        # A single-point segment keeps the fallback slope with intercept = its value,
+        # leaving a residual of slope * x (none for segment 1, whose fallback slope is 0)
+        single = (prev_slope * ps.mean_x(lo, hi)) ** 2 if seg > 0 else 0.0
+        rss = rss + np.where(cnt >= 2, r_ols, np.where(cnt == 1, single, 0.0))
+        bad |= (cnt >= 2) & ~ok
+        slopes.append(slope)
+        prev_slope = slope
+
+    rss = np.where(bad, np.inf, rss)
+    return rss, slopes[0], slopes[1], slopes[2]
+
+
+def best_index(rss: np.ndarray, mask: Optional[np.ndarray] = None) -> Optional[int]:
+    """Flat index of the smallest finite RSS (first one on ties), or None."""
+    rss = np.asarray(rss, dtype=np.float64)
+    if mask is not None:
+        rss = np.where(mask, rss, np.inf)
+    flat = rss.ravel()
+    if flat.size == 0 or not np.isfinite(flat).any():
+        return None
+    return int(np.argmin(flat))
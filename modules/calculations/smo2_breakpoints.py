@@ -25,6 +25,12 @@ from scipy.signal import savgol_filter
 from typing import Tuple, Optional, List, Dict
 from dataclasses import dataclass, field
 
+from .segmented_regression import (
+    best_index,
+    three_segment_threshold_rss,
+    two_segment_threshold_rss,
+)
+
 
 @dataclass
 class SmO2Breakpoints:
@@ -218,56 +224,25 @@ def _predict_piecewise_2segment(
 
 
 def _search_breakpoint_2segment(
-    x: np.ndarray, y: np.ndarray, bp_range: Tuple[float, float]
+    x: np.ndarray, y: np.ndarray, bp_range: Tuple[float, float], step: float = 1.0
 ) -> Tuple[Optional[float], Optional[Tuple[float, float]], float]:
     """
-    Two-phase breakpoint search for 2-segment model.
+    Exhaustive breakpoint search for the 2-segment model.
 
-    Phase 1: Coarse grid search (step=10)
-    Phase 2: Fine grid search (step=1) around best coarse result
+    Evaluates every candidate on the ``step`` grid over ``bp_range`` in closed
+    form (prefix sums), so the result is the exact grid optimum rather than a
+    coarse-to-fine approximation.
     """
-    best_rss = np.inf
-    best_bp = None
-    best_slopes = None
-
-    # Phase 1: Coarse search
-    coarse_step = 10
-    bp_coarse = np.arange(bp_range[0], bp_range[1], coarse_step)
-
-    for bp in bp_coarse:
-        try:
-            rss, slopes = _fit_piecewise_2segment(x, y, bp)
-            if rss < best_rss:
-                best_rss = rss
-                best_bp = bp
-                best_slopes = slopes
-        except (np.linalg.LinAlgError, ValueError, ZeroDivisionError):
-            continue
-
-    if best_bp is None:
+    grid = np.arange(bp_range[0], bp_range[1], step)
+    if len(grid) == 0 or len(x) == 0:
         return None, None, np.inf
 
-    # Phase 2: Fine search around best coarse
-    fine_step = 1
-    fine_range = 10
-
-    bp_fine = np.arange(
-        max(bp_range[0], best_bp - fine_range),
-        min(bp_range[1], best_bp + fine_range + fine_step),
-        fine_step,
-    )
-
-    for bp in bp_fine:
-        try:
-            rss, slopes = _fit_piecewise_2segment(x, y, bp)
-            if rss < best_rss:
-                best_rss = rss
-                best_bp = bp
-                best_slopes = slopes
-        except (np.linalg.LinAlgError, ValueError, ZeroDivisionError):
-            continue
+    rss, slope1, slope2 = two_segment_threshold_rss(x, y, grid)
+    best = best_index(rss)
+    if best is None:
+        return None, None, np.inf
 
-    return best_bp, best_slopes, best_rss
+    return grid[best], (float(slope1[best]), float(slope2[best])), float(rss[best])
 
 
 # =============================================================================
@@ -721,76 +696,36 @@ def _predict_piecewise_3segment(
     return y_pred
 
 
-def _two_phase_breakpoint_search(  # noqa: C901
+def _two_phase_breakpoint_search(
     x: np.ndarray,
     y: np.ndarray,
     bp1_range: Tuple[float, float],
     bp2_range: Tuple[float, float],
     min_separation: float,
+    step: float = 1.0,
 ) -> Tuple[Optional[float], Optional[float], Optional[Tuple[float, float, float]], float]:
     """
-    Two-phase breakpoint search: coarse grid + fine optimization.
+    Exhaustive breakpoint-pair search for the 3-segment model.
 
-    Phase 1: Coarse grid search (step=20) to find approximate region.
-    Phase 2: Fine grid search (step=2) around best coarse result.
-
-    Complexity: O((n/20)^2 + 15^2) = O(n^2/400) vs original O(n^2)
-    For typical ranges: ~25 iterations vs ~256 iterations (10x speedup)
+    Builds the full (bp1, bp2) grid at ``step`` resolution and gets the RSS of
+    every pair at once from prefix sums, replacing the former coarse (20 W)
+    + fine (2 W) double loop. Returns the exact grid optimum.
     """
-    best_rss = np.inf
-    best_bp1, best_bp2 = None, None
-    best_slopes = None
-
-    # Phase 1: Coarse search with step=20
-    coarse_step = 20
-    bp1_coarse = np.arange(bp1_range[0], bp1_range[1], coarse_step)
-    bp2_coarse = np.arange(bp2_range[0], bp2_range[1], coarse_step)
-
-    for bp1 in bp1_coarse:
-        for bp2 in bp2_coarse:
-            if bp2 <= bp1 + min_separation:
-                continue
-            try:
-                rss, slopes = _fit_piecewise_3segment(x, y, bp1, bp2)
-                if rss < best_rss:
-                    best_rss = rss
-                    best_bp1, best_bp2 = bp1, bp2
-                    best_slopes = slopes
-            except (np.linalg.LinAlgError, ValueError, ZeroDivisionError):
-                continue
-
-    if best_bp1 is None:
+    bp1_grid = np.arange(bp1_range[0], bp1_range[1], step)
+    bp2_grid = np.arange(bp2_range[0], bp2_range[1], step)
+    if len(bp1_grid) == 0 or len(bp2_grid) == 0 or len(x) == 0:
         return None, None, None, np.inf
 
-    # Phase 2: Fine search around best coarse (±15W, step=2)
-    fine_step = 2
-    fine_range = 15
-
-    bp1_fine = np.arange(
-        max(bp1_range[0], best_bp1 - fine_range),
-        min(bp1_range[1], best_bp1 + fine_range + fine_step),
-        fine_step,
-    )
-    bp2_fine = np.arange(
-        max(bp2_range[0], best_bp2 - fine_range),
-        min(bp2_range[1], best_bp2 + fine_range + fine_step),
-        fine_step,
-    )
+    bp1 = bp1_grid[:, None]
+    bp2 = bp2_grid[None, :]
+    rss, slope1, slope2, slope3 = three_segment_threshold_rss(x, y, bp1, bp2)
+    best = best_index(rss, mask=bp2 > bp1 + min_separation)
+    if best is None:
+        return None, None, None, np.inf
 
-    for bp1 in bp1_fine:
-        for bp2 in bp2_fine:
-            if bp2 <= bp1 + min_separation:
-                continue
-            try:
-                rss, slopes = _fit_piecewise_3segment(x, y, bp1, bp2)
-                if rss < best_rss:
-                    best_rss = rss
-                    best_bp1, best_bp2 = bp1, bp2
-                    best_slopes = slopes
-            except (np.linalg.LinAlgError, ValueError, ZeroDivisionError):
-                continue
-
-    return best_bp1, best_bp2, best_slopes, best_rss
+    i, j = np.unravel_index(best, rss.shape)
+    slopes = (float(slope1[i, j]), float(slope2[i, j]), float(slope3[i, j]))
+    return bp1_grid[i], bp2_grid[j], slopes, float(rss[i, j])
 
 
 # =============================================================================
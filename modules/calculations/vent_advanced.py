@@ -173,18 +173,28 @@ def _compute_segment_slopes(
     segment_len: int = 20,
     step: int = 10,
 ) -> List[Tuple[float, float]]:
+    """Least-squares VE/power slope of each segment with varying power.
+
+    All segments are regressed at once (same slopes as ``stats.linregress``
+    per segment).
+    """
     n = len(ve_smooth)
-    slopes: List[Tuple[float, float]] = []
-    for i in range(0, n - segment_len, step):
-        seg_power = power[i : i + segment_len]
-        seg_ve = ve_smooth[i : i + segment_len]
-        if len(seg_power) > 5 and np.unique(seg_power).size > 1:
-            try:
-                s, _, _, _, _ = stats.linregress(seg_power, seg_ve)
-                slopes.append((power[i + segment_len // 2], s))
-            except Exception as e:
-                logger.debug(f"Linregress failed in segment: {e}")
-    return slopes
+    starts = np.arange(0, n - segment_len, step)
+    if segment_len <= 5 or len(starts) == 0:
+        return []
+
+    windows = np.lib.stride_tricks.sliding_window_view
+    x = windows(np.asarray(power, dtype=np.float64), segment_len)[starts]
+    y = windows(np.asarray(ve_smooth, dtype=np.float64), segment_len)[starts]
+    x_dev = x - x.mean(axis=1, keepdims=True)
+    y_dev = y - y.mean(axis=1, keepdims=True)
+    ssx = np.einsum("ij,ij->i", x_dev, x_dev)
+    sxy = np.einsum("ij,ij->i", x_dev, y_dev)
+
+    varying = np.ptp(x, axis=1) > 0
+    slopes = sxy[varying] / ssx[varying]
+    centers = np.asarray(power)[starts[varying] + segment_len // 2]
+    return list(zip(centers.tolist(), slopes.tolist(), strict=True))
 
 
 def _find_slope_breakpoint(slopes: List[Tuple[float, float]]) -> Optional[float]:
@@ -449,14 +459,14 @@ def analyze_ventilation(
             mask = (
                 df[power_col] > 50 if power_col in df.columns else pd.Series(True, index=df.index)
             )
-            for i in range(0, mask.sum(), 20):
-                idx = df.index[mask][i] if i < mask.sum() else df.index[mask][-1]
-                metrics.ve_profile.append(
-                    {
-                        "power": float(df.loc[idx, power_col]) if power_col in df.columns else i,
-                        "ve": float(df.loc[idx, col]),
-                    }
-                )
+            sampled = df.index[mask][::20]
+            ve_values = df.loc[sampled, col].to_numpy(dtype=float)
+            if power_col in df.columns:
+                power_values = df.loc[sampled, power_col].to_numpy(dtype=float).tolist()
+            else:
+                power_values = list(range(0, len(sampled) * 20, 20))
+            for power_value, ve_value in zip(power_values, ve_values.tolist(), strict=True):
+                metrics.ve_profile.append({"power": power_value, "ve": ve_value})
             break
 
     return metrics
@@ -8,6 +8,7 @@ from scipy import stats, signal
 from typing import Optional, List, Tuple, Any
 
 from .threshold_types import TransitionZone, SensitivityResult, StepVTResult, StepTestRange
+from .segmented_regression import PrefixSums, best_index, two_segment_index_fits
 from .common import (
     VT1_SLOPE_THRESHOLD,
     VT2_SLOPE_THRESHOLD,
@@ -303,6 +304,119 @@ def detect_vt_from_steps(  # noqa: C901
     return result
 
 
+# Slope CI criteria of the sliding-window transition-zone detector
+_TZ_Z = 1.96
+_TZ_MIN_POINTS = 10
+_TZ_SENSITIVITY_WINDOWS = (30, 45, 60, 90)
+
+
+class _WindowSlopeScanner:
+    """Rolling VE-vs-time slope statistics over time windows in O(n).
+
+    Rows are sorted by time once; any ``[t, t + window)`` window is then an
+    index range whose regression slope, standard error and means come from
+    prefix sums, so every window size and start is answered without
+    re-masking the DataFrame.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        ve_column: str,
+        power_column: str,
+        hr_column: str,
+        time_column: str,
+    ):
+        t = df[time_column].to_numpy(dtype=np.float64)
+        keep = ~np.isnan(t)
+        order = np.argsort(t[keep], kind="stable")
+        self.t = t[keep][order]
+        self.n_rows = len(df)
+
+        ve = df[ve_column].to_numpy(dtype=np.float64)[keep][order]
+        has_ve = ~np.isnan(ve)
+        # Regression runs on rows with VE only; map row ranges to that subset
+        self._ve_rank = np.concatenate(([0], np.cumsum(has_ve)))
+        self._fit = PrefixSums(self.t[has_ve], ve[has_ve])
+
+        self._power = self._mean_sums(df[power_column], keep, order)
+        self.has_hr = hr_column in df
+        self._hr = self._mean_sums(df[hr_column], keep, order) if self.has_hr else None
+
+    @staticmethod
+    def _mean_sums(series: pd.Series, keep: np.ndarray, order: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        v = series.to_numpy(dtype=np.float64)[keep][order]
+        ok = ~np.isnan(v)
+        return (
+            np.concatenate(([0.0], np.cumsum(np.where(ok, v, 0.0)))),
+            np.concatenate(([0], np.cumsum(ok))),
+        )
+
+    @staticmethod
+    def _window_mean(sums: Tuple[np.ndarray, np.ndarray], lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+        total, count = sums
+        cnt = count[hi] - count[lo]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(cnt > 0, (total[hi] - total[lo]) / cnt, np.nan)
+
+    def candidates(self, window_duration: int, step_size: int) -> Tuple[List[dict], List[dict]]:
+        """VT1 / VT2 candidate windows, in window-start order."""
+        if self.n_rows < window_duration or len(self.t) == 0:
+            return [], []
+        starts = np.arange(
+            int(self.t[0]), int(self.t[-1]) - window_duration, step_size, dtype=np.float64
+        )
+        lo = np.searchsorted(self.t, starts, side="left")
+        hi = np.searchsorted(self.t, starts + window_duration, side="left")
+        full = (hi - lo) >= _TZ_MIN_POINTS
+        lo, hi = lo[full], hi[full]
+
+        slope, err, _ = self._fit.slope_stderr(self._ve_rank[lo], self._ve_rank[hi])
+        low, up = slope - _TZ_Z * err, slope + _TZ_Z * err
+        vt1 = (low <= 0.05) & (0.05 <= up) & (0.02 <= slope) & (slope <= 0.08)
+        vt2 = (low <= 0.15) & (0.15 <= up) & (0.10 <= slope) & (slope <= 0.20)
+
+        watts = self._window_mean(self._power, lo, hi)
+        hr = self._window_mean(self._hr, lo, hi) if self.has_hr else None
+
+        def collect(sel: np.ndarray) -> List[dict]:
+            return [
+                {
+                    "avg_watts": watts[i],
+                    "avg_hr": hr[i] if hr is not None else None,
+                    "std_err": err[i],
+                }
+                for i in np.flatnonzero(sel)
+            ]
+
+        return collect(vt1), collect(vt2)
+
+
+def _summarize_transition_zone(
+    candidates: List[dict], threshold: float, err_scale: float
+) -> Optional[TransitionZone]:
+    if not candidates:
+        return None
+    df_c = pd.DataFrame(candidates)
+    avg_err = df_c["std_err"].mean()
+    return TransitionZone(
+        range_watts=(df_c["avg_watts"].min(), df_c["avg_watts"].max()),
+        range_hr=(df_c["avg_hr"].min(), df_c["avg_hr"].max())
+        if "avg_hr" in df_c and df_c["avg_hr"].min()
+        else None,
+        confidence=max(0.1, min(1.0, 1.0 - (avg_err * err_scale))),
+        method=f"Sliding Window (threshold {threshold})",
+        description=f"Region where slope CI overlaps {threshold}.",
+    )
+
+
+def _zones_from_scanner(
+    scanner: _WindowSlopeScanner, window_duration: int, step_size: int
+) -> Tuple[Optional[TransitionZone], Optional[TransitionZone]]:
+    vt1_c, vt2_c = scanner.candidates(window_duration, step_size)
+    return _summarize_transition_zone(vt1_c, 0.05, 100), _summarize_transition_zone(vt2_c, 0.15, 50)
+
+
 def detect_vt_transition_zone(
     df: pd.DataFrame,
     window_duration: int = 60,
@@ -312,65 +426,29 @@ def detect_vt_transition_zone(
     hr_column: str = "hr",
     time_column: str = "time",
 ) -> Tuple[Optional[TransitionZone], Optional[TransitionZone]]:
-    """Detect VT transition zones using sliding window."""
+    """Detect VT transition zones using sliding window.
+
+    A window is a candidate when the 95% CI of its VE-vs-time slope overlaps
+    the VT1 (0.05) or VT2 (0.15) reference slope. Window statistics come from
+    prefix sums (O(n) overall) instead of a refit per window.
+    """
     if len(df) < window_duration:
         return None, None
-    min_time, max_time = df[time_column].min(), df[time_column].max()
-    vt1_c, vt2_c = [], []
-    Z = 1.96
-
-    for t in range(int(min_time), int(max_time) - window_duration, step_size):
-        mask = (df[time_column] >= t) & (df[time_column] < t + window_duration)
-        w = df[mask]
-        if len(w) < 10:
-            continue
-        slope, _, err = calculate_slope(w[time_column], w[ve_column])
-        l, u = slope - Z * err, slope + Z * err
-        if l <= 0.05 <= u and 0.02 <= slope <= 0.08:
-            vt1_c.append(
-                {
-                    "avg_watts": w[power_column].mean(),
-                    "avg_hr": w[hr_column].mean() if hr_column in w else None,
-                    "std_err": err,
-                }
-            )
-        if l <= 0.15 <= u and 0.10 <= slope <= 0.20:
-            vt2_c.append(
-                {
-                    "avg_watts": w[power_column].mean(),
-                    "avg_hr": w[hr_column].mean() if hr_column in w else None,
-                    "std_err": err,
-                }
-            )
-
-    def process_c(c, threshold, err_scale):
-        if not c:
-            return None
-        df_c = pd.DataFrame(c)
-        avg_err = df_c["std_err"].mean()
-        return TransitionZone(
-            range_watts=(df_c["avg_watts"].min(), df_c["avg_watts"].max()),
-            range_hr=(df_c["avg_hr"].min(), df_c["avg_hr"].max())
-            if "avg_hr" in df_c and df_c["avg_hr"].min()
-            else None,
-            confidence=max(0.1, min(1.0, 1.0 - (avg_err * err_scale))),
-            method=f"Sliding Window (threshold {threshold})",
-            description=f"Region where slope CI overlaps {threshold}.",
-        )
-
-    return process_c(vt1_c, 0.05, 100), process_c(vt2_c, 0.15, 50)
+    scanner = _WindowSlopeScanner(df, ve_column, power_column, hr_column, time_column)
+    return _zones_from_scanner(scanner, window_duration, step_size)
 
 
 def run_sensitivity_analysis(
     df: pd.DataFrame, ve_column: str, power_column: str, hr_column: str, time_column: str
 ) -> SensitivityResult:
-    """Check stability by varying window size."""
-    wins = [30, 45, 60, 90]
+    """Check stability by varying window size.
+
+    The prefix sums are built once and shared by all window sizes.
+    """
+    scanner = _WindowSlopeScanner(df, ve_column, power_column, hr_column, time_column)
     r1, r2 = [], []
-    for w in wins:
-        v1, v2 = detect_vt_transition_zone(
-            df, w, 5, ve_column, power_column, hr_column, time_column
-        )
+    for w in _TZ_SENSITIVITY_WINDOWS:
+        v1, v2 = _zones_from_scanner(scanner, w, 5)
         if v1:
             r1.append(sum(v1.range_watts) / 2)
         if v2:
@@ -1517,7 +1595,8 @@ def _find_breakpoint_segmented(
     """
     Find optimal breakpoint using piecewise linear regression.
 
-    Tests each potential breakpoint and returns the one minimizing total SSE.
+    Evaluates every potential breakpoint in closed form and returns the one
+    minimizing total SSE.
 
     Args:
         x: Independent variable (power)
@@ -1538,40 +1617,15 @@ def _find_breakpoint_segmented(
     if len(x) < 2 * min_segment_size:
         return None
 
-    best_idx = None
-    best_sse = np.inf
-    best_slope_ratio = 0
-
-    for i in range(min_segment_size, len(x) - min_segment_size):
-        # Fit two segments
-        x1, y1 = x[:i], y[:i]
-        x2, y2 = x[i:], y[i:]
-
-        try:
-            # Segment 1
-            slope1, intercept1, _, _, _ = stats.linregress(x1, y1)
-            pred1 = slope1 * x1 + intercept1
-            sse1 = np.sum((y1 - pred1) ** 2)
+    # SSE of both OLS segments for every split index at once (prefix sums)
+    splits, sse, slope1, slope2, valid = two_segment_index_fits(x, y, min_segment_size)
 
-            # Segment 2
-            slope2, intercept2, _, _, _ = stats.linregress(x2, y2)
-            pred2 = slope2 * x2 + intercept2
-            sse2 = np.sum((y2 - pred2) ** 2)
-
-            total_sse = sse1 + sse2
-
-            # We want slope2 > slope1 (increasing trend after breakpoint)
-            slope_ratio = slope2 / slope1 if slope1 != 0 else slope2
-
-            if total_sse < best_sse and slope_ratio > 1.1:
-                best_sse = total_sse
-                best_idx = i
-                best_slope_ratio = slope_ratio
-
-        except Exception:
-            continue
+    # We want slope2 > slope1 (increasing trend after breakpoint)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope_ratio = np.where(slope1 != 0, slope2 / slope1, slope2)
 
-    return best_idx
+    best = best_index(sse, mask=valid & (slope_ratio > 1.1))
+    return int(splits[best]) if best is not None else None
 
 
 def _calculate_segment_slope(x: np.ndarray, y: np.ndarray) -> float:
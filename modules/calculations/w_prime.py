@@ -1,83 +1,449 @@
 """
 SRP: Moduł odpowiedzialny za obliczenia W' Balance (Skarbiec Beztlenowy).
+
+All W' balance models run through one engine, ``w_prime_balance``, which
+works directly on contiguous float64 watts/time arrays:
+
+- ``"skiba"``: differential model with dynamic recovery τ
+  (``calculate_w_prime_fast``),
+- ``"biexp"``: Caen et al. bi-exponential reconstitution
+  (``calculate_w_prime_biexp``),
+- ``"constant_tau"``: Skiba integral form with a fixed τ
+  (``numba_utils.calculate_w_prime_balance_numba``).
+
+Results are memoized by a content fingerprint of the inputs (see
+``modules.fingerprint``) and returned read-only, so ``calculate_w_prime_balance``
+only attaches the balance column to a shallow copy of the frame.
+
+``w_prime_sweep`` runs a whole grid of (CP, W', recovery τ) sets over one
+power series in parallel; ``fit_cp_w_prime`` uses it to find the CP/W' pair
+that best explains observed exhaustion points.
 """
 
-from typing import Union
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
+
 import numpy as np
 import pandas as pd
-import io
-from numba import jit
 
-from ..utils import _serialize_df_to_parquet_bytes
+from modules.fingerprint import fingerprint
+from modules.numba_utils import njit, prange
 
+logger = logging.getLogger(__name__)
 
-@jit(nopython=True, fastmath=True)
-def calculate_w_prime_fast(watts, time, cp, w_prime_cap):
-    """Szybkie obliczenie W' Balance przy użyciu Numba JIT.
+W_PRIME_MODELS = ("skiba", "biexp", "constant_tau")
 
-    Implementacja modelu różnicowego W' Skiba/Morton.
+# Sport-specific bi-exponential parameters: (tau_fast, tau_slow, A_fast)
+_BIEXP_PARAMS = {
+    0: (50.0, 400.0, 0.65),  # cycling
+    1: (30.0, 300.0, 0.70),  # running
+    2: (20.0, 200.0, 0.75),  # swimming
+}
 
-    FIXED: Added exponential W' reconstitution (Skiba model)
-    When power drops below CP, W' recovers exponentially with time constant τ.
+# Fixed recovery time constant of the "constant_tau" model [s]
+DEFAULT_TAU = 546.0
 
-    Args:
-        watts: Tablica mocy [W]
-        time: Tablica czasów [s]
-        cp: Critical Power [W]
-        w_prime_cap: Pojemność W' [J]
+# Best grid cells refined by fit_cp_w_prime (the error surface can have several basins)
+_FIT_SEEDS = 3
 
-    Returns:
-        Tablica wartości W' Balance w czasie
-    """
-    n = len(watts)
-    w_bal = np.empty(n, dtype=np.float64)
+# Balance arrays kept by w_prime_balance (one per recently analysed session)
+_BALANCE_CACHE_SIZE = 16
+
+_NO_TIME = np.empty(0, dtype=np.float64)
+
+
+@njit(cache=True)
+def _step(time, i, prev_time):
+    """Seconds since the previous sample; 1 s without time, for i == 0 or if not increasing."""
+    if len(time) == 0 or i == 0:
+        return 1.0
+    dt = time[i] - prev_time
+    if not dt > 0:
+        return 1.0
+    return dt
+
+
+@njit(cache=True)
+def _skiba_kernel(watts, time, cp, w_prime_cap, tau_scale, floor, out):
     curr_w = w_prime_cap
+    prev_time = time[0] if len(time) else 0.0
 
-    prev_time = time[0]
+    # Skiba recovery time constant, scaled per sample by the power deficit
+    tau_base = w_prime_cap / cp * 300.0 * tau_scale
 
-    # FIXED: Skiba exponential recovery time constant (τ)
-    # τ = W' / (CP - P_below) typically ~300-600s for trained athletes
-    # Using dynamic τ based on power deficit
-    tau_base = w_prime_cap / cp * 300.0  # Base τ in seconds
+    for i in range(len(watts)):
+        dt = _step(time, i, prev_time)
+        if len(time):
+            prev_time = time[i]
 
-    for i in range(n):
-        if i == 0:
-            dt = 1.0
+        p = watts[i]
+        if p != p:
+            p = 0.0  # dropout / pause: no work done
+
+        power_diff = cp - p
+        if power_diff > 0:
+            # Below CP: reconstitution towards the cap
+            tau = tau_base * (cp / max(p, 1.0))
+            curr_w += (w_prime_cap - curr_w) / tau * dt
         else:
-            dt = time[i] - prev_time
-            if dt <= 0:
-                dt = 1.0
+            # Above CP: linear depletion (dW/dt = CP - P)
+            curr_w += power_diff * dt
+
+        if curr_w > w_prime_cap:
+            curr_w = w_prime_cap
+        elif curr_w < floor:
+            curr_w = floor
+        out[i] = curr_w
+
+
+@njit(cache=True)
+def _biexp_kernel(watts, time, cp, w_prime_cap, tau_f, tau_s, a_f, floor, out):
+    curr_w = w_prime_cap
+    prev_time = time[0] if len(time) else 0.0
+    a_s = 1.0 - a_f
+
+    for i in range(len(watts)):
+        dt = _step(time, i, prev_time)
+        if len(time):
             prev_time = time[i]
 
-        # Differential W' Model: dW/dt = CP - P
-        # FIXED: Add exponential recovery when below CP
-        power_diff = cp - watts[i]
+        p = watts[i]
+        if p != p:
+            p = 0.0
 
+        power_diff = cp - p
         if power_diff > 0:
-            # Below CP: Exponential reconstitution (Skiba model)
-            # W'(t) = W'_remaining + (W'_cap - W'_remaining) * (1 - e^(-dt/τ))
-            # Simplified: recover proportionally to time below CP
-            tau = tau_base * (cp / max(watts[i], 1.0))  # Dynamic τ
-            recovery_rate = (w_prime_cap - curr_w) / tau
-            delta = recovery_rate * dt
+            deficit = w_prime_cap - curr_w
+            curr_w = w_prime_cap - deficit * (a_f * np.exp(-dt / tau_f) + a_s * np.exp(-dt / tau_s))
         else:
-            # Above CP: Linear depletion
-            delta = power_diff * dt
-
-        # Integral
-        curr_w += delta
+            curr_w += power_diff * dt
 
-        # Boundary conditions
         if curr_w > w_prime_cap:
             curr_w = w_prime_cap
-        elif curr_w < 0:
-            curr_w = 0.0
+        elif curr_w < floor:
+            curr_w = floor
+        out[i] = curr_w
+
+
+@njit(cache=True)
+def _constant_tau_kernel(watts, time, cp, w_prime_cap, tau, floor, out):
+    # The first sample is the full capacity; work starts at the second one
+    out[0] = w_prime_cap
+    curr_w = w_prime_cap
+    prev_time = time[0] if len(time) else 0.0
+
+    for i in range(1, len(watts)):
+        dt = _step(time, i, prev_time)
+        if len(time):
+            prev_time = time[i]
+
+        p = watts[i]
+        if p != p:
+            p = 0.0
+
+        if p > cp:
+            curr_w -= (p - cp) * dt
+        else:
+            curr_w += (w_prime_cap - curr_w) * (1.0 - np.exp(-dt / tau))
+
+        curr_w = max(floor, min(w_prime_cap, curr_w))
+        out[i] = curr_w
+
+
+@njit(cache=True)
+def _run_model(watts, time, model, cp, w_prime_cap, tau_scale, recovery, floor, out):
+    """One model run into ``out``; ``recovery`` is (tau_fast, tau_slow, A_fast, tau)."""
+    if model == 0:
+        _skiba_kernel(watts, time, cp, w_prime_cap, tau_scale, floor, out)
+    elif model == 1:
+        _biexp_kernel(
+            watts, time, cp, w_prime_cap,
+            recovery[0] * tau_scale, recovery[1] * tau_scale, recovery[2], floor, out,
+        )
+    else:
+        _constant_tau_kernel(watts, time, cp, w_prime_cap, recovery[3] * tau_scale, floor, out)
+
+
+@njit(parallel=True, cache=True)
+def _sweep_kernel(watts, time, model, params, recovery, floor, samples, out):
+    """One model run per row of ``params`` (cp, w_prime_cap, tau_scale), in parallel.
+
+    Row j of ``out`` receives the whole balance series, or only the values
+    at ``samples`` when that array is not empty.
+    """
+    for j in prange(params.shape[0]):
+        if len(samples) == 0:
+            _run_model(
+                watts, time, model, params[j, 0], params[j, 1], params[j, 2],
+                recovery, floor, out[j],
+            )
+        else:
+            buf = np.empty(len(watts))
+            _run_model(
+                watts, time, model, params[j, 0], params[j, 1], params[j, 2],
+                recovery, floor, buf,
+            )
+            for s in range(len(samples)):
+                out[j, s] = buf[samples[s]]
+
+
+def _as_float64(values) -> np.ndarray:
+    """Contiguous float64 view of ``values`` (copied only if needed)."""
+    return np.ascontiguousarray(np.asarray(values, dtype=np.float64))
+
+
+def _prepare(watts, time, model: str, sport: int, tau: float):
+    """Kernel inputs: float64 arrays, model id and recovery constants."""
+    if model not in W_PRIME_MODELS:
+        raise ValueError(f"Unknown W' model {model!r}; expected one of {W_PRIME_MODELS}")
+    watts = _as_float64(watts)
+    time = _NO_TIME if time is None else _as_float64(time)
+    if len(time) and len(time) != len(watts):
+        raise ValueError(f"watts and time differ in length ({len(watts)} vs {len(time)})")
+    tau_f, tau_s, a_f = _BIEXP_PARAMS.get(sport, _BIEXP_PARAMS[0])
+    recovery = np.array([tau_f, tau_s, a_f, float(tau)])
+    return watts, time, W_PRIME_MODELS.index(model), recovery
+
+
+def _compute_balance(
+    watts,
+    time,
+    cp: float,
+    w_prime_cap: float,
+    model: str = "skiba",
+    sport: int = 0,
+    tau: float = DEFAULT_TAU,
+) -> np.ndarray:
+    """Run one model kernel; ``time=None`` means 1 s between samples."""
+    watts, time, model_id, recovery = _prepare(watts, time, model, sport, tau)
+    out = np.empty(len(watts), dtype=np.float64)
+    if len(watts):
+        _run_model(
+            watts, time, model_id, float(cp), float(w_prime_cap), 1.0, recovery, 0.0, out
+        )
+    return out
+
+
+def _sweep(watts, time, params, model, sport, tau, floor=0.0, samples=None) -> np.ndarray:
+    watts, time, model_id, recovery = _prepare(watts, time, model, sport, tau)
+    samples = np.empty(0, dtype=np.int64) if samples is None else np.asarray(samples, np.int64)
+    out = np.empty((len(params), len(samples) or len(watts)), dtype=np.float64)
+    if len(watts) and len(params):
+        _sweep_kernel(watts, time, model_id, params, recovery, float(floor), samples, out)
+    return out
+
+
+def w_prime_sweep(
+    watts,
+    time,
+    cp,
+    w_prime_cap,
+    tau_scale=1.0,
+    model: str = "skiba",
+    sport: int = 0,
+    tau: float = DEFAULT_TAU,
+) -> np.ndarray:
+    """W' balance for every combination of CP, W' and recovery time constant.
+
+    The parameter sets run in parallel (Numba ``prange``) over one power series.
+
+    Args:
+        watts: Power [W]; NaN counts as 0 W.
+        time: Time [s] per sample, or None for 1 s steps.
+        cp: Critical Power value(s) [W].
+        w_prime_cap: W' capacity value(s) [J].
+        tau_scale: Multiplier(s) on the model's recovery time constant(s).
+        model: One of ``W_PRIME_MODELS``.
+        sport: 0=cycling, 1=running, 2=swimming ("biexp" only).
+        tau: Base recovery time constant [s] ("constant_tau" only).
+
+    Returns:
+        Array of shape (len(cp), len(w_prime_cap), len(tau_scale), n_samples).
+    """
+    grid = [np.atleast_1d(np.asarray(v, dtype=np.float64)) for v in (cp, w_prime_cap, tau_scale)]
+    params = np.stack(np.meshgrid(*grid, indexing="ij"), axis=-1).reshape(-1, 3)
+    out = _sweep(watts, time, params, model, sport, tau)
+    return out.reshape(*(len(v) for v in grid), -1)
+
+
+@dataclass(frozen=True)
+class CPWPrimeFit:
+    """CP/W' pair that best explains observed exhaustion points."""
+
+    cp: float
+    w_prime: float
+    rmse_j: float  # RMS of the modelled W' balance at the exhaustion points
+    residuals_j: np.ndarray  # modelled W' balance at each exhaustion point
+
+
+def fit_cp_w_prime(
+    watts,
+    time,
+    exhaustion_times,
+    cp_range: Tuple[float, float] = (100.0, 500.0),
+    w_prime_range: Tuple[float, float] = (5000.0, 40000.0),
+    model: str = "skiba",
+    sport: int = 0,
+    tau_scale: float = 1.0,
+    grid_size: int = 25,
+) -> CPWPrimeFit:
+    """Fit CP and W' so that W' balance is exhausted at the observed points.
+
+    At exhaustion the model balance should be 0 J. The balance is left
+    unclamped below zero here, so both a too-low and a too-high pair give a
+    residual. A ``grid_size`` x ``grid_size`` (CP, W') grid is evaluated in one
+    sweep; the best few cells seed bounded Nelder-Mead searches. A single
+    exhaustion point does not pin down a unique pair; pass several.
+
+    Args:
+        watts: Power [W].
+        time: Time [s] per sample, or None for 1 s steps.
+        exhaustion_times: Times [s] at which the athlete could not continue.
+        cp_range: CP search range [W].
+        w_prime_range: W' search range [J].
+        model: One of ``W_PRIME_MODELS``.
+        sport: 0=cycling, 1=running, 2=swimming ("biexp" only).
+        tau_scale: Multiplier on the model's recovery time constant(s).
+        grid_size: Grid points per axis of the initial sweep; raise it if
+            the model's error surface has narrow basins.
+
+    Returns:
+        CPWPrimeFit with the best pair and its residuals.
+    """
+    from scipy.optimize import minimize
+
+    exhaustion_times = np.atleast_1d(np.asarray(exhaustion_times, dtype=np.float64))
+    if len(exhaustion_times) == 0:
+        raise ValueError("At least one exhaustion point is required")
+    watts, time_arr, model_id, recovery = _prepare(watts, time, model, sport, DEFAULT_TAU)
+    if len(watts) == 0:
+        raise ValueError("Empty power series")
+    if len(time_arr):
+        samples = np.searchsorted(time_arr, exhaustion_times, side="left")
+    else:
+        samples = np.rint(exhaustion_times).astype(np.int64)
+    samples = np.clip(samples, 0, len(watts) - 1)
+
+    cps = np.linspace(*cp_range, grid_size)
+    caps = np.linspace(*w_prime_range, grid_size)
+    params = np.stack(np.meshgrid(cps, caps, [tau_scale], indexing="ij"), axis=-1).reshape(-1, 3)
+    at_exhaustion = _sweep(watts, time_arr, params, model, sport, DEFAULT_TAU, -np.inf, samples)
+    mse = np.mean(at_exhaustion**2, axis=1)
+    seeds = params[np.argsort(mse, kind="stable")[:_FIT_SEEDS], :2]
+
+    buf = np.empty(len(watts))
+
+    def residuals(x):
+        _run_model(watts, time_arr, model_id, x[0], x[1], tau_scale, recovery, -np.inf, buf)
+        return buf[samples]
+
+    step = np.array([cps[-1] - cps[0], caps[-1] - caps[0]]) / max(grid_size - 1, 1)
+    best = None
+    for seed in seeds:
+        result = minimize(
+            lambda x: float(np.mean(residuals(x) ** 2)),
+            seed,
+            method="Nelder-Mead",
+            bounds=[cp_range, w_prime_range],
+            options={
+                "initial_simplex": [seed, seed + [step[0], 0.0], seed + [0.0, step[1]]],
+                "xatol": 1e-3,
+                "fatol": 1e-6,
+            },
+        )
+        if best is None or result.fun < best.fun:
+            best = result
+
+    cp, w_prime = (float(v) for v in best.x)
+    res = residuals(best.x).copy()
+    return CPWPrimeFit(
+        cp=cp,
+        w_prime=w_prime,
+        rmse_j=float(np.sqrt(np.mean(res**2))),
+        residuals_j=res,
+    )
+
+
+_balances: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+_balances_lock = threading.Lock()
+
 
-        w_bal[i] = curr_w
+def _input_key(values) -> Optional[str]:
+    if values is None:
+        return None
+    if not isinstance(values, (np.ndarray, pd.Series)):
+        values = np.asarray(values, dtype=np.float64)
+    return fingerprint(values)
 
+
+def w_prime_balance(
+    watts,
+    time=None,
+    cp: float = 0.0,
+    w_prime_cap: float = 0.0,
+    model: str = "skiba",
+    sport: int = 0,
+    tau: float = DEFAULT_TAU,
+) -> np.ndarray:
+    """W' balance [J] per sample, memoized by input content.
+
+    Args:
+        watts: Power [W] (array or Series); NaN counts as 0 W.
+        time: Time [s] per sample, or None for 1 s steps.
+        cp: Critical Power [W].
+        w_prime_cap: W' capacity [J].
+        model: One of ``W_PRIME_MODELS``.
+        sport: 0=cycling, 1=running, 2=swimming ("biexp" only).
+        tau: Recovery time constant [s] ("constant_tau" only).
+
+    Returns:
+        Read-only float64 array, shared between calls with equal inputs.
+    """
+    key = (
+        _input_key(watts),
+        _input_key(time),
+        float(cp),
+        float(w_prime_cap),
+        model,
+        sport if model == "biexp" else None,
+        float(tau) if model == "constant_tau" else None,
+    )
+    with _balances_lock:
+        w_bal = _balances.get(key)
+        if w_bal is not None:
+            _balances.move_to_end(key)
+            return w_bal
+
+    w_bal = _compute_balance(watts, time, cp, w_prime_cap, model, sport, tau)
+    w_bal.flags.writeable = False
+    with _balances_lock:
+        _balances[key] = w_bal
+        while len(_balances) > _BALANCE_CACHE_SIZE:
+            _balances.popitem(last=False)
     return w_bal
 
 
+def calculate_w_prime_fast(watts, time, cp, w_prime_cap):
+    """Szybkie obliczenie W' Balance przy użyciu Numba JIT.
+
+    Implementacja modelu różnicowego W' Skiba/Morton: liniowe zużycie powyżej
+    CP, odbudowa ze stałą czasową τ zależną od deficytu mocy poniżej CP.
+
+    Args:
+        watts: Tablica mocy [W]
+        time: Tablica czasów [s]
+        cp: Critical Power [W]
+        w_prime_cap: Pojemność W' [J]
+
+    Returns:
+        Tablica wartości W' Balance w czasie
+    """
+    return _compute_balance(watts, time, cp, w_prime_cap, "skiba")
+
+
 def calculate_w_prime_biexp(
     watts,
     time,
@@ -110,103 +476,15 @@ def calculate_w_prime_biexp(
     Returns:
         Array of W' balance values [J] over time.
     """
-    watts = np.asarray(watts, dtype=np.float64)
-    time = np.asarray(time, dtype=np.float64)
-
-    # Sport-specific bi-exponential parameters
-    _BIEXP_PARAMS = {
-        0: (50.0, 400.0, 0.65),  # cycling:  (tau_fast, tau_slow, A_fast)
-        1: (30.0, 300.0, 0.70),  # running
-        2: (20.0, 200.0, 0.75),  # swimming
-    }
-    tau_f, tau_s, a_f = _BIEXP_PARAMS.get(sport, _BIEXP_PARAMS[0])
-    a_s = 1.0 - a_f  # slow amplitude fraction
-
-    n = len(watts)
-    w_bal = np.empty(n, dtype=np.float64)
-    curr_w = w_prime_cap
-
-    prev_time = time[0]
-
-    for i in range(n):
-        if i == 0:
-            dt = 1.0
-        else:
-            dt = time[i] - prev_time
-            if dt <= 0:
-                dt = 1.0
-            prev_time = time[i]
-
-        power_diff = cp - watts[i]
-
-        if power_diff > 0:
-            # Below CP: bi-exponential reconstitution
-            deficit = w_prime_cap - curr_w
-            recovery_factor = a_f * np.exp(-dt / tau_f) + a_s * np.exp(-dt / tau_s)
-            curr_w = w_prime_cap - deficit * recovery_factor
-        else:
-            # Above CP: linear depletion
-            curr_w += power_diff * dt
-
-        # Boundary conditions
-        if curr_w > w_prime_cap:
-            curr_w = w_prime_cap
-        elif curr_w < 0.0:
-            curr_w = 0.0
-
-        w_bal[i] = curr_w
-
-    return w_bal
-
-
-def _calculate_w_prime_balance_cached(df_bytes: bytes, cp: float, w_prime: float):
-    """Cached version of W' Balance calculation."""
-    try:
-        bio = io.BytesIO(df_bytes)
-        try:
-            df_pd = pd.read_parquet(bio)
-        except Exception:
-            bio.seek(0)
-            df_pd = pd.read_csv(bio)
-
-        if "watts" not in df_pd.columns:
-            df_pd["w_prime_balance"] = np.nan
-            return df_pd
-
-        watts_arr = df_pd["watts"].to_numpy(dtype=np.float64)
-
-        if "time" in df_pd.columns:
-            time_arr = df_pd["time"].to_numpy(dtype=np.float64)
-        else:
-            time_arr = np.arange(len(watts_arr), dtype=np.float64)
-
-        w_bal = calculate_w_prime_fast(watts_arr, time_arr, float(cp), float(w_prime))
-
-        df_pd["w_prime_balance"] = w_bal
-        return df_pd
-
-    except Exception as e:
-        import logging
-
-        logging.getLogger(__name__).warning(f"W' calculation failed: {e}")
-        # Try to return DataFrame with zero W' balance
-        try:
-            bio = io.BytesIO(df_bytes)
-            try:
-                df_pd = pd.read_parquet(bio)
-            except (ImportError, ValueError):
-                bio.seek(0)
-                df_pd = pd.read_csv(bio)
-            df_pd["w_prime_balance"] = 0.0
-            return df_pd
-        except (pd.errors.ParserError, ValueError, KeyError) as recovery_error:
-            logging.getLogger(__name__).error(f"W' recovery failed: {recovery_error}")
-            return pd.DataFrame({"w_prime_balance": []})
+    return _compute_balance(watts, time, cp, w_prime_cap, "biexp", sport)
 
 
 def calculate_w_prime_balance(_df_pl_active, cp: float, w_prime: float) -> pd.DataFrame:
     """Calculate W' Balance for the entire workout.
 
+    The input frame is not copied: the result is a shallow copy sharing its
+    columns, with 'w_prime_balance' (and 'time', if missing) added.
+
     Args:
         _df_pl_active: DataFrame with workout data
         cp: Critical Power [W]
@@ -220,14 +498,23 @@ def calculate_w_prime_balance(_df_pl_active, cp: float, w_prime: float) -> pd.Da
     elif hasattr(_df_pl_active, "to_pandas"):
         df_pd = _df_pl_active.to_pandas()
     else:
-        df_pd = _df_pl_active.copy()
+        df_pd = _df_pl_active.copy(deep=False)
 
-    if "time" not in df_pd.columns:
+    has_time = "time" in df_pd.columns
+    if not has_time:
         df_pd["time"] = np.arange(len(df_pd), dtype=float)
 
-    df_bytes = _serialize_df_to_parquet_bytes(df_pd)
-    result_df = _calculate_w_prime_balance_cached(df_bytes, float(cp), float(w_prime))
-    return result_df
+    if "watts" not in df_pd.columns:
+        df_pd["w_prime_balance"] = np.nan
+        return df_pd
+
+    try:
+        time = df_pd["time"] if has_time else None
+        df_pd["w_prime_balance"] = w_prime_balance(df_pd["watts"], time, cp, w_prime)
+    except (ValueError, TypeError) as e:
+        logger.warning(f"W' calculation failed: {e}")
+        df_pd["w_prime_balance"] = 0.0
+    return df_pd
 
 
 # ============================================================
@@ -23,7 +23,10 @@ import numpy as np
 import pandas as pd
 
 from .common import ensure_pandas
-from .w_prime import calculate_w_prime_fast, calculate_w_prime_biexp
+from .w_prime import calculate_w_prime_fast, calculate_w_prime_biexp, w_prime_sweep
+
+# Default confidence band: CP and W' each varied by ±5%
+BAND_PCT = 0.05
 
 
 # ---------------------------------------------------------------------------
@@ -67,6 +70,7 @@ def compute_w_prime_reconstitution_map(
     w_prime_cap: float,
     model: str = "biexp",
     sport: int = 0,
+    band_pct: Optional[float] = BAND_PCT,
 ) -> tuple[pd.DataFrame, ReconstitutionSummary]:
     """
     Compute W' balance and extract reconstitution events.
@@ -77,14 +81,17 @@ def compute_w_prime_reconstitution_map(
         w_prime_cap: W' capacity [J]
         model: "skiba" (mono-exponential) or "biexp" (bi-exponential)
         sport: 0=cycling, 1=running, 2=swimming (for biexp model)
+        band_pct: Relative CP/W' uncertainty for the confidence band
+            (None or 0 to skip it)
 
     Returns:
         (df_with_wbal, summary)
         df_with_wbal has added columns: w_prime_balance, w_prime_pct,
-        is_depleted, is_recovering
+        is_depleted, is_recovering, and with a band w_prime_balance_low /
+        w_prime_balance_high (envelope of the CP x W' sweep)
     """
     df = ensure_pandas(df)
-    if df is None or "watts" not in df.columns:
+    if df is None or "watts" not in df.columns or df.empty:
         return df, _empty_summary()
 
     watts = df["watts"].fillna(0).values.astype(np.float64)
@@ -111,6 +118,10 @@ def compute_w_prime_reconstitution_map(
     result["w_prime_pct"] = (w_bal / w_prime_cap * 100) if w_prime_cap > 0 else 0
     result["is_depleted"] = w_bal < (w_prime_cap * 0.20)  # Below 20%
     result["is_recovering"] = np.concatenate([[False], w_bal[1:] > w_bal[:-1]])
+    if band_pct:
+        low, high = _balance_band(watts, time_arr, cp, w_prime_cap, model, sport, band_pct)
+        result["w_prime_balance_low"] = low
+        result["w_prime_balance_high"] = high
 
     # Extract reconstitution events
     events = _extract_reconstitution_events(result, cp, w_prime_cap)
@@ -119,6 +130,24 @@ def compute_w_prime_reconstitution_map(
     return result, summary
 
 
+def _balance_band(
+    watts: np.ndarray,
+    time_arr: np.ndarray,
+    cp: float,
+    w_prime_cap: float,
+    model: str,
+    sport: int,
+    band_pct: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Per-sample min/max W' balance over CP and W' varied by ±band_pct."""
+    factors = np.array([1.0 - band_pct, 1.0, 1.0 + band_pct])
+    sweep = w_prime_sweep(
+        watts, time_arr, cp * factors, w_prime_cap * factors,
+        model="biexp" if model == "biexp" else "skiba", sport=sport,
+    ).reshape(len(factors) ** 2, len(watts))
+    return sweep.min(axis=0), sweep.max(axis=0)
+
+
 def _extract_reconstitution_events(
     df: pd.DataFrame,
     cp: float,
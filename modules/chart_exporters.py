@@ -21,6 +21,7 @@ import pandas as pd
 import plotly.graph_objects as go
 from scipy import stats
 
+from .downsample import plot_view
 from .plots import add_stats_to_legend
 
 
@@ -327,32 +328,35 @@ class PulsePowerChartExporter(ChartExporter):
         return '5. Pulse Power (Watts / Heart Beat)'
     
     def can_export(self, ctx: ChartContext) -> bool:
-        df = ctx.df_plot_resampled
+        df = ctx.df_plot
         if 'watts_smooth' not in df.columns or 'heartrate_smooth' not in df.columns:
             return False
         mask = (df['watts_smooth'] > 50) & (df['heartrate_smooth'] > 90)
         return mask.sum() > 10
     
     def create_figure(self, ctx: ChartContext) -> go.Figure:
-        df = ctx.df_plot_resampled
+        # Smoothing and trend need evenly spaced samples: use the full 1 Hz
+        # frame, and downsample only the plotted trace
+        df = ctx.df_plot
         mask = (df['watts_smooth'] > 50) & (df['heartrate_smooth'] > 90)
-        df_pp = df[mask].copy()
+        df_pp = df.loc[mask, ['time_min']].copy()
         
-        df_pp['pp'] = df_pp['watts_smooth'] / df_pp['heartrate_smooth']
+        df_pp['pp'] = df['watts_smooth'][mask] / df['heartrate_smooth'][mask]
         df_pp['pp_smooth'] = df_pp['pp'].rolling(window=30, center=True).mean()
+        plot_df = plot_view(df_pp, x_col='time_min', columns=['pp_smooth'])
         
         fig = go.Figure()
         fig.add_trace(go.Scatter(
-            x=df_pp['time_min'], 
-            y=df_pp['pp_smooth'],
+            x=plot_df['time_min'], 
+            y=plot_df['pp_smooth'],
             name='Pulse Power', 
             line=dict(color='#FFD700', width=2)
         ))
         
         slope, intercept, _, _, _ = stats.linregress(df_pp['time_min'], df_pp['pp'])
-        trend = intercept + slope * df_pp['time_min']
+        trend = intercept + slope * plot_df['time_min']
         fig.add_trace(go.Scatter(
-            x=df_pp['time_min'], 
+            x=plot_df['time_min'], 
             y=trend, 
             name='Trend', 
             line=dict(color='white', dash='dash')
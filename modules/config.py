@@ -29,6 +29,8 @@ class Config:
     # Filtering & Resampling
     RESAMPLE_THRESHOLD = int(os.getenv("RESAMPLE_THRESHOLD", "10000"))
     RESAMPLE_STEP = int(os.getenv("RESAMPLE_STEP", "5"))
+    # Max points per Plotly trace (peak-preserving downsampling, modules.downsample)
+    PLOT_MAX_POINTS = int(os.getenv("PLOT_MAX_POINTS", "5000"))
     MIN_WATTS_ACTIVE = int(os.getenv("MIN_WATTS_ACTIVE", "10"))
     MIN_HR_ACTIVE = int(os.getenv("MIN_HR_ACTIVE", "40"))
     MIN_RECORDS_FOR_ROLLING = int(os.getenv("MIN_RECORDS_FOR_ROLLING", "30"))
@@ -52,6 +54,10 @@ class Config:
     DB_NAME = os.getenv("DB_NAME", "training_history.db")
     DB_PATH = DATA_DIR / DB_NAME
 
+    # --- Caching ---
+    # Disk cache for cache_result (modules.cache_utils); needs the 'cache' extra
+    DISK_CACHE_ENABLED = os.getenv("DISK_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+
     # --- UI Colors ---
     COLOR_POWER = os.getenv("COLOR_POWER", "#00cc96")
     COLOR_HR = os.getenv("COLOR_HR", "#ef553b")
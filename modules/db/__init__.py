@@ -1,4 +1,13 @@
 """Database module initialization."""
 from .session_store import SessionStore, SessionRecord
+from .mmp_store import MMPStore
+from .session_cache import SessionCache, ImportManifest, iter_cached_sessions
 
-__all__ = ['SessionStore', 'SessionRecord']
+__all__ = [
+    'SessionStore',
+    'SessionRecord',
+    'MMPStore',
+    'SessionCache',
+    'ImportManifest',
+    'iter_cached_sessions',
+]
@@ -6,9 +6,10 @@ import logging
 import sqlite3
 from abc import ABC
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterable, Iterator, Optional
 
 from modules.config import Config
+from modules.db.connection import get_connection
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +18,8 @@ class BaseStore(ABC):
     """Base class for all SQLite stores. Provides shared connection handling,
     schema bootstrap, migrations, and generic CRUD helpers.
 
+    Connections come from the thread-local pool in ``modules.db.connection``.
+
     Subclasses set:
       - table_name: str
       - _schema_sql: str  (CREATE TABLE IF NOT EXISTS ...)
@@ -33,9 +36,8 @@ class BaseStore(ABC):
         self._ensure_schema()
 
     def connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(str(self._db_path))
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Pooled, thread-local WAL connection (see modules.db.connection)."""
+        return get_connection(self._db_path)
 
     def _ensure_schema(self) -> None:
         with self.connect() as conn:
@@ -61,6 +63,27 @@ class BaseStore(ABC):
             conn.commit()
             return cursor
 
+    def executemany(self, sql: str, seq_of_params: Iterable[tuple[Any, ...]]) -> int:
+        """Run one statement for many parameter tuples in a single transaction."""
+        with self.connect() as conn:
+            cursor = conn.executemany(sql, seq_of_params)
+            conn.commit()
+            return cursor.rowcount
+
+    def iter_query(
+        self, sql: str, params: tuple[Any, ...] = (), batch_size: int = 500
+    ) -> Iterator[sqlite3.Row]:
+        """Stream rows in ``fetchmany`` batches instead of materializing them all."""
+        cursor = self.connect().execute(sql, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            cursor.close()
+
     def query(self, sql: str, params: tuple[Any, ...] = ()) -> list[sqlite3.Row]:
         with self.connect() as conn:
             return conn.execute(sql, params).fetchall()
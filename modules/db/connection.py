@@ -0,0 +1,93 @@
+"""
+Shared SQLite connection manager.
+
+Every store used to open a fresh ``sqlite3.connect`` per call, in rollback
+journal mode, paying connection setup, schema parsing and an fsync per
+commit each time. Connections are now opened once per (thread, database
+file) and reused:
+
+- WAL journal: readers never block the writer, commits append to the log
+- synchronous=NORMAL: fsync at checkpoints only (safe with WAL)
+- larger page cache, in-memory temp tables, memory-mapped reads
+- a bigger prepared-statement cache, so repeated SQL skips re-parsing
+
+``sqlite3`` connections must not cross threads or forks, so the pool is
+thread-local and discarded in a child process.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Union
+
+logger = logging.getLogger(__name__)
+
+BUSY_TIMEOUT_SEC = 30.0
+STATEMENT_CACHE_SIZE = 256
+
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-16000",  # KiB, i.e. 16 MB
+    "PRAGMA mmap_size=268435456",
+)
+
+_local = threading.local()
+
+
+def _pool() -> Dict[str, sqlite3.Connection]:
+    pid = os.getpid()
+    if getattr(_local, "pid", None) != pid:
+        # New thread, or a forked child holding the parent's handles
+        _local.pid = pid
+        _local.connections = {}
+    return _local.connections
+
+
+def _open(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(
+        path, timeout=BUSY_TIMEOUT_SEC, cached_statements=STATEMENT_CACHE_SIZE
+    )
+    conn.row_factory = sqlite3.Row
+    for pragma in _PRAGMAS:
+        try:
+            conn.execute(pragma)
+        except sqlite3.DatabaseError as e:
+            logger.debug("SQLite pragma %r not applied: %s", pragma, e)
+    return conn
+
+
+def get_connection(db_path: Union[str, Path]) -> sqlite3.Connection:
+    """Pooled connection to ``db_path`` for the calling thread.
+
+    Use as ``with get_connection(path) as conn:`` – the block commits on
+    success and rolls back on error, but the connection stays open. Rows
+    are ``sqlite3.Row`` (index and name access).
+    """
+    path = str(Path(db_path).resolve())
+    pool = _pool()
+    conn = pool.get(path)
+    if conn is None:
+        conn = _open(path)
+        pool[path] = conn
+    return conn
+
+
+def close_connection(db_path: Union[str, Path]) -> None:
+    """Close the calling thread's pooled connection to ``db_path``, if any."""
+    conn = _pool().pop(str(Path(db_path).resolve()), None)
+    if conn is not None:
+        conn.close()
+
+
+def close_all_connections() -> None:
+    """Close all pooled connections of the calling thread."""
+    pool = _pool()
+    for conn in pool.values():
+        conn.close()
+    pool.clear()
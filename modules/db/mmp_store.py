@@ -0,0 +1,418 @@
+"""
+Per-session Mean-Maximal Power store.
+
+Keeps the full 1 s – 60 min MMP curve of every session as a float32 BLOB
+keyed by session id, plus a persisted all-time envelope (best power per
+duration and the session that set it). The envelope is updated
+incrementally on add/delete, and rolling N-day bests are answered from an
+in-memory date-sorted matrix, so PR checks and CP-curve history plots never
+re-read the source files.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import date as date_cls
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from modules.calculations.mmp import MMP_MAX_DURATION, compute_mmp_curve
+from modules.db.base import BaseStore
+
+logger = logging.getLogger(__name__)
+
+ENVELOPE_ALL_TIME = "all_time"
+
+# Rolling-window envelopes kept in memory per store instance
+_WINDOW_CACHE_MAXSIZE = 32
+
+_ENVELOPE_SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS mmp_envelope (
+        name TEXT PRIMARY KEY,
+        curve BLOB NOT NULL,
+        session_ids BLOB NOT NULL,
+        revision INTEGER NOT NULL DEFAULT 0,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+def _to_blob(curve: np.ndarray) -> bytes:
+    return np.ascontiguousarray(curve, dtype="<f4").tobytes()
+
+
+def _from_blob(blob: bytes, length: int) -> np.ndarray:
+    curve = np.full(length, np.nan, dtype=np.float32)
+    values = np.frombuffer(blob, dtype="<f4")[:length]
+    curve[: len(values)] = values
+    return curve
+
+
+class MMPStore(BaseStore):
+    """SQLite-backed table of per-session MMP curves with a maintained envelope."""
+
+    table_name = "session_mmp"
+    _schema_sql = """
+        CREATE TABLE IF NOT EXISTS session_mmp (
+            session_id INTEGER PRIMARY KEY,
+            date TEXT NOT NULL,
+            curve BLOB NOT NULL
+        )
+    """
+
+    def __init__(self, db_path: Path | None = None, max_duration: int = MMP_MAX_DURATION) -> None:
+        self.max_duration = max_duration
+        self._lock = threading.RLock()
+        self._revision: Optional[int] = None
+        self._ids = np.empty(0, dtype=np.int64)
+        self._dates = np.empty(0, dtype="datetime64[D]")
+        self._matrix = np.empty((0, max_duration), dtype=np.float32)
+        self._envelope = np.full(max_duration, np.nan, dtype=np.float32)
+        self._envelope_ids = np.full(max_duration, -1, dtype=np.int64)
+        self._window_cache: Dict[Tuple, np.ndarray] = {}
+        super().__init__(db_path)
+
+    def _ensure_schema(self) -> None:
+        super()._ensure_schema()
+        with self.connect() as conn:
+            conn.execute(_ENVELOPE_SCHEMA_SQL)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_session_mmp_date ON session_mmp(date)")
+            conn.commit()
+
+    # ------------------------------------------------------------------
+    # In-memory state
+    # ------------------------------------------------------------------
+
+    def _db_revision(self, conn) -> int:
+        row = conn.execute(
+            "SELECT revision FROM mmp_envelope WHERE name = ?", (ENVELOPE_ALL_TIME,)
+        ).fetchone()
+        return int(row[0]) if row else 0
+
+    def _sync(self) -> None:
+        """Reload the matrix if another store instance wrote since our last read."""
+        with self.connect() as conn:
+            revision = self._db_revision(conn)
+            if revision == self._revision:
+                return
+            rows = conn.execute(
+                "SELECT session_id, date, curve FROM session_mmp ORDER BY date, session_id"
+            ).fetchall()
+            env = conn.execute(
+                "SELECT curve, session_ids FROM mmp_envelope WHERE name = ?", (ENVELOPE_ALL_TIME,)
+            ).fetchone()
+
+        n = len(rows)
+        self._ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=n)
+        self._dates = np.array([r[1][:10] for r in rows], dtype="datetime64[D]")
+        self._matrix = np.empty((n, self.max_duration), dtype=np.float32)
+        for i, r in enumerate(rows):
+            self._matrix[i] = _from_blob(r[2], self.max_duration)
+        if env is not None:
+            self._envelope = _from_blob(env[0], self.max_duration)
+            ids = np.frombuffer(env[1], dtype="<i8")[: self.max_duration]
+            self._envelope_ids = np.full(self.max_duration, -1, dtype=np.int64)
+            self._envelope_ids[: len(ids)] = ids
+        else:
+            self._envelope, self._envelope_ids = self._envelope_from_matrix()
+        self._window_cache.clear()
+        self._revision = revision
+
+    def _envelope_from_matrix(self, columns: Optional[np.ndarray] = None):
+        matrix = self._matrix if columns is None else self._matrix[:, columns]
+        width = matrix.shape[1]
+        if len(matrix) == 0:
+            return np.full(width, np.nan, dtype=np.float32), np.full(width, -1, dtype=np.int64)
+        filled = np.where(np.isnan(matrix), -np.inf, matrix)
+        rows = np.argmax(filled, axis=0)
+        best = filled[rows, np.arange(width)]
+        ids = np.where(np.isfinite(best), self._ids[rows], -1)
+        return np.where(np.isfinite(best), best, np.nan).astype(np.float32), ids
+
+    def _persist_envelope(self, conn) -> None:
+        self._revision = self._db_revision(conn) + 1
+        conn.execute(
+            """
+            INSERT INTO mmp_envelope (name, curve, session_ids, revision, updated_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(name) DO UPDATE SET
+                curve = excluded.curve,
+                session_ids = excluded.session_ids,
+                revision = excluded.revision,
+                updated_at = excluded.updated_at
+            """,
+            (
+                ENVELOPE_ALL_TIME,
+                _to_blob(self._envelope),
+                self._envelope_ids.astype("<i8").tobytes(),
+                self._revision,
+            ),
+        )
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def add_session_curve(
+        self,
+        session_id: int,
+        date: str,
+        power: Optional[Iterable[float]] = None,
+        curve: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Store (or replace) a session's MMP curve and update the envelope.
+
+        Args:
+            session_id: Id of the row in ``sessions``
+            date: Session date (YYYY-MM-DD)
+            power: 1 Hz power series; used when ``curve`` is not given
+            curve: Precomputed MMP curve (element d-1 = MMP for d seconds)
+
+        Returns:
+            The stored float32 curve
+        """
+        if curve is None:
+            if power is None:
+                raise ValueError("Either power or curve is required")
+            curve = compute_mmp_curve(power, self.max_duration)
+        stored = np.full(self.max_duration, np.nan, dtype=np.float32)
+        values = np.asarray(curve, dtype=np.float32)[: self.max_duration]
+        stored[: len(values)] = values
+
+        with self._lock:
+            self._sync()
+            if session_id in self._ids:
+                self._remove_from_memory(int(session_id))
+
+            day = np.datetime64(date[:10], "D")
+            pos = int(np.searchsorted(self._dates, day, side="right"))
+            self._ids = np.insert(self._ids, pos, session_id)
+            self._dates = np.insert(self._dates, pos, day)
+            self._matrix = np.insert(self._matrix, pos, stored, axis=0)
+
+            improved = ~np.isnan(stored) & ~(stored <= self._envelope)
+            self._envelope[improved] = stored[improved]
+            self._envelope_ids[improved] = session_id
+
+            for key, window in self._window_cache.items():
+                start, end, exclude = key
+                if start <= day <= end and exclude != session_id:
+                    np.fmax(window, stored, out=window)
+
+            with self.connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO session_mmp (session_id, date, curve) VALUES (?, ?, ?)",
+                    (int(session_id), date[:10], _to_blob(stored)),
+                )
+                self._persist_envelope(conn)
+                conn.commit()
+        return stored
+
+    def _remove_from_memory(self, session_id: int) -> bool:
+        idx = np.flatnonzero(self._ids == session_id)
+        if len(idx) == 0:
+            return False
+        self._ids = np.delete(self._ids, idx)
+        self._dates = np.delete(self._dates, idx)
+        self._matrix = np.delete(self._matrix, idx, axis=0)
+
+        # Only durations whose record came from this session need a rescan
+        affected = np.flatnonzero(self._envelope_ids == session_id)
+        if len(affected):
+            best, ids = self._envelope_from_matrix(affected)
+            self._envelope[affected] = best
+            self._envelope_ids[affected] = ids
+        self._window_cache.clear()
+        return True
+
+    def remove_session_curve(self, session_id: int) -> bool:
+        """Delete a session's curve and repair the envelope where it held the record."""
+        with self._lock:
+            self._sync()
+            removed = self._remove_from_memory(int(session_id))
+            with self.connect() as conn:
+                conn.execute("DELETE FROM session_mmp WHERE session_id = ?", (int(session_id),))
+                if removed:
+                    self._persist_envelope(conn)
+                conn.commit()
+        return removed
+
+    def rebuild_envelope(self) -> None:
+        """Recompute the all-time envelope from all stored curves."""
+        with self._lock:
+            self._revision = None
+            self._sync()
+            self._envelope, self._envelope_ids = self._envelope_from_matrix()
+            with self.connect() as conn:
+                self._persist_envelope(conn)
+                conn.commit()
+
+    def backfill_from_cache(self) -> int:
+        """Store curves for sessions imported before this store existed.
+
+        Power comes from the Parquet session cache of each session in the
+        import manifest; sessions without a cache file are left for the next
+        history import. The envelope is rebuilt once at the end.
+
+        Returns:
+            Number of curves added
+        """
+        from modules.db.session_cache import ImportManifest, SessionCache
+
+        if not self.missing_count():
+            return 0
+        ImportManifest(self._db_path)  # make sure the manifest table exists
+        cache = SessionCache(self._db_path)
+        rows = []
+        for session_id, date, source in self._missing_sources():
+            df = cache.read(date, source, ["watts"])
+            if df is None or "watts" not in df.columns:
+                continue
+            curve = compute_mmp_curve(df["watts"].to_numpy(), self.max_duration, skip_nan=True)
+            rows.append((session_id, date[:10], _to_blob(curve)))
+        if not rows:
+            return 0
+
+        with self._lock:
+            with self.connect() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO session_mmp (session_id, date, curve) VALUES (?, ?, ?)",
+                    rows,
+                )
+                conn.commit()
+            self.rebuild_envelope()
+        logger.info("Backfilled MMP curves of %d sessions from the session cache", len(rows))
+        return len(rows)
+
+    def _missing_sources(self) -> List[Tuple[int, str, str]]:
+        """(session_id, date, source path) of imported sessions with power but no curve."""
+        with self.connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT s.id, m.date, m.path FROM sessions s
+                JOIN import_manifest m ON m.session_id = s.id
+                LEFT JOIN session_mmp c ON c.session_id = s.id
+                WHERE c.session_id IS NULL AND s.avg_watts > 0
+                ORDER BY s.date, s.id
+                """
+            ).fetchall()
+        return [(int(r[0]), r[1], r[2]) for r in rows]
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get_curve(self, session_id: int) -> Optional[np.ndarray]:
+        """Stored MMP curve of one session (None if absent)."""
+        with self._lock:
+            self._sync()
+            idx = np.flatnonzero(self._ids == session_id)
+            return self._matrix[idx[0]].copy() if len(idx) else None
+
+    def session_count(self) -> int:
+        with self._lock:
+            self._sync()
+            return len(self._ids)
+
+    def missing_count(self) -> int:
+        """Number of sessions with power data but no stored curve."""
+        with self.connect() as conn:
+            if not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sessions'"
+            ).fetchone():
+                return 0
+            row = conn.execute(
+                """
+                SELECT COUNT(*) FROM sessions s
+                LEFT JOIN session_mmp c ON c.session_id = s.id
+                WHERE c.session_id IS NULL AND s.avg_watts > 0
+                """
+            ).fetchone()
+        return int(row[0])
+
+    def best_curve(
+        self,
+        days: Optional[int] = None,
+        end_date: Optional[str] = None,
+        exclude_session_id: Optional[int] = None,
+    ) -> np.ndarray:
+        """Best MMP per duration over all sessions or a rolling N-day window.
+
+        Args:
+            days: Window length in days (None = all time)
+            end_date: Last day of the window (default: today)
+            exclude_session_id: Session to leave out (e.g. the one being checked for PRs)
+
+        Returns:
+            float32 array, element d-1 = best power for d seconds (NaN = no data)
+        """
+        with self._lock:
+            self._sync()
+            if days is None and end_date is None and exclude_session_id is None:
+                return self._envelope.copy()
+
+            end = np.datetime64(end_date or date_cls.today().isoformat(), "D")
+            start = (
+                end - np.timedelta64(days - 1, "D")
+                if days is not None
+                else np.datetime64("0001-01-01", "D")
+            )
+            key = (start, end, exclude_session_id)
+            cached = self._window_cache.get(key)
+            if cached is not None:
+                return cached.copy()
+
+            lo = int(np.searchsorted(self._dates, start, side="left"))
+            hi = int(np.searchsorted(self._dates, end, side="right"))
+            rows = self._matrix[lo:hi]
+            if exclude_session_id is not None:
+                rows = rows[self._ids[lo:hi] != exclude_session_id]
+            if len(rows):
+                window = np.fmax.reduce(rows, axis=0)
+            else:
+                window = np.full(self.max_duration, np.nan, dtype=np.float32)
+            if len(self._window_cache) >= _WINDOW_CACHE_MAXSIZE:
+                self._window_cache.pop(next(iter(self._window_cache)))
+            self._window_cache[key] = window
+            return window.copy()
+
+    def best_pdc(
+        self,
+        durations: Iterable[int],
+        days: Optional[int] = None,
+        end_date: Optional[str] = None,
+        exclude_session_id: Optional[int] = None,
+    ) -> Dict[int, Optional[float]]:
+        """``best_curve`` sampled at the given durations, as a PDC dict."""
+        curve = self.best_curve(days, end_date, exclude_session_id)
+        result = {}
+        for d in durations:
+            v = curve[d - 1] if 0 < d <= self.max_duration else np.nan
+            result[int(d)] = float(v) if np.isfinite(v) else None
+        return result
+
+    def record_holders(self, durations: Iterable[int]) -> Dict[int, Optional[int]]:
+        """Session id holding the all-time record for each duration."""
+        with self._lock:
+            self._sync()
+            out = {}
+            for d in durations:
+                sid = int(self._envelope_ids[d - 1]) if 0 < d <= self.max_duration else -1
+                out[int(d)] = sid if sid >= 0 else None
+            return out
+
+    def history_matrix(self, days: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(session_ids, dates, curves) for sessions in the last ``days`` days, oldest first."""
+        with self._lock:
+            self._sync()
+            lo = 0
+            if days is not None:
+                start = np.datetime64(
+                    (date_cls.today() - timedelta(days=days - 1)).isoformat(), "D"
+                )
+                lo = int(np.searchsorted(self._dates, start, side="left"))
+            return self._ids[lo:].copy(), self._dates[lo:].copy(), self._matrix[lo:].copy()
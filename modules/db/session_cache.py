@@ -0,0 +1,162 @@
+"""
+Columnar cache of processed sessions.
+
+Every imported session is stored once as a 1 Hz Parquet file next to the
+database, so TTE backfills and ML training read the columns they need
+instead of re-parsing and re-processing the source CSVs. The import
+manifest records the size and mtime of each source file so unchanged files
+are skipped on the next bulk import.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from modules.config import Config
+from modules.db.base import BaseStore
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIRNAME = "session_cache"
+
+_UNSAFE_CHARS = re.compile(r"[^\w.\-]+")
+
+
+class SessionCache:
+    """Parquet files of processed 1 Hz sessions, one per (date, source file).
+
+    The file name carries a hash of the resolved source path, so sources
+    with the same name in different folders, or names that only differ in
+    characters unsafe for file names, get separate cache files.
+    """
+
+    def __init__(self, db_path: Path | None = None) -> None:
+        db_path = Path(db_path or Config.DB_PATH)
+        self.cache_dir = db_path.parent / CACHE_DIRNAME
+
+    def path_for(self, date: str, source: str | Path) -> Path:
+        source = Path(source).resolve()
+        stem = _UNSAFE_CHARS.sub("_", source.name)
+        digest = hashlib.sha1(str(source).encode()).hexdigest()[:12]
+        return self.cache_dir / f"{date}__{stem}__{digest}.parquet"
+
+    def write(self, date: str, source: str | Path, df: pd.DataFrame) -> Path:
+        """Store the numeric columns of a processed session as float32."""
+        numeric = df.select_dtypes(include=[np.number]).reset_index(drop=True)
+        numeric = numeric.astype(
+            {c: np.float32 for c in numeric.columns if numeric[c].dtype.kind == "f"}
+        )
+        numeric.attrs = {}
+        path = self.path_for(date, source)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".parquet.tmp")
+        numeric.to_parquet(tmp, index=False)
+        tmp.replace(path)
+        return path
+
+    def read(
+        self, date: str, source: str | Path, columns: Optional[Sequence[str]] = None
+    ) -> Optional[pd.DataFrame]:
+        """Load a cached session, optionally only some columns; None if absent."""
+        path = self.path_for(date, source)
+        if not path.exists():
+            return None
+        try:
+            if columns is not None:
+                import pyarrow.parquet as pq
+
+                available = set(pq.read_schema(path).names)
+                columns = [c for c in columns if c in available]
+            return pd.read_parquet(path, columns=columns)
+        except (OSError, ValueError, ImportError) as e:
+            logger.warning("Unreadable session cache %s: %s", path.name, e)
+            return None
+
+    def exists(self, date: str, source: str | Path) -> bool:
+        return self.path_for(date, source).exists()
+
+    def remove(self, date: str, source: str | Path) -> bool:
+        path = self.path_for(date, source)
+        if path.exists():
+            path.unlink()
+            return True
+        return False
+
+
+class ImportManifest(BaseStore):
+    """Source-file fingerprints (size, mtime) of imported sessions."""
+
+    table_name = "import_manifest"
+    _schema_sql = """
+        CREATE TABLE IF NOT EXISTS import_manifest (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            filename TEXT NOT NULL,
+            session_id INTEGER,
+            imported_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+
+    def fingerprints(self) -> Dict[str, Tuple[int, int]]:
+        """Map of source path -> (size, mtime_ns)."""
+        return {
+            row["path"]: (row["size"], row["mtime_ns"])
+            for row in self.query("SELECT path, size, mtime_ns FROM import_manifest")
+        }
+
+    def entries(self) -> List[Tuple[str, str]]:
+        """(date, filename) of all recorded imports, oldest first."""
+        rows = self.query("SELECT date, filename FROM import_manifest ORDER BY date, filename")
+        return [(row["date"], row["filename"]) for row in rows]
+
+    def sources(self) -> List[Tuple[str, str, str]]:
+        """(date, filename, source path) of all recorded imports, oldest first."""
+        rows = self.query(
+            "SELECT date, filename, path FROM import_manifest ORDER BY date, filename"
+        )
+        return [(row["date"], row["filename"], row["path"]) for row in rows]
+
+    def record_many(self, rows: Iterable[Tuple[str, int, int, str, str, Optional[int]]]) -> None:
+        """Upsert (path, size, mtime_ns, date, filename, session_id) rows in one transaction."""
+        self.executemany(
+            """
+            INSERT INTO import_manifest (path, size, mtime_ns, date, filename, session_id)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(path) DO UPDATE SET
+                size = excluded.size,
+                mtime_ns = excluded.mtime_ns,
+                date = excluded.date,
+                filename = excluded.filename,
+                session_id = excluded.session_id,
+                imported_at = CURRENT_TIMESTAMP
+            """,
+            rows,
+        )
+
+    def forget_session(self, session_id: int, date: str, filename: str) -> int:
+        """Drop the entries of a deleted session so its file is imported again."""
+        cursor = self.execute(
+            "DELETE FROM import_manifest WHERE session_id = ? OR (date = ? AND filename = ?)",
+            (session_id, date, filename),
+        )
+        return cursor.rowcount
+
+
+def iter_cached_sessions(
+    db_path: Path | None = None, columns: Optional[Sequence[str]] = None
+) -> Iterator[Tuple[str, str, pd.DataFrame]]:
+    """Yield (date, filename, df) for every session in the manifest that has a cache file."""
+    cache = SessionCache(db_path)
+    for date, filename, source in ImportManifest(db_path).sources():
+        df = cache.read(date, source, columns)
+        if df is not None:
+            yield date, filename, df
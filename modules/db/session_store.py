@@ -5,9 +5,10 @@ SQLite-based persistent storage for historical data.
 
 import sqlite3
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from dataclasses import dataclass
 from modules.config import Config
+from modules.db.connection import get_connection
 
 
 @dataclass
@@ -39,6 +40,82 @@ class SessionRecord:
     extra_metrics: str = "{}"
 
 
+
+_UPSERT_SQL = """
+INSERT INTO sessions (
+    date, filename, duration_sec, tss, np, if_factor,
+    avg_watts, avg_hr, max_hr, work_kj, avg_cadence,
+    mmp_5s, mmp_1m, mmp_5m, mmp_20m, avg_rmssd,
+    alerts_count, extra_metrics
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(date, filename) DO UPDATE SET
+    duration_sec = excluded.duration_sec,
+    tss = excluded.tss,
+    np = excluded.np,
+    if_factor = excluded.if_factor,
+    avg_watts = excluded.avg_watts,
+    avg_hr = excluded.avg_hr,
+    max_hr = excluded.max_hr,
+    work_kj = excluded.work_kj,
+    avg_cadence = excluded.avg_cadence,
+    mmp_5s = excluded.mmp_5s,
+    mmp_1m = excluded.mmp_1m,
+    mmp_5m = excluded.mmp_5m,
+    mmp_20m = excluded.mmp_20m,
+    avg_rmssd = excluded.avg_rmssd,
+    alerts_count = excluded.alerts_count,
+    extra_metrics = excluded.extra_metrics
+"""
+
+
+def _record_params(record: SessionRecord) -> tuple:
+    return (
+        record.date,
+        record.filename,
+        record.duration_sec,
+        record.tss,
+        record.np,
+        record.if_factor,
+        record.avg_watts,
+        record.avg_hr,
+        record.max_hr,
+        record.work_kj,
+        record.avg_cadence,
+        record.mmp_5s,
+        record.mmp_1m,
+        record.mmp_5m,
+        record.mmp_20m,
+        record.avg_rmssd,
+        record.alerts_count,
+        record.extra_metrics,
+    )
+
+
+def _session_record_factory(cursor: sqlite3.Cursor, row: tuple) -> SessionRecord:
+    # Map row directly to SessionRecord - O(1) per row
+    return SessionRecord(
+        id=row[0],
+        date=row[1],
+        filename=row[2],
+        duration_sec=row[3],
+        tss=row[4],
+        np=row[5],
+        if_factor=row[6],
+        avg_watts=row[7],
+        avg_hr=row[8],
+        max_hr=row[9],
+        work_kj=row[10],
+        avg_cadence=row[11],
+        mmp_5s=row[12],
+        mmp_1m=row[13],
+        mmp_5m=row[14],
+        mmp_20m=row[15],
+        avg_rmssd=row[16],
+        alerts_count=row[17],
+        extra_metrics=row[18],
+    )
+
+
 class SessionStore:
     """SQLite-based session storage with CRUD operations."""
 
@@ -52,7 +129,7 @@ class SessionStore:
 
     def _init_db(self) -> None:
         """Initialize database schema if not exists."""
-        with sqlite3.connect(self.db_path) as conn:
+        with get_connection(self.db_path) as conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS sessions (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -93,105 +170,78 @@ class SessionStore:
 
     def add_session(self, record: SessionRecord) -> int:
         """Add or update a session record. Returns session ID."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                """
-                INSERT INTO sessions (
-                    date, filename, duration_sec, tss, np, if_factor,
-                    avg_watts, avg_hr, max_hr, work_kj, avg_cadence,
-                    mmp_5s, mmp_1m, mmp_5m, mmp_20m, avg_rmssd,
-                    alerts_count, extra_metrics
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(date, filename) DO UPDATE SET
-                    duration_sec = excluded.duration_sec,
-                    tss = excluded.tss,
-                    np = excluded.np,
-                    if_factor = excluded.if_factor,
-                    avg_watts = excluded.avg_watts,
-                    avg_hr = excluded.avg_hr,
-                    max_hr = excluded.max_hr,
-                    work_kj = excluded.work_kj,
-                    avg_cadence = excluded.avg_cadence,
-                    mmp_5s = excluded.mmp_5s,
-                    mmp_1m = excluded.mmp_1m,
-                    mmp_5m = excluded.mmp_5m,
-                    mmp_20m = excluded.mmp_20m,
-                    avg_rmssd = excluded.avg_rmssd,
-                    alerts_count = excluded.alerts_count,
-                    extra_metrics = excluded.extra_metrics
-            """,
-                (
-                    record.date,
-                    record.filename,
-                    record.duration_sec,
-                    record.tss,
-                    record.np,
-                    record.if_factor,
-                    record.avg_watts,
-                    record.avg_hr,
-                    record.max_hr,
-                    record.work_kj,
-                    record.avg_cadence,
-                    record.mmp_5s,
-                    record.mmp_1m,
-                    record.mmp_5m,
-                    record.mmp_20m,
-                    record.avg_rmssd,
-                    record.alerts_count,
-                    record.extra_metrics,
-                ),
-            )
-            conn.commit()
-            return cursor.lastrowid
+        return self.add_sessions_bulk([record])[0]
+
+    def add_sessions_bulk(self, records: List[SessionRecord]) -> List[int]:
+        """Add or update many session records with one ``executemany`` transaction.
+
+        Returns:
+            Session IDs in the order of ``records``.
+        """
+        if not records:
+            return []
+        with get_connection(self.db_path) as conn:
+            conn.executemany(_UPSERT_SQL, [_record_params(r) for r in records])
+            # lastrowid is meaningless after executemany/upserts: look the ids up
+            dates = [r.date for r in records]
+            ids = {
+                (row[1], row[2]): row[0]
+                for row in conn.execute(
+                    "SELECT id, date, filename FROM sessions WHERE date BETWEEN ? AND ?",
+                    (min(dates), max(dates)),
+                )
+            }
+        return [ids[(r.date, r.filename)] for r in records]
 
     def get_sessions(self, days: int = 90) -> List[SessionRecord]:
         """Get sessions from the last N days using optimized batch fetch."""
-        with sqlite3.connect(self.db_path) as conn:
-            # Use custom row factory for direct SessionRecord creation
-            def session_record_factory(cursor, row):
-                # Map row directly to SessionRecord - O(1) per row
-                return SessionRecord(
-                    id=row[0],
-                    date=row[1],
-                    filename=row[2],
-                    duration_sec=row[3],
-                    tss=row[4],
-                    np=row[5],
-                    if_factor=row[6],
-                    avg_watts=row[7],
-                    avg_hr=row[8],
-                    max_hr=row[9],
-                    work_kj=row[10],
-                    avg_cadence=row[11],
-                    mmp_5s=row[12],
-                    mmp_1m=row[13],
-                    mmp_5m=row[14],
-                    mmp_20m=row[15],
-                    avg_rmssd=row[16],
-                    alerts_count=row[17],
-                    extra_metrics=row[18],
-                )
+        cursor = self._session_cursor(days)
+        # Single batch fetch - O(n) total
+        return cursor.fetchall()
 
-            conn.row_factory = session_record_factory
-            cursor = conn.execute(
-                """
-                SELECT id, date, filename, duration_sec, tss, np, if_factor,
-                       avg_watts, avg_hr, max_hr, work_kj, avg_cadence,
-                       mmp_5s, mmp_1m, mmp_5m, mmp_20m, avg_rmssd,
-                       alerts_count, extra_metrics
-                FROM sessions 
-                WHERE date >= date('now', ?)
-                ORDER BY date DESC
-            """,
-                (f"-{days} days",),
-            )
+    def iter_sessions(
+        self, days: Optional[int] = None, batch_size: int = 500
+    ) -> Iterator[SessionRecord]:
+        """Stream sessions (newest first) in ``fetchmany`` batches.
 
-            # Single batch fetch - O(n) total
-            return cursor.fetchall()
+        Args:
+            days: Only the last N days; None streams the whole history
+            batch_size: Rows fetched per round trip
+        """
+        cursor = self._session_cursor(days)
+        try:
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    return
+                yield from batch
+        finally:
+            cursor.close()
+
+    def _session_cursor(self, days: Optional[int]) -> sqlite3.Cursor:
+        """Cursor over sessions that yields SessionRecord objects directly."""
+        cursor = get_connection(self.db_path).cursor()
+        # Row factory on the cursor only: the pooled connection is shared
+        cursor.row_factory = _session_record_factory
+        where = "WHERE date >= date('now', ?)" if days is not None else ""
+        params = (f"-{days} days",) if days is not None else ()
+        cursor.execute(
+            f"""
+            SELECT id, date, filename, duration_sec, tss, np, if_factor,
+                   avg_watts, avg_hr, max_hr, work_kj, avg_cadence,
+                   mmp_5s, mmp_1m, mmp_5m, mmp_20m, avg_rmssd,
+                   alerts_count, extra_metrics
+            FROM sessions
+            {where}
+            ORDER BY date DESC
+            """,
+            params,
+        )
+        return cursor
 
     def get_all_tss(self, days: int = 90) -> List[tuple]:
         """Get (date, tss) tuples for training load calculation."""
-        with sqlite3.connect(self.db_path) as conn:
+        with get_connection(self.db_path) as conn:
             cursor = conn.execute(
                 """
                 SELECT date, SUM(tss) as daily_tss 
@@ -206,13 +256,24 @@ class SessionStore:
 
     def get_session_count(self) -> int:
         """Get total number of stored sessions."""
-        with sqlite3.connect(self.db_path) as conn:
+        with get_connection(self.db_path) as conn:
             cursor = conn.execute("SELECT COUNT(*) FROM sessions")
             return cursor.fetchone()[0]
 
     def delete_session(self, session_id: int) -> bool:
-        """Delete a session by ID."""
-        with sqlite3.connect(self.db_path) as conn:
+        """Delete a session by ID (and its stored MMP curve and import manifest entry)."""
+        with get_connection(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT date, filename FROM sessions WHERE id = ?", (session_id,)
+            ).fetchone()
             cursor = conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
             conn.commit()
-            return cursor.rowcount > 0
+            deleted = cursor.rowcount > 0
+
+        if deleted:
+            from modules.db.mmp_store import MMPStore
+            from modules.db.session_cache import ImportManifest
+
+            MMPStore(self.db_path).remove_session_curve(session_id)
+            ImportManifest(self.db_path).forget_session(session_id, row["date"], row["filename"])
+        return deleted
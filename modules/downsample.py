@@ -0,0 +1,252 @@
+"""
+Peak-preserving downsampling of time series for plotting.
+
+Long sessions used to be thinned for Plotly with ``df.iloc[::step]``, which
+drops sprint peaks and HR spikes. Here every bucket of consecutive samples
+keeps the rows holding the minimum and the maximum of each plotted column,
+so the envelope of every trace survives at any resolution.
+
+``DownsamplePyramid`` builds the row selections once per frame for bucket
+sizes 1, 2, 4, ... and ``view`` returns the finest level whose rows in the
+requested time range fit the per-trace point budget
+(``Config.PLOT_MAX_POINTS``). ``plot_view`` keeps recently built pyramids,
+so all charts of a session share one.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from modules.config import Config
+from modules.fingerprint import fingerprint
+from modules.numba_utils import is_numba_available, njit
+
+# Columns whose peaks are preserved when a chart does not name its own
+PLOT_COLUMNS = (
+    "watts",
+    "watts_smooth",
+    "watts_smooth_5s",
+    "heartrate",
+    "heartrate_smooth",
+    "smo2",
+    "smo2_smooth",
+    "smo2_smooth_ultra",
+    "thb_smooth",
+    "tymeventilation_smooth",
+    "tymebreathrate_smooth",
+    "torque_smooth",
+    "cadence_smooth",
+    "w_prime_balance",
+)
+
+# Pyramids kept by plot_view (one per recently shown frame)
+_PYRAMID_CACHE_SIZE = 8
+
+
+@njit(cache=True)
+def _minmax_kernel(values: np.ndarray, bucket: int) -> np.ndarray:
+    """Sorted row positions of each column's min and max per bucket of rows."""
+    n, k = values.shape
+    keep = np.zeros(n, dtype=np.bool_)
+    if n == 0:
+        return np.flatnonzero(keep)
+    keep[0] = True
+    keep[n - 1] = True
+    for start in range(0, n, bucket):
+        end = min(start + bucket, n)
+        for c in range(k):
+            i_min = start
+            i_max = start
+            v_min = np.inf
+            v_max = -np.inf
+            for i in range(start, end):
+                v = values[i, c]
+                # NaN fails both comparisons and is never selected
+                if v < v_min:
+                    v_min = v
+                    i_min = i
+                if v > v_max:
+                    v_max = v
+                    i_max = i
+            keep[i_min] = True
+            keep[i_max] = True
+    return np.flatnonzero(keep)
+
+
+def _minmax_numpy(values: np.ndarray, bucket: int) -> np.ndarray:
+    n, k = values.shape
+    keep = np.zeros(n, dtype=bool)
+    if n == 0:
+        return np.flatnonzero(keep)
+    keep[[0, n - 1]] = True
+    n_buckets = -(-n // bucket)
+    pad = ((0, n_buckets * bucket - n), (0, 0))
+    nan = np.isnan(values)
+    low = np.pad(np.where(nan, np.inf, values), pad, constant_values=np.inf)
+    high = np.pad(np.where(nan, -np.inf, values), pad, constant_values=-np.inf)
+    offsets = (np.arange(n_buckets) * bucket)[:, None]
+    keep[low.reshape(n_buckets, bucket, k).argmin(axis=1) + offsets] = True
+    keep[high.reshape(n_buckets, bucket, k).argmax(axis=1) + offsets] = True
+    return np.flatnonzero(keep)
+
+
+def minmax_indices(values: np.ndarray, bucket: int) -> np.ndarray:
+    """Row positions keeping the min and max of every column per ``bucket`` rows.
+
+    The first and last row are always kept so the time axis spans the
+    whole frame.
+
+    Args:
+        values: 2-D float array (rows x columns)
+        bucket: Rows per bucket
+
+    Returns:
+        Sorted int array of row positions
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, None]
+    if bucket <= 1:
+        return np.arange(len(values))
+    if is_numba_available():
+        return _minmax_kernel(values, int(bucket))
+    return _minmax_numpy(values, int(bucket))
+
+
+def _x_column(df: pd.DataFrame) -> Optional[str]:
+    for col in ("time_min", "time"):
+        if col in df.columns:
+            return col
+    return None
+
+
+class DownsamplePyramid:
+    """Peak-preserving row selections of one frame at halving resolutions.
+
+    ``levels[0]`` is every row; each further level keeps the extremes of
+    each plotted column in buckets of twice as many rows. Building stops
+    at the first level that fits ``max_points`` rows, so the coarsest
+    level bounds the payload of a full-session chart.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        x_col: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None,
+        max_points: int = Config.PLOT_MAX_POINTS,
+    ) -> None:
+        self.df = df
+        self.max_points = max(int(max_points), 2)
+        self.x_col = x_col if x_col in df.columns else _x_column(df)
+        if columns is None:
+            columns = [c for c in PLOT_COLUMNS if c in df.columns]
+        self.columns = [
+            c for c in columns if c in df.columns and pd.api.types.is_numeric_dtype(df[c])
+        ]
+
+        n = len(df)
+        if self.x_col is not None:
+            self.x = df[self.x_col].to_numpy(dtype=np.float64)
+        else:
+            self.x = np.arange(n, dtype=np.float64)
+
+        self.levels: List[np.ndarray] = [np.arange(n)]
+        if self.columns:
+            values = np.column_stack([df[c].to_numpy(dtype=np.float64) for c in self.columns])
+        else:
+            values = self.x[:, None]
+        bucket = 2
+        while len(self.levels[-1]) > self.max_points and bucket < 2 * n:
+            rows = minmax_indices(values, bucket)
+            if len(rows) < len(self.levels[-1]):
+                self.levels.append(rows)
+            bucket *= 2
+
+    def _in_range(self, rows: np.ndarray, x_range: Optional[Tuple[float, float]]) -> np.ndarray:
+        if x_range is None:
+            return rows
+        lo, hi = x_range
+        x = self.x[rows]
+        inside = np.flatnonzero((x >= lo) & (x <= hi))
+        if len(inside) == 0:
+            return rows[:0]
+        # One row beyond each edge so lines reach the borders of the view
+        first = max(inside[0] - 1, 0)
+        last = min(inside[-1] + 1, len(rows) - 1)
+        return rows[first : last + 1]
+
+    def level_for(self, x_range: Optional[Tuple[float, float]] = None) -> int:
+        """Finest level whose rows in ``x_range`` fit the point budget."""
+        for j, rows in enumerate(self.levels):
+            if len(self._in_range(rows, x_range)) <= self.max_points:
+                return j
+        return len(self.levels) - 1
+
+    def rows(self, x_range: Optional[Tuple[float, float]] = None) -> np.ndarray:
+        """Row positions to plot for ``x_range`` (in ``x_col`` units; None = all)."""
+        return self._in_range(self.levels[self.level_for(x_range)], x_range)
+
+    def view(
+        self, x_range: Optional[Tuple[float, float]] = None, df: Optional[pd.DataFrame] = None
+    ) -> pd.DataFrame:
+        """Frame to plot for ``x_range``, taken from ``df`` (default: the source frame)."""
+        df = self.df if df is None else df
+        rows = self.rows(x_range)
+        if len(rows) == len(df):
+            return df
+        return df.iloc[rows]
+
+
+_pyramids: "OrderedDict[tuple, DownsamplePyramid]" = OrderedDict()
+_pyramids_lock = threading.Lock()
+
+
+def get_pyramid(
+    df: pd.DataFrame,
+    x_col: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+    max_points: int = Config.PLOT_MAX_POINTS,
+) -> DownsamplePyramid:
+    """Pyramid of ``df``, built once per frame content and kept for reuse."""
+    key = (
+        fingerprint(df),
+        x_col,
+        tuple(columns) if columns is not None else None,
+        max_points,
+    )
+    with _pyramids_lock:
+        pyramid = _pyramids.get(key)
+        if pyramid is not None:
+            _pyramids.move_to_end(key)
+            return pyramid
+
+    pyramid = DownsamplePyramid(df, x_col, columns, max_points)
+    with _pyramids_lock:
+        _pyramids[key] = pyramid
+        while len(_pyramids) > _PYRAMID_CACHE_SIZE:
+            _pyramids.popitem(last=False)
+    return pyramid
+
+
+def plot_view(
+    df: pd.DataFrame,
+    x_range: Optional[Tuple[float, float]] = None,
+    x_col: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+    max_points: int = Config.PLOT_MAX_POINTS,
+) -> pd.DataFrame:
+    """Rows of ``df`` to send to a chart: peaks kept, at most ``max_points`` per trace.
+
+    Example:
+        >>> plot_df = plot_view(df_plot, columns=["watts_smooth", "heartrate_smooth"])
+        >>> go.Scatter(x=plot_df["time_min"], y=plot_df["watts_smooth"])
+    """
+    if len(df) <= max_points:
+        return df
+    # Rows come from the caller's frame (a cached pyramid may have been built
+    # from another frame with the same content)
+    return get_pyramid(df, x_col, columns, max_points).view(x_range, df)
@@ -6,13 +6,21 @@ Creates Garmin FIT format files for compatibility with:
 - Strava
 - Garmin Connect
 - Intervals.icu
+
+Record messages are encoded as one NumPy structured array (header byte plus
+little-endian fields per sample) and written with a single ``tobytes()``;
+the file CRC uses a 256-entry table (Numba kernel when available).
 """
 import struct
+import zipfile
 from io import BytesIO
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Iterable, Optional, List, Tuple
+import numpy as np
 import pandas as pd
 
+from modules.numba_utils import is_numba_available, njit
+
 
 # FIT Protocol constants
 FIT_HEADER_SIZE = 14
@@ -36,6 +44,73 @@ FIT_UINT32 = 0x86
 FIT_SINT32 = 0x85
 FIT_STRING = 0x07
 
+# Size in bytes and NumPy dtype of each base type
+FIT_TYPE_SIZES = {
+    FIT_UINT8: 1, FIT_SINT8: 1, FIT_UINT16: 2, FIT_SINT16: 2,
+    FIT_UINT32: 4, FIT_SINT32: 4, FIT_STRING: 1,
+}
+FIT_TYPE_DTYPES = {
+    FIT_UINT8: "u1", FIT_SINT8: "i1", FIT_UINT16: "<u2", FIT_SINT16: "<i2",
+    FIT_UINT32: "<u4", FIT_SINT32: "<i4",
+}
+
+# Record fields: (field number, base type, source columns, scale)
+RECORD_FIELDS = [
+    (7, FIT_UINT16, ("watts",), 1),                      # power [W]
+    (3, FIT_UINT8, ("heartrate",), 1),                   # heart_rate [bpm]
+    (4, FIT_UINT8, ("cadence",), 1),                     # cadence [rpm]
+    (6, FIT_UINT16, ("velocity_smooth", "speed"), 1000), # speed [m/s * 1000]
+]
+
+# Invalid value per unsigned type (written for missing samples)
+_INVALID = {FIT_UINT8: 0xFF, FIT_UINT16: 0xFFFF, FIT_UINT32: 0xFFFFFFFF}
+
+
+def _crc_table() -> np.ndarray:
+    """Byte-wise table of the FIT CRC-16 (reflected polynomial 0xA001)."""
+    table = np.zeros(256, dtype=np.uint16)
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+        table[i] = crc
+    return table
+
+
+CRC_TABLE = _crc_table()
+_CRC_TABLE_LIST = CRC_TABLE.tolist()
+
+
+@njit(cache=True)
+def _crc16_kernel(data, crc, table):
+    for byte in data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
+
+
+def fit_crc16(data: bytes, crc: int = 0) -> int:
+    """FIT CRC-16 of ``data``, continuing from ``crc``."""
+    if is_numba_available():
+        arr = np.frombuffer(data, dtype=np.uint8)
+        return int(_crc16_kernel(arr, np.uint16(crc), CRC_TABLE))
+    table = _CRC_TABLE_LIST
+    for byte in data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
+
+
+def _encode_uint(values: np.ndarray, base_type: int, scale: float = 1) -> np.ndarray:
+    """Truncate to integers and clamp to the type range; NaN becomes the invalid value."""
+    invalid = _INVALID[base_type]
+    out = np.clip(np.trunc(np.asarray(values, dtype=np.float64) * scale), 0, invalid)
+    out[np.isnan(out)] = invalid
+    return out.astype(FIT_TYPE_DTYPES[base_type])
+
+
+def _fit_uint(value: float, base_type: int) -> int:
+    """Single value encoded like a record field (clamped, NaN as invalid)."""
+    return int(_encode_uint(np.array([value], dtype=np.float64), base_type)[0])
+
 
 class FitExporter:
     """Creates FIT files from training data."""
@@ -49,6 +124,7 @@ class FitExporter:
     def __init__(self, serial_number: Optional[int] = None):
         self._buffer = BytesIO()
         self._data_size = 0
+        # Definition messages by (global message, fields), reused across exports
         self._local_msg_map = {}
         self._serial_number = serial_number if serial_number is not None else self.DEFAULT_SERIAL_NUMBER
     
@@ -98,6 +174,31 @@ class FitExporter:
         self._add_crc()
         
         return self._buffer.getvalue()
+
+    def export_batch(
+        self,
+        sessions: Iterable[Tuple[str, pd.DataFrame, dict, Optional[datetime]]],
+        sport: str = "cycling",
+    ) -> bytes:
+        """Export many sessions as FIT files in one ZIP archive.
+
+        Definition messages are built once and reused for every session.
+
+        Args:
+            sessions: (name, df, metrics, start_time) per session; ".fit" is
+                appended to names without it
+            sport: Sport type for all sessions
+
+        Returns:
+            ZIP archive bytes
+        """
+        zip_buffer = BytesIO()
+        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            for name, df, metrics, start_time in sessions:
+                if not name.lower().endswith(".fit"):
+                    name = f"{name}.fit"
+                zip_file.writestr(name, self.export(df, metrics, start_time, sport))
+        return zip_buffer.getvalue()
     
     def _write_header_placeholder(self):
         """Write 14-byte FIT header placeholder."""
@@ -120,30 +221,13 @@ class FitExporter:
     
     def _add_crc(self):
         """Calculate and append CRC."""
-        # Simple CRC16 for FIT
-        self._buffer.seek(0)
-        data = self._buffer.read()
-        crc = self._calculate_crc(data)
+        with self._buffer.getbuffer() as data:
+            crc = self._calculate_crc(data)
         self._buffer.write(struct.pack('<H', crc))
     
     def _calculate_crc(self, data: bytes) -> int:
         """Calculate FIT CRC16."""
-        crc_table = [
-            0x0000, 0xCC01, 0xD801, 0x1400, 0xF001, 0x3C00, 0x2800, 0xE401,
-            0xA001, 0x6C00, 0x7800, 0xB401, 0x5000, 0x9C01, 0x8801, 0x4400
-        ]
-        
-        crc = 0
-        for byte in data:
-            tmp = crc_table[crc & 0xF]
-            crc = (crc >> 4) & 0x0FFF
-            crc = crc ^ tmp ^ crc_table[byte & 0xF]
-            
-            tmp = crc_table[crc & 0xF]
-            crc = (crc >> 4) & 0x0FFF
-            crc = crc ^ tmp ^ crc_table[(byte >> 4) & 0xF]
-        
-        return crc
+        return fit_crc16(data)
     
     def _write_file_id(self, start_time: datetime):
         """Write File ID message."""
@@ -169,68 +253,40 @@ class FitExporter:
         )
         self._write_data(MSG_FILE_ID, data)
     
-    def _write_records(self, df: pd.DataFrame, start_time: datetime):  # noqa: C901
-        """Write record messages for each data point."""
-        # Determine available fields
-        has_power = 'watts' in df.columns
-        has_hr = 'heartrate' in df.columns
-        has_cadence = 'cadence' in df.columns
-        has_speed = 'velocity_smooth' in df.columns or 'speed' in df.columns
-        
-        # Create definition based on available fields
-        fields = [
-            (253, FIT_UINT32, 1),  # timestamp
-        ]
-        
-        if has_power:
-            fields.append((7, FIT_UINT16, 1))    # power
-        if has_hr:
-            fields.append((3, FIT_UINT8, 1))     # heart_rate
-        if has_cadence:
-            fields.append((4, FIT_UINT8, 1))     # cadence
-        if has_speed:
-            fields.append((6, FIT_UINT16, 1))    # speed (m/s * 1000)
-        
+    def _write_records(self, df: pd.DataFrame, start_time: datetime):
+        """Write one record message per sample, encoded as a single structured array."""
+        fields = [(253, FIT_UINT32, 1)]  # timestamp
+        columns = []
+        for field_num, base_type, sources, scale in RECORD_FIELDS:
+            col = next((c for c in sources if c in df.columns), None)
+            if col is not None:
+                fields.append((field_num, base_type, 1))
+                columns.append((f"f{field_num}", col, base_type, scale))
+
         definition = self._create_definition(MSG_RECORD, fields)
         self._write_message(definition)
-        
-        time_col = 'time' if 'time' in df.columns else None
+
+        # Header byte 0 (data message, local type 0) followed by the fields
+        dtype = np.dtype(
+            [("header", "u1")]
+            + [(f"f{num}", FIT_TYPE_DTYPES[base_type]) for num, base_type, _ in fields]
+        )
         n = len(df)
-        
-        time_values = df[time_col].values if time_col else None
-        power_values = df['watts'].values if has_power else None
-        hr_values = df['heartrate'].values if has_hr else None
-        cadence_values = df['cadence'].values if has_cadence else None
-        
-        speed_col = 'velocity_smooth' if 'velocity_smooth' in df.columns else 'speed'
-        speed_values = None
-        if has_speed:
-            if speed_col in df.columns:
-                speed_values = df[speed_col].values
-        
-        for i in range(n):
-            elapsed = float(time_values[i]) if time_values is not None else float(i)
-            timestamp = int((start_time + timedelta(seconds=elapsed) - self.FIT_EPOCH).total_seconds())
-            
-            data_parts = [struct.pack('<I', timestamp)]
-            
-            if has_power and power_values is not None:
-                power = int(float(power_values[i]))
-                data_parts.append(struct.pack('<H', max(0, min(65535, power))))
-            
-            if has_hr and hr_values is not None:
-                hr = int(float(hr_values[i]))
-                data_parts.append(struct.pack('<B', max(0, min(255, hr))))
-            
-            if has_cadence and cadence_values is not None:
-                cadence = int(float(cadence_values[i]))
-                data_parts.append(struct.pack('<B', max(0, min(255, cadence))))
-            
-            if speed_values is not None:
-                speed = float(speed_values[i]) * 1000
-                data_parts.append(struct.pack('<H', max(0, min(65535, int(speed)))))
-            
-            self._write_data(MSG_RECORD, b''.join(data_parts))
+        records = np.zeros(n, dtype=dtype)
+
+        if 'time' in df.columns:
+            elapsed_us = np.round(df['time'].to_numpy(dtype=np.float64) * 1e6).astype(np.int64)
+        else:
+            elapsed_us = np.arange(n, dtype=np.int64) * 1_000_000
+        start_us = (start_time - self.FIT_EPOCH) // timedelta(microseconds=1)
+        records["f253"] = (start_us + elapsed_us) // 1_000_000
+
+        for name, col, base_type, scale in columns:
+            records[name] = _encode_uint(df[col].to_numpy(dtype=np.float64), base_type, scale)
+
+        block = records.tobytes()
+        self._buffer.write(block)
+        self._data_size += len(block)
     
     def _write_session(
         self, 
@@ -245,12 +301,12 @@ class FitExporter:
         timestamp = int((start_time - self.FIT_EPOCH).total_seconds())
         duration = len(df)  # seconds
         
-        avg_power = int(metrics.get('avg_watts', 0))
-        avg_hr = int(metrics.get('avg_hr', 0))
-        max_hr = int(df['heartrate'].max()) if 'heartrate' in df.columns else 0
-        total_work = int(metrics.get('work_kj', 0) * 1000)  # kJ to J
-        np_val = int(metrics.get('np', avg_power))
-        tss = int(metrics.get('tss', 0) * 10)  # TSS * 10
+        avg_power = _fit_uint(metrics.get('avg_watts', 0), FIT_UINT16)
+        avg_hr = _fit_uint(metrics.get('avg_hr', 0), FIT_UINT8)
+        max_hr = _fit_uint(df['heartrate'].max(), FIT_UINT8) if 'heartrate' in df.columns else 0
+        total_work = _fit_uint(metrics.get('work_kj', 0) * 1000, FIT_UINT32)  # kJ to J
+        np_val = _fit_uint(metrics.get('np', avg_power), FIT_UINT16)
+        tss = _fit_uint(metrics.get('tss', 0) * 10, FIT_UINT16)  # TSS * 10
         
         # Simplified session message
         definition = self._create_definition(MSG_SESSION, [
@@ -269,9 +325,9 @@ class FitExporter:
         ])
         self._write_message(definition)
         
-        max_power = int(df['watts'].max()) if 'watts' in df.columns else 0
+        max_power = _fit_uint(df['watts'].max(), FIT_UINT16) if 'watts' in df.columns else 0
         
-        data = struct.pack('<IIIIBBHBBIHHH',
+        data = struct.pack('<IIIIBHHBBIHH',
             timestamp,
             timestamp,
             duration * 1000,   # milliseconds
@@ -316,18 +372,27 @@ class FitExporter:
         global_msg_num: int, 
         fields: List[tuple]
     ) -> bytes:
-        """Create definition message for a global message type."""
-        num_fields = len(fields)
-        
+        """Create (or reuse) the definition message for a global message type.
+
+        ``fields`` holds (field number, base type, element count) tuples.
+        """
+        key = (global_msg_num, tuple(fields))
+        definition = self._local_msg_map.get(key)
+        if definition is not None:
+            return definition
+
         # Definition header: reserved, arch (little endian), global msg num, num fields
-        header = struct.pack('<xBHB', 0, global_msg_num, num_fields)
-        
-        # Field definitions
-        field_defs = b''
-        for field_num, field_type, field_size in fields:
-            field_defs += struct.pack('<BBB', field_num, field_size, field_type)
+        header = struct.pack('<xBHB', 0, global_msg_num, len(fields))
         
-        return header + field_defs
+        # Field definitions: number, size in bytes, base type
+        field_defs = b''.join(
+            struct.pack('<BBB', field_num, count * FIT_TYPE_SIZES[field_type], field_type)
+            for field_num, field_type, count in fields
+        )
+
+        definition = header + field_defs
+        self._local_msg_map[key] = definition
+        return definition
     
     def _write_message(self, definition: bytes):
         """Write a definition message."""
@@ -337,10 +402,12 @@ class FitExporter:
         self._buffer.write(definition)
         self._data_size += 1 + len(definition)
     
-    def _write_data(self, local_msg: int, data: bytes):
-        """Write a data message."""
-        header = local_msg & 0x0F  # Local message, data bit clear
-        self._buffer.write(struct.pack('B', header))
+    def _write_data(self, global_msg: int, data: bytes):
+        """Write a data message for the definition written just before it.
+
+        Every definition is written as local message 0, so the header is 0.
+        """
+        self._buffer.write(b'\x00')
         self._buffer.write(data)
         self._data_size += 1 + len(data)
 
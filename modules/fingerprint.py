@@ -0,0 +1,200 @@
+"""
+Content fingerprints for DataFrames, Series and NumPy arrays.
+
+Used to build collision-safe cache keys: two sessions with the same shape
+and columns but different samples get different fingerprints.
+
+Hashing streams the underlying buffers in fixed-size chunks (zero-copy for
+contiguous numeric data) with xxhash when installed, falling back to
+hashlib.blake2b. Fingerprints are memoized per object id and re-validated
+against a cheap structural signature, so repeated lookups on the same
+object cost microseconds.
+
+The signature includes the identity of each column's buffer, so replacing
+a column (``df["watts"] = df["watts"] * 2``) invalidates the memo. In-place
+value edits (``df.loc[...] = ...``) that write into the existing buffers
+are not detected; call ``invalidate_fingerprint(obj)`` after mutating an
+object in place.
+"""
+
+import hashlib
+import threading
+import weakref
+from typing import Any, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Try to use xxhash (much faster than blake2 on large buffers)
+try:
+    import xxhash
+
+    _XXHASH_AVAILABLE = True
+except ImportError:
+    _XXHASH_AVAILABLE = False
+    xxhash = None
+
+# Bump when the hashing scheme changes so old disk-cache entries are ignored
+FINGERPRINT_VERSION = 1
+
+# Bytes hashed per update() call
+CHUNK_BYTES = 1 << 20
+
+_memo: Dict[int, Tuple[Any, Tuple, str]] = {}
+_memo_lock = threading.Lock()
+
+
+def _new_hasher():
+    if _XXHASH_AVAILABLE:
+        return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=16)
+
+
+def _update_array(h, arr: np.ndarray) -> None:
+    """Feed an ndarray's raw bytes to the hasher in chunks."""
+    h.update(f"{arr.dtype.str}{arr.shape}".encode())
+    if arr.size == 0:
+        return
+
+    if arr.dtype.kind not in "biufcmM":
+        # Object / string data: hash element values via pandas
+        flat = pd.Series(arr.reshape(-1), copy=False)
+        _update_array(h, pd.util.hash_pandas_object(flat, index=False).to_numpy())
+        return
+
+    if arr.flags.c_contiguous:
+        buf = memoryview(arr.reshape(-1).view(np.uint8))
+        for start in range(0, len(buf), CHUNK_BYTES):
+            h.update(buf[start : start + CHUNK_BYTES])
+        return
+
+    # Strided view: copy one bounded chunk of rows at a time
+    rows = max(1, CHUNK_BYTES // max(1, arr[:1].nbytes))
+    for start in range(0, arr.shape[0], rows):
+        chunk = np.ascontiguousarray(arr[start : start + rows])
+        h.update(memoryview(chunk.reshape(-1).view(np.uint8)))
+
+
+def _update_series_values(h, s: pd.Series) -> None:
+    if isinstance(s.dtype, np.dtype):
+        _update_array(h, s.to_numpy(copy=False))
+    else:
+        # Extension dtypes (category, nullable ints, strings...)
+        h.update(str(s.dtype).encode())
+        _update_array(h, pd.util.hash_pandas_object(s, index=False).to_numpy())
+
+
+def _update_index(h, index: pd.Index) -> None:
+    if isinstance(index, pd.RangeIndex):
+        h.update(f"RI:{index.start}:{index.stop}:{index.step}".encode())
+    else:
+        _update_series_values(h, index.to_series(index=pd.RangeIndex(len(index))))
+
+
+def _buffer_id(values: Any) -> int:
+    """Identity of a values buffer: data pointer of an ndarray, else the array's id."""
+    if isinstance(values, np.ndarray):
+        return values.__array_interface__["data"][0]
+    return id(values)
+
+
+def _series_values(s: pd.Series) -> Any:
+    return s.to_numpy(copy=False) if isinstance(s.dtype, np.dtype) else s.array
+
+
+def _column_signatures(df: pd.DataFrame) -> Tuple:
+    """(dtype, buffer identity) per column."""
+    # _get_column_array skips building a Series per column
+    get_column = getattr(df, "_get_column_array", None)
+    if get_column is None:
+        arrays = [_series_values(s) for _, s in df.items()]
+    else:
+        arrays = [get_column(i) for i in range(df.shape[1])]
+    return tuple((arr.dtype, _buffer_id(arr)) for arr in arrays)
+
+
+def _signature(obj: Any) -> Tuple:
+    """Cheap structural signature used to validate memoized fingerprints."""
+    if isinstance(obj, np.ndarray):
+        return ("A", obj.shape, obj.dtype.str, _buffer_id(obj))
+    if isinstance(obj, pd.Series):
+        values = _series_values(obj)
+        return ("S", obj.shape, str(obj.dtype), obj.name, id(obj.index), _buffer_id(values))
+    return ("D", obj.shape, tuple(obj.columns), id(obj.index), _column_signatures(obj))
+
+
+def _compute(obj: Any) -> str:
+    h = _new_hasher()
+    if isinstance(obj, np.ndarray):
+        h.update(b"ARR")
+        _update_array(h, obj)
+    elif isinstance(obj, pd.Series):
+        h.update(f"SER:{obj.name!r}".encode())
+        _update_index(h, obj.index)
+        _update_series_values(h, obj)
+    else:
+        h.update(f"DF:{obj.shape}".encode())
+        _update_index(h, obj.index)
+        for col in obj.columns:
+            h.update(f"|{col!r}".encode())
+            _update_series_values(h, obj[col])
+    return h.hexdigest()
+
+
+def fingerprint(obj: Any) -> str:
+    """
+    Content fingerprint of a DataFrame, Series or ndarray.
+
+    Covers values, dtypes, column names and index. Equal content yields an
+    equal fingerprint regardless of object identity.
+
+    Args:
+        obj: pd.DataFrame, pd.Series or np.ndarray
+
+    Returns:
+        Hex digest string
+    """
+    if not isinstance(obj, (pd.DataFrame, pd.Series, np.ndarray)):
+        raise TypeError(f"Cannot fingerprint object of type {type(obj).__name__}")
+
+    key = id(obj)
+    sig = _signature(obj)
+    with _memo_lock:
+        entry = _memo.get(key)
+    if entry is not None:
+        ref, memo_sig, digest = entry
+        if ref() is obj and memo_sig == sig:
+            return digest
+
+    digest = _compute(obj)
+    try:
+        ref = weakref.ref(obj, lambda _r, k=key: _forget(k, _r))
+    except TypeError:
+        return digest
+    with _memo_lock:
+        _memo[key] = (ref, sig, digest)
+    return digest
+
+
+def _forget(key: int, ref: Any) -> None:
+    with _memo_lock:
+        entry = _memo.get(key)
+        if entry is not None and entry[0] is ref:
+            del _memo[key]
+
+
+def invalidate_fingerprint(obj: Any) -> None:
+    """Drop the memoized fingerprint of an object mutated in place."""
+    with _memo_lock:
+        _memo.pop(id(obj), None)
+
+
+def clear_fingerprint_memo() -> None:
+    """Drop all memoized fingerprints."""
+    with _memo_lock:
+        _memo.clear()
+
+
+def is_xxhash_available() -> bool:
+    """Check if xxhash is available."""
+    return _XXHASH_AVAILABLE
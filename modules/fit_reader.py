@@ -0,0 +1,297 @@
+"""
+Native FIT file decoder for session ingestion.
+
+Reads record messages of a Garmin FIT activity straight into NumPy column
+arrays, without a Python object per sample:
+
+1. ``_walk_messages`` (Numba kernel, plain Python without Numba) scans the
+   message stream once. It keeps the current definition per local message
+   type and outputs each message's payload offset, its definition message
+   and its timestamp (field 253 or a compressed timestamp header).
+2. The few definition messages are parsed with ``struct``. For each record
+   layout, every field is gathered for all its messages at once by fancy
+   indexing into the byte buffer and viewed with its base type.
+
+Fields are mapped onto the canonical columns used by ``process_data``
+(``watts``, ``heartrate``, ``cadence``, ``smo2``, ``thb``,
+``core_temperature``, ...). Invalid values become NaN. Developer fields are
+skipped.
+"""
+
+import logging
+import struct
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from modules.numba_utils import njit
+
+logger = logging.getLogger(__name__)
+
+FIT_SIGNATURE = b".FIT"
+MSG_RECORD = 20
+FIELD_TIMESTAMP = 253
+
+# Record field number -> (column, scale, offset); value = raw / scale - offset
+RECORD_COLUMNS: Dict[int, Tuple[str, float, float]] = {
+    7: ("watts", 1.0, 0.0),
+    3: ("heartrate", 1.0, 0.0),
+    4: ("cadence", 1.0, 0.0),
+    57: ("smo2", 10.0, 0.0),              # saturated_hemoglobin_percent [%]
+    54: ("thb", 100.0, 0.0),              # total_hemoglobin_conc [g/dL]
+    139: ("core_temperature", 100.0, 0.0),
+    6: ("velocity_smooth", 1000.0, 0.0),  # speed [m/s]
+    73: ("velocity_smooth", 1000.0, 0.0),  # enhanced_speed (preferred)
+    2: ("altitude", 5.0, 500.0),
+    78: ("altitude", 5.0, 500.0),         # enhanced_altitude (preferred)
+    5: ("distance", 100.0, 0.0),
+}
+
+# Fields that win over their legacy counterpart when both are present
+_ENHANCED = {73: 6, 78: 2}
+
+# Base type byte -> (NumPy little-endian dtype, invalid value)
+_BASE_TYPES = {
+    0x00: ("u1", 0xFF),        # enum
+    0x01: ("i1", 0x7F),        # sint8
+    0x02: ("u1", 0xFF),        # uint8
+    0x0A: ("u1", 0x00),        # uint8z
+    0x0D: ("u1", 0xFF),        # byte
+    0x83: ("<i2", 0x7FFF),     # sint16
+    0x84: ("<u2", 0xFFFF),     # uint16
+    0x8B: ("<u2", 0x0000),     # uint16z
+    0x85: ("<i4", 0x7FFFFFFF),  # sint32
+    0x86: ("<u4", 0xFFFFFFFF),  # uint32
+    0x8C: ("<u4", 0x00000000),  # uint32z
+}
+
+# Kernel status codes
+_OK, _UNDEFINED_LOCAL, _TRUNCATED = 0, 1, 2
+
+
+@njit(cache=True)
+def _walk_messages(data, offsets, def_msg, timestamps):  # noqa: C901
+    """Scan the data records once; returns (message count, status).
+
+    For message i: ``offsets[i]`` is the payload start, ``def_msg[i]`` the
+    index of its definition message (-1 for definitions) and
+    ``timestamps[i]`` its FIT timestamp (-1 if none). When the arrays are
+    too small, messages are still counted but not stored.
+    """
+    n = len(data)
+    capacity = len(offsets)
+    size_by_local = np.full(16, -1, dtype=np.int64)
+    def_by_local = np.full(16, -1, dtype=np.int64)
+    ts_offset_by_local = np.full(16, -1, dtype=np.int64)
+    big_endian_by_local = np.zeros(16, dtype=np.bool_)
+    last_ts = -1
+    count = 0
+    pos = 0
+
+    while pos < n:
+        header = data[pos]
+        pos += 1
+        ts = -1
+
+        if header & 0x80:
+            # Compressed timestamp header: local type in bits 5-6
+            local = (header >> 5) & 0x03
+            if last_ts >= 0:
+                offset = header & 0x1F
+                last_ts = last_ts + ((offset - last_ts) & 0x1F)
+                ts = last_ts
+            is_definition = False
+        else:
+            local = header & 0x0F
+            is_definition = (header & 0x40) != 0
+
+        if is_definition:
+            if pos + 5 > n:
+                return count, _TRUNCATED
+            big_endian = data[pos + 1] == 1
+            n_fields = data[pos + 4]
+            end = pos + 5 + 3 * n_fields
+            if end > n:
+                return count, _TRUNCATED
+            size = 0
+            ts_offset = -1
+            for f in range(n_fields):
+                field = pos + 5 + 3 * f
+                if data[field] == FIELD_TIMESTAMP and data[field + 1] == 4:
+                    ts_offset = size
+                size += data[field + 1]
+            if header & 0x20:
+                # Developer field definitions
+                if end + 1 > n:
+                    return count, _TRUNCATED
+                n_dev = data[end]
+                end += 1 + 3 * n_dev
+                if end > n:
+                    return count, _TRUNCATED
+                for f in range(n_dev):
+                    size += data[end - 3 * n_dev + 3 * f + 1]
+            size_by_local[local] = size
+            def_by_local[local] = count
+            ts_offset_by_local[local] = ts_offset
+            big_endian_by_local[local] = big_endian
+            if count < capacity:
+                offsets[count] = pos
+                def_msg[count] = -1
+                timestamps[count] = -1
+            pos = end
+        else:
+            size = size_by_local[local]
+            if size < 0:
+                return count, _UNDEFINED_LOCAL
+            if pos + size > n:
+                return count, _TRUNCATED
+            t = ts_offset_by_local[local]
+            if t >= 0:
+                b = data[pos + t:pos + t + 4]
+                if big_endian_by_local[local]:
+                    b = b[::-1]
+                value = np.int64(b[0]) | (np.int64(b[1]) << 8) | (np.int64(b[2]) << 16)
+                value |= np.int64(b[3]) << 24
+                if value != 0xFFFFFFFF:
+                    last_ts = value
+                    ts = value
+            if count < capacity:
+                offsets[count] = pos
+                def_msg[count] = def_by_local[local]
+                timestamps[count] = ts
+            pos += size
+        count += 1
+
+    return count, _OK
+
+
+def _walk(body: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    capacity = len(body) // 8 + 16
+    while True:
+        offsets = np.empty(capacity, dtype=np.int64)
+        def_msg = np.empty(capacity, dtype=np.int64)
+        timestamps = np.empty(capacity, dtype=np.int64)
+        count, status = _walk_messages(body, offsets, def_msg, timestamps)
+        if count <= capacity:
+            break
+        capacity = count
+    if status == _UNDEFINED_LOCAL:
+        raise ValueError("FIT data message without a preceding definition")
+    if status == _TRUNCATED:
+        logger.warning("Truncated FIT file; decoded %d messages", count)
+    return offsets[:count], def_msg[:count], timestamps[:count]
+
+
+def _parse_definition(
+    body: np.ndarray, pos: int
+) -> Tuple[bool, int, List[Tuple[int, int, int, int]]]:
+    """(big endian, global message number, [(field, offset, size, base type)])."""
+    big_endian = body[pos + 1] == 1
+    (global_num,) = struct.unpack(">H" if big_endian else "<H", body[pos + 2:pos + 4].tobytes())
+    fields = []
+    offset = 0
+    for f in range(int(body[pos + 4])):
+        num, size, base_type = (int(v) for v in body[pos + 5 + 3 * f:pos + 8 + 3 * f])
+        fields.append((num, offset, size, base_type))
+        offset += size
+    return big_endian, global_num, fields
+
+
+def _gather_field(
+    body: np.ndarray, payloads: np.ndarray, offset: int, base_type: int, big_endian: bool
+) -> np.ndarray:
+    """One field of all messages of a layout as float64, invalid values as NaN."""
+    dtype, invalid = _BASE_TYPES[base_type]
+    dtype = np.dtype(dtype)
+    if big_endian:
+        dtype = dtype.newbyteorder(">")
+    # Only the first element of array fields is used
+    index = payloads[:, None] + (offset + np.arange(dtype.itemsize))
+    raw = np.ascontiguousarray(body[index]).view(dtype).reshape(-1)
+    values = raw.astype(np.float64)
+    values[raw == invalid] = np.nan
+    return values
+
+
+def _read_bytes(source) -> bytes:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if hasattr(source, "read"):
+        return source.read()
+    with open(source, "rb") as f:
+        return f.read()
+
+
+def is_fit_file(file) -> bool:
+    """True if ``file`` (binary file object, restored to its position) starts with a FIT header."""
+    try:
+        start = file.tell()
+        head = file.read(12)
+        file.seek(start)
+    except (AttributeError, OSError):
+        return False
+    return isinstance(head, bytes) and len(head) >= 12 and head[8:12] == FIT_SIGNATURE
+
+
+def read_fit(source) -> pd.DataFrame:  # noqa: C901
+    """Decode the record messages of a FIT file into a session frame.
+
+    Args:
+        source: Path, bytes or binary file object
+
+    Returns:
+        One row per record message with ``time`` [s] from the first record
+        (float64) and the mapped sensor columns (float32)
+
+    Raises:
+        ValueError: If the data is not a valid FIT file
+    """
+    data = _read_bytes(source)
+    if len(data) < 12 or data[8:12] != FIT_SIGNATURE:
+        raise ValueError("Not a FIT file")
+    header_size = data[0]
+    (data_size,) = struct.unpack("<I", data[4:8])
+    data_size = min(data_size, len(data) - header_size)
+    body = np.frombuffer(data, dtype=np.uint8, count=data_size, offset=header_size)
+
+    offsets, def_msg, timestamps = _walk(body)
+
+    definitions = {}
+    for i in np.flatnonzero(def_msg < 0):
+        definitions[int(i)] = _parse_definition(body, int(offsets[i]))
+    record_defs = [i for i, (_, global_num, _) in definitions.items() if global_num == MSG_RECORD]
+    is_record = np.isin(def_msg, record_defs)
+    n = int(is_record.sum())
+
+    rows_def = def_msg[is_record]
+    payloads = offsets[is_record]
+    columns: Dict[str, np.ndarray] = {}
+    for d in record_defs:
+        rows = np.flatnonzero(rows_def == d)
+        if len(rows) == 0:
+            continue
+        big_endian, _, fields = definitions[d]
+        superseded = {_ENHANCED[f[0]] for f in fields if f[0] in _ENHANCED}
+        for num, offset, size, base_type in fields:
+            if num not in RECORD_COLUMNS or num in superseded or base_type not in _BASE_TYPES:
+                continue
+            dtype_size = np.dtype(_BASE_TYPES[base_type][0]).itemsize
+            if size < dtype_size:
+                continue
+            col, scale, shift = RECORD_COLUMNS[num]
+            values = _gather_field(body, payloads[rows], offset, base_type, big_endian)
+            if col not in columns:
+                columns[col] = np.full(n, np.nan)
+            columns[col][rows] = values / scale - shift
+
+    ts = timestamps[is_record].astype(np.float64)
+    ts[ts < 0] = np.nan
+    frame = {}
+    if n and not np.isnan(ts).all():
+        frame["time"] = ts - np.nanmin(ts)
+    else:
+        frame["time"] = np.arange(n, dtype=np.float64)
+    for col, values in columns.items():
+        frame[col] = values.astype(np.float32)
+    return pd.DataFrame(frame)
@@ -76,7 +76,7 @@ class AppLayout:
         params['crank_length'] = st.sidebar.number_input(
             "Długość korby [mm]", key="crank", on_change=self.state.save_settings_callback
         )
-        uploaded_file = st.sidebar.file_uploader("Wgraj plik (CSV / TXT)", type=['csv', 'txt'])
+        uploaded_file = st.sidebar.file_uploader("Wgraj plik (CSV / TXT / FIT)", type=['csv', 'txt', 'fit'])
             
         return uploaded_file, params
 
@@ -1,16 +1,26 @@
 """
 Historical Training Importer.
 
-Batch import of CSV files from the 'treningi_csv' folder into training_history.db.
+Batch import of CSV and FIT files from the 'treningi_csv' folder into
+training_history.db. FIT files are decoded natively (modules.fit_reader).
+Processed sessions are also written to the Parquet session cache next to the
+database, which later batch jobs (TTE backfill, ML training) read instead of
+the CSVs.
 """
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
 from pathlib import Path
 from datetime import datetime
 from typing import List, Tuple, Optional
 import re
 
-from modules.db import SessionStore, SessionRecord
-from modules.utils import load_data
+import numpy as np
+import pandas as pd
+
+from modules.db import SessionStore, SessionRecord, MMPStore, SessionCache, ImportManifest
+from modules.utils import load_data_uncached
 from modules.calculations import process_data, calculate_metrics, calculate_normalized_power
+from modules.calculations.mmp import compute_mmp_curve
 from services.data_validation import validate_dataframe
 
 
@@ -50,99 +60,212 @@ def extract_date_from_filename(filename: str) -> Optional[str]:
     return None
 
 
+# Sessions committed per SessionStore transaction during bulk import
+IMPORT_BATCH_SIZE = 50
+
+# Session file patterns picked up from the training folder
+SESSION_FILE_PATTERNS = ("*.csv", "*.CSV", "*.fit", "*.FIT")
+
+
+def _session_files(folder_path: Path) -> List[Path]:
+    """Sorted, de-duplicated session files (CSV and FIT) in a folder."""
+    files = set()
+    for pattern in SESSION_FILE_PATTERNS:
+        files.update(folder_path.glob(pattern))
+    return sorted(files)
+
+
+class _RejectedFile(Exception):
+    """File that cannot be imported; the message is shown to the user as-is."""
+
+
+def _build_session(
+    filepath: Path, cp: float
+) -> Tuple[SessionRecord, Optional[np.ndarray], pd.DataFrame]:
+    """Load, validate and process one CSV or FIT file into a record, MMP curve and 1 Hz frame."""
+    with open(filepath, 'rb') as f:
+        df_raw = load_data_uncached(f)
+
+    if df_raw is None or df_raw.empty:
+        raise _RejectedFile(f"Pusty plik: {filepath.name}")
+
+    # Validate logic
+    is_valid, error = validate_dataframe(df_raw)
+    if not is_valid:
+        raise _RejectedFile(f"Błąd walidacji ({filepath.name}): {error}")
+
+    df = process_data(df_raw)
+    metrics = calculate_metrics(df, cp)
+
+    # Calculate NP and TSS
+    if 'watts' in df.columns and len(df) >= 30:
+        np_val = calculate_normalized_power(df)
+        if cp > 0:
+            if_factor = np_val / cp
+            tss = (len(df) * np_val * if_factor) / (cp * 3600) * 100
+        else:
+            if_factor = 0
+            tss = 0
+    else:
+        np_val = metrics.get('avg_watts', 0)
+        if_factor = 0
+        tss = 0
+
+    # Extract date from filename
+    date_str = extract_date_from_filename(filepath.name)
+    if not date_str:
+        # Use file modification time
+        mod_time = datetime.fromtimestamp(filepath.stat().st_mtime)
+        date_str = mod_time.strftime('%Y-%m-%d')
+
+    # Full MMP curve from a single cumulative-sum pass; windows with gaps are
+    # skipped, as the former pandas rolling means did
+    curve = (
+        compute_mmp_curve(df['watts'].to_numpy(), skip_nan=True) if 'watts' in df.columns else None
+    )
+
+    def _mmp(seconds: int) -> Optional[float]:
+        if curve is None or np.isnan(curve[seconds - 1]):
+            return None
+        return float(curve[seconds - 1])
+
+    record = SessionRecord(
+        date=date_str,
+        filename=filepath.name,
+        duration_sec=len(df),
+        tss=tss,
+        np=np_val,
+        if_factor=if_factor,
+        avg_watts=metrics.get('avg_watts', 0),
+        avg_hr=metrics.get('avg_hr', 0),
+        max_hr=df['heartrate'].max() if 'heartrate' in df.columns else 0,
+        work_kj=metrics.get('work_kj', 0) if 'work_kj' in metrics else (df['watts'].sum() / 1000 if 'watts' in df.columns else 0),
+        avg_cadence=metrics.get('avg_cadence', 0),
+        mmp_5s=_mmp(5),
+        mmp_1m=_mmp(60),
+        mmp_5m=_mmp(300),
+        mmp_20m=_mmp(1200),
+    )
+    return record, curve, df
+
+
+def _success_message(record: SessionRecord) -> str:
+    return f"✅ {record.filename}: TSS={record.tss:.0f}, NP={record.np:.0f}W"
+
+
 def import_single_file(
     filepath: Path,
     cp: float = 280,
-    store: Optional[SessionStore] = None
+    store: Optional[SessionStore] = None,
+    mmp_store: Optional[MMPStore] = None
 ) -> Tuple[bool, str]:
-    """Import a single CSV file into the database.
+    """Import a single CSV or FIT file into the database.
     
     Args:
-        filepath: Path to CSV file
+        filepath: Path to CSV or FIT file
         cp: Critical Power for metrics calculation
         store: Optional SessionStore instance
+        mmp_store: Optional MMPStore instance for the full MMP curve
         
     Returns:
         Tuple of (success, message)
     """
     if store is None:
         store = SessionStore()
+    if mmp_store is None:
+        mmp_store = MMPStore(store.db_path)
     
     try:
-        # Load and process data
-        with open(filepath, 'rb') as f:
-            df_raw = load_data(f)
-        
-        if df_raw is None or df_raw.empty:
-            return False, f"Pusty plik: {filepath.name}"
-            
-        # Validate logic
-        is_valid, error = validate_dataframe(df_raw)
-        if not is_valid:
-            return False, f"Błąd walidacji ({filepath.name}): {error}"
-        
-        df = process_data(df_raw)
-        metrics = calculate_metrics(df, cp)
-        
-        # Calculate NP and TSS
-        if 'watts' in df.columns and len(df) >= 30:
-            np_val = calculate_normalized_power(df)
-            if cp > 0:
-                if_factor = np_val / cp
-                tss = (len(df) * np_val * if_factor) / (cp * 3600) * 100
-            else:
-                if_factor = 0
-                tss = 0
-        else:
-            np_val = metrics.get('avg_watts', 0)
-            if_factor = 0
-            tss = 0
-        
-        # Extract date from filename
-        date_str = extract_date_from_filename(filepath.name)
-        if not date_str:
-            # Use file modification time
-            mod_time = datetime.fromtimestamp(filepath.stat().st_mtime)
-            date_str = mod_time.strftime('%Y-%m-%d')
-        
-        # Create session record
-        record = SessionRecord(
-            date=date_str,
-            filename=filepath.name,
-            duration_sec=len(df),
-            tss=tss,
-            np=np_val,
-            if_factor=if_factor,
-            avg_watts=metrics.get('avg_watts', 0),
-            avg_hr=metrics.get('avg_hr', 0),
-            max_hr=df['heartrate'].max() if 'heartrate' in df.columns else 0,
-            work_kj=metrics.get('work_kj', 0) if 'work_kj' in metrics else (df['watts'].sum() / 1000 if 'watts' in df.columns else 0),
-            avg_cadence=metrics.get('avg_cadence', 0),
-            mmp_5s=df['watts'].rolling(5).mean().max() if 'watts' in df.columns else None,
-            mmp_1m=df['watts'].rolling(60).mean().max() if 'watts' in df.columns else None,
-            mmp_5m=df['watts'].rolling(300).mean().max() if 'watts' in df.columns and len(df) >= 300 else None,
-            mmp_20m=df['watts'].rolling(1200).mean().max() if 'watts' in df.columns and len(df) >= 1200 else None,
+        filepath = Path(filepath)
+        stat = filepath.stat()
+        record, curve, df = _build_session(filepath, cp)
+        SessionCache(store.db_path).write(record.date, filepath, df)
+
+        session_id = store.add_session(record)
+        if curve is not None:
+            mmp_store.add_session_curve(session_id, record.date, curve=curve)
+        ImportManifest(store.db_path).record_many(
+            [(str(filepath.resolve()), stat.st_size, stat.st_mtime_ns,
+              record.date, record.filename, session_id)]
         )
-        
-        store.add_session(record)
-        return True, f"✅ {filepath.name}: TSS={tss:.0f}, NP={np_val:.0f}W"
-        
+        return True, _success_message(record)
+
+    except _RejectedFile as e:
+        return False, str(e)
     except Exception as e:
         return False, f"❌ {filepath.name}: {str(e)}"
 
 
-def import_training_folder(
+def _import_worker(filepath: str, cp: float, db_path: str) -> dict:
+    """Process-pool task: build one session and write its columnar cache.
+
+    Database writes stay in the parent process, which batches them.
+    """
+    path = Path(filepath)
+    try:
+        stat = path.stat()
+        record, curve, df = _build_session(path, cp)
+        SessionCache(Path(db_path)).write(record.date, path, df)
+    except _RejectedFile as e:
+        return {"ok": False, "message": str(e)}
+    except Exception as e:
+        return {"ok": False, "message": f"❌ {path.name}: {str(e)}"}
+
+    return {
+        "ok": True,
+        "message": _success_message(record),
+        "record": record,
+        "curve": None if curve is None else curve.astype(np.float32),
+        "manifest": (filepath, stat.st_size, stat.st_mtime_ns),
+    }
+
+
+def _file_fingerprint(filepath: Path) -> Tuple[int, int]:
+    stat = filepath.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _flush_batch(
+    batch: List[dict], store: SessionStore, mmp_store: MMPStore, manifest: ImportManifest
+) -> None:
+    """Commit a batch of processed sessions in one transaction."""
+    if not batch:
+        return
+    ids = store.add_sessions_bulk([item["record"] for item in batch])
+    for item, session_id in zip(batch, ids, strict=True):
+        if item["curve"] is not None:
+            mmp_store.add_session_curve(session_id, item["record"].date, curve=item["curve"])
+    manifest.record_many(
+        (*item["manifest"], item["record"].date, item["record"].filename, session_id)
+        for item, session_id in zip(batch, ids, strict=True)
+    )
+    batch.clear()
+
+
+def import_training_folder(  # noqa: C901
     folder_path: Optional[Path] = None,
     cp: float = 280,
-    progress_callback: Optional[callable] = None
+    progress_callback: Optional[callable] = None,
+    max_workers: Optional[int] = None,
+    force: bool = False,
+    store: Optional[SessionStore] = None,
 ) -> Tuple[int, int, List[str]]:
-    """Import all CSV files from the training folder.
-    
+    """Import all CSV and FIT files from the training folder.
+
+    Files are processed in a process pool; files whose size and mtime match
+    the import manifest and whose session cache exists are skipped unless
+    ``force`` is set. Each processed
+    session is written once to the Parquet session cache, and database rows
+    are committed in batches of IMPORT_BATCH_SIZE.
+
     Args:
         folder_path: Path to folder (default: 'Treningi CSV')
         cp: Critical Power for calculations
         progress_callback: Optional callback(current, total, message) for progress updates
-        
+        max_workers: Process pool size (default: CPU count); 1 runs in-process
+        force: Re-import files even if unchanged since the last import
+        store: Optional SessionStore instance
+
     Returns:
         Tuple of (success_count, fail_count, messages)
     """
@@ -154,36 +277,82 @@ def import_training_folder(
     if not folder_path.exists():
         return 0, 0, [f"Folder nie istnieje: {folder_path}"]
     
-    # Find all CSV files
-    csv_files = list(folder_path.glob("*.csv")) + list(folder_path.glob("*.CSV"))
-    csv_files = sorted(set(csv_files))  # Remove duplicates, sort
+    csv_files = _session_files(folder_path)
     
     if not csv_files:
-        return 0, 0, ["Brak plików CSV w folderze"]
+        return 0, 0, ["Brak plików CSV/FIT w folderze"]
     
-    store = SessionStore()
+    if store is None:
+        store = SessionStore()
+    mmp_store = MMPStore(store.db_path)
+    manifest = ImportManifest(store.db_path)
+    known = {}
+    if not force:
+        # A file is unchanged only if its session cache is there too (e.g. not
+        # written under an older cache naming)
+        cache = SessionCache(store.db_path)
+        cached = {source for date, _, source in manifest.sources() if cache.exists(date, source)}
+        known = {path: fp for path, fp in manifest.fingerprints().items() if path in cached}
+
+    total = len(csv_files)
+    messages: List[Optional[str]] = [None] * total
+    done = 0
+
+    def report(index: int, message: str) -> None:
+        nonlocal done
+        messages[index] = message
+        done += 1
+        if progress_callback:
+            progress_callback(done, total, message)
+
+    pending = []
+    for i, filepath in enumerate(csv_files):
+        key = str(filepath.resolve())
+        if known.get(key) == _file_fingerprint(filepath):
+            report(i, f"⏭️ {filepath.name}: bez zmian")
+        else:
+            pending.append((i, key))
+
     success_count = 0
     fail_count = 0
-    messages = []
-    
-    for i, filepath in enumerate(csv_files):
-        success, msg = import_single_file(filepath, cp, store)
-        
-        if success:
+    batch: List[dict] = []
+
+    def consume(index: int, result: dict) -> None:
+        nonlocal success_count, fail_count
+        if result["ok"]:
             success_count += 1
+            batch.append(result)
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                _flush_batch(batch, store, mmp_store, manifest)
         else:
             fail_count += 1
-        
-        messages.append(msg)
-        
-        if progress_callback:
-            progress_callback(i + 1, len(csv_files), msg)
-    
+        report(index, result["message"])
+
+    db_path = str(store.db_path)
+    if max_workers == 1 or len(pending) <= 1:
+        for i, key in pending:
+            consume(i, _import_worker(key, cp, db_path))
+    else:
+        # spawn: forking a process that already runs numba/BLAS threads can deadlock
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx) as executor:
+            futures = {
+                executor.submit(_import_worker, key, cp, db_path): i for i, key in pending
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"ok": False, "message": f"❌ {csv_files[i].name}: {str(e)}"}
+                consume(i, result)
+
+    _flush_batch(batch, store, mmp_store, manifest)
     return success_count, fail_count, messages
 
 
 def get_available_files(folder_path: Optional[Path] = None) -> List[dict]:
-    """Get list of available CSV files with their info.
+    """Get list of available CSV and FIT files with their info.
     
     Returns:
         List of dicts with 'name', 'size', 'date' keys
@@ -196,10 +365,8 @@ def get_available_files(folder_path: Optional[Path] = None) -> List[dict]:
     if not folder_path.exists():
         return []
     
-    csv_files = list(folder_path.glob("*.csv")) + list(folder_path.glob("*.CSV"))
-    
     result = []
-    for f in sorted(set(csv_files)):
+    for f in _session_files(folder_path):
         date = extract_date_from_filename(f.name)
         if not date:
             mod_time = datetime.fromtimestamp(f.stat().st_mtime)
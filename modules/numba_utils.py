@@ -210,13 +210,15 @@ def find_peaks_numba(arr: np.ndarray, min_height: float, min_distance: int) -> n
 
 
 # Power calculations
-@njit(cache=True)
 def calculate_w_prime_balance_numba(
     power: np.ndarray, cp: float, w_prime: float, tau: float = 546.0
 ) -> np.ndarray:
     """
     Calculate W' balance using Skiba's algorithm.
 
+    Runs the "constant_tau" kernel of the shared W' engine
+    (modules.calculations.w_prime) with 1-second steps.
+
     Args:
         power: Power values in Watts
         cp: Critical Power
@@ -226,24 +228,9 @@ def calculate_w_prime_balance_numba(
     Returns:
         W' balance array
     """
-    n = len(power)
-    w_bal = np.empty(n)
-    w_bal[0] = w_prime
-
-    for i in range(1, n):
-        dt = 1.0  # Assume 1-second intervals
-
-        if power[i] > cp:
-            # Depletion
-            w_bal[i] = w_bal[i - 1] - (power[i] - cp) * dt
-        else:
-            # Reconstitution
-            w_bal[i] = w_bal[i - 1] + (w_prime - w_bal[i - 1]) * (1 - np.exp(-dt / tau))
-
-        # Clamp to valid range
-        w_bal[i] = max(0.0, min(w_prime, w_bal[i]))
+    from modules.calculations.w_prime import _compute_balance
 
-    return w_bal
+    return _compute_balance(power, None, cp, w_prime, "constant_tau", tau=tau)
 
 
 # Convenience functions that work with or without Numba
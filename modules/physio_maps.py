@@ -7,7 +7,7 @@ Provides scatter plots and drift analysis for Power-HR-SmO2 relationships:
 - Constant-power segment detection
 - HR and SmO2 drift analysis at constant power
 """
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 from dataclasses import dataclass
 import logging
 
@@ -215,6 +215,104 @@ def scatter_power_smo2(
 # Constant Power Segment Detection
 # ============================================================
 
+def _window_stats(
+    watts: np.ndarray, window_size: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Median, min and max of each window ``watts[i:i + window_size]``.
+
+    Covers the start positions ``i < len(watts) - window_size`` scanned by
+    the segment detector. pandas keeps a skiplist for the rolling median and
+    monotonic deques for min/max, so this is O(n log w).
+    """
+    rolling = pd.Series(watts, dtype=np.float64).rolling(window_size)
+    valid = slice(window_size - 1, len(watts) - 1)
+    median = rolling.median().to_numpy()[valid]
+    if watts.dtype.kind == 'f':
+        # np.median keeps the float width of its input
+        median = median.astype(watts.dtype)
+    return median, rolling.min().to_numpy()[valid], rolling.max().to_numpy()[valid]
+
+
+def _first_outside(watts: np.ndarray, start: int, lower: float, upper: float) -> int:
+    """Index of the first sample from ``start`` on outside [lower, upper] (or len)."""
+    n = len(watts)
+    chunk = 256
+    while start < n:
+        block = watts[start:start + chunk]
+        outside = np.flatnonzero((block < lower) | (block > upper))
+        if outside.size:
+            return start + int(outside[0])
+        start += chunk
+        chunk *= 2
+    return n
+
+
+def _scan_segments(
+    watts: np.ndarray,
+    stats: Tuple[np.ndarray, np.ndarray, np.ndarray],
+    tolerance_pct: float,
+    window_size: int
+) -> List[Tuple[int, int, float]]:
+    median, window_min, window_max = stats
+    lower_factor = 1 - tolerance_pct / 100
+    upper_factor = 1 + tolerance_pct / 100
+    # Same precision as the scalar ``median * factor`` of the window-by-window scan
+    bound_dtype = type(median.dtype.type(1) * lower_factor)
+    lower = median.astype(bound_dtype) * lower_factor
+    upper = median.astype(bound_dtype) * upper_factor
+
+    low_power = median < 50
+    stable = ~low_power & (window_min >= lower) & (window_max <= upper)
+    # Windows that are neither low-power nor stable just advance by one sample
+    stops = np.flatnonzero(low_power | stable)
+
+    segments = []
+    i = 0
+    while i < len(median):
+        k = np.searchsorted(stops, i)
+        if k == len(stops):
+            break
+        i = int(stops[k])
+
+        if low_power[i]:  # Skip very low power
+            i += max(window_size // 2, 1)
+            continue
+
+        # Extend segment as far as possible
+        end_idx = _first_outside(watts, i + window_size, lower[i], upper[i])
+        segments.append((i, end_idx, np.mean(watts[i:end_idx])))
+        i = end_idx
+
+    return segments
+
+
+def detect_constant_power_segments_multi(
+    df: pd.DataFrame,
+    tolerances_pct: Sequence[float],
+    min_duration_sec: int = 120
+) -> Dict[float, List[Tuple[int, int, float]]]:
+    """Constant-power segments for several tolerances in one pass.
+
+    The rolling window statistics are computed once and shared; each
+    tolerance then costs a linear scan.
+
+    Returns:
+        Dict mapping each tolerance to its list of (start_idx, end_idx, avg_power)
+    """
+    if 'watts' not in df.columns:
+        return {tol: [] for tol in tolerances_pct}
+
+    watts = df['watts'].fillna(0).values
+    if len(watts) < min_duration_sec:
+        return {tol: [] for tol in tolerances_pct}
+
+    stats = _window_stats(watts, min_duration_sec)
+    return {
+        tol: _scan_segments(watts, stats, tol, min_duration_sec)
+        for tol in tolerances_pct
+    }
+
+
 def detect_constant_power_segments(
     df: pd.DataFrame,
     tolerance_pct: float = 5.0,
@@ -222,6 +320,10 @@ def detect_constant_power_segments(
 ) -> List[Tuple[int, int, float]]:
     """Find segments where power is stable within tolerance.
     
+    A window of ``min_duration_sec`` samples starts a segment when all its
+    samples lie within ``tolerance_pct`` of the window median (>= 50 W); the
+    segment then extends while samples stay within that band.
+
     Args:
         df: DataFrame with 'watts' column
         tolerance_pct: Percentage tolerance around median power
@@ -230,49 +332,9 @@ def detect_constant_power_segments(
     Returns:
         List of (start_idx, end_idx, avg_power) tuples
     """
-    if 'watts' not in df.columns:
-        return []
-    
-    watts = df['watts'].fillna(0).values
-    n = len(watts)
-    
-    if n < min_duration_sec:
-        return []
-    
-    segments = []
-    
-    # Sliding window approach
-    window_size = min_duration_sec
-    
-    i = 0
-    while i < n - window_size:
-        window = watts[i:i + window_size]
-        median_power = np.median(window)
-        
-        if median_power < 50:  # Skip very low power
-            i += window_size // 2
-            continue
-        
-        # Check if window is within tolerance
-        lower = median_power * (1 - tolerance_pct / 100)
-        upper = median_power * (1 + tolerance_pct / 100)
-        
-        if np.all((window >= lower) & (window <= upper)):
-            # Extend segment as far as possible
-            end_idx = i + window_size
-            while end_idx < n:
-                if lower <= watts[end_idx] <= upper:
-                    end_idx += 1
-                else:
-                    break
-            
-            avg_power = np.mean(watts[i:end_idx])
-            segments.append((i, end_idx, avg_power))
-            i = end_idx
-        else:
-            i += 1
-    
-    return segments
+    return detect_constant_power_segments_multi(
+        df, [tolerance_pct], min_duration_sec
+    )[tolerance_pct]
 
 
 def trend_at_constant_power(
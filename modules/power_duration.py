@@ -19,6 +19,8 @@ import pandas as pd
 from scipy.optimize import curve_fit
 import plotly.graph_objects as go
 
+from modules.calculations.mmp import compute_mmp
+
 logger = logging.getLogger(__name__)
 
 
@@ -97,8 +99,8 @@ def compute_max_mean_power(
 ) -> Dict[int, float]:
     """Compute Maximum Mean Power for a list of durations.
     
-    Uses rolling mean and max to find the best average power 
-    achievable for each duration window.
+    Uses the shared cumulative-sum MMP engine to find the best average
+    power achievable for each duration window.
     
     Args:
         power_series: Power values at 1Hz
@@ -110,29 +112,7 @@ def compute_max_mean_power(
     if windows_seconds is None:
         windows_seconds = DEFAULT_DURATIONS
     
-    power = power_series.fillna(0).values
-    n = len(power)
-    
-    results = {}
-    
-    for window in windows_seconds:
-        if n < window:
-            results[window] = None
-            continue
-        
-        # Compute rolling mean using pandas for efficiency
-        rolling_mean = pd.Series(power).rolling(
-            window=window, min_periods=window
-        ).mean()
-        
-        max_power = rolling_mean.max()
-        
-        if pd.notna(max_power):
-            results[window] = float(max_power)
-        else:
-            results[window] = None
-    
-    return results
+    return compute_mmp(power_series.to_numpy(), windows_seconds)
 
 
 def _cp_model(t: np.ndarray, w_prime: float, cp: float) -> np.ndarray:
@@ -0,0 +1,469 @@
+"""
+Ramp Test Report Enrichment.
+
+Runs the physiological analyzers that add sections to a ramp-test report
+(SmO2, cardiovascular, ventilation, biomechanical occlusion,
+thermoregulation, cardiac drift, VO2max), followed by the stages that
+depend on their output (canonical physiology / metabolic engine, limiter
+radar).
+
+The source frame is normalized once - lower-case column names plus the
+aliases the analyzers expect - into a frame of read-only columns that all
+analyzers share (each gets a shallow copy, so added columns stay private
+and in-place writes fail loudly instead of leaking). The independent
+analyzers run concurrently, each with its own timeout; a failing or
+stalled analyzer is logged and skipped. Their partial results are merged
+in declaration order, so the report does not depend on completion order.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ANALYZER_TIMEOUT_SEC = 60.0
+
+CORE_TEMP_COLUMNS = (
+    "core_temperature_smooth",
+    "core_temperature",
+    "core_temp",
+    "core",
+    "temperature",
+    "temp",
+)
+HSI_COLUMNS = ("hsi", "heat_strain_index")
+
+# A partial report: top-level key -> section. Dict sections are merged into
+# an existing section of the same key (e.g. "metrics").
+Partial = Dict[str, Any]
+
+
+@dataclass(frozen=True)
+class Analyzer:
+    """One independent report analyzer.
+
+    ``func(frame, data)`` gets a shallow copy of the normalized source frame
+    and a read-only view of the report so far, and returns a partial report.
+    """
+
+    name: str
+    func: Callable[[pd.DataFrame, Dict[str, Any]], Partial]
+    timeout: float = ANALYZER_TIMEOUT_SEC
+
+
+def normalize_source_frame(source_df: pd.DataFrame) -> pd.DataFrame:
+    """Lower-case, alias-complete copy of ``source_df`` with read-only columns.
+
+    Adds ``SmO2`` (from smo2 / smo2_pct), ``hr`` (from heartrate / heart_rate) and
+    ``seconds`` (sample index, when only ``time`` is present).
+    """
+    columns: Dict[str, np.ndarray] = {}
+    for name in source_df.columns:
+        key = str(name).lower().strip()
+        if key not in columns:
+            columns[key] = source_df[name].to_numpy(copy=True)
+
+    smo2_col = next((c for c in ("smo2", "smo2_pct") if c in columns), None)
+    if smo2_col:
+        columns["SmO2"] = columns[smo2_col]
+    hr_col = next((c for c in ("hr", "heartrate", "heart_rate") if c in columns), None)
+    if hr_col:
+        columns["hr"] = columns[hr_col]
+    if "seconds" not in columns and "time" in columns:
+        columns["seconds"] = np.arange(len(source_df), dtype=np.int64)
+
+    for values in columns.values():
+        values.flags.writeable = False
+    return pd.DataFrame(columns, index=pd.RangeIndex(len(source_df)), copy=False)
+
+
+def _first_column(frame: pd.DataFrame, candidates: Sequence[str]) -> Optional[str]:
+    return next((c for c in candidates if c in frame.columns), None)
+
+
+def _cadence_column(frame: pd.DataFrame) -> Optional[str]:
+    return _first_column(frame, ("cadence", "cad"))
+
+
+# --- Analyzers ---
+
+
+def analyze_smo2(frame: pd.DataFrame, data: Dict[str, Any]) -> Partial:
+    if "SmO2" not in frame.columns:
+        return {}
+    from modules.calculations.smo2_advanced import (
+        analyze_smo2_advanced,
+        format_smo2_metrics_for_report,
+    )
+
+    return {"smo2_advanced": format_smo2_metrics_for_report(analyze_smo2_advanced(frame))}
+
+
+def analyze_cardio(frame: pd.DataFrame, data: Dict[str, Any]) -> Partial:
+    if "hr" not in frame.columns:
+        return {}
+    from modules.calculations.cardio_advanced import (
+        analyze_cardiovascular,
+        format_cardio_metrics_for_report,
+    )
+
+    return {"cardio_advanced": format_cardio_metrics_for_report(analyze_cardiovascular(frame))}
+
+
+def analyze_vent(frame: pd.DataFrame, data: Dict[str, Any]) -> Partial:
+    if not any(c in frame.columns for c in ("ve_lmin", "ve", "tymeventilation")):
+        return {}
+    from modules.calculations.vent_advanced import (
+        analyze_ventilation,
+        format_vent_metrics_for_report,
+    )
+
+    return {"vent_advanced": format_vent_metrics_for_report(analyze_ventilation(frame))}
+
+
+def analyze_occlusion(frame: pd.DataFrame, data: Dict[str, Any]) -> Partial:
+    cad_col = _cadence_column(frame)
+    if "SmO2" not in frame.columns:
+        return {}
+    if "torque" in frame.columns:
+        torque = frame["torque"].to_numpy()
+    elif "watts" in frame.columns and cad_col:
+        # Torque = Power / Angular Velocity, where ω = 2π * rpm / 60
+        angular_vel = np.maximum(2 * np.pi * frame[cad_col].to_numpy() / 60, 0.1)
+        torque = frame["watts"].to_numpy() / angular_vel
+    else:
+        return {}
+
+    from modules.calculations.biomech_occlusion import (
+        analyze_biomech_occlusion,
+        format_occlusion_for_report,
+    )
+
+    smo2 = frame["SmO2"].to_numpy()
+    cadence = frame[cad_col].to_numpy() if cad_col else None
+    if len(torque) == 0 or len(smo2) == 0:
+        return {}
+    occlusion = analyze_biomech_occlusion(torque, smo2, cadence)
+    logger.info(
+        f"[Biomech] Occlusion Index: {occlusion.occlusion_index:.3f} ({occlusion.classification})"
+    )
+    return {"biomech_occlusion": format_occlusion_for_report(occlusion)}
+
+
+def analyze_thermo(frame: pd.DataFrame, data: Dict[str, Any]) -> Partial:
+    core_col = _first_column(frame, CORE_TEMP_COLUMNS)
+    if not core_col:
+        return {}
+    from modules.calculations.thermoregulation import (
+        analyze_thermoregulation,
+        format_thermo_for_report,
+    )
+
+    hsi_col = _first_column(frame, HSI_COLUMNS)
+    core_temp = frame[core_col].to_numpy()
+    time_seconds = (
+        frame["timestamp"].to_numpy()
+        if "timestamp" in frame.columns
+        else np.arange(len(core_temp))
+    )
+    hr = frame["hr"].to_numpy() if "hr" in frame.columns else None
+    power = frame["power"].to_numpy() if "power" in frame.columns else None
+    hsi = frame[hsi_col].to_numpy() if hsi_col else None
+
+    thermo = analyze_thermoregulation(core_temp, time_seconds, hr, power, hsi)
+    logger.info(
+        f"[Thermal] Max Core: {thermo.max_core_temp:.1f}C, "
+        f"Delta/10min: {thermo.delta_per_10min:.2f}C"
+    )
+    return {"thermo_analysis": format_thermo_for_report(thermo)}
+
+
+def analyze_drift(frame: pd.DataFrame, data: Dict[str, Any]) -> Partial:
+    power_col = _first_column(frame, ("watts", "power"))
+    hr_col = _first_column(frame, ("hr", "heartrate", "heart_rate"))
+    if not (power_col and hr_col):
+        return {}
+    from modules.calculations.cardiac_drift import (
+        analyze_cardiac_drift,
+        format_drift_for_report,
+    )
+
+    core_col = _first_column(frame, CORE_TEMP_COLUMNS)
+    hsi_col = _first_column(frame, HSI_COLUMNS)
+    power_arr = frame[power_col].to_numpy()
+    time_arr = (
+        frame["timestamp"].to_numpy() if "timestamp" in frame.columns else np.arange(len(power_arr))
+    )
+    drift_profile = analyze_cardiac_drift(
+        power_arr,
+        frame[hr_col].to_numpy(),
+        time_arr,
+        frame[core_col].to_numpy() if core_col else None,
+        frame["SmO2"].to_numpy() if "SmO2" in frame.columns else None,
+        frame[hsi_col].to_numpy() if hsi_col else None,
+    )
+    logger.info(
+        f"[Cardiac Drift] EF: {drift_profile.ef_start:.2f} → {drift_profile.ef_end:.2f} "
+        f"({drift_profile.delta_ef_pct:+.1f}%), Type: {drift_profile.drift_type}"
+    )
+    # Stored under thermo_analysis for PDF layout access
+    return {"thermo_analysis": {"cardiac_drift": format_drift_for_report(drift_profile)}}
+
+
+def analyze_vo2max(frame: pd.DataFrame, data: Dict[str, Any]) -> Partial:
+    """VO2max from the best 5-min power, with the same method as the UI."""
+    from modules.calculations.metrics import calculate_vo2max
+
+    weight = data.get("metadata", {}).get("rider_weight", 75) or 75
+    power_col = _first_column(frame, ("watts", "power"))
+    if not power_col or weight <= 0:
+        return {}
+
+    # Use SAME method as UI: rolling(window=300).mean().max()
+    mmp_5min = frame[power_col].rolling(window=300).mean().max()
+    if not (pd.notna(mmp_5min) and mmp_5min > 0):
+        return {}
+
+    vo2max_est = calculate_vo2max(mmp_5min, weight)
+    logger.info(
+        f"[VO2max] Calculated: {vo2max_est:.1f} ml/kg/min from MMP5={mmp_5min:.1f}W "
+        "(method: rolling_300s_mean_max)"
+    )
+    # Structured VO2max with full traceability
+    return {
+        "metrics": {
+            "vo2max": round(vo2max_est, 2),
+            "vo2max_metadata": {
+                "value": round(vo2max_est, 2),
+                "mmp_5min_watts": round(mmp_5min, 1),
+                "method": "rolling_300s_mean_max",
+                "source": "persistence_pandas",
+                "confidence": 0.70,
+                "formula": "Sitko et al. 2021: 16.61 + 8.87 * (P / kg)",
+                "weight_kg": weight,
+            },
+        }
+    }
+
+
+# Merge order of the partial results (cardiac drift extends thermo_analysis)
+ANALYZERS: List[Analyzer] = [
+    Analyzer("SmO2 Advanced", analyze_smo2),
+    Analyzer("Cardio Advanced", analyze_cardio),
+    Analyzer("Vent Advanced", analyze_vent),
+    Analyzer("Biomech Occlusion", analyze_occlusion),
+    Analyzer("Thermoregulation", analyze_thermo),
+    Analyzer("Cardiac Drift", analyze_drift),
+    Analyzer("VO2max", analyze_vo2max),
+]
+
+
+def merge_partial(data: Dict[str, Any], partial: Partial) -> None:
+    """Merge one analyzer's partial report into ``data`` (in place)."""
+    for key, section in partial.items():
+        if isinstance(section, dict) and isinstance(data.get(key), dict):
+            data[key].update(section)
+        else:
+            data[key] = section
+
+
+def run_analyzers(
+    frame: pd.DataFrame,
+    data: Dict[str, Any],
+    analyzers: Sequence[Analyzer] = ANALYZERS,
+) -> Dict[str, str]:
+    """Run ``analyzers`` concurrently and merge their results into ``data``.
+
+    Returns:
+        Status per analyzer name: "ok", "failed" or "timeout".
+    """
+    status: Dict[str, str] = {}
+    if not analyzers:
+        return status
+
+    snapshot = dict(data)
+    executor = ThreadPoolExecutor(max_workers=len(analyzers), thread_name_prefix="report-enrich")
+    try:
+        started = time.monotonic()
+        futures = [
+            executor.submit(analyzer.func, frame.copy(deep=False), snapshot)
+            for analyzer in analyzers
+        ]
+        for analyzer, future in zip(analyzers, futures, strict=True):
+            remaining = max(0.0, started + analyzer.timeout - time.monotonic())
+            try:
+                partial = future.result(timeout=remaining)
+            except FutureTimeout:
+                logger.warning(f"[{analyzer.name}] Analysis timed out after {analyzer.timeout}s")
+                status[analyzer.name] = "timeout"
+                continue
+            except Exception as e:
+                logger.warning(f"[{analyzer.name}] Analysis failed: {e}")
+                status[analyzer.name] = "failed"
+                continue
+            merge_partial(data, partial or {})
+            status[analyzer.name] = "ok"
+    finally:
+        # Do not wait for a stalled analyzer; its result is discarded
+        executor.shutdown(wait=False, cancel_futures=True)
+    return status
+
+
+# --- Dependent stages ---
+
+
+def add_canonical_physiology(data: Dict[str, Any]) -> None:
+    """Canonical physiology (single source of truth) and the metabolic strategy."""
+    from modules.calculations.canonical_physio import (
+        build_canonical_physiology,
+        format_canonical_for_report,
+    )
+    from modules.calculations.metabolic_engine import (
+        analyze_metabolic_engine,
+        format_metabolic_strategy_for_report,
+    )
+
+    canonical = build_canonical_physiology(data, data.get("time_series", {}))
+    data["canonical_physiology"] = format_canonical_for_report(canonical)
+
+    cp_watts = canonical.cp_watts.value
+    if cp_watts <= 0:
+        return
+
+    metabolic_strategy = analyze_metabolic_engine(
+        vo2max=canonical.vo2max.value,
+        vo2max_source=canonical.vo2max.source,
+        vo2max_confidence=canonical.vo2max.confidence,
+        cp_watts=cp_watts,
+        w_prime_kj=canonical.w_prime_kj.value or 15,
+        pmax_watts=canonical.pmax_watts.value,
+        weight_kg=canonical.weight_kg.value,
+        ftp_watts=canonical.ftp_watts.value,
+    )
+    formatted = format_metabolic_strategy_for_report(metabolic_strategy)
+
+    # Add alternatives from canonical
+    confidence = canonical.vo2max.confidence
+    formatted["profile"]["vo2max_alternatives"] = canonical.vo2max.alternatives
+    formatted["profile"]["data_quality"] = (
+        "good" if confidence >= 0.7 else ("moderate" if confidence >= 0.5 else "low")
+    )
+    data["metabolic_strategy"] = formatted
+
+
+def limiter_analysis(
+    frame: pd.DataFrame,
+    data: Dict[str, Any],
+    interpretation: Callable[[str], dict],
+) -> Optional[Dict[str, Any]]:
+    """Limiter radar over the best 20-min (FTP) window; None without enough power data."""
+    window_sec = 1200  # 20 min
+    if "watts" not in frame.columns:
+        return None
+
+    rolling_watts = frame["watts"].rolling(window=window_sec, min_periods=window_sec).mean()
+    if rolling_watts.isna().all():
+        return None
+    peak_idx = rolling_watts.idxmax()
+    if pd.isna(peak_idx):
+        return None
+
+    start_idx = max(0, peak_idx - window_sec + 1)
+    df_peak = frame.iloc[start_idx : peak_idx + 1]
+
+    # Calculate percentages
+    pct_hr = 0
+    pct_ve = 0
+    pct_smo2_util = 0
+
+    # HR%
+    if "hr" in frame.columns:
+        peak_hr_avg = df_peak["hr"].mean()
+        max_hr = frame["hr"].max()
+        pct_hr = (peak_hr_avg / max_hr * 100) if max_hr > 0 else 0
+
+    # VE%
+    ve_col = _first_column(frame, ("tymeventilation", "ve", "ventilation"))
+    if ve_col:
+        peak_ve_avg = df_peak[ve_col].mean()
+        max_ve = frame[ve_col].max() * 1.1  # Estimate VEmax
+        pct_ve = (peak_ve_avg / max_ve * 100) if max_ve > 0 else 0
+
+    # SmO2 utilization (desaturation)
+    if "smo2" in frame.columns:
+        pct_smo2_util = 100 - df_peak["smo2"].mean()
+
+    # Power%
+    peak_w_avg = df_peak["watts"].mean()
+    cp_watts = (
+        data.get("canonical_physiology", {}).get("summary", {}).get("cp_watts", 0) or peak_w_avg
+    )
+    pct_power = (peak_w_avg / cp_watts * 100) if cp_watts > 0 else 0
+
+    # Determine limiting factor
+    limiting_factor = "Serce"
+    if pct_ve >= max(pct_hr, pct_smo2_util):
+        limiting_factor = "Płuca"
+    elif pct_smo2_util >= pct_hr:
+        limiting_factor = "Mięśnie"
+
+    return {
+        "window": "20 min (FTP)",
+        "peak_power": round(peak_w_avg, 0),
+        "pct_hr": round(pct_hr, 1),
+        "pct_ve": round(pct_ve, 1),
+        "pct_smo2_util": round(pct_smo2_util, 1),
+        "pct_power": round(pct_power, 1),
+        "limiting_factor": limiting_factor,
+        "interpretation": interpretation(limiting_factor),
+    }
+
+
+def enrich_report(
+    data: Dict[str, Any],
+    source_df: Optional[pd.DataFrame],
+    interpretation: Callable[[str], dict],
+) -> Dict[str, str]:
+    """Add all analysis sections to ``data`` (in place).
+
+    Args:
+        data: Report dict (``RampTestResult.to_dict()`` plus time series)
+        source_df: Source session frame; without it only the canonical
+            physiology is built
+        interpretation: Limiting factor -> interpretation text
+
+    Returns:
+        Status per stage name ("ok", "failed", "timeout", "skipped").
+    """
+    frame = None
+    status: Dict[str, str] = {}
+    if source_df is not None and len(source_df) > 0:
+        frame = normalize_source_frame(source_df)
+        status.update(run_analyzers(frame, data))
+
+    try:
+        add_canonical_physiology(data)
+        status["Canonical Physio"] = "ok"
+    except Exception as e:
+        logger.warning(f"[Canonical Physio / Metabolic Engine] Analysis failed: {e}")
+        status["Canonical Physio"] = "failed"
+
+    if frame is None:
+        status["Limiter Analysis"] = "skipped"
+        return status
+    try:
+        limiter = limiter_analysis(frame, data, interpretation)
+        if limiter is not None:
+            data["limiter_analysis"] = limiter
+        status["Limiter Analysis"] = "ok"
+    except Exception as e:
+        logger.warning(f"[Limiter Analysis] Calculation failed: {e}")
+        status["Limiter Analysis"] = "failed"
+    return status
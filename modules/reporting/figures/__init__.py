@@ -18,6 +18,7 @@ from .limiters import generate_radar_chart, generate_vlamax_balance_chart
 from .vent_full import generate_full_vent_chart
 from .drift import generate_power_hr_scatter, generate_power_smo2_scatter, generate_drift_heatmap
 from .biomech import generate_biomech_chart, generate_torque_smo2_chart
+from .renderer import FIGURES, render_figures
 
 
 def generate_all_ramp_figures(
@@ -45,8 +46,6 @@ def generate_all_ramp_figures(
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
     
-    session_id = report_data.get("metadata", {}).get("session_id", "unknown")[:8]
-    
     # Handle config as dict if passed, or use attributes
     if isinstance(config, dict):
         ext = config.get('format', 'png')
@@ -58,52 +57,11 @@ def generate_all_ramp_figures(
         if hasattr(config, '__dict__'):
             config.__dict__['manual_overrides'] = manual_overrides
     
-    paths = {}
-    failed_charts = []
-    
-    # helper to generate path and run function
-    def add_fig(name, fn, args=None, needs_df=True):
-        fpath = output_path / f"{name}_{session_id}.{ext}"
-        try:
-            if needs_df:
-                fn(report_data, config, str(fpath), source_df=source_df)
-            else:
-                fn(report_data, config, str(fpath))
-            paths[name] = str(fpath)
-            logger.info(f"[Figures] Generated: {name}")
-        except Exception as e:
-            logger.error(f"Failed to generate {name}: {e}")
-            failed_charts.append(f"{name}: {e}")
+    # Charts render in worker processes; unchanged ones come from the cache
+    paths, failed_charts = render_figures(
+        report_data, output_path, config, source_df, manual_overrides, ext=ext
+    )
 
-    # 1. Core
-    add_fig("ramp_profile", generate_ramp_profile_chart)
-    add_fig("smo2_power", generate_smo2_power_chart)
-    add_fig("pdc_curve", generate_pdc_chart, needs_df=False)
-    add_fig("ve_profile", generate_ve_profile_chart)
-    
-    # 2. Thermal
-    add_fig("thermal_hsi", generate_thermal_chart)
-    add_fig("thermal_efficiency", generate_efficiency_chart)
-    
-    # 3. Model & Limiters
-    add_fig("limiters_radar", generate_radar_chart)
-    add_fig("vlamax_balance", generate_vlamax_balance_chart)
-    
-    # 4. Drift & Decoupling
-    add_fig("drift_hr", generate_power_hr_scatter)
-    add_fig("drift_smo2", generate_power_smo2_scatter)
-    
-    # NEW: Heatmaps
-    add_fig("drift_heatmap_hr", lambda *a, **k: generate_drift_heatmap(*a, mode="hr", **k))
-    add_fig("drift_heatmap_smo2", lambda *a, **k: generate_drift_heatmap(*a, mode="smo2", **k))
-    
-    # 5. Biomech
-    add_fig("biomech_summary", generate_biomech_chart)
-    add_fig("biomech_torque_smo2", generate_torque_smo2_chart)
-    
-    # 6. Optional: Vent Full
-    add_fig("vent_full", generate_full_vent_chart)
-    
     # Summary log
     logger.info(f"[Figures] Summary: {len(paths)} generated, {len(failed_charts)} failed")
     if failed_charts:
@@ -0,0 +1,449 @@
+"""
+Parallel, cached rendering of the ramp-test report figures.
+
+Figures are rendered in a pool of spawned worker processes (matplotlib Agg
+backend). The source DataFrame and the report dict are placed once in a
+shared-memory block; each worker attaches to it once per job instead of
+receiving a pickled copy per chart.
+
+Every PNG is cached under a hash of exactly the inputs its chart reads:
+the report, the source data, the chart options and only the manual
+overrides that chart uses. Regenerating a PDF after changing e.g. the
+manual VT1 therefore redraws just the charts showing VT1 and copies the
+rest from the cache.
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import pickle
+import shutil
+import threading
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from importlib import import_module
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Bump when chart code changes in a way that must invalidate cached PNGs
+RENDERER_VERSION = 1
+
+FIGURE_WORKERS = max(1, min(4, (os.cpu_count() or 1) - 1))
+MAX_CACHE_FILES = 512
+
+
+@dataclass(frozen=True)
+class FigureSpec:
+    """One report chart: ``modules.reporting.figures.<module>.<func>``."""
+
+    name: str
+    module: str
+    func: str
+    needs_df: bool = True
+    kwargs: Tuple[Tuple[str, Any], ...] = ()
+    # manual_overrides keys the chart reads
+    overrides: Tuple[str, ...] = ()
+
+
+# Rendering (and PDF) order
+FIGURES: Tuple[FigureSpec, ...] = (
+    # 1. Core
+    FigureSpec(
+        "ramp_profile",
+        "ramp_profile",
+        "generate_ramp_profile_chart",
+        overrides=("manual_vt1_watts", "manual_vt2_watts"),
+    ),
+    FigureSpec(
+        "smo2_power", "smo2_vs_power", "generate_smo2_power_chart", overrides=("smo2_lt1_m",)
+    ),
+    FigureSpec("pdc_curve", "cp_curve", "generate_pdc_chart", needs_df=False),
+    FigureSpec("ve_profile", "ve_profile", "generate_ve_profile_chart"),
+    # 2. Thermal
+    FigureSpec("thermal_hsi", "thermal", "generate_thermal_chart"),
+    FigureSpec("thermal_efficiency", "thermal", "generate_efficiency_chart"),
+    # 3. Model & Limiters
+    FigureSpec("limiters_radar", "limiters", "generate_radar_chart"),
+    FigureSpec("vlamax_balance", "limiters", "generate_vlamax_balance_chart"),
+    # 4. Drift & Decoupling
+    FigureSpec("drift_hr", "drift", "generate_power_hr_scatter"),
+    FigureSpec("drift_smo2", "drift", "generate_power_smo2_scatter"),
+    FigureSpec("drift_heatmap_hr", "drift", "generate_drift_heatmap", kwargs=(("mode", "hr"),)),
+    FigureSpec(
+        "drift_heatmap_smo2", "drift", "generate_drift_heatmap", kwargs=(("mode", "smo2"),)
+    ),
+    # 5. Biomech
+    FigureSpec("biomech_summary", "biomech", "generate_biomech_chart"),
+    FigureSpec("biomech_torque_smo2", "biomech", "generate_torque_smo2_chart"),
+    # 6. Optional: Vent Full
+    FigureSpec("vent_full", "vent_full", "generate_full_vent_chart"),
+)
+
+
+# --- Cache keys ---
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, Mapping):  # e.g. a lazily loaded time series
+        return dict(obj)
+    return repr(obj)
+
+
+def _digest(obj: Any) -> str:
+    payload = json.dumps(obj, sort_keys=True, default=_json_default, ensure_ascii=False)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _config_items(config: Any) -> Dict[str, Any]:
+    if isinstance(config, dict):
+        items = config
+    else:
+        items = getattr(config, "__dict__", {})
+    return {k: v for k, v in items.items() if k != "manual_overrides"}
+
+
+def figure_key(
+    spec: FigureSpec,
+    report_digest: str,
+    frame_digest: str,
+    config_digest: str,
+    manual_overrides: Dict[str, Any],
+    ext: str,
+) -> str:
+    """Cache key of one chart: its own inputs only."""
+    used_overrides = {k: manual_overrides.get(k) for k in spec.overrides}
+    return _digest(
+        [
+            RENDERER_VERSION,
+            spec.name,
+            spec.module,
+            spec.func,
+            list(spec.kwargs),
+            report_digest,
+            frame_digest if spec.needs_df else "",
+            config_digest,
+            used_overrides,
+            ext,
+        ]
+    )
+
+
+class FigureCache:
+    """Rendered charts on disk, one file per cache key (oldest pruned)."""
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_files: int = MAX_CACHE_FILES):
+        if cache_dir is None:
+            from modules.config import Config
+
+            cache_dir = Path(Config.DATA_DIR) / "cache" / "figures"
+        self.cache_dir = Path(cache_dir)
+        self.max_files = max_files
+
+    def path_for(self, key: str, ext: str) -> Path:
+        return self.cache_dir / f"{key}.{ext}"
+
+    def fetch(self, key: str, ext: str, dest: Path) -> bool:
+        """Copy a cached chart to ``dest``; False on a miss."""
+        path = self.path_for(key, ext)
+        try:
+            shutil.copyfile(path, dest)
+        except OSError:
+            return False
+        os.utime(path)  # keep recently used charts when pruning
+        return True
+
+    def store(self, key: str, ext: str, src: Path) -> None:
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self.path_for(key, ext)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            shutil.copyfile(src, tmp)
+            tmp.replace(path)
+            self._prune()
+        except OSError as e:
+            logger.debug(f"[Figures] Cache store failed for {src}: {e}")
+
+    def _prune(self) -> None:
+        files = list(self.cache_dir.glob("*.*"))
+        if len(files) <= self.max_files:
+            return
+        files.sort(key=lambda p: p.stat().st_mtime)
+        for path in files[: len(files) - self.max_files]:
+            path.unlink(missing_ok=True)
+
+
+# --- Shared memory payload ---
+
+
+class SharedPayload:
+    """Report dict and source frame in one shared-memory block.
+
+    Numeric, boolean and datetime columns are stored as raw buffers (other
+    columns are not used by the charts and are dropped); the report is
+    stored pickled. ``descriptor`` is all a worker needs to attach.
+    """
+
+    _ALIGN = 64
+
+    def __init__(self, report_data: Dict[str, Any], source_df: Optional[pd.DataFrame]):
+        report_bytes = pickle.dumps(report_data, protocol=pickle.HIGHEST_PROTOCOL)
+        arrays: List[Tuple[str, np.ndarray]] = []
+        index = None
+        if source_df is not None:
+            for name in source_df.columns:
+                values = source_df[name].to_numpy()
+                if values.dtype.kind in "biufcmM":
+                    arrays.append((name, np.ascontiguousarray(values)))
+            if not isinstance(source_df.index, pd.RangeIndex):
+                index = np.ascontiguousarray(source_df.index.to_numpy())
+                if index.dtype.kind not in "biufcmM":
+                    index = None
+
+        layout = []
+        offset = 0
+
+        def reserve(nbytes: int) -> int:
+            nonlocal offset
+            start = offset
+            offset += -(-nbytes // self._ALIGN) * self._ALIGN
+            return start
+
+        report_offset = reserve(len(report_bytes))
+        for name, values in arrays:
+            layout.append((name, values.dtype.str, reserve(values.nbytes)))
+        index_spec = (index.dtype.str, reserve(index.nbytes)) if index is not None else None
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        buf = self.shm.buf
+        buf[report_offset : report_offset + len(report_bytes)] = report_bytes
+        for (_, values), (_, _, start) in zip(arrays, layout, strict=True):
+            buf[start : start + values.nbytes] = values.view(np.uint8).reshape(-1)
+        if index is not None:
+            buf[index_spec[1] : index_spec[1] + index.nbytes] = index.view(np.uint8).reshape(-1)
+
+        self.descriptor = {
+            "name": self.shm.name,
+            "report": (report_offset, len(report_bytes)),
+            "has_frame": source_df is not None,
+            "n_rows": len(source_df) if source_df is not None else 0,
+            "columns": layout,
+            "index": index_spec,
+        }
+
+    def close(self) -> None:
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def read_payload(
+    descriptor: Dict[str, Any], buf: memoryview
+) -> Tuple[Dict[str, Any], Optional[pd.DataFrame]]:
+    """Report dict and an independent copy of the frame from a payload buffer."""
+    offset, size = descriptor["report"]
+    report = pickle.loads(buf[offset : offset + size])
+    if not descriptor["has_frame"]:
+        return report, None
+
+    n = descriptor["n_rows"]
+
+    def read(dtype: str, start: int) -> np.ndarray:
+        return np.frombuffer(buf, dtype=np.dtype(dtype), count=n, offset=start).copy()
+
+    columns = {name: read(dtype, start) for name, dtype, start in descriptor["columns"]}
+    index = read(*descriptor["index"]) if descriptor["index"] else pd.RangeIndex(n)
+    return report, pd.DataFrame(columns, index=index, copy=False)
+
+
+# --- Rendering ---
+
+
+def render_figure(
+    spec: FigureSpec,
+    report_data: Dict[str, Any],
+    config: Any,
+    output_path: str,
+    source_df: Optional[pd.DataFrame],
+) -> str:
+    """Render one chart to ``output_path`` in the calling process."""
+    func = getattr(import_module(f"modules.reporting.figures.{spec.module}"), spec.func)
+    kwargs = dict(spec.kwargs)
+    if spec.needs_df:
+        kwargs["source_df"] = source_df
+    func(report_data, config, output_path, **kwargs)
+    return output_path
+
+
+# Worker state: the payload of the job being rendered
+_worker_payload: Dict[str, Any] = {}
+
+
+def _init_worker() -> None:
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+
+def _render_in_worker(
+    descriptor: Dict[str, Any], spec: FigureSpec, config: Any, output_path: str
+) -> str:
+    if _worker_payload.get("name") != descriptor["name"]:
+        shm = shared_memory.SharedMemory(name=descriptor["name"])
+        try:
+            report, frame = read_payload(descriptor, shm.buf)
+        finally:
+            shm.close()
+        _worker_payload.clear()
+        _worker_payload.update(name=descriptor["name"], report=report, frame=frame)
+
+    frame = _worker_payload["frame"]
+    # Charts may add or modify columns; each gets its own copy
+    source_df = frame.copy() if frame is not None else None
+    return render_figure(spec, _worker_payload["report"], config, output_path, source_df)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Shared worker pool; workers stay warm (matplotlib imported) between reports."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a process that already runs numba/BLAS threads can deadlock
+            ctx = multiprocessing.get_context("spawn")
+            _pool = ProcessPoolExecutor(
+                max_workers=FIGURE_WORKERS, mp_context=ctx, initializer=_init_worker
+            )
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(shutdown_pool)
+
+
+def render_figures(  # noqa: C901
+    report_data: Dict[str, Any],
+    output_path: Path,
+    config: Any,
+    source_df: Optional[pd.DataFrame],
+    manual_overrides: Dict[str, Any],
+    ext: str = "png",
+    specs: Tuple[FigureSpec, ...] = FIGURES,
+    cache: Optional[FigureCache] = None,
+    parallel: bool = True,
+) -> Tuple[Dict[str, str], List[str]]:
+    """Render ``specs`` into ``output_path``, reusing cached charts.
+
+    Returns:
+        (paths by chart name in ``specs`` order, failure messages)
+    """
+    cache = cache if cache is not None else FigureCache()
+    session_id = report_data.get("metadata", {}).get("session_id", "unknown")[:8]
+
+    report_digest = _digest(report_data)
+    frame_digest = ""
+    if source_df is not None:
+        from modules.fingerprint import fingerprint
+
+        frame_digest = fingerprint(source_df)
+    config_digest = _digest(_config_items(config))
+
+    targets = {spec.name: output_path / f"{spec.name}_{session_id}.{ext}" for spec in specs}
+    keys = {
+        spec.name: figure_key(
+            spec, report_digest, frame_digest, config_digest, manual_overrides, ext
+        )
+        for spec in specs
+    }
+
+    rendered: Dict[str, str] = {}
+    failures: List[str] = []
+    missing = []
+    for spec in specs:
+        if cache.fetch(keys[spec.name], ext, targets[spec.name]):
+            rendered[spec.name] = str(targets[spec.name])
+            logger.info(f"[Figures] Cached: {spec.name}")
+        else:
+            missing.append(spec)
+
+    def done(spec: FigureSpec) -> None:
+        rendered[spec.name] = str(targets[spec.name])
+        cache.store(keys[spec.name], ext, targets[spec.name])
+        logger.info(f"[Figures] Generated: {spec.name}")
+
+    def failed(spec: FigureSpec, e: Exception) -> None:
+        logger.error(f"Failed to generate {spec.name}: {e}")
+        failures.append(f"{spec.name}: {e}")
+
+    remaining = list(missing)
+    if parallel and FIGURE_WORKERS > 1 and len(missing) > 1:
+        payload = None
+        try:
+            pickle.dumps(config)  # fails here rather than inside every task
+            payload = SharedPayload(report_data, source_df)
+            pool = _get_pool()
+            futures = [
+                (
+                    spec,
+                    pool.submit(
+                        _render_in_worker,
+                        payload.descriptor,
+                        spec,
+                        config,
+                        str(targets[spec.name]),
+                    ),
+                )
+                for spec in missing
+            ]
+            for spec, future in futures:
+                try:
+                    future.result()
+                    done(spec)
+                except BrokenProcessPool:
+                    raise
+                except Exception as e:
+                    failed(spec, e)
+                remaining.remove(spec)
+        except (BrokenProcessPool, OSError, pickle.PicklingError, TypeError) as e:
+            # Fall back to rendering the rest in this process
+            logger.warning(f"[Figures] Parallel rendering unavailable: {e}")
+            shutdown_pool()
+        finally:
+            if payload is not None:
+                payload.close()
+
+    for spec in remaining:
+        try:
+            render_figure(spec, report_data, config, str(targets[spec.name]), source_df)
+            done(spec)
+        except Exception as e:
+            failed(spec, e)
+
+    ordered = {spec.name: rendered[spec.name] for spec in specs if spec.name in rendered}
+    return ordered, failures
@@ -20,6 +20,8 @@ logger = logging.getLogger(__name__)
 
 from models.results import RampTestResult
 from modules.calculations.version import RAMP_METHOD_VERSION
+from modules.reporting.enrichment import enrich_report
+from modules.reporting.timeseries_store import resolve_time_series, write_time_series
 
 # canonical version of the JSON structure
 CANONICAL_SCHEMA = "ramp_test_result_v1.json"
@@ -197,15 +199,6 @@ def save_ramp_test_report(  # noqa: C901
     # 1. Prepare data dictionary
     data = result.to_dict()
 
-    # Initialize analysis_df for limiter analysis (set inside source_df block)
-    analysis_df = None
-    core_col = None
-    smo2_col = None
-    hsi_col = None
-
-    # 1.1 Add time series if source_df is available (for regeneration support)
-    data = result.to_dict()
-
     # 1.1 Add time series if source_df is available (for regeneration support)
     if source_df is not None and len(source_df) > 0:
         df_ts = source_df.copy()
@@ -250,460 +243,10 @@ def save_ramp_test_report(  # noqa: C901
 
         data["time_series"] = ts_data
 
-        # 1.2 Run advanced SmO2 analysis if SmO2 data available
-        if "smo2_pct" in ts_data or "smo2" in df_ts.columns:
-            try:
-                from modules.calculations.smo2_advanced import (
-                    analyze_smo2_advanced,
-                    format_smo2_metrics_for_report,
-                )
-
-                # Prepare DataFrame for analysis
-                analysis_df = df_ts.copy()
-                # Normalize column names
-                if "smo2" in analysis_df.columns:
-                    analysis_df["SmO2"] = analysis_df["smo2"]
-                elif "smo2_pct" in analysis_df.columns:
-                    analysis_df["SmO2"] = analysis_df["smo2_pct"]
-
-                if "seconds" not in analysis_df.columns and "time" in analysis_df.columns:
-                    analysis_df["seconds"] = range(len(analysis_df))
-
-                smo2_metrics = analyze_smo2_advanced(analysis_df)
-                data["smo2_advanced"] = format_smo2_metrics_for_report(smo2_metrics)
-
-            except Exception as e:
-                logger.warning(f"[SmO2 Advanced] Analysis failed: {e}")
-
-        # 1.3 Run cardiovascular analysis if HR data available
-        if "hr_bpm" in ts_data or "hr" in df_ts.columns:
-            try:
-                from modules.calculations.cardio_advanced import (
-                    analyze_cardiovascular,
-                    format_cardio_metrics_for_report,
-                )
-
-                analysis_df = df_ts.copy()
-                if "hr" not in analysis_df.columns and "heartrate" in analysis_df.columns:
-                    analysis_df["hr"] = analysis_df["heartrate"]
-
-                cardio_metrics = analyze_cardiovascular(analysis_df)
-                data["cardio_advanced"] = format_cardio_metrics_for_report(cardio_metrics)
-
-            except Exception as e:
-                logger.warning(f"[Cardio Advanced] Analysis failed: {e}")
-
-        # 1.4 Run ventilation analysis if VE data available
-        if "ve_lmin" in ts_data or any(col in df_ts.columns for col in ["ve", "tymeventilation"]):
-            try:
-                from modules.calculations.vent_advanced import (
-                    analyze_ventilation,
-                    format_vent_metrics_for_report,
-                )
-
-                analysis_df = df_ts.copy()
-                vent_metrics = analyze_ventilation(analysis_df)
-                data["vent_advanced"] = format_vent_metrics_for_report(vent_metrics)
-
-            except Exception as e:
-                logger.warning(f"[Vent Advanced] Analysis failed: {e}")
-
-        # 1.5 Run biomechanical occlusion analysis if torque and SmO2 available
-        has_torque = "torque_nm" in ts_data or "torque" in df_ts.columns
-        has_smo2 = "smo2_pct" in ts_data or "smo2" in df_ts.columns
-        has_power = "power_watts" in ts_data or "watts" in df_ts.columns
-        has_cadence = (
-            "cadence_rpm" in ts_data or "cadence" in df_ts.columns or "cad" in df_ts.columns
-        )
-
-        if (has_torque or (has_power and has_cadence)) and has_smo2:
-            try:
-                import numpy as np
-                from modules.calculations.biomech_occlusion import (
-                    analyze_biomech_occlusion,
-                    format_occlusion_for_report,
-                )
-                from modules.calculations.thermoregulation import (
-                    analyze_thermoregulation,
-                    format_thermo_for_report,
-                )
-
-                analysis_df = df_ts.copy()
-
-                # Get torque (calculate from power/cadence if needed)
-                if "torque" in analysis_df.columns:
-                    torque = analysis_df["torque"].values
-                elif "watts" in analysis_df.columns and (
-                    "cadence" in analysis_df.columns or "cad" in analysis_df.columns
-                ):
-                    power = analysis_df["watts"].values
-                    cad_col = "cadence" if "cadence" in analysis_df.columns else "cad"
-                    cadence = analysis_df[cad_col].values
-                    # Torque = Power / Angular Velocity, where ω = 2π * rpm / 60
-                    angular_vel = 2 * np.pi * cadence / 60
-                    angular_vel[angular_vel < 0.1] = 0.1  # Avoid div by zero
-                    torque = power / angular_vel
-                else:
-                    torque = np.array([])
-
-                # Get SmO2
-                smo2_col = "smo2" if "smo2" in analysis_df.columns else "smo2_pct"
-                smo2 = (
-                    analysis_df[smo2_col].values
-                    if smo2_col in analysis_df.columns
-                    else np.array([])
-                )
-
-                # Get cadence if available
-                cadence = None
-                if "cadence" in analysis_df.columns:
-                    cadence = analysis_df["cadence"].values
-                elif "cad" in analysis_df.columns:
-                    cadence = analysis_df["cad"].values
-
-                if len(torque) > 0 and len(smo2) > 0:
-                    occlusion = analyze_biomech_occlusion(torque, smo2, cadence)
-                    data["biomech_occlusion"] = format_occlusion_for_report(occlusion)
-                    logger.info(
-                        f"[Biomech] Occlusion Index: {occlusion.occlusion_index:.3f} ({occlusion.classification})"
-                    )
-
-            except Exception as e:
-                logger.warning(f"[Biomech Occlusion] Analysis failed: {e}")
-
-            # 1.4.2 Thermoregulation Analysis
-            try:
-                # Get Core Temp and HSI - use same aliases as thermal.py
-                core_col = None
-                for c in [
-                    "core_temperature_smooth",
-                    "core_temperature",
-                    "core_temp",
-                    "core",
-                    "temperature",
-                    "temp",
-                ]:
-                    if c in analysis_df.columns:
-                        core_col = c
-                        break
-
-                hsi_col = None
-                for c in ["hsi", "heat_strain_index"]:
-                    if c in analysis_df.columns:
-                        hsi_col = c
-                        break
-
-                if core_col:
-                    core_temp = analysis_df[core_col].values
-                    time_seconds = (
-                        analysis_df["timestamp"].values
-                        if "timestamp" in analysis_df.columns
-                        else np.arange(len(core_temp))
-                    )
-                    hr = analysis_df["hr"].values if "hr" in analysis_df.columns else None
-                    power = analysis_df["power"].values if "power" in analysis_df.columns else None
-                    hsi = analysis_df[hsi_col].values if hsi_col else None
-
-                    thermo = analyze_thermoregulation(core_temp, time_seconds, hr, power, hsi)
-                    data["thermo_analysis"] = format_thermo_for_report(thermo)
-                    logger.info(
-                        f"[Thermal] Max Core: {thermo.max_core_temp:.1f}C, Delta/10min: {thermo.delta_per_10min:.2f}C"
-                    )
-            except Exception as e:
-                logger.warning(f"[Thermoregulation] Analysis failed: {e}")
-
-        # === CARDIAC DRIFT ANALYSIS ===
-        try:
-            from modules.calculations.cardiac_drift import (
-                analyze_cardiac_drift,
-                format_drift_for_report,
-            )
-
-            # Get power and HR columns
-            power_col = next((c for c in ["watts", "power"] if c in analysis_df.columns), None)
-            hr_col = next(
-                (c for c in ["hr", "heartrate", "heart_rate"] if c in analysis_df.columns), None
-            )
-            time_col = "timestamp" if "timestamp" in analysis_df.columns else None
-
-            if power_col and hr_col:
-                power_arr = analysis_df[power_col].values
-                hr_arr = analysis_df[hr_col].values
-                time_arr = analysis_df[time_col].values if time_col else np.arange(len(power_arr))
-
-                # Get optional signals
-                core_arr = analysis_df[core_col].values if core_col else None
-                smo2_arr = analysis_df[smo2_col].values if smo2_col in analysis_df.columns else None
-                hsi_arr = analysis_df[hsi_col].values if hsi_col else None
-
-                drift_profile = analyze_cardiac_drift(
-                    power_arr, hr_arr, time_arr, core_arr, smo2_arr, hsi_arr
-                )
-
-                # Store under thermo_analysis for PDF layout access
-                if "thermo_analysis" not in data:
-                    data["thermo_analysis"] = {}
-                data["thermo_analysis"]["cardiac_drift"] = format_drift_for_report(drift_profile)
-                logger.info(
-                    f"[Cardiac Drift] EF: {drift_profile.ef_start:.2f} → {drift_profile.ef_end:.2f} ({drift_profile.delta_ef_pct:+.1f}%), Type: {drift_profile.drift_type}"
-                )
-        except Exception as e:
-            logger.warning(f"[Cardiac Drift] Analysis failed: {e}")
-
-    # 1.5 Calculate VO2max using same method as UI (pandas rolling)
-    # This ensures consistency between UI KPI display and PDF report
-    if source_df is not None and len(source_df) > 0:
-        try:
-            import pandas as pd
-            from modules.calculations.metrics import calculate_vo2max
-
-            df_calc = source_df.copy()
-            df_calc.columns = df_calc.columns.str.lower().str.strip()
-
-            # Get weight
-            weight = data.get("metadata", {}).get("rider_weight", 75) or 75
-
-            # Find power column
-            power_col = None
-            for col in ["watts", "power"]:
-                if col in df_calc.columns:
-                    power_col = col
-                    break
-
-            if power_col and weight > 0:
-                # Use SAME method as UI: rolling(window=300).mean().max()
-                mmp_5min = df_calc[power_col].rolling(window=300).mean().max()
-
-                if pd.notna(mmp_5min) and mmp_5min > 0:
-                    vo2max_est = calculate_vo2max(mmp_5min, weight)
-
-                    # Store in metrics object with RICH METADATA DEFINITION
-                    if "metrics" not in data:
-                        data["metrics"] = {}
-
-                    # Structured VO2max with full traceability
-                    data["metrics"]["vo2max"] = round(vo2max_est, 2)
-                    data["metrics"]["vo2max_metadata"] = {
-                        "value": round(vo2max_est, 2),
-                        "mmp_5min_watts": round(mmp_5min, 1),
-                        "method": "rolling_300s_mean_max",
-                        "source": "persistence_pandas",
-                        "confidence": 0.70,
-                        "formula": "Sitko et al. 2021: 16.61 + 8.87 * (P / kg)",
-                        "weight_kg": weight,
-                    }
-
-                    logger.info(
-                        f"[VO2max] Calculated: {vo2max_est:.1f} ml/kg/min from MMP5={mmp_5min:.1f}W (method: rolling_300s_mean_max)"
-                    )
-
-        except Exception as e:
-            logger.warning(f"[VO2max] Calculation failed: {e}")
-
-    # 1.6 Build CANONICAL PHYSIOLOGY (Single Source of Truth)
-    try:
-        from modules.calculations.canonical_physio import (
-            build_canonical_physiology,
-            format_canonical_for_report,
-        )
-
-        time_series = data.get("time_series", {})
-        canonical = build_canonical_physiology(data, time_series)
-
-        # Store canonical physiology in data
-        data["canonical_physiology"] = format_canonical_for_report(canonical)
-
-        # 1.6 Run metabolic engine with CANONICAL values
-        from modules.calculations.metabolic_engine import (
-            analyze_metabolic_engine,
-            format_metabolic_strategy_for_report,
-        )
-
-        cp_watts = canonical.cp_watts.value
-        vo2max = canonical.vo2max.value
-        weight_kg = canonical.weight_kg.value
-        w_prime_kj = canonical.w_prime_kj.value or 15
-        pmax = canonical.pmax_watts.value
-
-        if cp_watts > 0:
-            metabolic_strategy = analyze_metabolic_engine(
-                vo2max=vo2max,
-                vo2max_source=canonical.vo2max.source,
-                vo2max_confidence=canonical.vo2max.confidence,
-                cp_watts=cp_watts,
-                w_prime_kj=w_prime_kj,
-                pmax_watts=pmax,
-                weight_kg=weight_kg,
-                ftp_watts=canonical.ftp_watts.value,
-            )
-
-            formatted = format_metabolic_strategy_for_report(metabolic_strategy)
-
-            # Add alternatives from canonical
-            formatted["profile"]["vo2max_alternatives"] = canonical.vo2max.alternatives
-            formatted["profile"]["data_quality"] = (
-                "good"
-                if canonical.vo2max.confidence >= 0.7
-                else ("moderate" if canonical.vo2max.confidence >= 0.5 else "low")
-            )
-
-            data["metabolic_strategy"] = formatted
-
-    except Exception as e:
-        logger.warning(f"[Canonical Physio / Metabolic Engine] Analysis failed: {e}")
-        import traceback
-
-        logger.error(traceback.format_exc())
-
-    # 1.7 Limiter Analysis (20min FTP window for radar chart)
-    # Only run if analysis_df is available (requires source_df)
-    if analysis_df is not None:
-        try:
-            # Calculate 20min MMP window
-            window_sec = 1200  # 20 min
-            if "watts" in analysis_df.columns:
-                analysis_df["rolling_watts_20m"] = (
-                    analysis_df["watts"].rolling(window=window_sec, min_periods=window_sec).mean()
-                )
-
-                if not analysis_df["rolling_watts_20m"].isna().all():
-                    peak_idx = analysis_df["rolling_watts_20m"].idxmax()
-
-                    if not pd.isna(peak_idx):
-                        start_idx = max(0, peak_idx - window_sec + 1)
-                        df_peak = analysis_df.iloc[start_idx : peak_idx + 1]
-
-                        # Calculate percentages
-                        pct_hr = 0
-                        pct_ve = 0
-                        pct_smo2_util = 0
-                        pct_power = 0
-
-                        # HR%
-                        if "hr" in analysis_df.columns:
-                            peak_hr_avg = df_peak["hr"].mean()
-                            max_hr = analysis_df["hr"].max()
-                            pct_hr = (peak_hr_avg / max_hr * 100) if max_hr > 0 else 0
-
-                        # VE%
-                        ve_col = next(
-                            (
-                                c
-                                for c in ["tymeventilation", "ve", "ventilation"]
-                                if c in analysis_df.columns
-                            ),
-                            None,
-                        )
-                        if ve_col:
-                            peak_ve_avg = df_peak[ve_col].mean()
-                            max_ve = analysis_df[ve_col].max() * 1.1  # Estimate VEmax
-                            pct_ve = (peak_ve_avg / max_ve * 100) if max_ve > 0 else 0
-
-                        # SmO2 utilization (desaturation)
-                        if "smo2" in analysis_df.columns:
-                            peak_smo2_avg = df_peak["smo2"].mean()
-                            pct_smo2_util = 100 - peak_smo2_avg
-
-                        # Power%
-                        peak_w_avg = df_peak["watts"].mean()
-                        cp_watts = (
-                            data.get("canonical_physiology", {}).get("summary", {}).get("cp_watts", 0)
-                            or peak_w_avg
-                        )
-                        pct_power = (peak_w_avg / cp_watts * 100) if cp_watts > 0 else 0
-
-                        # Determine limiting factor
-                        limiting_factor = "Serce"
-                        if pct_ve >= max(pct_hr, pct_smo2_util):
-                            limiting_factor = "Płuca"
-                        elif pct_smo2_util >= pct_hr:
-                            limiting_factor = "Mięśnie"
-
-                        data["limiter_analysis"] = {
-                            "window": "20 min (FTP)",
-                            "peak_power": round(peak_w_avg, 0),
-                            "pct_hr": round(pct_hr, 1),
-                            "pct_ve": round(pct_ve, 1),
-                            "pct_smo2_util": round(pct_smo2_util, 1),
-                            "pct_power": round(pct_power, 1),
-                            "limiting_factor": limiting_factor,
-                            "interpretation": _get_limiter_interpretation(limiting_factor),
-                        }
-        except Exception as e:
-            logger.warning(f"[Limiter Analysis] Calculation failed: {e}")
-    try:
-        # Calculate 20min MMP window
-        window_sec = 1200  # 20 min
-        if "watts" in analysis_df.columns:
-            analysis_df["rolling_watts_20m"] = (
-                analysis_df["watts"].rolling(window=window_sec, min_periods=window_sec).mean()
-            )
-
-            if not analysis_df["rolling_watts_20m"].isna().all():
-                peak_idx = analysis_df["rolling_watts_20m"].idxmax()
-
-                if not pd.isna(peak_idx):
-                    start_idx = max(0, peak_idx - window_sec + 1)
-                    df_peak = analysis_df.iloc[start_idx : peak_idx + 1]
-
-                    # Calculate percentages
-                    pct_hr = 0
-                    pct_ve = 0
-                    pct_smo2_util = 0
-                    pct_power = 0
-
-                    # HR%
-                    if "hr" in analysis_df.columns:
-                        peak_hr_avg = df_peak["hr"].mean()
-                        max_hr = analysis_df["hr"].max()
-                        pct_hr = (peak_hr_avg / max_hr * 100) if max_hr > 0 else 0
-
-                    # VE%
-                    ve_col = next(
-                        (
-                            c
-                            for c in ["tymeventilation", "ve", "ventilation"]
-                            if c in analysis_df.columns
-                        ),
-                        None,
-                    )
-                    if ve_col:
-                        peak_ve_avg = df_peak[ve_col].mean()
-                        max_ve = analysis_df[ve_col].max() * 1.1  # Estimate VEmax
-                        pct_ve = (peak_ve_avg / max_ve * 100) if max_ve > 0 else 0
-
-                    # SmO2 utilization (desaturation)
-                    if "smo2" in analysis_df.columns:
-                        peak_smo2_avg = df_peak["smo2"].mean()
-                        pct_smo2_util = 100 - peak_smo2_avg
-
-                    # Power%
-                    peak_w_avg = df_peak["watts"].mean()
-                    cp_watts = (
-                        data.get("canonical_physiology", {}).get("summary", {}).get("cp_watts", 0)
-                        or peak_w_avg
-                    )
-                    pct_power = (peak_w_avg / cp_watts * 100) if cp_watts > 0 else 0
-
-                    # Determine limiting factor
-                    limiting_factor = "Serce"
-                    if pct_ve >= max(pct_hr, pct_smo2_util):
-                        limiting_factor = "Płuca"
-                    elif pct_smo2_util >= pct_hr:
-                        limiting_factor = "Mięśnie"
-
-                    data["limiter_analysis"] = {
-                        "window": "20 min (FTP)",
-                        "peak_power": round(peak_w_avg, 0),
-                        "pct_hr": round(pct_hr, 1),
-                        "pct_ve": round(pct_ve, 1),
-                        "pct_smo2_util": round(pct_smo2_util, 1),
-                        "pct_power": round(pct_power, 1),
-                        "limiting_factor": limiting_factor,
-                        "interpretation": _get_limiter_interpretation(limiting_factor),
-                    }
-    except Exception as e:
-        logger.warning(f"[Limiter Analysis] Calculation failed: {e}")
+    # 1.2-1.7 Analyzer stage: SmO2 / cardio / ventilation / occlusion /
+    # thermoregulation / cardiac drift / VO2max run concurrently on one
+    # normalized frame, then canonical physiology and the limiter radar
+    enrich_report(data, source_df, _get_limiter_interpretation)
 
     # 2. Enrich metadata
     now = datetime.now()
@@ -784,9 +327,18 @@ def save_ramp_test_report(  # noqa: C901
     # 5. Save file (Immutable by default)
     mode = "w" if dev_mode else "x"
 
+    # Time series go to a columnar sidecar; the JSON keeps a reference.
+    # final_json itself keeps the inline series for the PDF generated below.
+    json_payload = final_json
+    if final_json.get("time_series") and (dev_mode or not file_path.exists()):
+        json_payload = {
+            **final_json,
+            "time_series": write_time_series(file_path, final_json["time_series"]),
+        }
+
     try:
         with open(file_path, mode, encoding="utf-8") as f:
-            json.dump(final_json, f, indent=2, ensure_ascii=False, cls=NumpyEncoder)
+            json.dump(json_payload, f, indent=2, ensure_ascii=False, cls=NumpyEncoder)
         logger.info(f"Ramp Test JSON saved: {session_id}")
     except FileExistsError:
         # Should be rare given UUID, but protects against collision/logic errors
@@ -1144,6 +696,9 @@ def load_ramp_test_report(file_path: Union[str, Path]) -> Dict:
     """
     Load a Ramp Test report from JSON.
 
+    A time series stored in a sidecar file is returned as a
+    ``LazyTimeSeries`` that reads channels on first access.
+
     Args:
         file_path: Path to JSON file
 
@@ -1151,7 +706,8 @@ def load_ramp_test_report(file_path: Union[str, Path]) -> Dict:
         Dictionary with report data
     """
     with open(file_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+        report = json.load(f)
+    return resolve_time_series(report, file_path)
 
 
 def check_git_tracking(directory: str = "reports/ramp_tests"):
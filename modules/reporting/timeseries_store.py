@@ -0,0 +1,186 @@
+"""
+Sidecar storage of ramp-test report time series.
+
+The canonical JSON used to carry the full 1 Hz time series as float lists,
+which made each report several MB and every history load parse all of it.
+The channels are now written next to the JSON as a zstd-compressed Parquet
+file of float32 columns; the JSON keeps only a reference:
+
+    "time_series": {
+        "$sidecar": "ramp_test_2026-01-02_abc12345.timeseries.parquet",
+        "format": "parquet",
+        "channels": ["time_sec", "power_watts", ...],
+        "n_samples": 1234
+    }
+
+``load_ramp_test_report`` replaces the reference with a ``LazyTimeSeries``,
+which reads a channel only when it is first accessed. Reports with inline
+time series still load unchanged; ``migrate_archive`` converts them.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SIDECAR_KEY = "$sidecar"
+SIDECAR_SUFFIX = ".timeseries.parquet"
+SIDECAR_FORMAT = "parquet"
+SIDECAR_COMPRESSION = "zstd"
+
+
+def sidecar_path(json_path: Union[str, Path]) -> Path:
+    """Sidecar file of a report: ``<name>.json`` -> ``<name>.timeseries.parquet``."""
+    json_path = Path(json_path)
+    return json_path.with_name(json_path.stem + SIDECAR_SUFFIX)
+
+
+def is_sidecar_reference(time_series: Any) -> bool:
+    return isinstance(time_series, dict) and SIDECAR_KEY in time_series
+
+
+def write_time_series(json_path: Union[str, Path], time_series: Mapping) -> Dict[str, Any]:
+    """Write the channels of ``time_series`` next to ``json_path``.
+
+    Returns:
+        The reference to store under ``"time_series"`` in the JSON.
+    """
+    columns = {key: np.asarray(values, dtype=np.float32) for key, values in time_series.items()}
+    lengths = {len(values) for values in columns.values()}
+    if len(lengths) > 1:
+        # Channels are columns of one frame; pad short ones with NaN
+        n = max(lengths)
+        columns = {
+            key: np.pad(values, (0, n - len(values)), constant_values=np.nan)
+            for key, values in columns.items()
+        }
+    frame = pd.DataFrame(columns)
+
+    path = sidecar_path(json_path)
+    tmp = path.with_name(path.name + ".tmp")
+    # Byte-stream-split floats compress far better than dictionary pages
+    frame.to_parquet(
+        tmp,
+        index=False,
+        compression=SIDECAR_COMPRESSION,
+        use_dictionary=False,
+        use_byte_stream_split=True,
+    )
+    tmp.replace(path)
+    return {
+        SIDECAR_KEY: path.name,
+        "format": SIDECAR_FORMAT,
+        "channels": list(frame.columns),
+        "n_samples": len(frame),
+    }
+
+
+class LazyTimeSeries(Mapping):
+    """Read-only ``{channel: list of values}`` backed by a sidecar file.
+
+    Behaves like the inline ``time_series`` dict of older reports (values
+    are plain lists); each channel is read from disk on first access.
+    """
+
+    def __init__(self, path: Union[str, Path], channels: Sequence[str], n_samples: int = 0):
+        self.path = Path(path)
+        self.channels = list(channels)
+        self.n_samples = n_samples
+        self._cache: Dict[str, List[float]] = {}
+
+    def __getitem__(self, channel: str) -> List[float]:
+        if channel not in self.channels:
+            raise KeyError(channel)
+        if channel not in self._cache:
+            self._cache[channel] = self.array(channel).tolist()
+        return self._cache[channel]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.channels)
+
+    def __len__(self) -> int:
+        return len(self.channels)
+
+    def array(self, channel: str) -> np.ndarray:
+        """One channel as a float32 array (bypasses the list cache)."""
+        return self.to_frame([channel])[channel].to_numpy()
+
+    def to_frame(self, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """The given channels (default: all) as a DataFrame."""
+        return pd.read_parquet(self.path, columns=list(columns or self.channels))
+
+    def to_dict(self) -> Dict[str, List[float]]:
+        return {channel: self[channel] for channel in self.channels}
+
+    def __repr__(self) -> str:
+        return f"LazyTimeSeries({self.path.name!r}, channels={self.channels})"
+
+
+def resolve_time_series(report: Dict[str, Any], json_path: Union[str, Path]) -> Dict[str, Any]:
+    """Replace a sidecar reference in ``report`` with a ``LazyTimeSeries`` (in place)."""
+    reference = report.get("time_series")
+    if not is_sidecar_reference(reference):
+        return report
+
+    path = Path(json_path).with_name(reference[SIDECAR_KEY])
+    if not path.exists():
+        logger.warning(f"Time series sidecar missing: {path}")
+        report["time_series"] = {}
+        return report
+    report["time_series"] = LazyTimeSeries(
+        path, reference.get("channels", []), reference.get("n_samples", 0)
+    )
+    return report
+
+
+def migrate_report(json_path: Union[str, Path]) -> bool:
+    """Move the inline time series of one report to a sidecar.
+
+    Only ``"time_series"`` changes; the JSON is rewritten atomically.
+
+    Returns:
+        True if the report was converted, False if there was nothing to do.
+    """
+    json_path = Path(json_path)
+    with open(json_path, "r", encoding="utf-8") as f:
+        report = json.load(f)
+
+    time_series = report.get("time_series")
+    if not time_series or is_sidecar_reference(time_series):
+        return False
+
+    report["time_series"] = write_time_series(json_path, time_series)
+    tmp = json_path.with_name(json_path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, json_path)
+    return True
+
+
+def migrate_archive(base_dir: Union[str, Path] = "reports/ramp_tests") -> Tuple[int, int]:
+    """Convert every report under ``base_dir`` with an inline time series.
+
+    Returns:
+        (converted, skipped) counts; reports that fail to convert are
+        logged and counted as skipped.
+    """
+    converted = skipped = 0
+    for json_path in sorted(Path(base_dir).rglob("*.json")):
+        try:
+            if migrate_report(json_path):
+                converted += 1
+            else:
+                skipped += 1
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not migrate {json_path}: {e}")
+            skipped += 1
+    return converted, skipped
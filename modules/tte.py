@@ -3,22 +3,32 @@ Time-to-Exhaustion (TTE) Detection Module.
 
 Computes the maximum continuous duration an athlete can sustain
 a target power percentage (e.g., 100% FTP ±5%).
+
+All targets are evaluated together: ``longest_runs`` finds the longest
+in-band run for every band in one pass over the power series, so the full
+TTE-vs-intensity curve (``TTE_CURVE_PCTS``) costs about as much as a single
+target.
 """
 
 import logging
 from typing import Dict, List, Optional, Tuple, Callable
 import json
 import numpy as np
-import sqlite3
 import pandas as pd
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from modules.config import Config
+from modules.db.connection import get_connection
+from modules.db.session_cache import ImportManifest, SessionCache
+from modules.numba_utils import is_numba_available, njit
 
 logger = logging.getLogger(__name__)
 
+# Targets [% FTP] of the TTE-vs-intensity curve (the bands tile it at ±5%)
+TTE_CURVE_PCTS = (80.0, 85.0, 90.0, 95.0, 100.0, 105.0, 110.0, 115.0, 120.0)
+
 
 @dataclass
 class TTEResult:
@@ -34,6 +44,64 @@ class TTEResult:
     timestamp: Optional[str] = None
 
 
+@njit(cache=True)
+def _longest_runs_kernel(power: np.ndarray, lows: np.ndarray, highs: np.ndarray) -> np.ndarray:
+    """Longest run of consecutive samples inside [lows[k], highs[k]] for each band k."""
+    n_bands = len(lows)
+    best = np.zeros(n_bands, dtype=np.int64)
+    current = np.zeros(n_bands, dtype=np.int64)
+    for i in range(len(power)):
+        p = power[i]
+        for k in range(n_bands):
+            if lows[k] <= p <= highs[k]:
+                current[k] += 1
+                if current[k] > best[k]:
+                    best[k] = current[k]
+            else:
+                current[k] = 0
+    return best
+
+
+def _longest_runs_numpy(power: np.ndarray, lows: np.ndarray, highs: np.ndarray) -> np.ndarray:
+    best = np.zeros(len(lows), dtype=np.int64)
+    for k in range(len(lows)):
+        in_range = np.concatenate(([False], (power >= lows[k]) & (power <= highs[k]), [False]))
+        edges = np.flatnonzero(np.diff(in_range.view(np.int8)))
+        if len(edges):
+            best[k] = np.max(edges[1::2] - edges[::2])
+    return best
+
+
+def _target_bands(
+    target_pcts, ftp: float, tol_pct: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(min, max) power of each target band, target_pct ± tol_pct of FTP."""
+    target_power = ftp * (np.asarray(target_pcts, dtype=np.float64) / 100.0)
+    return target_power * (1 - tol_pct / 100.0), target_power * (1 + tol_pct / 100.0)
+
+
+def longest_runs(power_series, target_pcts, ftp: float, tol_pct: float = 5.0) -> np.ndarray:
+    """Compute TTE for many FTP percentages in one pass over the series.
+
+    Args:
+        power_series: Power values at 1Hz (NaN is treated as 0 W)
+        target_pcts: Target percentages of FTP
+        ftp: Functional Threshold Power in watts
+        tol_pct: Tolerance percentage (default 5%)
+
+    Returns:
+        Int array aligned with ``target_pcts``: longest continuous duration
+        in seconds within each band
+    """
+    lows, highs = _target_bands(target_pcts, ftp, tol_pct)
+    if power_series is None or len(power_series) == 0:
+        return np.zeros(len(lows), dtype=np.int64)
+    power = np.nan_to_num(np.asarray(power_series, dtype=np.float64), nan=0.0)
+    if is_numba_available():
+        return _longest_runs_kernel(power, lows, highs)
+    return _longest_runs_numpy(power, lows, highs)
+
+
 def compute_tte(
     power_series: pd.Series, target_pct: float, ftp: float, tol_pct: float = 5.0
 ) -> int:
@@ -51,32 +119,34 @@ def compute_tte(
     Returns:
         Maximum continuous duration in seconds
     """
-    if power_series is None or len(power_series) == 0:
-        return 0
-
-    # Calculate target power range
-    target_power = ftp * (target_pct / 100.0)
-    power_min = target_power * (1 - tol_pct / 100.0)
-    power_max = target_power * (1 + tol_pct / 100.0)
+    return int(longest_runs(power_series, [target_pct], ftp, tol_pct)[0])
 
-    # Fill NaN with 0 (treated as below threshold)
-    power = power_series.fillna(0).values
 
-    # Create boolean mask for valid power range
-    in_range = (power >= power_min) & (power <= power_max)
-
-    # Find longest continuous run of True values
-    max_duration = 0
-    current_duration = 0
+def compute_tte_curve(
+    power_series: pd.Series,
+    ftp: float,
+    target_pcts=TTE_CURVE_PCTS,
+    tol_pct: float = 5.0,
+) -> pd.DataFrame:
+    """Compute the TTE-vs-intensity curve of a session.
 
-    for val in in_range:
-        if val:
-            current_duration += 1
-            max_duration = max(max_duration, current_duration)
-        else:
-            current_duration = 0
+    Args:
+        power_series: Power values at 1Hz
+        ftp: Functional Threshold Power in watts
+        target_pcts: Target percentages of FTP (default 80-120%)
+        tol_pct: Tolerance percentage (default 5%)
 
-    return max_duration
+    Returns:
+        DataFrame with 'target_pct', 'power_min', 'power_max' and
+        'tte_seconds', one row per target
+    """
+    lows, highs = _target_bands(target_pcts, ftp, tol_pct)
+    return pd.DataFrame({
+        "target_pct": np.asarray(target_pcts, dtype=np.float64),
+        "power_min": lows,
+        "power_max": highs,
+        "tte_seconds": longest_runs(power_series, target_pcts, ftp, tol_pct),
+    })
 
 
 def compute_tte_result(
@@ -99,10 +169,7 @@ def compute_tte_result(
         TTEResult with all computed values
     """
     tte_seconds = compute_tte(power_series, target_pct, ftp, tol_pct)
-
-    target_power = ftp * (target_pct / 100.0)
-    power_min = target_power * (1 - tol_pct / 100.0)
-    power_max = target_power * (1 + tol_pct / 100.0)
+    (power_min,), (power_max,) = _target_bands([target_pct], ftp, tol_pct)
 
     return TTEResult(
         session_id=session_id or datetime.now().strftime("%Y%m%d_%H%M%S"),
@@ -110,8 +177,8 @@ def compute_tte_result(
         target_pct=target_pct,
         ftp=ftp,
         tolerance_pct=tol_pct,
-        target_power_min=power_min,
-        target_power_max=power_max,
+        target_power_min=float(power_min),
+        target_power_max=float(power_max),
         timestamp=datetime.now().isoformat(),
     )
 
@@ -185,8 +252,7 @@ def get_tte_history_from_db(days: int = 90, target_pct: float = 100.0) -> List[D
     history = []
 
     try:
-        with sqlite3.connect(db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with get_connection(db_path) as conn:
             cursor = conn.execute(
                 """
                 SELECT id, date, filename, extra_metrics 
@@ -217,6 +283,38 @@ def get_tte_history_from_db(days: int = 90, target_pct: float = 100.0) -> List[D
     return history
 
 
+def get_tte_curve_history_from_db(days: int = 90) -> pd.DataFrame:
+    """Best TTE per target percentage over recent sessions in training_history.db.
+
+    Args:
+        days: Historical window in days
+
+    Returns:
+        DataFrame with 'target_pct', 'tte_seconds' (best in the window) and
+        'sessions' (sessions with a stored value), sorted by target; empty
+        if no session has TTE values
+    """
+    rows = []
+    try:
+        with get_connection(Config.DB_PATH) as conn:
+            cursor = conn.execute(
+                "SELECT extra_metrics FROM sessions WHERE date >= date('now', ?)",
+                (f"-{days} days",),
+            )
+            for row in cursor.fetchall():
+                tte_data = json.loads(row["extra_metrics"] or "{}").get("tte", {})
+                rows.extend((float(pct), int(tte)) for pct, tte in tte_data.items())
+    except Exception as e:
+        logger.warning(f"Error fetching TTE curve history: {e}")
+
+    history = pd.DataFrame(rows, columns=["target_pct", "tte_seconds"])
+    return (
+        history.groupby("target_pct")["tte_seconds"]
+        .agg(tte_seconds="max", sessions="count")
+        .reset_index()
+    )
+
+
 def save_tte_to_db(filename: str, session_date: str, target_pct: float, tte_seconds: int) -> bool:
     """Save/Update TTE value in the session's extra_metrics.
 
@@ -231,8 +329,7 @@ def save_tte_to_db(filename: str, session_date: str, target_pct: float, tte_seco
     """
     db_path = Config.DB_PATH
     try:
-        with sqlite3.connect(db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with get_connection(db_path) as conn:
             # 1. Get existing extra_metrics
             cursor = conn.execute(
                 "SELECT extra_metrics FROM sessions WHERE filename = ? AND date = ?",
@@ -262,29 +359,36 @@ def save_tte_to_db(filename: str, session_date: str, target_pct: float, tte_seco
 
 
 def _compute_single_session_tte(
-    csv_path: Path, target_pcts: List[float], ftp: float, tol_pct: float
+    csv_path: Path,
+    target_pcts: List[float],
+    ftp: float,
+    tol_pct: float,
+    cache_path: Optional[Path] = None,
 ) -> Optional[Dict]:
-    """Helper for parallel processing of a single file."""
-    from modules.utils import load_data
-    from modules.calculations import process_data
+    """Helper for parallel processing of a single file.
 
+    Reads only the power column from the Parquet session cache when
+    ``cache_path`` exists, otherwise re-parses and re-processes the CSV.
+    """
     try:
-        with open(csv_path, "rb") as f:
-            df_raw = load_data(f)
+        if cache_path is not None and cache_path.exists():
+            df = pd.read_parquet(cache_path, columns=["watts"])
+        else:
+            from modules.utils import load_data_uncached
+            from modules.calculations import process_data
 
-        if df_raw is None or df_raw.empty or "watts" not in df_raw.columns:
-            return None
+            if csv_path is None or not csv_path.exists():
+                return None
+            with open(csv_path, "rb") as f:
+                df_raw = load_data_uncached(f)
 
-        df = process_data(df_raw)
-        power_series = df["watts"]
+            if df_raw is None or df_raw.empty or "watts" not in df_raw.columns:
+                return None
 
-        results = {}
-        for pct in target_pcts:
-            # We use the existing compute_tte within this process
-            tte_val = compute_tte(power_series, pct, ftp, tol_pct)
-            results[str(int(pct))] = int(tte_val)
+            df = process_data(df_raw)
 
-        return results
+        ttes = longest_runs(df["watts"], target_pcts, ftp, tol_pct)
+        return {str(int(pct)): int(tte) for pct, tte in zip(target_pcts, ttes, strict=True)}
     except Exception as e:
         logger.warning(f"TTE computation failed: {e}")
         return None
@@ -294,6 +398,8 @@ def _submit_tte_tasks(
     executor: ProcessPoolExecutor,
     sessions: list,
     file_cache: dict,
+    session_cache: SessionCache,
+    cache_sources: dict,
     target_pcts: List[float],
     ftp: float,
     tol_pct: float,
@@ -305,12 +411,17 @@ def _submit_tte_tasks(
     for i, row in enumerate(sessions):
         filename = row["filename"]
         csv_path = file_cache.get(Path(filename).stem)
-        if not csv_path or not csv_path.exists():
+        source = cache_sources.get((row["date"], filename))
+        cache_path = session_cache.path_for(row["date"], source) if source else None
+        cache_hit = cache_path is not None and cache_path.exists()
+        if not cache_hit and (not csv_path or not csv_path.exists()):
             fail_count += 1
             if progress_callback:
                 progress_callback(i + 1, total, f"❌ {filename}: Not found")
             continue
-        future = executor.submit(_compute_single_session_tte, csv_path, target_pcts, ftp, tol_pct)
+        future = executor.submit(
+            _compute_single_session_tte, csv_path, target_pcts, ftp, tol_pct, cache_path
+        )
         futures[future] = (row["id"], filename, row["extra_metrics"])
     return futures, fail_count
 
@@ -348,27 +459,40 @@ def _collect_tte_results(
 
 def batch_compute_tte_for_all_sessions(
     ftp: float,
-    target_pcts: List[float] = [100.0],
+    target_pcts: List[float] = TTE_CURVE_PCTS,
     tol_pct: float = 5.0,
     progress_callback: Optional[Callable[[int, int, str], None]] = None,
 ) -> Tuple[int, int]:
     """
     Optimized batch processing using parallel execution and directory caching.
 
+    Sessions present in the Parquet session cache (written by the history
+    importer) are read from there; only uncached sessions re-parse their
+    CSV/FIT file. By default the full TTE curve (``TTE_CURVE_PCTS``) is
+    stored for each session, all targets from one pass over its power.
+
     Complexity Analysis:
     - Current Big O: O(N * (G + L + P + C))
       N=Sessions, G=Directory Glob, L=Load, P=Process, C=Compute
     - Expected Big O: O(N_files + (N * (L + P + C)) / Cores)
     """
+    from modules.history_import import _session_files
+
     db_path = Config.DB_PATH
     training_folder = Path(Config.BASE_DIR) / "treningi_csv"
 
-    file_cache = {p.stem: p for p in training_folder.glob("*.csv")}
+    file_cache = {p.stem: p for p in _session_files(training_folder)}
+    session_cache = SessionCache(db_path)
+    cache_sources = {
+        (date, filename): source
+        for date, filename, source in ImportManifest(db_path).sources()
+    }
 
     try:
-        with sqlite3.connect(db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            sessions = conn.execute("SELECT id, filename, extra_metrics FROM sessions").fetchall()
+        with get_connection(db_path) as conn:
+            sessions = conn.execute(
+                "SELECT id, date, filename, extra_metrics FROM sessions"
+            ).fetchall()
             total = len(sessions)
 
             with ProcessPoolExecutor() as executor:
@@ -376,6 +500,8 @@ def batch_compute_tte_for_all_sessions(
                     executor,
                     sessions,
                     file_cache,
+                    session_cache,
+                    cache_sources,
                     target_pcts,
                     ftp,
                     tol_pct,
@@ -10,11 +10,13 @@ import plotly.graph_objects as go
 import streamlit as st
 
 from modules.calculations.banister import (
+    FIT_MARKERS,
     BanisterModel,
+    banister_fit_inputs,
     default_banister_model,
+    fit_banister_model,
+    plan_taper,
     predict_performance,
-    optimize_peaking,
-    TSSRecommendation,
 )
 from modules.ui.shared import chart, metric
 
@@ -27,13 +29,16 @@ def render_banister_tab(*args, **kwargs) -> None:
 
     store = get_session_store()
 
-    _render_model_params()
+    _render_model_params(store)
     _render_prediction_chart(store)
     _render_peaking_calculator(store)
     _render_theory()
 
 
-def _render_model_params() -> None:
+FIT_HISTORY_OPTIONS = {365: "1 rok", 730: "2 lata", 1095: "3 lata", 1825: "5 lat"}
+
+
+def _render_model_params(store) -> None:
     with st.expander("⚙️ Parametry modelu", expanded=False):
         col1, col2 = st.columns(2)
         with col1:
@@ -43,7 +48,65 @@ def _render_model_params() -> None:
             k2 = st.slider("k2 (współczynnik zmęczenia)", 0.1, 5.0, 2.0, 0.1, key="ban_k2")
             tau2 = st.slider("τ2 — fatigue decay (dni)", 3, 21, 7, 1, key="ban_tau2")
 
-        st.session_state["banister_model"] = BanisterModel(k1=k1, k2=k2, tau1=tau1, tau2=tau2)
+        model = BanisterModel(k1=k1, k2=k2, tau1=tau1, tau2=tau2)
+
+        fit = _render_model_fit(store)
+        use_fit = fit is not None and st.checkbox(
+            "Użyj dopasowanego modelu", value=True, key="ban_use_fit"
+        )
+        if use_fit:
+            model = fit.model
+
+        st.session_state["banister_model"] = model
+
+
+def _render_model_fit(store):
+    st.markdown("#### 🔧 Dopasowanie do Twoich danych")
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        marker = st.selectbox(
+            "Marker wydajności",
+            list(FIT_MARKERS),
+            format_func=FIT_MARKERS.get,
+            key="ban_fit_marker",
+        )
+    with col2:
+        days = st.selectbox(
+            "Historia",
+            list(FIT_HISTORY_OPTIONS),
+            index=1,
+            format_func=FIT_HISTORY_OPTIONS.get,
+            key="ban_fit_days",
+        )
+    with col3:
+        st.write("")
+        run_fit = st.button("Dopasuj", key="ban_fit_run")
+
+    if run_fit:
+        _, tss, marker_days, marker_values = banister_fit_inputs(
+            store.iter_sessions(days=days), marker
+        )
+        fit = fit_banister_model(tss, marker_days, marker_values)
+        st.session_state["banister_fit"] = fit
+        if fit is None:
+            st.warning(
+                "⚠️ Za mało sesji z maksymalnym wysiłkiem, aby dopasować model "
+                "(potrzeba kilku testów/wyścigów w wybranym okresie)."
+            )
+
+    fit = st.session_state.get("banister_fit")
+    if fit is None:
+        return None
+
+    m = fit.model
+    c1, c2, c3, c4, c5 = st.columns(5)
+    c1.metric("k1", f"{m.k1:.3f}")
+    c2.metric("k2", f"{m.k2:.3f}")
+    c3.metric("τ1", f"{m.tau1:.0f} dni")
+    c4.metric("τ2", f"{m.tau2:.0f} dni")
+    c5.metric("P0", f"{m.p0:.0f}")
+    st.caption(f"RMSE = {fit.rmse:.1f} | R² = {fit.r_squared:.2f} | markery: {fit.n_markers}")
+    return fit
 
 
 def _get_model() -> BanisterModel:
@@ -158,6 +221,17 @@ def _get_planned_tss(days: int) -> list:
     return planned
 
 
+WEEKDAY_LABELS = ["Pon", "Wt", "Śr", "Czw", "Pt", "Sob", "Nd"]
+
+TAPER_PHASE_COLORS = {
+    "Budowanie formy": "#e67e22",
+    "Akcent intensywności": "#e74c3c",
+    "Taper": "#3498db",
+    "Odpoczynek": "#95a5a6",
+    "Zawody": "#27ae60",
+}
+
+
 def _render_peaking_calculator(store) -> None:
     st.markdown("### 🏔️ Kalkulator taperu (peaking)")
 
@@ -177,17 +251,76 @@ def _render_peaking_calculator(store) -> None:
     if race_date is None:
         return
 
-    days_out = taper_weeks * 7
-    recs = optimize_peaking(
-        current_ctl=summary["ctl"],
-        current_atl=summary["atl"],
-        target_date=datetime.combine(race_date, datetime.min.time()),
+    render_taper_planner(
+        summary["ctl"],
+        summary["atl"],
+        datetime.combine(race_date, datetime.min.time()),
+        days_out=taper_weeks * 7,
+        model=_get_model(),
+        key_prefix="ban",
+    )
+
+
+def render_taper_planner(
+    ctl: float,
+    atl: float,
+    race_date: datetime,
+    days_out: int,
+    model: Optional[BanisterModel] = None,
+    key_prefix: str = "ban",
+) -> None:
+    """Constraint inputs, optimized taper chart and day-by-day details.
+
+    Shared by the Banister and periodization tabs; ``key_prefix`` keeps
+    their widget keys apart.
+    """
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        max_tss = st.number_input(
+            "Maks. TSS/dzień",
+            min_value=10,
+            max_value=500,
+            value=int(max(round(1.5 * ctl), 10)),
+            step=5,
+            key=f"{key_prefix}_taper_max_tss",
+        )
+    with col2:
+        rest_days = st.multiselect(
+            "Dni wolne",
+            list(range(7)),
+            format_func=lambda d: WEEKDAY_LABELS[d],
+            key=f"{key_prefix}_taper_rest_days",
+        )
+    with col3:
+        intensity_days = st.slider(
+            "Dni intensywne / tydz.", 0, 3, 1, key=f"{key_prefix}_taper_intensity_days"
+        )
+    with col4:
+        intensity_tss = st.number_input(
+            "Min. TSS dnia intensywnego",
+            min_value=0,
+            max_value=500,
+            value=int(min(round(ctl), max_tss)),
+            step=5,
+            key=f"{key_prefix}_taper_intensity_tss",
+        )
+
+    plan = plan_taper(
+        current_ctl=ctl,
+        current_atl=atl,
+        target_date=race_date,
         days_out=days_out,
+        model=model,
+        max_daily_tss=float(max_tss),
+        rest_days=rest_days,
+        min_intensity_days=intensity_days,
+        intensity_tss=float(intensity_tss),
     )
+    recs = plan.recommendations
 
     dates = [r.date for r in recs]
     tss_vals = [r.recommended_tss for r in recs]
-    phases = [r.taper_phase for r in recs]
+    bar_colors = [TAPER_PHASE_COLORS.get(r.taper_phase, "#95a5a6") for r in recs]
 
     fig = go.Figure()
     fig.add_trace(
@@ -195,29 +328,54 @@ def _render_peaking_calculator(store) -> None:
             x=dates,
             y=tss_vals,
             name="Rekomendowany TSS",
-            marker_color="#e74c3c",
-            opacity=0.7,
+            marker_color=bar_colors,
+            opacity=0.8,
+            hovertext=[r.taper_phase for r in recs],
+        )
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=dates,
+            y=plan.predicted_performance,
+            name="Wydajność (prognoza)",
+            yaxis="y2",
+            line=dict(color="#2c3e50", width=2),
         )
     )
     fig.add_hline(
-        y=summary["ctl"],
+        y=ctl,
         line_dash="dash",
         line_color="#3498db",
-        annotation_text=f"CTL = {summary['ctl']:.0f}",
+        annotation_text=f"CTL = {ctl:.0f}",
     )
 
     fig.update_layout(
-        title="Plan taperu — rekomendowany TSS",
+        title="Plan taperu — optymalny TSS wg modelu Banistera",
         xaxis_title="Data",
         yaxis_title="TSS",
+        yaxis2=dict(title="Wydajność", overlaying="y", side="right", showgrid=False),
         height=350,
         hovermode="x unified",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
     )
-    chart(fig, key="banister_taper_chart")
+    chart(fig, key=f"{key_prefix}_taper_chart")
+
+    gain = plan.target_performance - plan.maintenance_performance
+    c1, c2 = st.columns(2)
+    with c1:
+        metric("Wydajność w dniu startu", f"{plan.target_performance:.1f}")
+    with c2:
+        metric(
+            "vs. utrzymanie TSS = CTL",
+            f"{gain:+.1f}",
+            help="Różnica względem planu z dziennym TSS równym obecnemu CTL",
+        )
 
     with st.expander("📋 Szczegóły taperu"):
         for r in recs:
-            st.markdown(f"**{r.date}** — TSS: {r.recommended_tss:.0f} | {r.notes}")
+            st.markdown(
+                f"**{r.date}** — TSS: {r.recommended_tss:.0f} | {r.taper_phase}: {r.notes}"
+            )
 
 
 def _render_theory() -> None:
@@ -237,4 +395,9 @@ def _render_theory() -> None:
         | τ₂ | 7 dni | Decay zmęczenia (analogia ATL) |
 
         **Taper** (Mujika & Padilla 2003): redukcja objętości 40-60% przy utrzymaniu intensywności.
+
+        **Optymalizacja taperu:** wpływ TSS z dnia odległego o d dni od startu na formę w dniu
+        startu wynosi k₁·e^(−d/τ₁) − k₂·e^(−d/τ₂). Dopóki jest dodatni, trening podnosi formę
+        (maks. TSS), potem ją obniża (minimum). Dni intensywne rozmieszczane są tam, gdzie
+        kosztują najmniej, z zachowaniem dni wolnych i limitu TSS.
         """)
@@ -3,6 +3,8 @@ import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
 
+from modules.downsample import plot_view
+
 def render_biomech_tab(df_plot, df_plot_resampled):  # noqa: C901
     st.header("Biomechaniczny Stres")
     
@@ -171,25 +173,29 @@ def render_biomech_tab(df_plot, df_plot_resampled):  # noqa: C901
     st.divider()
     st.subheader("🫀 Pulse Power (Moc na Uderzenie Serca)")
     
-    if 'watts_smooth' in df_plot_resampled.columns and 'heartrate_smooth' in df_plot_resampled.columns:
+    # Statystyki na pełnym przebiegu 1 Hz; próbkowane są tylko rysowane serie
+    if 'watts_smooth' in df_plot.columns and 'heartrate_smooth' in df_plot.columns:
         import numpy as np
         from scipy import stats
         
-        mask_pp = (df_plot_resampled['watts_smooth'] > 50) & (df_plot_resampled['heartrate_smooth'] > 90)
-        df_pp = df_plot_resampled[mask_pp].copy()
+        mask_pp = (df_plot['watts_smooth'] > 50) & (df_plot['heartrate_smooth'] > 90)
+        df_pp = df_plot.loc[mask_pp, ['time_min', 'watts_smooth', 'heartrate_smooth']].copy()
         
         if not df_pp.empty:
             df_pp['pulse_power'] = df_pp['watts_smooth'] / df_pp['heartrate_smooth']
             
             df_pp['pp_smooth'] = df_pp['pulse_power'].rolling(window=12, center=True).mean() 
+            plot_pp = plot_view(df_pp, x_col='time_min', columns=['pp_smooth', 'watts_smooth'])
             x_pp = df_pp['time_min']
             y_pp = df_pp['pulse_power']
             valid_idx = np.isfinite(x_pp) & np.isfinite(y_pp)
             
             if valid_idx.sum() > 100:
                 slope_pp, intercept_pp, _, _, _ = stats.linregress(x_pp[valid_idx], y_pp[valid_idx])
-                trend_line_pp = intercept_pp + slope_pp * x_pp
-                total_drop = (trend_line_pp.iloc[-1] - trend_line_pp.iloc[0]) / trend_line_pp.iloc[0] * 100
+                trend_start = intercept_pp + slope_pp * x_pp.iloc[0]
+                trend_end = intercept_pp + slope_pp * x_pp.iloc[-1]
+                total_drop = (trend_end - trend_start) / trend_start * 100
+                trend_line_pp = intercept_pp + slope_pp * plot_pp['time_min']
             else:
                 slope_pp = 0; total_drop = 0; trend_line_pp = None
 
@@ -207,9 +213,9 @@ def render_biomech_tab(df_plot, df_plot_resampled):  # noqa: C901
             fig_pp = go.Figure()
             
             fig_pp.add_trace(go.Scatter(
-                x=df_pp['time_min'], 
-                y=df_pp['pp_smooth'], 
-                customdata=df_pp['watts_smooth'],
+                x=plot_pp['time_min'], 
+                y=plot_pp['pp_smooth'], 
+                customdata=plot_pp['watts_smooth'],
                 name='Pulse Power (W/bpm)', 
                 mode='lines',
                 line=dict(color='#FFD700', width=2),
@@ -218,7 +224,7 @@ def render_biomech_tab(df_plot, df_plot_resampled):  # noqa: C901
             
             if trend_line_pp is not None:
                 fig_pp.add_trace(go.Scatter(
-                    x=x_pp, y=trend_line_pp,
+                    x=plot_pp['time_min'], y=trend_line_pp,
                     name='Trend',
                     mode='lines',
                     line=dict(color='white', width=1.5, dash='dash'),
@@ -226,7 +232,7 @@ def render_biomech_tab(df_plot, df_plot_resampled):  # noqa: C901
                 ))
             
             fig_pp.add_trace(go.Scatter(
-                x=df_pp['time_min'], y=df_pp['watts_smooth'],
+                x=plot_pp['time_min'], y=plot_pp['watts_smooth'],
                 name='Moc (tło)',
                 yaxis='y2',
                 line=dict(width=0),
@@ -279,7 +285,7 @@ def render_biomech_tab(df_plot, df_plot_resampled):  # noqa: C901
     rider_age = st.session_state.get('rider_age', 30)
     is_male = st.session_state.get('is_male', True)
 
-    if 'watts_smooth' in df_plot_resampled.columns and 'heartrate_smooth' in df_plot_resampled.columns:
+    if 'watts_smooth' in df_plot.columns and 'heartrate_smooth' in df_plot.columns:
         import numpy as np
         
         # Współczynniki Keytela
@@ -287,7 +293,7 @@ def render_biomech_tab(df_plot, df_plot_resampled):  # noqa: C901
         
         # Obliczenie wydatku energetycznego (EE) w kJ/min
         ee_kj_min = gender_factor + \
-                    (0.6309 * df_plot_resampled['heartrate_smooth']) + \
+                    (0.6309 * df_plot['heartrate_smooth']) + \
                     (0.1988 * rider_weight) + \
                     (0.2017 * rider_age)
         
@@ -296,17 +302,17 @@ def render_biomech_tab(df_plot, df_plot_resampled):  # noqa: C901
         p_metabolic = p_metabolic.replace(0, np.nan)
         
         # Obliczamy Gross Efficiency
-        ge_series = (df_plot_resampled['watts_smooth'] / p_metabolic) * 100
+        ge_series = (df_plot['watts_smooth'] / p_metabolic) * 100
         
         # Filtrujemy dane nierealistyczne
-        mask_ge = (df_plot_resampled['watts_smooth'] > 100) & \
+        mask_ge = (df_plot['watts_smooth'] > 100) & \
                 (ge_series > 5) & (ge_series < 30) & \
-                (df_plot_resampled['heartrate_smooth'] > 110) 
+                (df_plot['heartrate_smooth'] > 110) 
         
         df_ge = pd.DataFrame({
-            'time_min': df_plot_resampled['time_min'],
+            'time_min': df_plot['time_min'],
             'ge': ge_series,
-            'watts': df_plot_resampled['watts_smooth']
+            'watts': df_plot['watts_smooth']
         })
         df_ge.loc[~mask_ge, 'ge'] = np.nan
 
@@ -327,12 +333,13 @@ def render_biomech_tab(df_plot, df_plot_resampled):  # noqa: C901
 
             cg3.info("Wartości powyżej 25% mogą wynikać z opóźnienia tętna względem mocy (np. krótkie interwały). Analizuj trendy na długich odcinkach.")
 
+            plot_ge = plot_view(df_ge, x_col='time_min', columns=['ge', 'watts'])
             fig_ge = go.Figure()
             
             fig_ge.add_trace(go.Scatter(
-                x=df_ge['time_min'], 
-                y=df_ge['ge'],
-                customdata=df_ge['watts'],
+                x=plot_ge['time_min'], 
+                y=plot_ge['ge'],
+                customdata=plot_ge['watts'],
                 mode='lines',
                 name='Gross Efficiency (%)',
                 line=dict(color='#00cc96', width=1.5),
@@ -341,8 +348,8 @@ def render_biomech_tab(df_plot, df_plot_resampled):  # noqa: C901
             ))
             
             fig_ge.add_trace(go.Scatter(
-                x=df_ge['time_min'], 
-                y=df_ge['watts'],
+                x=plot_ge['time_min'], 
+                y=plot_ge['watts'],
                 mode='lines',
                 name='Moc (Tło)',
                 yaxis='y2',
@@ -353,9 +360,10 @@ def render_biomech_tab(df_plot, df_plot_resampled):  # noqa: C901
             ))
             
             if len(valid_ge) > 100:
-                trend_line = np.poly1d(np.polyfit(valid_ge['time_min'], valid_ge['ge'], 1))(valid_ge['time_min'])
+                trend_x = plot_ge['time_min'][plot_ge['ge'].notna()]
+                trend_line = np.poly1d(np.polyfit(valid_ge['time_min'], valid_ge['ge'], 1))(trend_x)
                 fig_ge.add_trace(go.Scatter(
-                    x=valid_ge['time_min'],
+                    x=trend_x,
                     y=trend_line,
                     mode='lines',
                     name='Trend GE',
@@ -23,6 +23,13 @@ def _format_min_to_mmss(decimal_min: float) -> str:
     seconds = total_seconds % 60
     return f"{minutes:02d}:{seconds:02d}"
 
+def prefetch_drift_maps_tab(df_plot: pd.DataFrame) -> None:
+    """Start the constant-power segment detection in the background."""
+    prefetch.submit(
+        detect_constant_power_segments, df_plot, tolerance_pct=10, min_duration_sec=120
+    )
+
+
 def render_drift_maps_tab(df_plot: pd.DataFrame) -> None:
     """Render the Drift Maps tab in Performance section.
     
@@ -73,7 +80,9 @@ def render_drift_maps_tab(df_plot: pd.DataFrame) -> None:
     st.subheader("📏 Analiza Dryfu przy Stałej Mocy")
     
     # Detect segments
-    segments = detect_constant_power_segments(df_plot, tolerance_pct=10, min_duration_sec=120)
+    segments = prefetch.compute(
+        detect_constant_power_segments, df_plot, tolerance_pct=10, min_duration_sec=120
+    )
     
     if not segments:
         st.info("Nie wykryto segmentów stałej mocy (min. 2 minuty, ±10%).")
@@ -35,7 +35,7 @@ def render_history_import_tab(cp: float = 280):  # noqa: C901
     available = get_available_files()
     
     if not available:
-        st.warning("Brak plików CSV w folderze 'treningi_csv'.")
+        st.warning("Brak plików CSV/FIT w folderze 'treningi_csv'.")
         return
     
     # Display available files
@@ -100,6 +100,8 @@ def render_history_import_tab(cp: float = 280):  # noqa: C901
                     escaped_msg = html.escape(msg)
                     if msg.startswith("✅"):
                         st.markdown(f"<span style='color: green'>{escaped_msg}</span>", unsafe_allow_html=True)
+                    elif msg.startswith("⏭️"):
+                        st.markdown(f"<span style='color: gray'>{escaped_msg}</span>", unsafe_allow_html=True)
                     else:
                         st.markdown(f"<span style='color: red'>{escaped_msg}</span>", unsafe_allow_html=True)
 
@@ -9,6 +9,12 @@ import modules.calculations.hrv
 
 importlib.reload(modules.calculations.hrv)
 from modules.calculations.hrv import calculate_dynamic_dfa_v2
+from modules.ui import prefetch
+
+
+def prefetch_hrv_tab(df_clean_pl: Any) -> None:
+    """Start the DFA Alpha-1 analysis in the background."""
+    prefetch.submit(calculate_dynamic_dfa_v2, df_clean_pl)
 
 
 def render_hrv_tab(df_clean_pl: Any) -> None:  # noqa: C901
@@ -37,7 +43,9 @@ def render_hrv_tab(df_clean_pl: Any) -> None:  # noqa: C901
         if col_btn1.button("🚀 Oblicz HRV i DFA Alpha-1"):
             with st.spinner("Analiza geometrii rytmu serca... Proszę czekać..."):
                 try:
-                    result_df, error_msg = calculate_dynamic_dfa_v2(df_clean_pl)
+                    result_df, error_msg = prefetch.compute(
+                        calculate_dynamic_dfa_v2, df_clean_pl
+                    )
                     st.session_state.df_dfa = result_df
                     st.session_state.dfa_error = error_msg
                     st.rerun()
@@ -8,34 +8,33 @@ import pandas as pd
 import numpy as np
 from scipy import stats
 
+from modules.downsample import plot_view
+
 
 def render_intervals_tab(df_plot, df_plot_resampled, cp_input, rider_weight, rider_age, is_male):
     # --- PULSE POWER (EFICIENCY) ---
     st.subheader("🫀 Pulse Power (Moc na Uderzenie Serca)")
 
-    if (
-        "watts_smooth" in df_plot_resampled.columns
-        and "heartrate_smooth" in df_plot_resampled.columns
-    ):
-        mask_pp = (df_plot_resampled["watts_smooth"] > 50) & (
-            df_plot_resampled["heartrate_smooth"] > 90
-        )
-        df_pp = df_plot_resampled[mask_pp].copy()
+    # Statistics on the full 1 Hz frame; only the plotted traces are downsampled
+    if "watts_smooth" in df_plot.columns and "heartrate_smooth" in df_plot.columns:
+        mask_pp = (df_plot["watts_smooth"] > 50) & (df_plot["heartrate_smooth"] > 90)
+        df_pp = df_plot.loc[mask_pp, ["time_min", "watts_smooth", "heartrate_smooth"]].copy()
 
         if not df_pp.empty:
             df_pp["pulse_power"] = df_pp["watts_smooth"] / df_pp["heartrate_smooth"]
 
             df_pp["pp_smooth"] = df_pp["pulse_power"].rolling(window=12, center=True).mean()
+            plot_pp = plot_view(df_pp, x_col="time_min", columns=["pp_smooth", "watts_smooth"])
             x_pp = df_pp["time_min"]
             y_pp = df_pp["pulse_power"]
             valid_idx = np.isfinite(x_pp) & np.isfinite(y_pp)
 
             if valid_idx.sum() > 100:
                 slope_pp, intercept_pp, _, _, _ = stats.linregress(x_pp[valid_idx], y_pp[valid_idx])
-                trend_line_pp = intercept_pp + slope_pp * x_pp
-                total_drop = (
-                    (trend_line_pp.iloc[-1] - trend_line_pp.iloc[0]) / trend_line_pp.iloc[0] * 100
-                )
+                trend_start = intercept_pp + slope_pp * x_pp.iloc[0]
+                trend_end = intercept_pp + slope_pp * x_pp.iloc[-1]
+                total_drop = (trend_end - trend_start) / trend_start * 100
+                trend_line_pp = intercept_pp + slope_pp * plot_pp["time_min"]
             else:
                 slope_pp = 0
                 total_drop = 0
@@ -77,9 +76,9 @@ def render_intervals_tab(df_plot, df_plot_resampled, cp_input, rider_weight, rid
 
             fig_pp.add_trace(
                 go.Scatter(
-                    x=df_pp["time_min"],
-                    y=df_pp["pp_smooth"],
-                    customdata=df_pp["watts_smooth"],
+                    x=plot_pp["time_min"],
+                    y=plot_pp["pp_smooth"],
+                    customdata=plot_pp["watts_smooth"],
                     name="Pulse Power (W/bpm)",
                     mode="lines",
                     line=dict(color="#FFD700", width=2),  # Złoty kolor
@@ -90,7 +89,7 @@ def render_intervals_tab(df_plot, df_plot_resampled, cp_input, rider_weight, rid
             if trend_line_pp is not None:
                 fig_pp.add_trace(
                     go.Scatter(
-                        x=x_pp,
+                        x=plot_pp["time_min"],
                         y=trend_line_pp,
                         name="Trend",
                         mode="lines",
@@ -101,8 +100,8 @@ def render_intervals_tab(df_plot, df_plot_resampled, cp_input, rider_weight, rid
 
             fig_pp.add_trace(
                 go.Scatter(
-                    x=df_pp["time_min"],
-                    y=df_pp["watts_smooth"],
+                    x=plot_pp["time_min"],
+                    y=plot_pp["watts_smooth"],
                     name="Moc (tło)",
                     yaxis="y2",
                     line=dict(width=0),
@@ -223,10 +222,7 @@ klasyfikował zmęczenie na podstawie trendów podobnych do PP.
     st.caption("Stosunek mocy generowanej (Waty) do spalanej energii (Metabolizm). Typowo: 18-23%.")
 
     # 1. Sprawdzamy, czy mamy potrzebne dane
-    if (
-        "watts_smooth" in df_plot_resampled.columns
-        and "heartrate_smooth" in df_plot_resampled.columns
-    ):
+    if "watts_smooth" in df_plot.columns and "heartrate_smooth" in df_plot.columns:
         # 2. Obliczamy Moc Metaboliczną (Wzór Keytela na podstawie HR)
         # Wzór zwraca kJ/min. Zamieniamy to na Waty (J/s).
         # P_met [W] = (kJ/min * 1000) / 60
@@ -238,7 +234,7 @@ klasyfikował zmęczenie na podstawie trendów podobnych do PP.
         # Używamy wygładzonego HR, żeby uniknąć skoków
         ee_kj_min = (
             gender_factor
-            + (0.6309 * df_plot_resampled["heartrate_smooth"])
+            + (0.6309 * df_plot["heartrate_smooth"])
             + (0.1988 * rider_weight)
             + (0.2017 * rider_age)
         )
@@ -252,7 +248,7 @@ klasyfikował zmęczenie na podstawie trendów podobnych do PP.
         # GE = (Moc Mechaniczna / Moc Metaboliczna) * 100
         # Filtrujemy momenty, gdzie nie pedałujesz (Moc < 10W), bo wtedy GE=0
 
-        ge_series = (df_plot_resampled["watts_smooth"] / p_metabolic) * 100
+        ge_series = (df_plot["watts_smooth"] / p_metabolic) * 100
 
         # Filtrujemy dane nierealistyczne i "zimny start"
         # 1. Watts > 40 (żeby nie dzielić przez zero na postojach)
@@ -260,18 +256,18 @@ klasyfikował zmęczenie na podstawie trendów podobnych do PP.
         # 3. HR > 100 bpm (Wzór Keytela bardzo słabo działa dla niskiego tętna!)
 
         mask_ge = (
-            (df_plot_resampled["watts_smooth"] > 100)
+            (df_plot["watts_smooth"] > 100)
             & (ge_series > 5)
             & (ge_series < 30)
-            & (df_plot_resampled["heartrate_smooth"] > 110)
+            & (df_plot["heartrate_smooth"] > 110)
         )
 
         # Zerujemy błędne wartości (zamieniamy na NaN, żeby nie rysowały się na wykresie)
         df_ge = pd.DataFrame(
             {
-                "time_min": df_plot_resampled["time_min"],
+                "time_min": df_plot["time_min"],
                 "ge": ge_series,
-                "watts": df_plot_resampled["watts_smooth"],
+                "watts": df_plot["watts_smooth"],
             }
         )
         df_ge.loc[~mask_ge, "ge"] = np.nan
@@ -279,13 +275,13 @@ klasyfikował zmęczenie na podstawie trendów podobnych do PP.
         # 4. Czyszczenie danych (Realistyczne ramy fizjologiczne)
         # GE rzadko przekracza 30% (chyba że zjeżdżasz z góry i HR spada szybciej niż waty)
         # GE poniżej 0% to błąd.
-        mask_ge = (df_plot_resampled["watts_smooth"] > 40) & (ge_series > 5) & (ge_series < 35)
+        mask_ge = (df_plot["watts_smooth"] > 40) & (ge_series > 5) & (ge_series < 35)
 
         df_ge = pd.DataFrame(
             {
-                "time_min": df_plot_resampled["time_min"],
+                "time_min": df_plot["time_min"],
                 "ge": ge_series,
-                "watts": df_plot_resampled["watts_smooth"],
+                "watts": df_plot["watts_smooth"],
             }
         )
         # Zerujemy nierealistyczne wartości do wykresu
@@ -318,14 +314,15 @@ klasyfikował zmęczenie na podstawie trendów podobnych do PP.
             )
 
             # WYKRES GE
+            plot_ge = plot_view(df_ge, x_col="time_min", columns=["ge", "watts"])
             fig_ge = go.Figure()
 
             # Linia GE
             fig_ge.add_trace(
                 go.Scatter(
-                    x=df_ge["time_min"],
-                    y=df_ge["ge"],
-                    customdata=df_ge["watts"],
+                    x=plot_ge["time_min"],
+                    y=plot_ge["ge"],
+                    customdata=plot_ge["watts"],
                     mode="lines",
                     name="Gross Efficiency (%)",
                     line=dict(color="#00cc96", width=1.5),
@@ -337,8 +334,8 @@ klasyfikował zmęczenie na podstawie trendów podobnych do PP.
             # Tło (Moc)
             fig_ge.add_trace(
                 go.Scatter(
-                    x=df_ge["time_min"],
-                    y=df_ge["watts"],
+                    x=plot_ge["time_min"],
+                    y=plot_ge["watts"],
                     mode="lines",
                     name="Moc (Tło)",
                     yaxis="y2",
@@ -351,12 +348,13 @@ klasyfikował zmęczenie na podstawie trendów podobnych do PP.
 
             # Linia Trendu GE
             if len(valid_ge) > 100:
+                trend_x = plot_ge["time_min"][plot_ge["ge"].notna()]
                 trend_line = np.poly1d(np.polyfit(valid_ge["time_min"], valid_ge["ge"], 1))(
-                    valid_ge["time_min"]
+                    trend_x
                 )
                 fig_ge.add_trace(
                     go.Scatter(
-                        x=valid_ge["time_min"],
+                        x=trend_x,
                         y=trend_line,
                         mode="lines",
                         name="Trend GE",
@@ -89,7 +89,7 @@ def render_kpi_tab(df_plot, df_plot_resampled, metrics, rider_weight, decoupling
             fig_s = go.Figure()
             fig_s.add_trace(go.Scatter(x=df_plot_resampled['time_min'], y=df_plot_resampled[col_smo2], name='SmO2', line=dict(color='#ab63fa', width=2), hovertemplate="SmO2: %{y:.1f}%<extra></extra>"))
             
-            trend_y = calculate_trend(df_plot_resampled['time_min'].values, df_plot_resampled[col_smo2].values)
+            trend_y = calculate_trend(df_plot['time_min'].values, df_plot[col_smo2].values, df_plot_resampled['time_min'].values)
             if trend_y is not None:
                 fig_s.add_trace(go.Scatter(x=df_plot_resampled['time_min'], y=trend_y, name='Trend', line=dict(color='white', dash='dash', width=1.5), hovertemplate="Trend: %{y:.1f}%<extra></extra>"))
             
@@ -141,7 +141,7 @@ def render_kpi_tab(df_plot, df_plot_resampled, metrics, rider_weight, decoupling
         ))
         
         # Trend VE
-        trend_ve = calculate_trend(df_plot_resampled['time_min'].values, df_plot_resampled['tymeventilation_smooth'].values)
+        trend_ve = calculate_trend(df_plot['time_min'].values, df_plot['tymeventilation_smooth'].values, df_plot_resampled['time_min'].values)
         if trend_ve is not None:
              fig_v.add_trace(go.Scatter(
                  x=df_plot_resampled['time_min'], 
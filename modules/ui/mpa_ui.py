@@ -7,22 +7,46 @@ import plotly.graph_objects as go
 import numpy as np
 import pandas as pd
 
+from modules.ui import prefetch
 from modules.ui.shared import chart, metric, require_data
 from modules.plots import CHART_HEIGHT_MAIN, CHART_HEIGHT_SUB
 
 
-def render_mpa_tab(df_plot, cp_input, w_prime_input):
-    st.header("⚡ MPA — Maximum Power Available")
-
-    if not require_data(df_plot, column="watts"):
-        return
-
+def _mpa_inputs(df_plot):
     watts = df_plot["watts"].to_numpy(dtype=np.float64)
     time_arr = (
         df_plot["time"].to_numpy(dtype=np.float64)
         if "time" in df_plot.columns
         else np.arange(len(watts), dtype=np.float64)
     )
+    return watts, time_arr
+
+
+def prefetch_mpa_tab(df_plot, cp_input, w_prime_input):
+    """Start the default (cycling, bi-exponential) MPA profile in the background."""
+    from modules.calculations.mpa import calculate_mpa
+
+    if df_plot is None or "watts" not in df_plot.columns:
+        return
+    watts, time_arr = _mpa_inputs(df_plot)
+    prefetch.submit(
+        calculate_mpa,
+        watts,
+        time_arr,
+        cp=float(cp_input),
+        w_prime_cap=float(w_prime_input),
+        model="biexp",
+        sport=0,
+    )
+
+
+def render_mpa_tab(df_plot, cp_input, w_prime_input):
+    st.header("⚡ MPA — Maximum Power Available")
+
+    if not require_data(df_plot, column="watts"):
+        return
+
+    watts, time_arr = _mpa_inputs(df_plot)
 
     c1, c2 = st.columns(2)
     sport = c1.selectbox("Sport", ["Kolarstwo", "Bieg", "Pływanie"], index=0)
@@ -35,7 +59,8 @@ def render_mpa_tab(df_plot, cp_input, w_prime_input):
 
     from modules.calculations.mpa import calculate_mpa, calculate_time_to_exhaustion
 
-    profile = calculate_mpa(
+    profile = prefetch.compute(
+        calculate_mpa,
         watts,
         time_arr,
         cp=float(cp_input),
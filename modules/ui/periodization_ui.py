@@ -31,6 +31,7 @@ def render_periodization_tab(*args, **kwargs) -> None:
         _render_gantt_chart(plan)
         _render_weekly_targets(plan)
         _render_pmc_overlay(plan, store)
+        _render_taper(plan)
         _render_validation(plan)
         _render_export(plan)
     _render_theory()
@@ -253,6 +254,31 @@ def _render_pmc_overlay(plan: PeriodizationPlan, store) -> None:
     chart(fig, key="per_pmc_overlay")
 
 
+def _render_taper(plan: PeriodizationPlan) -> None:
+    st.markdown("### 🏔️ Optymalny taper (Peak + Race)")
+
+    from modules.ui.banister_ui import render_taper_planner
+
+    taper_blocks = [b for b in plan.blocks if b.block_type in ("Peak", "Race")]
+    if not taper_blocks:
+        return
+
+    race_date = datetime.strptime(plan.race_date, "%Y-%m-%d")
+    taper_start = datetime.strptime(taper_blocks[0].start_date, "%Y-%m-%d")
+    st.caption(
+        "Dzienny TSS maksymalizujący prognozowaną wydajność w dniu zawodów "
+        "(model Banistera z zakładki Banister)."
+    )
+    render_taper_planner(
+        st.session_state.get("per_ctl", 50.0),
+        st.session_state.get("per_atl", 40.0),
+        race_date,
+        days_out=(race_date - taper_start).days + 1,
+        model=st.session_state.get("banister_model"),
+        key_prefix="per",
+    )
+
+
 def _render_validation(plan: PeriodizationPlan) -> None:
     warnings = validate_plan(plan)
     if warnings:
@@ -1,12 +1,14 @@
 """Longitudinal power trends — Mean-Maximal Power (MMP) over the season.
 
 Reads best efforts (5s / 1min / 5min / 20min) stored per session in the
-SessionStore and plots how they evolve over time. Pure read-only view.
+SessionStore and plots how they evolve over time. The PDC envelope section
+reads full per-session curves from the MMPStore. Pure read-only view.
 """
 from __future__ import annotations
 
 import logging
 
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
@@ -115,6 +117,8 @@ def render_power_trends_tab() -> None:
     apply_chart_style(fig, "Mean-Maximal Power — trend sezonowy")
     st.plotly_chart(fig, width="stretch", config=CHART_CONFIG)
 
+    _render_pdc_envelope()
+
     with st.expander("ℹ️ Jak czytać"):
         st.markdown(
             "- **5 s** — moc neuromięśniowa / sprint.\n"
@@ -123,3 +127,62 @@ def render_power_trends_tab() -> None:
             "- **20 min** — proxy FTP (≈95% z 20-min).\n\n"
             "Rekord = najlepszy wynik w wybranym zakresie; wartość = ostatnia sesja."
         )
+
+
+def _render_pdc_envelope() -> None:
+    """Best-ever and rolling 30/90-day PDC from stored per-session MMP curves."""
+    from modules.power_duration import (
+        DEFAULT_DURATIONS,
+        detect_personal_records,
+        plot_power_duration,
+    )
+
+    try:
+        from modules.cache_utils import get_mmp_store
+
+        mmp_store = get_mmp_store()
+        mmp_store.backfill_from_cache()
+        missing = mmp_store.missing_count()
+        ids, dates, curves = mmp_store.history_matrix()
+    except Exception as e:
+        logger.warning("Power trends: could not load MMP curves: %s", e)
+        return
+
+    if len(ids) == 0:
+        return
+
+    st.divider()
+    st.subheader("🏆 Krzywa mocy — rekordy")
+
+    latest_id = int(ids[-1])
+    latest_curve = curves[-1]
+    current_pdc = {
+        d: (float(latest_curve[d - 1]) if np.isfinite(latest_curve[d - 1]) else None)
+        for d in DEFAULT_DURATIONS
+    }
+    prs = []
+    if not missing:
+        # Without the whole history every new session would look like a record
+        previous_best = mmp_store.best_pdc(DEFAULT_DURATIONS, exclude_session_id=latest_id)
+        prs = detect_personal_records(current_pdc, previous_best)
+
+    fig = plot_power_duration(
+        current_pdc,
+        history_30d=mmp_store.best_pdc(DEFAULT_DURATIONS, days=30),
+        history_90d=mmp_store.best_pdc(DEFAULT_DURATIONS, days=90),
+        personal_records=prs,
+        title=f"Ostatnia sesja ({str(dates[-1])}) vs najlepsze 30/90 dni",
+    )
+    st.plotly_chart(fig, width="stretch", config=CHART_CONFIG)
+
+    if prs:
+        st.success(
+            "Nowe rekordy w ostatniej sesji: "
+            + ", ".join(f"{pr.duration} s — {pr.power:.0f} W" for pr in prs)
+        )
+    st.caption(f"Krzywe MMP zapisane dla {len(ids)} sesji.")
+    if missing:
+        st.caption(
+            f"Rekordy ukryte: {missing} sesji z mocą nie ma jeszcze krzywej MMP "
+            "— zaimportuj ponownie historię treningów."
+        )
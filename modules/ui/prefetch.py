@@ -0,0 +1,116 @@
+"""
+Background prefetch of heavy tab analyses.
+
+With on-demand navigation only the selected tab renders, so switching to
+a heavy tab would pay for its analysis at click time. Tabs route their
+expensive, UI-free computations through ``compute``; the app calls the
+tab's prefetcher (see ``TabRegistry``) for the tabs the user is likely to
+open next, which ``submit`` the same computations to a small thread pool.
+When the tab is opened, ``compute`` picks up the finished (or in-flight)
+result instead of starting over.
+
+Results are keyed by function and argument content (DataFrames by
+fingerprint), so a changed session or parameter never reuses a stale value.
+
+Which tabs are "likely next" is learned from the tab switches observed in
+this process (``record_transition`` / ``likely_next``).
+"""
+
+import logging
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence
+
+from modules.cache_utils import make_cache_key
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_WORKERS = 2
+MAX_RESULTS = 32
+
+_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="tab-prefetch")
+_futures: "OrderedDict[str, Future]" = OrderedDict()
+_lock = threading.Lock()
+_transitions: Counter = Counter()
+
+
+def _key(fn: Callable, args: tuple, kwargs: dict) -> str:
+    name = f"{fn.__module__}.{fn.__qualname__}"
+    return make_cache_key(name, args, kwargs)
+
+
+def _store(key: str, future: Future) -> None:
+    _futures[key] = future
+    while len(_futures) > MAX_RESULTS:
+        _futures.popitem(last=False)
+
+
+def submit(fn: Callable, *args, **kwargs) -> Future:
+    """Start ``fn(*args, **kwargs)`` in the background unless already known."""
+    key = _key(fn, args, kwargs)
+    with _lock:
+        future = _futures.get(key)
+        if future is None or (future.done() and future.exception() is not None):
+            future = _executor.submit(fn, *args, **kwargs)
+            _store(key, future)
+        else:
+            _futures.move_to_end(key)
+    return future
+
+
+def compute(fn: Callable, *args, **kwargs) -> Any:
+    """``fn(*args, **kwargs)``, reusing a prefetched result when available.
+
+    Runs in the calling thread when nothing was prefetched, so Streamlit
+    calls made by ``fn`` keep their script context.
+    """
+    key = _key(fn, args, kwargs)
+    with _lock:
+        future = _futures.get(key)
+        if future is not None:
+            _futures.move_to_end(key)
+    if future is not None:
+        try:
+            return future.result()
+        except Exception as e:
+            logger.debug("Prefetched %s failed, recomputing: %s", fn.__qualname__, e)
+
+    result = fn(*args, **kwargs)
+    done: Future = Future()
+    done.set_result(result)
+    with _lock:
+        _store(key, done)
+    return result
+
+
+def clear() -> None:
+    """Forget all prefetched results (running tasks finish unobserved)."""
+    with _lock:
+        _futures.clear()
+
+
+def pending() -> int:
+    """Number of prefetch tasks still running."""
+    with _lock:
+        return sum(1 for f in _futures.values() if not f.done())
+
+
+def record_transition(previous: Optional[str], current: str) -> None:
+    """Count a switch from tab ``previous`` to tab ``current``."""
+    if previous and previous != current:
+        with _lock:
+            _transitions[(previous, current)] += 1
+
+
+def likely_next(current: str, candidates: Sequence[str], n: int = 2) -> List[str]:
+    """Up to ``n`` tabs most likely opened after ``current``.
+
+    Ranked by observed switches from ``current``; ties (and tabs never
+    switched to) follow the order of ``candidates``, which should start with
+    the tabs next to ``current``.
+    """
+    with _lock:
+        counts = {c: _transitions[(current, c)] for c in candidates if c != current}
+    ranked = sorted(counts, key=lambda c: -counts[c])  # stable: keeps candidate order
+    return ranked[:n]
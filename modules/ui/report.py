@@ -409,7 +409,9 @@ def render_report_tab(  # noqa: C901
             )
 
             trend_y = calculate_trend(
-                df_plot_resampled["time_min"].values, df_plot_resampled[col_smo2].values
+                df_plot["time_min"].values,
+                df_plot[col_smo2].values,
+                df_plot_resampled["time_min"].values,
             )
             if trend_y is not None:
                 fig_s.add_trace(
@@ -497,7 +499,9 @@ def render_report_tab(  # noqa: C901
 
         # Trend VE
         trend_ve = calculate_trend(
-            df_plot_resampled["time_min"].values, df_plot_resampled["tymeventilation_smooth"].values
+            df_plot["time_min"].values,
+            df_plot["tymeventilation_smooth"].values,
+            df_plot_resampled["time_min"].values,
         )
         if trend_ve is not None:
             fig_v.add_trace(
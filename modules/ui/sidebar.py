@@ -147,7 +147,7 @@ def render_sidebar(settings_manager: SettingsManager) -> Tuple[RiderSettings, Op
     )
 
     # File upload
-    uploaded_file = st.sidebar.file_uploader("Wgraj plik (CSV / TXT)", type=["csv", "txt"])
+    uploaded_file = st.sidebar.file_uploader("Wgraj plik (CSV / TXT / FIT)", type=["csv", "txt", "fit"])
 
     settings = RiderSettings(
         weight=rider_weight,
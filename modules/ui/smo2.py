@@ -4,6 +4,7 @@ import pandas as pd
 from scipy import stats
 from modules.calculations.kinetics import generate_state_timeline
 from modules.calculations.quality import check_signal_quality
+from modules.downsample import plot_view
 
 
 def render_smo2_tab(target_df, training_notes, uploaded_file_name):  # noqa: C901
@@ -180,14 +181,15 @@ def render_smo2_tab(target_df, training_notes, uploaded_file_name):  # noqa: C90
         m4.metric("Trend SmO2 (Slope)", trend_desc, delta=trend_desc, delta_color=trend_color)
 
         # ===== WYKRES GŁÓWNY (SUROWE SmO2) =====
+        plot_df = plot_view(target_df, x_col="time", columns=["smo2_smooth", "watts_smooth_5s"])
         fig_smo2 = go.Figure()
 
         # SmO2 (Primary - RAW values)
         fig_smo2.add_trace(
             go.Scatter(
-                x=target_df["time"],
-                y=target_df["smo2_smooth"],
-                customdata=target_df["time_str"],
+                x=plot_df["time"],
+                y=plot_df["smo2_smooth"],
+                customdata=plot_df["time_str"],
                 mode="lines",
                 name="SmO2 (%)",
                 line=dict(color="#FF4B4B", width=2),
@@ -199,9 +201,9 @@ def render_smo2_tab(target_df, training_notes, uploaded_file_name):  # noqa: C90
         if "watts_smooth_5s" in target_df.columns:
             fig_smo2.add_trace(
                 go.Scatter(
-                    x=target_df["time"],
-                    y=target_df["watts_smooth_5s"],
-                    customdata=target_df["time_str"],
+                    x=plot_df["time"],
+                    y=plot_df["watts_smooth_5s"],
+                    customdata=plot_df["time_str"],
                     mode="lines",
                     name="Power",
                     line=dict(color="#1f77b4", width=1),
@@ -287,14 +289,15 @@ def render_smo2_tab(target_df, training_notes, uploaded_file_name):  # noqa: C90
             thb_cols[2].metric("Trend THb (Slope)", trend_thb_desc)
 
             # Wykres THb
+            plot_df = plot_view(target_df, x_col="time", columns=["thb_smooth", "watts_smooth_5s"])
             fig_thb = go.Figure()
 
             # THb (Primary)
             fig_thb.add_trace(
                 go.Scatter(
-                    x=target_df["time"],
-                    y=target_df["thb_smooth"],
-                    customdata=target_df["time_str"],
+                    x=plot_df["time"],
+                    y=plot_df["thb_smooth"],
+                    customdata=plot_df["time_str"],
                     mode="lines",
                     name="THb (g/dL)",
                     line=dict(color="#9467bd", width=2),  # Purple color
@@ -306,9 +309,9 @@ def render_smo2_tab(target_df, training_notes, uploaded_file_name):  # noqa: C90
             if "watts_smooth_5s" in target_df.columns:
                 fig_thb.add_trace(
                     go.Scatter(
-                        x=target_df["time"],
-                        y=target_df["watts_smooth_5s"],
-                        customdata=target_df["time_str"],
+                        x=plot_df["time"],
+                        y=plot_df["watts_smooth_5s"],
+                        customdata=plot_df["time_str"],
                         mode="lines",
                         name="Power",
                         line=dict(color="#1f77b4", width=1),
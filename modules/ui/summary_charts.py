@@ -11,6 +11,7 @@ from scipy import stats
 from typing import Optional
 
 from modules.config import Config
+from modules.downsample import plot_view
 from modules.plots import CHART_CONFIG, CHART_HEIGHT_MAIN, CHART_HEIGHT_SUB
 from .summary_calculations import _estimate_cp_wprime
 from modules.ui.shared import chart, metric
@@ -34,6 +35,7 @@ def _build_training_timeline_chart(  # noqa: C901
     vt2_watts: int = 0,
 ) -> Optional[go.Figure]:
     """Build training timeline as two stacked subplots: Power+HR (top) / SmO2+VE (bottom)."""
+    df_plot = plot_view(df_plot)
     time_x = (
         df_plot["time_min"]
         if "time_min" in df_plot.columns
@@ -310,6 +312,10 @@ def _render_smo2_thb_chart(df_plot: pd.DataFrame):
 
     fig_smo2_thb = make_subplots(specs=[[{"secondary_y": True}]])
 
+    df_plot = plot_view(
+        df_plot, x_col="time", columns=["smo2_smooth", "smo2", "thb_smooth", "thb"]
+    )
+
     time_x = df_plot["time"] if "time" in df_plot.columns else range(len(df_plot))
 
     smo2_col = _get_smooth(df_plot, "smo2")
@@ -8,14 +8,27 @@ import plotly.graph_objects as go
 import pandas as pd
 
 from modules.plots import CHART_CONFIG
+from modules.ui import prefetch
 from modules.tte import (
     compute_tte_result,
+    compute_tte_curve,
+    get_tte_curve_history_from_db,
     format_tte,
     export_tte_json,
     TTEResult,
 )
 
 
+def prefetch_tte_tab(
+    df_plot: pd.DataFrame, ftp: float, uploaded_file_name: str = "manual_upload"
+) -> None:
+    """Start the TTE analysis at the default target (100% FTP, ±5%) in the background."""
+    if "watts" not in df_plot.columns:
+        return
+    prefetch.submit(compute_tte_result, df_plot["watts"], target_pct=100, ftp=ftp, tol_pct=5)
+    prefetch.submit(compute_tte_curve, df_plot["watts"], ftp=ftp, tol_pct=5)
+
+
 def render_tte_tab(df_plot: pd.DataFrame, ftp: float, uploaded_file_name: str = "manual_upload") -> None:
     """Render the TTE analysis tab.
     
@@ -61,7 +74,8 @@ def render_tte_tab(df_plot: pd.DataFrame, ftp: float, uploaded_file_name: str =
     
     # Compute TTE for current session
     power_series = df_plot['watts']
-    result = compute_tte_result(
+    result = prefetch.compute(
+        compute_tte_result,
         power_series,
         target_pct=target_pct,
         ftp=ftp,
@@ -106,6 +120,10 @@ def render_tte_tab(df_plot: pd.DataFrame, ftp: float, uploaded_file_name: str =
     
     # Power distribution chart
     _render_power_distribution_chart(df_plot, result)
+
+    # TTE-vs-intensity curve (all targets from one pass over the session)
+    curve = prefetch.compute(compute_tte_curve, power_series, ftp=ftp, tol_pct=tol_pct)
+    _render_tte_curve_chart(curve, get_tte_curve_history_from_db(days=90))
     
     # Export section
     st.divider()
@@ -242,3 +260,44 @@ def _render_power_distribution_chart(df_plot: pd.DataFrame, result: TTEResult) -
     )
     
     st.plotly_chart(fig, width="stretch", config=CHART_CONFIG)
+
+
+def _render_tte_curve_chart(curve: pd.DataFrame, history: pd.DataFrame) -> None:
+    """Render TTE vs % FTP for the session and the 90-day best from the history."""
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatter(
+        x=curve['target_pct'],
+        y=curve['tte_seconds'] / 60,
+        name='Sesja',
+        mode='lines+markers',
+        line=dict(color='#1f77b4', width=2),
+        customdata=curve[['power_min', 'power_max']],
+        hovertemplate=(
+            '%{x:.0f}% FTP (%{customdata[0]:.0f}-%{customdata[1]:.0f} W): '
+            '%{y:.1f} min<extra></extra>'
+        )
+    ))
+
+    if not history.empty:
+        fig.add_trace(go.Scatter(
+            x=history['target_pct'],
+            y=history['tte_seconds'] / 60,
+            name='Najlepszy (90 dni)',
+            mode='lines+markers',
+            line=dict(color='#ff7f0e', width=2, dash='dash'),
+            hovertemplate='%{x:.0f}% FTP: %{y:.1f} min<extra></extra>'
+        ))
+
+    fig.update_layout(
+        template="plotly_dark",
+        title="Krzywa TTE vs Intensywność",
+        hovermode="x unified",
+        xaxis=dict(title="Intensywność [% FTP]", tickformat=".0f"),
+        yaxis=dict(title="TTE [min]", tickformat=".0f", rangemode="tozero"),
+        height=400,
+        margin=dict(l=10, r=10, t=40, b=10),
+        legend=dict(orientation="h", y=1.1, x=0)
+    )
+
+    st.plotly_chart(fig, width="stretch", config=CHART_CONFIG)
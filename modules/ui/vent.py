@@ -3,6 +3,7 @@ import plotly.graph_objects as go
 import pandas as pd
 from scipy import stats
 from modules.calculations.quality import check_signal_quality
+from modules.downsample import plot_view
 
 
 def render_vent_tab(target_df, training_notes, uploaded_file_name):  # noqa: C901
@@ -197,14 +198,15 @@ def render_vent_tab(target_df, training_notes, uploaded_file_name):  # noqa: C90
         m4.metric("Trend VE (Slope)", trend_desc, delta=trend_desc, delta_color=trend_color)
 
         # ===== WYKRES GŁÓWNY (VE + Power) =====
+        plot_df = plot_view(target_df, x_col="time", columns=["ve_smooth", "watts_smooth_5s"])
         fig_vent = go.Figure()
 
         # VE (Primary)
         fig_vent.add_trace(
             go.Scatter(
-                x=target_df["time"],
-                y=target_df["ve_smooth"],
-                customdata=target_df["time_str"],
+                x=plot_df["time"],
+                y=plot_df["ve_smooth"],
+                customdata=plot_df["time_str"],
                 mode="lines",
                 name="VE (L/min)",
                 line=dict(color="#ffa15a", width=2),
@@ -216,9 +218,9 @@ def render_vent_tab(target_df, training_notes, uploaded_file_name):  # noqa: C90
         if "watts_smooth_5s" in target_df.columns:
             fig_vent.add_trace(
                 go.Scatter(
-                    x=target_df["time"],
-                    y=target_df["watts_smooth_5s"],
-                    customdata=target_df["time_str"],
+                    x=plot_df["time"],
+                    y=plot_df["watts_smooth_5s"],
+                    customdata=plot_df["time_str"],
                     mode="lines",
                     name="Power",
                     line=dict(color="#1f77b4", width=1),
@@ -371,14 +373,17 @@ def render_vent_tab(target_df, training_notes, uploaded_file_name):  # noqa: C90
                 )
 
                 # BR Chart
+                plot_df = plot_view(
+                    target_df, x_col="time", columns=["rr_smooth", "watts_smooth_5s"]
+                )
                 fig_br = go.Figure()
 
                 # BR (Primary)
                 fig_br.add_trace(
                     go.Scatter(
-                        x=target_df["time"],
-                        y=target_df["rr_smooth"],
-                        customdata=target_df["time_str"],
+                        x=plot_df["time"],
+                        y=plot_df["rr_smooth"],
+                        customdata=plot_df["time_str"],
                         mode="lines",
                         name="BR (/min)",
                         line=dict(color="#00cc96", width=2),
@@ -390,9 +395,9 @@ def render_vent_tab(target_df, training_notes, uploaded_file_name):  # noqa: C90
                 if "watts_smooth_5s" in target_df.columns:
                     fig_br.add_trace(
                         go.Scatter(
-                            x=target_df["time"],
-                            y=target_df["watts_smooth_5s"],
-                            customdata=target_df["time_str"],
+                            x=plot_df["time"],
+                            y=plot_df["watts_smooth_5s"],
+                            customdata=plot_df["time_str"],
                             mode="lines",
                             name="Power",
                             line=dict(color="#1f77b4", width=1),
@@ -557,14 +562,17 @@ def render_vent_tab(target_df, training_notes, uploaded_file_name):  # noqa: C90
                 )
 
                 # VT Chart
+                plot_df = plot_view(
+                    target_df, x_col="time", columns=["tv_smooth", "watts_smooth_5s"]
+                )
                 fig_tv = go.Figure()
 
                 # VT (Primary)
                 fig_tv.add_trace(
                     go.Scatter(
-                        x=target_df["time"],
-                        y=target_df["tv_smooth"],
-                        customdata=target_df["time_str"],
+                        x=plot_df["time"],
+                        y=plot_df["tv_smooth"],
+                        customdata=plot_df["time_str"],
                         mode="lines",
                         name="VT (L)",
                         line=dict(color="#ab63fa", width=2),
@@ -576,9 +584,9 @@ def render_vent_tab(target_df, training_notes, uploaded_file_name):  # noqa: C90
                 if "watts_smooth_5s" in target_df.columns:
                     fig_tv.add_trace(
                         go.Scatter(
-                            x=target_df["time"],
-                            y=target_df["watts_smooth_5s"],
-                            customdata=target_df["time_str"],
+                            x=plot_df["time"],
+                            y=plot_df["watts_smooth_5s"],
+                            customdata=plot_df["time_str"],
                             mode="lines",
                             name="Power",
                             line=dict(color="#1f77b4", width=1),
@@ -11,6 +11,7 @@ from typing import Dict, Any, Optional
 
 from modules.config import Config
 from modules.plots import CHART_CONFIG, CHART_HEIGHT_MAIN
+from modules.ui import prefetch
 from modules.ui.shared import chart, metric, require_data
 from modules.calculations.w_prime_reconstitution import (
     compute_w_prime_reconstitution_map,
@@ -19,6 +20,28 @@ from modules.calculations.w_prime_reconstitution import (
 )
 
 
+def prefetch_w_prime_reconstitution_tab(
+    df: Optional[pd.DataFrame] = None,
+    df_resampled: Optional[pd.DataFrame] = None,
+    metrics: Optional[Dict[str, Any]] = None,
+    rider_weight: float = 75.0,
+    cp_input: int = 280,
+    w_prime_input: int = 20000,
+    **kwargs,
+) -> None:
+    """Start the default (bi-exponential, cycling) reconstitution map in the background."""
+    if df is None or df.empty:
+        return
+    prefetch.submit(
+        compute_w_prime_reconstitution_map,
+        df=df,
+        cp=cp_input,
+        w_prime_cap=w_prime_input,
+        model="biexp",
+        sport=0,
+    )
+
+
 def render_w_prime_reconstitution_tab(
     df: Optional[pd.DataFrame] = None,
     df_resampled: Optional[pd.DataFrame] = None,
@@ -58,7 +81,8 @@ def render_w_prime_reconstitution_tab(
         )
 
     # Compute
-    result_df, summary = compute_w_prime_reconstitution_map(
+    result_df, summary = prefetch.compute(
+        compute_w_prime_reconstitution_map,
         df=df,
         cp=cp_input,
         w_prime_cap=w_prime_input,
@@ -113,6 +137,27 @@ def render_w_prime_reconstitution_tab(
 
     fig = go.Figure()
 
+    # Confidence band: envelope of W' balance for CP and W' ±5%
+    if "w_prime_balance_high" in result_df.columns:
+        fig.add_trace(go.Scatter(
+            x=x_vals,
+            y=result_df["w_prime_balance_high"],
+            mode="lines",
+            line=dict(width=0),
+            showlegend=False,
+            hoverinfo="skip",
+        ))
+        fig.add_trace(go.Scatter(
+            x=x_vals,
+            y=result_df["w_prime_balance_low"],
+            mode="lines",
+            name="Pasmo CP/W' ±5%",
+            fill="tonexty",
+            fillcolor="rgba(255, 107, 53, 0.2)",
+            line=dict(width=0),
+            hoverinfo="skip",
+        ))
+
     # W' balance area
     fig.add_trace(go.Scatter(
         x=x_vals,
@@ -5,7 +5,10 @@ import pandas as pd
 import numpy as np
 import io
 import logging
-from typing import Optional
+import os
+from typing import List, Optional
+
+from modules.fit_reader import is_fit_file, read_fit
 
 logger = logging.getLogger(__name__)
 
@@ -33,20 +36,33 @@ def parse_time_input(t_str: str) -> int | None:
     return None
 
 
-def _serialize_df_to_parquet_bytes(df: pd.DataFrame) -> bytes:
-    """Serialize DataFrame to bytes for caching.
+def _resolve_column_names(columns) -> List[str]:
+    """Lowercased, stripped column names with aliases mapped to canonical names.
 
-    Tries parquet first (faster), falls back to CSV.
+    An alias is renamed only when its canonical column is absent; the first
+    matching column (in file order) wins. Names that collide after
+    lowercasing get a numeric suffix so every name stays unique.
     """
-    bio = io.BytesIO()
-    try:
-        df.to_parquet(bio, index=False)
-        return bio.getvalue()
-    except (ImportError, ValueError) as e:
-        logger.debug(f"Parquet serialization failed, using CSV: {e}")
-        bio = io.BytesIO()
-        df.to_csv(bio, index=False)
-        return bio.getvalue()
+    names = [str(c).lower().strip() for c in columns]
+
+    present = set(names)
+    for canonical, aliases in _COLUMN_ALIAS_INDEX.items():
+        if canonical in present:
+            continue
+        for i, name in enumerate(names):
+            if name in aliases:
+                names[i] = canonical
+                present.add(canonical)
+                break
+
+    seen: dict = {}
+    for i, name in enumerate(names):
+        if name in seen:
+            seen[name] += 1
+            names[i] = f"{name}_{seen[name]}"
+        else:
+            seen[name] = 0
+    return names
 
 
 def normalize_columns_pandas(df_pd: pd.DataFrame) -> pd.DataFrame:
@@ -58,28 +74,7 @@ def normalize_columns_pandas(df_pd: pd.DataFrame) -> pd.DataFrame:
     """
     # Copy to avoid mutating input DataFrame
     df_pd = df_pd.copy()
-
-    # Lowercase all columns first
-    df_pd.columns = [str(c).lower().strip() for c in df_pd.columns]
-
-    # Apply standard mappings using cached reverse index for O(m) complexity
-    mapping = {}
-    cols = set(df_pd.columns)  # O(1) lookup
-    cols_lower = {c.lower().strip() for c in df_pd.columns}
-
-    # Pre-built reverse index: canonical -> set of aliases (module-level constant)
-    for canonical, aliases in _COLUMN_ALIAS_INDEX.items():
-        if canonical not in cols_lower:
-            # Find first matching alias
-            match = next((a for a in aliases if a in cols_lower), None)
-            if match:
-                # Find original case column name
-                orig_col = next(c for c in df_pd.columns if c.lower().strip() == match)
-                mapping[orig_col] = canonical
-
-    if mapping:
-        df_pd = df_pd.rename(columns=mapping)
-
+    df_pd.columns = _resolve_column_names(df_pd.columns)
     return df_pd
 
 
@@ -115,193 +110,245 @@ _COLUMN_ALIAS_INDEX = {
 }
 
 
-def _clean_hrv_value(val: str) -> float:
-    """Clean a single HRV value string.
+# Known numeric columns and the dtype they are parsed to. Sensor channels
+# fit comfortably in float32 (the session cache stores them that way too);
+# time keeps float64 so long recordings with fractional stamps stay exact.
+_NUMERIC_DTYPES = {
+    "watts": "float32",
+    "heartrate": "float32",
+    "cadence": "float32",
+    "smo2": "float32",
+    "thb": "float32",
+    "temp": "float32",
+    "torque": "float32",
+    "core_temperature": "float32",
+    "skin_temperature": "float32",
+    "velocity_smooth": "float32",
+    "tymebreathrate": "float32",
+    "tymeventilation": "float32",
+    "rr": "float32",
+    "rr_interval": "float32",
+    "hrv": "float32",
+    "ibi": "float32",
+    "time": "float64",
+    "skin_temp": "float32",
+    "core_temp": "float32",
+    "power": "float32",
+}
 
-    Handles formats: plain numbers, colon-separated values (e.g., "50:60:55")
-    """
-    val = val.strip().lower()
-    if val == "nan" or val == "":
-        return np.nan
 
-    if ":" in val:
-        try:
-            parts = [float(x) for x in val.split(":") if x]
-            return np.mean(parts) if parts else np.nan
-        except ValueError:
-            return np.nan
+def _csv_source(file):
+    """Path of an on-disk file (scanned without buffering it), else an in-memory buffer.
 
+    Only real file handles are scanned by path: an upload's ``name`` is the
+    client's bare filename and may collide with an unrelated local file.
+    """
+    name = getattr(file, "name", None)
+    if _is_disk_file(file) and isinstance(name, (str, os.PathLike)) and os.path.isfile(name):
+        return name
+    file.seek(0)
+    return file if isinstance(file, io.BytesIO) else io.BytesIO(file.read())
+
+
+def _is_disk_file(file) -> bool:
+    """True for a file handle backed by the OS (not an in-memory buffer)."""
+    if isinstance(file, io.BufferedReader):
+        return True
+    if isinstance(file, io.BytesIO):
+        return False
     try:
-        return float(val)
-    except ValueError:
-        return np.nan
+        file.fileno()
+    except (AttributeError, OSError, ValueError):
+        return False
+    return True
+
+
+def _hrv_expr():
+    """Polars expression parsing ``hrv`` strings; "50:60:55" becomes their mean."""
+    import polars as pl
+
+    text = pl.col("hrv").str.strip_chars()
+    # Empty parts are skipped; an unparsable part makes the whole value NaN
+    parts = (
+        text.str.replace_all(":+", ":")
+        .str.strip_chars(":")
+        .str.split(":")
+        .cast(pl.List(pl.Float64), strict=False)
+    )
+    value = (
+        pl.when(text.str.contains(":", literal=True))
+        .then(parts.list.eval(pl.element().fill_null(float("nan"))).list.mean())
+        .otherwise(text.cast(pl.Float64, strict=False))
+    )
+    return value.alias("hrv")
+
+
+def _scan_csv(source, lenient: bool = False):
+    """Lazy, typed scan of a CSV with normalized column names.
+
+    The header is read first to pick the separator (comma, else semicolon)
+    and resolve aliases, so known numeric columns are parsed straight to
+    their target dtype while the file streams. With ``lenient`` they are
+    read as text and cast non-strictly instead, turning bad values into
+    nulls the way pd.to_numeric(errors="coerce") did.
+    """
+    import polars as pl
+
+    def header(separator):
+        return pl.scan_csv(
+            source,
+            separator=separator,
+            with_column_names=_resolve_column_names,
+            infer_schema=False,
+        ).collect_schema().names()
+
+    separator, names = ",", header(",")
+    if len(names) == 1:
+        semicolon_names = header(";")
+        if len(semicolon_names) > 1:
+            separator, names = ";", semicolon_names
+
+    dtypes = {"float32": pl.Float32, "float64": pl.Float64}
+    numeric = {c: dtypes[_NUMERIC_DTYPES[c]] for c in names if c in _NUMERIC_DTYPES}
+    hrv = numeric.pop("hrv", None) is not None
+
+    schema = {c: pl.String for c in numeric} if lenient else dict(numeric)
+    if hrv:
+        schema["hrv"] = pl.String
+    lf = pl.scan_csv(
+        source,
+        separator=separator,
+        with_column_names=_resolve_column_names,
+        schema_overrides=schema,
+    )
+
+    exprs = [_hrv_expr()] if hrv else []
+    if lenient:
+        exprs += [
+            pl.col(c).str.strip_chars().cast(dtype, strict=False) for c, dtype in numeric.items()
+        ]
+    if exprs:
+        lf = lf.with_columns(exprs)
+    if hrv:
+        # Separate pass: chained onto the parse expression, the fills re-run it
+        lf = lf.with_columns(
+            pl.col("hrv").fill_nan(None).interpolate().forward_fill().backward_fill()
+            .cast(pl.Float32)
+        )
+    return lf
 
 
-def _read_raw_file(file) -> pd.DataFrame:
-    """Read file content into raw DataFrame using Polars/Pandas."""
-    # Try Polars first for speed
-    try:
-        import polars as pl
-
-        file.seek(0)
-        content = file.read()
-        file.seek(0)
+def _load_csv_polars(file, chunk_size: Optional[int] = None) -> pd.DataFrame:
+    import polars as pl
 
-        # Try comma separator
+    with pl.Config(streaming_chunk_size=chunk_size):
         try:
-            pl_df = pl.read_csv(io.BytesIO(content))
-        except Exception:
-            # Try semicolon
-            pl_df = pl.read_csv(io.BytesIO(content), separator=";")
-
-        df_pd = pl_df.to_pandas()
-        logger.debug("Loaded data with Polars (fast mode)")
-        return df_pd
-    except Exception as e:
-        logger.debug(f"Polars load failed, using Pandas: {e}")
-        # Pandas fallback with pyarrow engine for better performance
+            df = _scan_csv(_csv_source(file)).collect(engine="streaming")
+        except pl.exceptions.ComputeError as e:
+            # A known numeric column holds text somewhere
+            logger.debug(f"Typed CSV scan failed, parsing numeric columns leniently: {e}")
+            df = _scan_csv(_csv_source(file), lenient=True).collect(engine="streaming")
+    return df.to_pandas()
+
+
+def _parse_hrv_pandas(hrv: pd.Series) -> pd.Series:
+    """Vectorized pandas counterpart of ``_hrv_expr``."""
+    text = hrv.astype(str).str.strip().str.lower()
+    colon = text.str.contains(":", regex=False)
+    values = pd.to_numeric(text.where(~colon), errors="coerce")
+    if colon.any():
+        parts = text[colon].str.split(":", expand=True).replace("", np.nan)
+        numbers = parts.apply(pd.to_numeric, errors="coerce")
+        invalid = (numbers.isna() & parts.notna()).any(axis=1)
+        values[colon] = numbers.mean(axis=1).mask(invalid)
+    return values.interpolate(method="linear").ffill().bfill()
+
+
+def _read_csv_pandas(file) -> pd.DataFrame:
+    """Read a CSV with pandas (pyarrow engine first, then standard, then semicolons)."""
+    try:
+        file.seek(0)
+        return pd.read_csv(file, engine="pyarrow")
+    except (ValueError, UnicodeDecodeError, ImportError) as e:
+        logger.info(f"PyArrow CSV parse failed, trying standard engine: {e}")
         try:
             file.seek(0)
-            # Use pyarrow engine for faster parsing of large files
-            return pd.read_csv(file, low_memory=False, engine="pyarrow")
-        except (pd.errors.ParserError, UnicodeDecodeError, ImportError) as e:
-            logger.info(f"PyArrow CSV parse failed, trying standard engine: {e}")
-            try:
-                file.seek(0)
-                return pd.read_csv(file, low_memory=False)
-            except (pd.errors.ParserError, UnicodeDecodeError) as e:
-                logger.info(f"Standard CSV parse failed, trying semicolon separator: {e}")
-                file.seek(0)
-                return pd.read_csv(file, sep=";", low_memory=False)
-
-
-def _process_hrv_column(df: pd.DataFrame) -> pd.DataFrame:
-    """Process and clean HRV column if present."""
-    if "hrv" in df.columns:
-        df["hrv"] = df["hrv"].astype(str).apply(_clean_hrv_value)
-        df["hrv"] = pd.to_numeric(df["hrv"], errors="coerce")
-        df["hrv"] = df["hrv"].interpolate(method="linear").ffill().bfill()
-    return df
+            return pd.read_csv(file, low_memory=False)
+        except (pd.errors.ParserError, UnicodeDecodeError) as e:
+            logger.info(f"Standard CSV parse failed, trying semicolon separator: {e}")
+            file.seek(0)
+            return pd.read_csv(file, sep=";", low_memory=False)
 
 
-def _convert_numeric_types(df: pd.DataFrame) -> pd.DataFrame:
-    """Convert known columns to numeric types."""
-    numeric_cols = [
-        "watts",
-        "heartrate",
-        "cadence",
-        "smo2",
-        "thb",
-        "temp",
-        "torque",
-        "core_temperature",
-        "skin_temperature",
-        "velocity_smooth",
-        "tymebreathrate",
-        "tymeventilation",
-        "rr",
-        "rr_interval",
-        "hrv",
-        "ibi",
-        "time",
-        "skin_temp",
-        "core_temp",
-        "power",
-    ]
-
-    for col in numeric_cols:
+def _load_csv_pandas(file) -> pd.DataFrame:
+    df = _read_csv_pandas(file)
+    if len(df.columns) == 1 and ";" in str(df.columns[0]):
+        file.seek(0)
+        df = pd.read_csv(file, sep=";", low_memory=False)
+    df.columns = _resolve_column_names(df.columns)
+    if "hrv" in df.columns:
+        df["hrv"] = _parse_hrv_pandas(df["hrv"])
+    for col, dtype in _NUMERIC_DTYPES.items():
         if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(dtype)
     return df
 
 
 @st.cache_data
 def load_data(file, chunk_size: Optional[int] = None) -> pd.DataFrame:
-    """Load CSV/TXT file into DataFrame with column normalization.
+    """Load CSV/TXT or FIT file into DataFrame with column normalization.
 
-    Uses Polars for faster reading if available, falls back to Pandas.
-    Supports chunked loading for large files (>100k rows) to control memory.
+    Cached per uploaded file in the Streamlit session; batch jobs and worker
+    processes should call load_data_uncached instead.
 
     Args:
         file: Uploaded file object
-        chunk_size: Optional chunk size for large files (default: auto-detect)
+        chunk_size: Optional rows per streaming batch (default: chosen by Polars)
 
     Returns:
         Processed DataFrame with normalized columns
     """
-    import gc
-    import logging
-    
-    memory_logger = logging.getLogger("memory")
-    
-    df_pd = _read_raw_file(file)
-    row_count = len(df_pd)
-    memory_mb = df_pd.memory_usage(deep=True).sum() / 1024 / 1024
-    
-    if row_count > 100000:
-        memory_logger.warning(
-            f"Large file detected: {row_count:,} rows, ~{memory_mb:.1f} MB. "
-            f"Using chunked processing."
-        )
-    
-    if row_count > 500000:
-        memory_logger.warning(
-            f"Very large file: {row_count:,} rows. Consider using smaller files "
-            f"or reducing sampling rate."
-        )
-        gc.collect()
-
-    # Check if chunked processing needed for large files
-    if len(df_pd) > 100000 and chunk_size is not False:
-        return _process_large_dataframe(df_pd, chunk_size or 50000)
-
-    # 2. Normalization -> Standard Column Names
-    df_pd = normalize_columns_pandas(df_pd)
-
-    # 3. Data Cleaning (HRV)
-    df_pd = _process_hrv_column(df_pd)
-
-    # 4. Structure Enforcement (Time)
-    if "time" not in df_pd.columns:
-        df_pd["time"] = np.arange(len(df_pd)).astype(float)
+    return load_data_uncached(file, chunk_size)
 
-    # 5. Type Conversion
-    df_pd = _convert_numeric_types(df_pd)
-
-    return df_pd
 
+def load_data_uncached(file, chunk_size: Optional[int] = None) -> pd.DataFrame:
+    """Load CSV/TXT or FIT file into DataFrame with column normalization.
 
-def _process_large_dataframe(df: pd.DataFrame, chunk_size: int) -> pd.DataFrame:
-    """Process large DataFrames in chunks to control memory usage.
+    FIT files (detected by their header) are decoded natively by
+    ``modules.fit_reader``. Text files are scanned lazily by Polars' streaming
+    engine with column names, aliases and dtypes resolved from the header, so
+    rows are parsed, typed and HRV-cleaned batch by batch and only the final
+    frame is materialized.
+    Known sensor columns come out as float32 and ``time`` as float64. Falls
+    back to Pandas when Polars cannot parse the file.
 
     Args:
-        df: Large input DataFrame
-        chunk_size: Number of rows per chunk
+        file: File object opened in binary mode
+        chunk_size: Optional rows per streaming batch (default: chosen by Polars)
 
     Returns:
-        Concatenated processed DataFrame
+        Processed DataFrame with normalized columns
     """
-    import gc
-
-    chunks = []
-    total_rows = len(df)
-
-    for start_idx in range(0, total_rows, chunk_size):
-        end_idx = min(start_idx + chunk_size, total_rows)
-        chunk = df.iloc[start_idx:end_idx].copy()
-
-        # Process chunk
-        chunk = normalize_columns_pandas(chunk)
-        chunk = _process_hrv_column(chunk)
-
-        if "time" not in chunk.columns:
-            chunk["time"] = np.arange(start_idx, end_idx).astype(float)
+    if is_fit_file(file):
+        df_pd = read_fit(file)
+        logger.debug("Loaded FIT file")
+    else:
+        try:
+            df_pd = _load_csv_polars(file, chunk_size)
+            logger.debug("Loaded data with Polars (streaming)")
+        except Exception as e:
+            logger.debug(f"Polars load failed, using Pandas: {e}")
+            df_pd = _load_csv_pandas(file)
 
-        chunk = _convert_numeric_types(chunk)
-        chunks.append(chunk)
+    row_count = len(df_pd)
+    if row_count > 500000:
+        memory_mb = df_pd.memory_usage().sum() / 1024 / 1024
+        logging.getLogger("memory").warning(
+            f"Very large file: {row_count:,} rows, ~{memory_mb:.1f} MB. Consider using "
+            f"smaller files or reducing sampling rate."
+        )
 
-        # Explicit cleanup
-        del chunk
-        gc.collect()
+    if "time" not in df_pd.columns:
+        df_pd["time"] = np.arange(row_count, dtype=np.float64)
 
-    return pd.concat(chunks, ignore_index=True)
+    return df_pd
@@ -8,6 +8,7 @@ Modules:
 - session_analysis: Metrics calculations (NP, IF, TSS, extended metrics)
 - data_validation: DataFrame structure validation
 - session_orchestrator: High-level session processing pipeline
+- session_bundle: Per-upload memoized analysis artifacts for Streamlit reruns
 """
 
 from .session_analysis import (
@@ -29,6 +30,13 @@ from .data_validation import (
     validate_dataframe,
 )
 
+from .session_bundle import (
+    RiderParams,
+    SessionAnalysis,
+    SessionBundle,
+    content_hash,
+)
+
 from .session_orchestrator import (
     process_uploaded_session,
     prepare_session_record,
@@ -52,6 +60,11 @@ __all__ = [
     'RESAMPLE_STEP',
     # Validation
     'validate_dataframe',
+    # Session bundle
+    'RiderParams',
+    'SessionAnalysis',
+    'SessionBundle',
+    'content_hash',
     # Orchestration
     'process_uploaded_session',
     'prepare_session_record',
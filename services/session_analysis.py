@@ -12,6 +12,7 @@ import pandas as pd
 import numpy as np
 from typing import Tuple, Dict, Any
 from modules.config import Config
+from modules.downsample import plot_view
 
 # ============================================================
 # Re-exporting constants for backward compatibility
@@ -82,61 +83,124 @@ def calculate_extended_metrics(
     Returns:
         Extended metrics dictionary
     """
-    # Import here to avoid circular dependency
-    from modules.calculations import (
-        calculate_normalized_power,
-        estimate_carbs_burned,
-        calculate_power_duration_curve,
-        estimate_vlamax_from_pdc,
+    profile = calculate_power_profile(df)
+    return combine_extended_metrics(
+        metrics,
+        profile,
+        calculate_carbs(df, vt1_watts, vt2_watts),
+        estimate_physiology(profile, rider_weight, ef_factor),
+        calculate_signal_metrics(df),
+        ef_factor,
     )
 
+
+def combine_extended_metrics(
+    metrics: Dict[str, Any],
+    profile: Dict[str, Any],
+    carbs: Dict[str, Any],
+    physiology: Dict[str, Any],
+    signals: Dict[str, Any],
+    ef_factor: float,
+) -> Dict[str, Any]:
+    """Merge the parts of the extended metrics into a copy of ``metrics``."""
     # Copy metrics to avoid mutating input
     metrics = {**metrics}
 
-    if "watts" in df.columns:
-        metrics["np"] = calculate_normalized_power(df)
-        # FIXED: Work calculation now accounts for non-1s sample intervals
-        # Work = sum(watts * dt) / 1000 (kJ)
-        if "time" in df.columns and len(df) > 1:
-            # Calculate actual time delta for non-uniform sampling
-            time_diffs = df["time"].diff().dropna()
-            avg_interval = time_diffs.mean() if len(time_diffs) > 0 else 1.0
-            metrics["work_kj"] = df["watts"].sum() * avg_interval / 1000
-        else:
-            # Fallback: assume 1s samples
-            metrics["work_kj"] = df["watts"].sum() / 1000
-        metrics["carbs_total"] = estimate_carbs_burned(df, vt1_watts, vt2_watts)
+    if profile:
+        metrics["np"] = profile["np"]
+        metrics["work_kj"] = profile["work_kj"]
+        metrics.update(carbs)
+        metrics.update(physiology)
+
+    metrics.update(signals)
+
+    # Efficiency factor
+    metrics["ef_factor"] = ef_factor
+    return metrics
+
+
+def calculate_power_profile(df: pd.DataFrame) -> Dict[str, Any]:
+    """NP, work, power duration curve and 5-min MMP (empty without power).
+
+    Depends on the power data only, not on any rider parameter.
+    """
+    # Import here to avoid circular dependency
+    from modules.calculations import calculate_normalized_power, calculate_power_duration_curve
+
+    if "watts" not in df.columns:
+        return {}
+
+    profile: Dict[str, Any] = {"np": calculate_normalized_power(df)}
+    # FIXED: Work calculation now accounts for non-1s sample intervals
+    # Work = sum(watts * dt) / 1000 (kJ)
+    if "time" in df.columns and len(df) > 1:
+        # Calculate actual time delta for non-uniform sampling
+        time_diffs = df["time"].diff().dropna()
+        avg_interval = time_diffs.mean() if len(time_diffs) > 0 else 1.0
+        profile["work_kj"] = df["watts"].sum() * avg_interval / 1000
+    else:
+        # Fallback: assume 1s samples
+        profile["work_kj"] = df["watts"].sum() / 1000
+
+    profile["pdc"] = calculate_power_duration_curve(df)
+    profile["mmp_5m"] = df["watts"].rolling(Config.ROLLING_WINDOW_5MIN).mean().max()
+    return profile
 
-        # Power Duration Curve & VLamax estimation
-        pdc = calculate_power_duration_curve(df)
-        metrics["vlamax_est"] = (
+
+def calculate_carbs(df: pd.DataFrame, vt1_watts: float, vt2_watts: float) -> Dict[str, Any]:
+    """Carbohydrate use from the VT1/VT2 zones (empty without power)."""
+    from modules.calculations import estimate_carbs_burned
+
+    if "watts" not in df.columns:
+        return {}
+    return {"carbs_total": estimate_carbs_burned(df, vt1_watts, vt2_watts)}
+
+
+def estimate_physiology(
+    profile: Dict[str, Any], rider_weight: float, ef_factor: float
+) -> Dict[str, Any]:
+    """VLamax and VO2max estimates from a ``calculate_power_profile`` result."""
+    from modules.calculations import estimate_vlamax_from_pdc
+
+    if not profile:
+        return {}
+
+    pdc = profile["pdc"]
+    result: Dict[str, Any] = {
+        "vlamax_est": (
             estimate_vlamax_from_pdc(pdc, rider_weight) if pdc and rider_weight > 0 else 0
         )
-
-        # VO2max estimation with GE (Gross Efficiency) correction
-        # Standard ACSM formula: VO2 = (power * 10.8 + 3.5) ml/kg/min
-        # Add GE correction: if efficiency differs from 21%, adjust estimate
-        mmp_5m = df["watts"].rolling(Config.ROLLING_WINDOW_5MIN).mean().max()
-        try:
-            mmp_scalar = float(mmp_5m)
-            if np.isfinite(mmp_scalar) and rider_weight > 0:
-                power_per_kg = mmp_scalar / rider_weight
-                # Base formula (assumes 21% GE)
-                vo2_base = 10.8 * power_per_kg + 3.5
-                # Apply GE correction if ef_factor available
-                if ef_factor and ef_factor > 0:
-                    # ef_factor = watts/bpm; estimate individual GE
-                    # Typical ef_factor at threshold ~2.5-3.5 W/bpm
-                    # GE ≈ 21% * (ef_factor / 3.0)
-                    ge_ratio = min(1.3, max(0.7, ef_factor / 3.0))
-                    vo2_corrected = vo2_base / ge_ratio
-                    metrics["vo2_max_est"] = round(vo2_corrected, 1)
-                else:
-                    metrics["vo2_max_est"] = round(vo2_base, 1)
+    }
+
+    # VO2max estimation with GE (Gross Efficiency) correction
+    # Standard ACSM formula: VO2 = (power * 10.8 + 3.5) ml/kg/min
+    # Add GE correction: if efficiency differs from 21%, adjust estimate
+    try:
+        mmp_scalar = float(profile["mmp_5m"])
+        if np.isfinite(mmp_scalar) and rider_weight > 0:
+            power_per_kg = mmp_scalar / rider_weight
+            # Base formula (assumes 21% GE)
+            vo2_base = 10.8 * power_per_kg + 3.5
+            # Apply GE correction if ef_factor available
+            if ef_factor and ef_factor > 0:
+                # ef_factor = watts/bpm; estimate individual GE
+                # Typical ef_factor at threshold ~2.5-3.5 W/bpm
+                # GE ≈ 21% * (ef_factor / 3.0)
+                ge_ratio = min(1.3, max(0.7, ef_factor / 3.0))
+                vo2_corrected = vo2_base / ge_ratio
+                result["vo2_max_est"] = round(vo2_corrected, 1)
             else:
-                metrics["vo2_max_est"] = 0
-        except (ValueError, TypeError):
-            metrics["vo2_max_est"] = 0
+                result["vo2_max_est"] = round(vo2_base, 1)
+        else:
+            result["vo2_max_est"] = 0
+    except (ValueError, TypeError):
+        result["vo2_max_est"] = 0
+    return result
+
+
+def calculate_signal_metrics(df: pd.DataFrame) -> Dict[str, Any]:
+    """Heat strain, core temperature, HRV and pulse-power summaries."""
+    metrics: Dict[str, Any] = {}
 
     if "hsi" in df.columns:
         metrics["max_hsi"] = df["hsi"].max()
@@ -150,12 +214,8 @@ def calculate_extended_metrics(
     elif "hrv" in df.columns:
         metrics["avg_rmssd"] = df["hrv"].mean()
 
-    # Efficiency factor
-    metrics["ef_factor"] = ef_factor
-
     # Average Pulse Power
     metrics["avg_pp"] = _calculate_average_pulse_power(df)
-
     return metrics
 
 
@@ -199,14 +259,15 @@ def apply_smo2_smoothing(df: pd.DataFrame) -> pd.DataFrame:
 
 
 def resample_dataframe(df: pd.DataFrame) -> pd.DataFrame:
-    """Resample DataFrame if it exceeds threshold size.
+    """Downsample DataFrame for plotting, keeping peaks.
+
+    Rows holding the min/max of each plotted column are kept per bucket
+    (see ``modules.downsample``), so sprint peaks and HR spikes survive.
 
     Args:
         df: Original DataFrame
 
     Returns:
-        Resampled DataFrame if size > threshold, otherwise original
+        At most ``Config.PLOT_MAX_POINTS`` rows; the original if already smaller
     """
-    if len(df) > Config.RESAMPLE_THRESHOLD:
-        return df.iloc[:: Config.RESAMPLE_STEP, :].copy()
-    return df
+    return plot_view(df)
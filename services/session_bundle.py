@@ -0,0 +1,214 @@
+"""
+Session Bundle Service
+
+Memoized analysis artifacts of one uploaded session.
+
+Streamlit reruns the whole script on every widget interaction. Instead of
+re-running the processing pipeline each time, the app keeps one
+``SessionBundle`` per uploaded file (keyed by a content hash) and asks it
+for artifacts. Every artifact is memoized on the rider parameters it
+actually depends on, so e.g. changing VT1 only recomputes carbohydrate
+use, while NP, the power duration curve and the W' balance are reused.
+
+Dependency map (parameters in brackets):
+- clean frame, heat strain, power profile (NP/PDC), advanced KPI: none
+- base metrics, Z2 drift, header NP/IF/TSS: [cp]
+- W' balance frame, smoothed / resampled plot frames: [cp, w_prime]
+- carbohydrates: [vt1_watts, vt2_watts]
+- VLamax / VO2max estimates: [rider_weight]
+"""
+
+import logging
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from modules.fingerprint import fingerprint
+
+from .data_validation import validate_dataframe
+from .session_analysis import (
+    apply_smo2_smoothing,
+    calculate_carbs,
+    calculate_header_metrics,
+    calculate_power_profile,
+    calculate_signal_metrics,
+    combine_extended_metrics,
+    estimate_physiology,
+    resample_dataframe,
+)
+
+logger = logging.getLogger(__name__)
+
+# Parameter variants kept per artifact (toggling back and forth stays cached)
+MAX_VARIANTS = 4
+
+
+def content_hash(data: bytes) -> str:
+    """Fingerprint of an uploaded file's raw bytes."""
+    return fingerprint(np.frombuffer(data, dtype=np.uint8))
+
+
+@dataclass(frozen=True)
+class RiderParams:
+    """Rider parameters the session analysis depends on."""
+
+    cp: float
+    w_prime: float
+    rider_weight: float
+    vt1_watts: float
+    vt2_watts: float
+
+
+@dataclass
+class SessionAnalysis:
+    """Outputs of the processing pipeline for one set of rider parameters."""
+
+    df_plot: pd.DataFrame
+    df_plot_resampled: pd.DataFrame
+    metrics: Dict[str, Any]
+    decoupling_percent: float
+    drift_z2: float
+
+
+class SessionBundle:
+    """Analysis artifacts of one session, each memoized on its own inputs.
+
+    Returned DataFrames are shallow copies: tabs that add or rename
+    columns do not leak into the cached artifacts.
+    """
+
+    def __init__(self, df_raw: pd.DataFrame, content_hash: str, filename: str = "") -> None:
+        self.df_raw = df_raw
+        self.content_hash = content_hash
+        self.filename = filename
+        self._memo: Dict[str, "OrderedDict[Hashable, Any]"] = {}
+        # Number of actual computations per artifact (diagnostics and tests)
+        self.compute_counts: Counter = Counter()
+
+    def memoized(self, name: str, key: Hashable, builder: Callable[[], Any]) -> Any:
+        """Value of artifact ``name`` for ``key``, computing it at most once."""
+        variants = self._memo.setdefault(name, OrderedDict())
+        if key in variants:
+            variants.move_to_end(key)
+            return variants[key]
+        value = builder()
+        self.compute_counts[name] += 1
+        variants[key] = value
+        if len(variants) > MAX_VARIANTS:
+            variants.popitem(last=False)
+        return value
+
+    # --- parameter-free artifacts ---
+
+    def validation(self) -> Tuple[bool, Optional[str]]:
+        return self.memoized("validation", (), lambda: validate_dataframe(self.df_raw))
+
+    def clean(self) -> pd.DataFrame:
+        from modules.calculations import process_data
+
+        return self.memoized("clean", (), lambda: process_data(self.df_raw))
+
+    def heat_frame(self) -> pd.DataFrame:
+        """Clean frame with the heat strain index column."""
+        from modules.calculations import calculate_heat_strain_index
+
+        return self.memoized("heat_frame", (), lambda: calculate_heat_strain_index(self.clean()))
+
+    def advanced_kpi(self) -> Tuple[float, float]:
+        """(decoupling %, efficiency factor)."""
+        from modules.calculations import calculate_advanced_kpi
+
+        return self.memoized("advanced_kpi", (), lambda: calculate_advanced_kpi(self.clean()))
+
+    def power_profile(self) -> Dict[str, Any]:
+        return self.memoized("power_profile", (), lambda: calculate_power_profile(self.clean()))
+
+    def signal_metrics(self) -> Dict[str, Any]:
+        return self.memoized(
+            "signal_metrics", (), lambda: calculate_signal_metrics(self.heat_frame())
+        )
+
+    # --- parameter-dependent artifacts ---
+
+    def base_metrics(self, cp: float) -> Dict[str, Any]:
+        from modules.calculations import calculate_metrics
+
+        return self.memoized("base_metrics", cp, lambda: calculate_metrics(self.clean(), cp))
+
+    def drift_z2(self, cp: float) -> float:
+        from modules.calculations import calculate_z2_drift
+
+        return self.memoized("drift_z2", cp, lambda: calculate_z2_drift(self.clean(), cp))
+
+    def header_metrics(self, cp: float) -> Tuple[float, float, float]:
+        """(NP, IF, TSS) for the header."""
+        return self.memoized(
+            "header_metrics", cp, lambda: calculate_header_metrics(self.clean(), cp)
+        )
+
+    def carbs(self, vt1_watts: float, vt2_watts: float) -> Dict[str, Any]:
+        return self.memoized(
+            "carbs",
+            (vt1_watts, vt2_watts),
+            lambda: calculate_carbs(self.clean(), vt1_watts, vt2_watts),
+        )
+
+    def physiology(self, rider_weight: float) -> Dict[str, Any]:
+        _, ef_factor = self.advanced_kpi()
+        return self.memoized(
+            "physiology",
+            rider_weight,
+            lambda: estimate_physiology(self.power_profile(), rider_weight, ef_factor),
+        )
+
+    def plot_frame(self, cp: float, w_prime: float) -> pd.DataFrame:
+        """Heat frame with W' balance and SmO2 smoothing applied."""
+        from modules.calculations import calculate_w_prime_balance
+
+        def build() -> pd.DataFrame:
+            df = calculate_w_prime_balance(self.heat_frame(), cp, w_prime)
+            return apply_smo2_smoothing(df)
+
+        return self.memoized("plot_frame", (cp, w_prime), build)
+
+    def resampled_frame(self, cp: float, w_prime: float) -> pd.DataFrame:
+        return self.memoized(
+            "resampled_frame",
+            (cp, w_prime),
+            lambda: resample_dataframe(self.plot_frame(cp, w_prime)),
+        )
+
+    def metrics(self, params: RiderParams) -> Dict[str, Any]:
+        """Session metrics, as ``calculate_extended_metrics`` would return them."""
+        _, ef_factor = self.advanced_kpi()
+        return combine_extended_metrics(
+            self.base_metrics(params.cp),
+            self.power_profile(),
+            self.carbs(params.vt1_watts, params.vt2_watts),
+            self.physiology(params.rider_weight),
+            self.signal_metrics(),
+            ef_factor,
+        )
+
+    def analyze(self, params: RiderParams) -> Tuple[Optional[SessionAnalysis], Optional[str]]:
+        """Full pipeline output for ``params``.
+
+        Returns:
+            (analysis, error_message); analysis is None when validation fails.
+        """
+        is_valid, error_msg = self.validation()
+        if not is_valid:
+            return None, error_msg
+
+        decoupling_percent, _ = self.advanced_kpi()
+        analysis = SessionAnalysis(
+            df_plot=self.plot_frame(params.cp, params.w_prime).copy(deep=False),
+            df_plot_resampled=self.resampled_frame(params.cp, params.w_prime).copy(deep=False),
+            metrics=self.metrics(params),
+            decoupling_percent=decoupling_percent,
+            drift_z2=self.drift_z2(params.cp),
+        )
+        return analysis, None
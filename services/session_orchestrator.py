@@ -9,21 +9,9 @@ import pandas as pd
 from datetime import date
 from typing import Dict, Any, Optional, Tuple
 
-from .session_analysis import (
-    calculate_extended_metrics,
-    apply_smo2_smoothing,
-    resample_dataframe,
-)
-from .data_validation import validate_dataframe
+from .session_bundle import RiderParams, SessionBundle
 
-from modules.calculations import (
-    calculate_w_prime_balance,
-    calculate_metrics,
-    calculate_advanced_kpi,
-    calculate_z2_drift,
-    calculate_heat_strain_index,
-    process_data,
-)
+from modules.calculations.mmp import compute_mmp
 
 
 def process_uploaded_session(
@@ -36,6 +24,9 @@ def process_uploaded_session(
 ) -> Tuple[Optional[pd.DataFrame], Optional[pd.DataFrame], Optional[Dict[str, Any]], Optional[str]]:
     """Process an uploaded session file through the full analysis pipeline.
     
+    One-shot run of ``SessionBundle.analyze``; the app keeps a bundle per
+    upload instead so reruns reuse the artifacts.
+
     Orchestrates:
     1. Data validation
     2. Data processing
@@ -49,50 +40,20 @@ def process_uploaded_session(
     Returns:
     (df_plot, df_plot_resampled, metrics, error_message)
     """
-    # Validate data
-    is_valid, error_msg = validate_dataframe(df_raw)
-    if not is_valid:
-        return None, None, None, error_msg
-    
-    # Process data
-    df_clean_pl = process_data(df_raw)
-    
-    # Calculate base metrics
-    metrics = calculate_metrics(df_clean_pl, cp_input)
-    
-    # Calculate W' balance
-    df_w_prime = calculate_w_prime_balance(df_clean_pl, cp_input, w_prime_input)
-    
-    # Calculate advanced KPIs
-    decoupling_percent, ef_factor = calculate_advanced_kpi(df_clean_pl)
-    
-    # Calculate Z2 drift
-    drift_z2 = calculate_z2_drift(df_clean_pl, cp_input)
-    
-    # Calculate Heat Strain Index
-    df_with_hsi = calculate_heat_strain_index(df_w_prime)
-    df_plot = df_with_hsi
-    
-    # Calculate extended metrics
-    metrics = calculate_extended_metrics(
-        df_plot, metrics, rider_weight, vt1_watts, vt2_watts, ef_factor
+    bundle = SessionBundle(df_raw, content_hash="")
+    analysis, error_msg = bundle.analyze(
+        RiderParams(cp_input, w_prime_input, rider_weight, vt1_watts, vt2_watts)
     )
-    
-    # Apply SmO2 smoothing
-    df_plot = apply_smo2_smoothing(df_plot)
-    
-    # Resample for performance
-    df_plot_resampled = resample_dataframe(df_plot)
-    
+    if analysis is None:
+        return None, None, None, error_msg
+
     # Store intermediate values in metrics for later use
     # We use a leading underscore convention for internal values
-    # FIXED: Removed DataFrame from metrics dict - DataFrames should not be stored in metrics
-    # The df_clean_pl is now returned separately if needed
-    metrics['_decoupling_percent'] = decoupling_percent
-    metrics['_drift_z2'] = drift_z2
-    # metrics['_df_clean_pl'] removed - use function return value instead
-    
-    return df_plot, df_plot_resampled, metrics, None
+    metrics = analysis.metrics
+    metrics['_decoupling_percent'] = analysis.decoupling_percent
+    metrics['_drift_z2'] = analysis.drift_z2
+
+    return analysis.df_plot, analysis.df_plot_resampled, metrics, None
 
 
 def prepare_session_record(
@@ -105,15 +66,10 @@ def prepare_session_record(
 ) -> Dict[str, Any]:
     """Prepare session data for database storage."""
 
-    def _mmp(window_sec: int):
-        """Mean-maximal power over a window (assumes ~1 Hz samples)."""
-        if 'watts' not in df_plot.columns or len(df_plot) < window_sec:
-            return None
-        try:
-            val = df_plot['watts'].rolling(window_sec, min_periods=window_sec).mean().max()
-            return float(val) if val == val else None  # filter NaN
-        except Exception:
-            return None
+    if 'watts' in df_plot.columns:
+        mmp = compute_mmp(df_plot['watts'].to_numpy(), [5, 60, 300, 1200])
+    else:
+        mmp = {}
 
     return {
         'date': date.today().isoformat(),
@@ -128,10 +84,10 @@ def prepare_session_record(
         'work_kj': metrics.get('work_kj', 0),
         'avg_cadence': metrics.get('avg_cadence', 0),
         'avg_rmssd': metrics.get('avg_rmssd'),
-        'mmp_5s': _mmp(5),
-        'mmp_1m': _mmp(60),
-        'mmp_5m': _mmp(300),
-        'mmp_20m': _mmp(1200),
+        'mmp_5s': mmp.get(5),
+        'mmp_1m': mmp.get(60),
+        'mmp_5m': mmp.get(300),
+        'mmp_20m': mmp.get(1200),
     }
 
 
@@ -6,11 +6,18 @@ import pytest
 from modules.calculations.banister import (
     BanisterModel,
     BanisterPrediction,
+    MIN_FIT_MARKERS,
     TSSRecommendation,
     default_banister_model,
     predict_performance,
     optimize_peaking,
+    plan_taper,
+    impulse_response,
+    simulate_banister,
+    fit_banister_model,
+    banister_fit_inputs,
 )
+from modules.db import SessionRecord
 from datetime import datetime, timedelta
 
 
@@ -68,6 +75,94 @@ class TestPredictPerformance:
         assert result[0].predicted_performance > 100.0
 
 
+def _reference_performance(model, tss):
+    """Direct double-sum impulse response (pre-recursion implementation)."""
+    out = []
+    for n in range(len(tss)):
+        decay = np.arange(n, -1, -1)
+        fitness = model.k1 * np.sum(tss[: n + 1] * np.exp(-decay / model.tau1))
+        fatigue = model.k2 * np.sum(tss[: n + 1] * np.exp(-decay / model.tau2))
+        out.append(model.p0 + fitness - fatigue)
+    return np.array(out)
+
+
+def _synthetic_history(n=900, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.where(rng.random(n) < 0.7, np.clip(rng.normal(80, 30, n), 0, None), 0.0)
+
+
+class TestRecursiveEngine:
+    def test_matches_direct_sum(self):
+        tss = _synthetic_history(300)
+        model = BanisterModel(k1=0.9, k2=1.7, tau1=35.0, tau2=9.0, p0=12.0)
+        perf, _, _ = simulate_banister(tss, model.k1, model.k2, model.tau1, model.tau2, model.p0)
+        assert np.allclose(perf[0], _reference_performance(model, tss))
+
+    def test_impulse_response_recursion(self):
+        tss = np.array([100.0, 0.0, 0.0, 50.0])
+        r = impulse_response(tss, [7.0])
+        d = np.exp(-1 / 7.0)
+        assert np.allclose(r[0], [100.0, 100 * d, 100 * d**2, 100 * d**3 + 50.0])
+
+    def test_batched_parameter_sets(self):
+        tss = _synthetic_history(200)
+        k1 = np.array([1.0, 0.5, 2.0])
+        tau1 = np.array([42.0, 30.0, 42.0])
+        perf, fitness, fatigue = simulate_banister(tss, k1, 2.0, tau1, 7.0, 0.0)
+        assert perf.shape == fitness.shape == fatigue.shape == (3, 200)
+        for p in range(3):
+            model = BanisterModel(k1=k1[p], k2=2.0, tau1=tau1[p], tau2=7.0)
+            assert np.allclose(perf[p], _reference_performance(model, tss))
+
+    def test_predictions_match_reference(self):
+        model = default_banister_model()
+        tss = list(_synthetic_history(120))
+        preds = predict_performance(model, tss, days_ahead=10)
+        reference = _reference_performance(model, np.array(tss + [0.0] * 10))
+        assert np.allclose([p.predicted_performance for p in preds], reference, atol=0.051)
+
+
+class TestFitBanisterModel:
+    def test_recovers_known_parameters(self):
+        tss = _synthetic_history()
+        true = BanisterModel(k1=0.08, k2=0.25, tau1=38.0, tau2=9.0, p0=250.0)
+        perf, _, _ = simulate_banister(tss, true.k1, true.k2, true.tau1, true.tau2, true.p0)
+        rng = np.random.default_rng(1)
+        days = np.sort(rng.choice(len(tss), 80, replace=False))
+        values = perf[0, days] + rng.normal(0, 1.0, len(days))
+
+        fit = fit_banister_model(tss, days, values)
+        assert fit is not None
+        assert fit.n_markers == 80
+        assert fit.r_squared > 0.95
+        assert fit.model.tau1 == pytest.approx(38.0, rel=0.15)
+        assert fit.model.tau2 == pytest.approx(9.0, rel=0.25)
+        assert fit.model.tau1 > fit.model.tau2
+
+    def test_too_few_markers(self):
+        tss = _synthetic_history(100)
+        days = np.arange(MIN_FIT_MARKERS - 1) * 10
+        assert fit_banister_model(tss, days, np.full(len(days), 250.0)) is None
+
+    def test_fit_inputs_from_records(self):
+        records = [
+            SessionRecord(date="2024-01-01", tss=80.0, mmp_5m=320.0, mmp_20m=280.0),
+            SessionRecord(date="2024-01-01", tss=20.0, mmp_5m=200.0, mmp_20m=180.0),
+            SessionRecord(date="2024-01-03", tss=60.0, mmp_5m=250.0, mmp_20m=200.0),
+            SessionRecord(date="2024-01-05", tss=90.0, mmp_5m=330.0, mmp_20m=285.0),
+        ]
+        start, tss, days, values = banister_fit_inputs(records, "mmp_20m")
+        assert start == datetime(2024, 1, 1)
+        assert tss.tolist() == [100.0, 0.0, 60.0, 0.0, 90.0]
+        # 2024-01-03 is below 90% of the trailing best
+        assert days.tolist() == [0, 4]
+        assert values.tolist() == [280.0, 285.0]
+
+        _, _, cp_days, cp_values = banister_fit_inputs(records, "cp", near_max_pct=0.0)
+        assert cp_days.tolist() == [0, 2, 4]
+        assert cp_values[0] == pytest.approx((280 * 1200 - 320 * 300) / 900)
+
+
 class TestOptimizePeaking:
     def test_taper_plan_created(self):
         target = datetime.now() + timedelta(days=14)
@@ -88,3 +183,75 @@ class TestOptimizePeaking:
         for r in recs:
             assert r.notes
             assert r.date
+
+
+class TestPlanTaper:
+    TARGET = datetime(2026, 6, 14)  # a Sunday
+
+    def _brute_force_best(self, model, n, hi, intensity, rest_mask):
+        """Evaluate every plan built from {0, intensity, hi} per day at once."""
+        import itertools
+
+        levels = np.array([0.0, intensity, hi])
+        plans = np.array(list(itertools.product(levels, repeat=n)))
+        plans[:, rest_mask] = 0.0
+        hard = plans >= intensity
+        ok = (hard.sum(axis=1) >= 1) & ~(hard[:, 1:] & hard[:, :-1]).any(axis=1)
+        days_before = np.arange(n - 1, -1, -1)
+        gain = model.k1 * np.exp(-days_before / model.tau1) - model.k2 * np.exp(
+            -days_before / model.tau2
+        )
+        return np.max(np.where(ok, plans @ gain, -np.inf))
+
+    def test_matches_brute_force(self):
+        model = default_banister_model()
+        n = 7
+        plan = plan_taper(
+            60.0, 40.0, self.TARGET, days_out=n, model=model, max_daily_tss=90.0, intensity_tss=60.0
+        )
+        rest = np.zeros(n, dtype=bool)
+        rest[-1] = True
+        days_before = np.arange(n - 1, -1, -1)
+        gain = model.k1 * np.exp(-days_before / model.tau1) - model.k2 * np.exp(
+            -days_before / model.tau2
+        )
+        best = self._brute_force_best(model, n, 90.0, 60.0, rest)
+        assert float(plan.tss @ gain) == pytest.approx(best)
+
+    def test_respects_constraints(self):
+        plan = plan_taper(
+            70.0,
+            60.0,
+            self.TARGET,
+            days_out=21,
+            max_daily_tss=110.0,
+            rest_days=[0],
+            min_intensity_days=2,
+            intensity_tss=70.0,
+        )
+        assert len(plan.recommendations) == 21
+        assert plan.tss.max() <= 110.0
+        assert plan.tss[-1] == 0.0
+        dates = [datetime.strptime(r.date, "%Y-%m-%d") for r in plan.recommendations]
+        assert dates[-1] == self.TARGET
+        assert all(t == 0 for d, t in zip(dates, plan.tss, strict=True) if d.weekday() == 0)
+
+        hard = np.array([r.taper_phase == "Akcent intensywności" for r in plan.recommendations])
+        assert not (hard[1:] & hard[:-1]).any()
+        assert all(plan.tss[hard] >= 70.0)
+        for week_end in (21, 14, 7):
+            assert hard[week_end - 7 : week_end].sum() >= 2
+
+    def test_beats_maintaining_load(self):
+        plan = plan_taper(60.0, 40.0, self.TARGET, days_out=14)
+        assert plan.target_performance > plan.maintenance_performance
+        assert plan.predicted_performance[-1] == pytest.approx(plan.target_performance)
+
+    def test_uses_model(self):
+        slow_fatigue = BanisterModel(k1=1.0, k2=2.0, tau1=42.0, tau2=15.0)
+        fast = plan_taper(60.0, 40.0, self.TARGET, days_out=28, min_intensity_days=0)
+        slow = plan_taper(
+            60.0, 40.0, self.TARGET, days_out=28, model=slow_fatigue, min_intensity_days=0
+        )
+        # Longer-lasting fatigue calls for an earlier, longer taper
+        assert (slow.tss == 0).sum() > (fast.tss == 0).sum()
@@ -0,0 +1,124 @@
+"""
+Tests for peak-preserving plot downsampling.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.downsample import (
+    DownsamplePyramid,
+    _minmax_numpy,
+    minmax_indices,
+    plot_view,
+)
+from services.session_analysis import resample_dataframe
+
+
+@pytest.fixture
+def ride_df():
+    rng = np.random.default_rng(0)
+    n = 5 * 3600
+    t = np.arange(n)
+    watts = 200 + rng.normal(0, 20, n)
+    watts[7777] = 1400  # single-second sprint
+    hr = 140 + rng.normal(0, 3, n)
+    hr[12345] = 199
+    return pd.DataFrame({
+        "time": t,
+        "time_min": t / 60,
+        "watts": watts,
+        "watts_smooth": pd.Series(watts).rolling(5, min_periods=1).mean(),
+        "heartrate": hr,
+        "heartrate_smooth": hr,
+        "note": "x",
+    })
+
+
+class TestMinMaxIndices:
+
+    @pytest.mark.parametrize("n,k,bucket", [(1000, 3, 7), (999, 1, 2), (17, 2, 32)])
+    def test_kernel_matches_numpy(self, n, k, bucket):
+        rng = np.random.default_rng(n)
+        values = rng.normal(size=(n, k))
+        values[rng.random((n, k)) < 0.1] = np.nan
+        np.testing.assert_array_equal(
+            minmax_indices(values, bucket), _minmax_numpy(values, bucket)
+        )
+
+    def test_keeps_extremes_and_edges(self):
+        values = np.array([5.0, 1.0, 9.0, 3.0, 4.0, np.nan, 8.0, 2.0, 6.0])
+        assert minmax_indices(values, 3).tolist() == [0, 1, 2, 3, 4, 6, 7, 8]
+
+
+class TestDownsamplePyramid:
+
+    def test_full_view_is_bounded_and_keeps_peaks(self, ride_df):
+        view = DownsamplePyramid(ride_df, max_points=5000).view()
+        assert len(view) <= 5000
+        assert view["watts"].max() == 1400
+        assert view["heartrate"].max() == 199
+        assert view["time"].iloc[0] == 0 and view["time"].iloc[-1] == len(ride_df) - 1
+        assert view["time"].is_monotonic_increasing
+        # Stride thinning loses the sprint
+        assert ride_df.iloc[::5]["watts"].max() < 1400
+
+    def test_zoom_uses_finer_level(self, ride_df):
+        pyramid = DownsamplePyramid(ride_df, max_points=5000)
+        coarsest = len(pyramid.levels) - 1
+        assert pyramid.level_for() == coarsest
+
+        zoom = pyramid.view((100, 110))
+        assert pyramid.level_for((100, 110)) == 0
+        assert len(zoom) == 603  # every second in range + one on each side
+        assert zoom["time_min"].min() < 100 and zoom["time_min"].max() > 110
+        assert 0 < pyramid.level_for((60, 180)) < coarsest
+
+    def test_small_frame_passes_through(self, ride_df):
+        small = ride_df.iloc[:1000]
+        assert plot_view(small) is small
+
+    def test_resample_dataframe(self, ride_df):
+        resampled = resample_dataframe(ride_df)
+        assert len(resampled) <= 5000
+        assert resampled["watts"].max() == 1400
+        assert list(resampled.columns) == list(ride_df.columns)
+
+
+def test_pulse_power_export_uses_full_resolution(ride_df):
+    from scipy import stats
+
+    from modules.chart_exporters import ChartContext, PulsePowerChartExporter
+    from modules.config import Config
+
+    ctx = ChartContext(
+        df_plot=ride_df,
+        df_plot_resampled=resample_dataframe(ride_df),
+        rider_weight=75,
+        cp_input=250,
+        vt1_watts=180,
+        vt2_watts=230,
+        metrics={},
+    )
+    exporter = PulsePowerChartExporter()
+    assert exporter.can_export(ctx)
+    pp_trace, trend_trace = exporter.create_figure(ctx).data[:2]
+
+    pp = ride_df["watts_smooth"] / ride_df["heartrate_smooth"]
+    pp_smooth = pp.rolling(window=30, center=True).mean()
+    rows = np.searchsorted(ride_df["time_min"].to_numpy(), np.asarray(pp_trace.x))
+    assert len(rows) <= Config.PLOT_MAX_POINTS
+    np.testing.assert_allclose(np.asarray(pp_trace.y, dtype=float), pp_smooth.iloc[rows])
+    fit = stats.linregress(ride_df["time_min"], pp)
+    np.testing.assert_allclose(trend_trace.y, fit.intercept + fit.slope * np.asarray(trend_trace.x))
+
+
+def test_trend_fitted_on_full_data_evaluated_on_plot_axis(ride_df):
+    from modules.calculations import calculate_trend
+
+    resampled = resample_dataframe(ride_df)
+    x, y = ride_df["time_min"].to_numpy(), ride_df["watts_smooth"].to_numpy()
+    trend = calculate_trend(x, y, resampled["time_min"].to_numpy())
+
+    assert len(trend) == len(resampled)
+    np.testing.assert_allclose(trend, np.poly1d(np.polyfit(x, y, 1))(resampled["time_min"]))
+    np.testing.assert_allclose(calculate_trend(x, y), np.poly1d(np.polyfit(x, y, 1))(x))
@@ -0,0 +1,121 @@
+"""
+Tests for the parallel, cached ramp-test figure renderer.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("reportlab")  # modules.reporting builds PDFs on import
+
+from modules.reporting.figures.renderer import (  # noqa: E402
+    FIGURES,
+    FigureCache,
+    SharedPayload,
+    figure_key,
+    read_payload,
+    render_figures,
+)
+
+
+@pytest.fixture
+def ramp_df():
+    rng = np.random.default_rng(0)
+    n = 900
+    t = np.arange(n)
+    return pd.DataFrame({
+        "time": t,
+        "watts": 100 + t / 6 + rng.normal(0, 8, n),
+        "heartrate": 100 + t / 25,
+        "smo2": 75 - t / 60,
+        "tymeventilation": 30 + (t / 25) ** 1.3,
+        "cadence": rng.normal(90, 4, n),
+    })
+
+
+@pytest.fixture
+def report(ramp_df):
+    return {
+        "metadata": {"session_id": "abcdef123456", "rider_weight": 75},
+        "thresholds": {"vt1_watts": 200, "vt2_watts": 280},
+        "time_series": {
+            "time_sec": ramp_df["time"].tolist(),
+            "power_watts": ramp_df["watts"].tolist(),
+        },
+    }
+
+
+class TestSharedPayload:
+
+    def test_round_trip(self, report):
+        df = pd.DataFrame(
+            {
+                "watts": np.arange(5, dtype=np.float32),
+                "hr": np.arange(5, dtype=np.int64),
+                "flag": [True, False, True, False, True],
+                "ts": pd.date_range("2026-01-01", periods=5, freq="s"),
+                "label": list("abcde"),  # not numeric: dropped
+            },
+            index=np.arange(10, 15),
+        )
+        payload = SharedPayload(report, df)
+        try:
+            restored_report, restored = read_payload(payload.descriptor, payload.shm.buf)
+        finally:
+            payload.close()
+
+        assert restored_report == report
+        pd.testing.assert_frame_equal(restored, df.drop(columns="label"))
+        assert restored["watts"].to_numpy().flags.writeable
+
+    def test_without_frame(self, report):
+        payload = SharedPayload(report, None)
+        try:
+            assert read_payload(payload.descriptor, payload.shm.buf) == (report, None)
+        finally:
+            payload.close()
+
+
+class TestFigureKey:
+
+    def test_only_used_overrides_invalidate(self):
+        specs = {spec.name: spec for spec in FIGURES}
+        base = ("r", "f", "c")
+
+        def key(name, overrides):
+            return figure_key(specs[name], *base, overrides, "png")
+
+        vt1 = {"manual_vt1_watts": 210}
+        assert key("ramp_profile", {}) != key("ramp_profile", vt1)
+        assert key("smo2_power", {}) == key("smo2_power", vt1)
+        assert key("smo2_power", {}) != key("smo2_power", {"smo2_lt1_m": 5})
+        # Charts that do not read the source frame ignore its fingerprint
+        assert figure_key(specs["pdc_curve"], "r", "f", "c", {}, "png") == figure_key(
+            specs["pdc_curve"], "r", "other", "c", {}, "png"
+        )
+
+
+class TestRenderFigures:
+
+    def test_cache_reuse(self, tmp_path, report, ramp_df):
+        cache = FigureCache(tmp_path / "cache")
+        specs = tuple(s for s in FIGURES if s.name in ("ramp_profile", "smo2_power"))
+
+        def render(out, overrides):
+            return render_figures(
+                report, tmp_path / out, {}, ramp_df, overrides,
+                specs=specs, cache=cache, parallel=False,
+            )
+
+        (tmp_path / "a").mkdir()
+        paths, failures = render("a", {})
+        assert failures == []
+        assert list(paths) == ["ramp_profile", "smo2_power"]
+        assert len(list(cache.cache_dir.iterdir())) == 2
+
+        # A VT1 override redraws the ramp profile only
+        (tmp_path / "b").mkdir()
+        paths, _ = render("b", {"manual_vt1_watts": 210})
+        assert len(list(cache.cache_dir.iterdir())) == 3
+        assert (tmp_path / "b" / "smo2_power_abcdef12.png").read_bytes() == (
+            tmp_path / "a" / "smo2_power_abcdef12.png"
+        ).read_bytes()
@@ -0,0 +1,124 @@
+"""Tests for content fingerprints and cache keys."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.cache_utils import _generate_cache_key, make_cache_key
+from modules.fingerprint import fingerprint, invalidate_fingerprint
+
+
+class TestFingerprint:
+    """Tests for fingerprint function."""
+
+    def test_same_shape_different_content(self, sample_power_df):
+        """Sessions with identical shape and columns must not collide."""
+        other = sample_power_df.copy()
+        other.loc[100, "watts"] += 1.0
+
+        assert fingerprint(sample_power_df) != fingerprint(other)
+
+    def test_equal_content_equal_fingerprint(self, sample_power_df):
+        """Independent copies with equal content share a fingerprint."""
+        assert fingerprint(sample_power_df) == fingerprint(sample_power_df.copy())
+
+    def test_strided_array_matches_contiguous(self):
+        """Non-contiguous views hash the same as their contiguous copies."""
+        arr = np.arange(2000, dtype=float).reshape(1000, 2)
+        view = arr[:, 1]
+
+        assert not view.flags.c_contiguous
+        assert fingerprint(view) == fingerprint(np.ascontiguousarray(view))
+
+    def test_memo_revalidated_on_new_column(self, sample_power_df):
+        """Adding a column changes the structural signature."""
+        df = sample_power_df.copy()
+        before = fingerprint(df)
+        df["watts_smooth"] = df["watts"].rolling(5, min_periods=1).mean()
+
+        assert fingerprint(df) != before
+
+    def test_memo_revalidated_on_column_reassignment(self, sample_power_df):
+        """Replacing a column with same-dtype values changes the signature."""
+        df = sample_power_df.copy()
+        df["label"] = pd.array(["a"] * len(df), dtype="string")
+        before = fingerprint(df)
+        df["watts"] = df["watts"] * 2
+        doubled = fingerprint(df)
+        df["label"] = df["label"] + "b"
+
+        assert len({before, doubled, fingerprint(df)}) == 3
+
+    def test_memo_revalidated_on_series_buffer_swap(self, sample_power_df):
+        """A Series whose values buffer is replaced (copy-on-write) is rehashed."""
+        with pd.option_context("mode.copy_on_write", True):
+            df = sample_power_df.copy()
+            df.loc[0, "watts"] = np.nan
+            watts = df["watts"]
+            before = fingerprint(watts)
+            watts.fillna(0.0, inplace=True)  # shares df's buffer, so it is copied
+
+            assert fingerprint(watts) != before
+
+    def test_invalidate_after_inplace_edit(self, sample_power_df):
+        """In-place value edits are picked up after explicit invalidation."""
+        df = sample_power_df.copy()
+        before = fingerprint(df)
+        df.iloc[0, 1] = -1.0
+        invalidate_fingerprint(df)
+
+        assert fingerprint(df) != before
+
+    def test_object_and_index_content(self):
+        """String columns and index labels are part of the fingerprint."""
+        a = pd.DataFrame({"name": ["a", "b"]}, index=[0, 1])
+        b = pd.DataFrame({"name": ["a", "c"]}, index=[0, 1])
+        c = pd.DataFrame({"name": ["a", "b"]}, index=[5, 6])
+
+        assert len({fingerprint(a), fingerprint(b), fingerprint(c)}) == 3
+
+
+class TestCacheKeys:
+    """Tests for cache key generation."""
+
+    def test_disk_key_depends_on_content(self, sample_power_df):
+        other = sample_power_df.copy()
+        other["watts"] = other["watts"][::-1].to_numpy()
+
+        key_a = _generate_cache_key("f", (sample_power_df,), {"cp": 280})
+        key_b = _generate_cache_key("f", (other,), {"cp": 280})
+
+        assert key_a != key_b
+
+    def test_disk_key_depends_on_container_contents(self):
+        assert _generate_cache_key("f", ([1, 2],), {}) != _generate_cache_key("f", ([1, 3],), {})
+
+    def test_make_cache_key_stable(self, sample_power_df):
+        assert make_cache_key(sample_power_df, 30, "watts") == make_cache_key(
+            sample_power_df.copy(), 30, "watts"
+        )
+        assert make_cache_key(sample_power_df, 30) != make_cache_key(sample_power_df, 60)
+
+    def test_disk_cache_follows_config_flag(self, sample_power_df, tmp_path, monkeypatch):
+        from modules import cache_utils
+        from modules.config import Config
+
+        if not cache_utils._CACHE_AVAILABLE:
+            pytest.skip("diskcache not installed")
+        monkeypatch.setattr(Config, "DB_PATH", tmp_path / "history.db")
+        monkeypatch.setattr(cache_utils, "_cache", None)
+        calls = []
+
+        @cache_utils.cache_result(ttl=60)
+        def mean_power(df):
+            calls.append(1)
+            return float(df["watts"].mean())
+
+        mean_power(sample_power_df)
+        mean_power(sample_power_df.copy())
+        assert len(calls) == 1
+        assert (tmp_path / "cache").is_dir()
+
+        monkeypatch.setattr(Config, "DISK_CACHE_ENABLED", False)
+        assert cache_utils.get_cache() is None
+        mean_power(sample_power_df)
+        assert len(calls) == 2
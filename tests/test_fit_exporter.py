@@ -0,0 +1,111 @@
+"""
+Tests for the vectorized FIT record encoder and CRC in FitExporter.
+"""
+import io
+import struct
+import zipfile
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.export.fit_exporter import MSG_RECORD, FitExporter, fit_crc16
+
+START = datetime(2024, 5, 1, 7, 30, 12, 250000)
+METRICS = {"avg_watts": 220, "avg_hr": 140, "np": 230, "tss": 80.5, "work_kj": 900}
+
+
+def _reference_crc(data: bytes) -> int:
+    """The nibble-table CRC the exporter used before."""
+    table = [
+        0x0000, 0xCC01, 0xD801, 0x1400, 0xF001, 0x3C00, 0x2800, 0xE401,
+        0xA001, 0x6C00, 0x7800, 0xB401, 0x5000, 0x9C01, 0x8801, 0x4400,
+    ]
+    crc = 0
+    for byte in data:
+        tmp = table[crc & 0xF]
+        crc = ((crc >> 4) & 0x0FFF) ^ tmp ^ table[byte & 0xF]
+        tmp = table[crc & 0xF]
+        crc = ((crc >> 4) & 0x0FFF) ^ tmp ^ table[(byte >> 4) & 0xF]
+    return crc
+
+
+def _reference_records(df: pd.DataFrame) -> bytes:
+    """Per-sample struct.pack encoding of record messages."""
+    epoch = FitExporter.FIT_EPOCH
+    out = []
+    for i in range(len(df)):
+        ts = int((START + timedelta(seconds=float(df["time"].iloc[i])) - epoch).total_seconds())
+        out.append(b"\x00" + struct.pack(
+            "<IHBBH",
+            ts,
+            max(0, min(65535, int(df["watts"].iloc[i]))),
+            max(0, min(255, int(df["heartrate"].iloc[i]))),
+            max(0, min(255, int(df["cadence"].iloc[i]))),
+            max(0, min(65535, int(df["velocity_smooth"].iloc[i] * 1000))),
+        ))
+    return b"".join(out)
+
+
+@pytest.fixture
+def ride():
+    rng = np.random.default_rng(0)
+    n = 2000
+    time = np.arange(n, dtype=float)
+    time[rng.random(n) < 0.1] += 0.5
+    return pd.DataFrame({
+        "time": time,
+        "watts": rng.normal(220, 120, n),
+        "heartrate": rng.normal(140, 60, n),
+        "cadence": rng.normal(90, 10, n),
+        "velocity_smooth": rng.normal(9, 2, n),
+    })
+
+
+class TestFitExporter:
+
+    def test_records_match_per_sample_encoding(self, ride):
+        data = FitExporter().export(ride, METRICS, START)
+        records = _reference_records(ride)
+        # Record definition: 5 fields with their byte sizes, then the records
+        definition = struct.pack("<BxBHB", 0x40, 0, MSG_RECORD, 5) + bytes(
+            [253, 4, 0x86, 7, 2, 0x84, 3, 1, 0x00, 4, 1, 0x00, 6, 2, 0x84]
+        )
+        assert definition + records in data
+
+    def test_header_and_crc(self, ride):
+        data = FitExporter().export(ride, METRICS, START)
+        header_size, _, _, data_size, signature, _ = struct.unpack("<BBHI4sH", data[:14])
+        assert signature == b".FIT"
+        assert header_size + data_size + 2 == len(data)
+        assert fit_crc16(data) == 0  # CRC over the file including its own CRC
+        assert fit_crc16(data[:-2]) == _reference_crc(data[:-2])
+
+    def test_missing_samples_are_invalid(self, ride):
+        df = ride.iloc[:3].copy()
+        df.loc[1, ["watts", "heartrate"]] = np.nan
+        data = FitExporter().export(df, METRICS, START)
+        records = data[data.index(_reference_records(df.iloc[:1])):]
+        second = records[11:22]
+        assert second[5:7] == b"\xff\xff"
+        assert second[7] == 0xFF
+
+    def test_crc_without_numba(self, monkeypatch):
+        import modules.export.fit_exporter as fit_module
+
+        payload = bytes(range(256)) * 3
+        monkeypatch.setattr(fit_module, "is_numba_available", lambda: False)
+        assert fit_crc16(payload) == _reference_crc(payload)
+
+    def test_batch_export(self, ride):
+        exporter = FitExporter()
+        sessions = [
+            ("morning", ride, METRICS, START),
+            ("evening.fit", ride.iloc[:500], METRICS, START + timedelta(hours=10)),
+        ]
+        archive = zipfile.ZipFile(io.BytesIO(exporter.export_batch(sessions)))
+        assert archive.namelist() == ["morning.fit", "evening.fit"]
+        assert archive.read("morning.fit") == FitExporter().export(ride, METRICS, START)
+        # Record definitions are built once per field set and reused
+        assert len([k for k in exporter._local_msg_map if k[0] == MSG_RECORD]) == 1
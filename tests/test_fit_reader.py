@@ -0,0 +1,158 @@
+"""
+Tests for the native FIT decoder and FIT session ingestion.
+"""
+import io
+import json
+import struct
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.calculations import process_data
+from modules.db import SessionCache, SessionStore
+from modules.export.fit_exporter import MSG_RECORD, FitExporter, fit_crc16
+from modules.fit_reader import is_fit_file, read_fit
+from modules.history_import import import_training_folder
+from modules.utils import load_data_uncached
+
+START = datetime(2024, 5, 1, 7, 30, 12)
+METRICS = {"avg_watts": 220, "avg_hr": 140, "np": 230, "tss": 80.5, "work_kj": 900}
+
+
+def _fit_file(body: bytes) -> bytes:
+    header = struct.pack("<BBHI4s", 12, 0x10, 2100, len(body), b".FIT")
+    data = header + body
+    return data + struct.pack("<H", fit_crc16(data))
+
+
+def _big_endian_file() -> bytes:
+    """Big-endian records: one with field 253, three with compressed timestamps."""
+    fields = [(253, 4, 0x86), (7, 2, 0x84), (3, 1, 0x02)]
+    body = struct.pack(">BxBHB", 0x40, 1, MSG_RECORD, len(fields))
+    body += bytes(v for field in fields for v in field)
+    body += b"\x00" + struct.pack(">IHB", 1000, 250, 141)
+    # Local type 1 without a timestamp field, for compressed timestamp headers
+    body += struct.pack(">BxBHB", 0x41, 1, MSG_RECORD, 2) + bytes([7, 2, 0x84, 3, 1, 0x02])
+    for offset, watts, hr in [(9, 260, 142), (10, 0xFFFF, 0xFF), (3, 300, 150)]:
+        body += bytes([0x80 | (1 << 5) | offset]) + struct.pack(">HB", watts, hr)
+    return _fit_file(body)
+
+
+@pytest.fixture
+def ride():
+    rng = np.random.default_rng(0)
+    n = 1800
+    return pd.DataFrame({
+        "time": np.arange(n, dtype=float),
+        "watts": np.clip(rng.normal(220, 60, n), 0, None).round(),
+        "heartrate": rng.normal(140, 8, n).round(),
+        "cadence": rng.normal(90, 5, n).round(),
+        "velocity_smooth": rng.normal(9, 1, n).round(3),
+    })
+
+
+class TestReadFit:
+
+    def test_round_trip_exporter_output(self, ride):
+        df = read_fit(FitExporter().export(ride, METRICS, START))
+
+        assert len(df) == len(ride)
+        assert df["time"].dtype == np.float64
+        assert df["watts"].dtype == np.float32
+        np.testing.assert_array_equal(df["time"], ride["time"])
+        for col in ("watts", "heartrate", "cadence"):
+            np.testing.assert_array_equal(df[col], ride[col])
+        np.testing.assert_allclose(df["velocity_smooth"], ride["velocity_smooth"], atol=1e-3)
+
+    def test_big_endian_and_compressed_timestamps(self):
+        df = read_fit(io.BytesIO(_big_endian_file()))
+
+        assert df["time"].tolist() == [0.0, 1.0, 2.0, 27.0]
+        assert df["watts"].tolist()[::3] == [250.0, 300.0]
+        # 0xFFFF / 0xFF are the FIT invalid values
+        assert np.isnan(df["watts"].iloc[2]) and np.isnan(df["heartrate"].iloc[2])
+        assert df["heartrate"].iloc[1] == 142.0
+
+    def test_scaled_and_enhanced_fields(self):
+        fields = [(253, 4, 0x86), (57, 2, 0x84), (6, 2, 0x84), (73, 4, 0x86), (78, 4, 0x86)]
+        body = struct.pack("<BxBHB", 0x40, 0, MSG_RECORD, len(fields))
+        body += bytes(v for field in fields for v in field)
+        body += b"\x00" + struct.pack("<IHHII", 5000, 615, 1000, 8250, 3000)
+        df = read_fit(_fit_file(body))
+
+        assert df["smo2"].iloc[0] == pytest.approx(61.5)
+        assert df["velocity_smooth"].iloc[0] == pytest.approx(8.25)  # enhanced wins
+        assert df["altitude"].iloc[0] == pytest.approx(100.0)
+
+    def test_rejects_non_fit_data(self):
+        with pytest.raises(ValueError):
+            read_fit(b"time,watts\n0,100\n")
+        body = b"\x00" + bytes(8)  # data message before any definition
+        with pytest.raises(ValueError):
+            read_fit(_fit_file(body))
+
+    def test_truncated_file_keeps_complete_records(self, ride):
+        data = FitExporter().export(ride.iloc[:10], METRICS, START)
+        header_size = data[0]
+        cut = data[:header_size + 100]
+        assert 0 < len(read_fit(cut)) < 10
+
+    def test_without_numba(self, monkeypatch, ride):
+        import modules.fit_reader as fit_module
+
+        data = FitExporter().export(ride.iloc[:200], METRICS, START)
+        expected = read_fit(data)
+        kernel = getattr(fit_module._walk_messages, "py_func", fit_module._walk_messages)
+        monkeypatch.setattr(fit_module, "_walk_messages", kernel)
+        pd.testing.assert_frame_equal(read_fit(data), expected)
+
+
+class TestIngestion:
+
+    def test_detection_keeps_position(self):
+        f = io.BytesIO(_big_endian_file())
+        assert is_fit_file(f)
+        assert f.tell() == 0
+        assert not is_fit_file(io.BytesIO(b"time,watts\n0,100\n"))
+
+    def test_load_data_dispatches_to_fit(self, ride):
+        f = io.BytesIO(FitExporter().export(ride, METRICS, START))
+        df = load_data_uncached(f)
+
+        assert len(df) == len(ride)
+        processed = process_data(df)
+        assert processed["watts"].mean() == pytest.approx(ride["watts"].mean(), rel=1e-3)
+
+    def test_bulk_import_of_fit_folder(self, ride, tmp_path):
+        rides = tmp_path / "rides"
+        rides.mkdir()
+        (rides / "2025-03-01_tempo.fit").write_bytes(FitExporter().export(ride, METRICS, START))
+        ride.to_csv(rides / "2025-03-02_tempo.csv", index=False)
+        store = SessionStore(tmp_path / "db" / "history.db")
+
+        ok, failed, _ = import_training_folder(rides, cp=280, max_workers=1, store=store)
+
+        assert (ok, failed) == (2, 0)
+        sessions = {s.filename: s for s in store.get_sessions(days=100000)}
+        assert sessions["2025-03-01_tempo.fit"].np == sessions["2025-03-02_tempo.csv"].np
+        assert len(SessionCache(store.db_path).read("2025-03-01", rides / "2025-03-01_tempo.fit")) == 1800
+
+
+def test_tte_backfill_finds_uncached_uppercase_fit(ride, tmp_path, monkeypatch):
+    from modules.config import Config
+    from modules.tte import batch_compute_tte_for_all_sessions
+
+    rides = tmp_path / "treningi_csv"
+    rides.mkdir()
+    (rides / "2025-03-01_tempo.FIT").write_bytes(FitExporter().export(ride, METRICS, START))
+    store = SessionStore(tmp_path / "data" / "history.db")
+    import_training_folder(rides, cp=280, max_workers=1, store=store)
+    SessionCache(store.db_path).remove("2025-03-01", rides / "2025-03-01_tempo.FIT")
+    monkeypatch.setattr(Config, "BASE_DIR", tmp_path)
+    monkeypatch.setattr(Config, "DB_PATH", store.db_path)
+
+    assert batch_compute_tte_for_all_sessions(ftp=220, target_pcts=[100.0]) == (1, 0)
+    (session,) = store.get_sessions(days=100000)
+    assert json.loads(session.extra_metrics)["tte"]["100"] > 0
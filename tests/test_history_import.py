@@ -0,0 +1,142 @@
+"""Tests for the bulk history importer and the Parquet session cache."""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.db import ImportManifest, MMPStore, SessionCache, SessionStore
+from modules.history_import import import_single_file, import_training_folder
+from modules.tte import _compute_single_session_tte
+
+
+def _write_ride(path, seconds=900, seed=0):
+    rng = np.random.default_rng(seed)
+    pd.DataFrame(
+        {
+            "time": np.arange(seconds, dtype=float),
+            "watts": 230 + 40 * np.sin(np.arange(seconds) / 60) + rng.normal(0, 10, seconds),
+            "heartrate": 140 + rng.normal(0, 2, seconds),
+            "cadence": 90 + rng.normal(0, 3, seconds),
+        }
+    ).to_csv(path, index=False)
+
+
+@pytest.fixture
+def folder(tmp_path):
+    rides = tmp_path / "rides"
+    rides.mkdir()
+    _write_ride(rides / "2025-03-01_tempo.csv", seed=1)
+    _write_ride(rides / "2025-03-04_long.csv", seconds=1500, seed=2)
+    return rides
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SessionStore(tmp_path / "db" / "history.db")
+
+
+class TestBulkImport:
+    def test_imports_caches_and_batches(self, folder, store):
+        ok, failed, messages = import_training_folder(folder, cp=280, max_workers=1, store=store)
+
+        assert (ok, failed) == (2, 0)
+        assert all(m.startswith("✅") for m in messages)
+        assert store.get_session_count() == 2
+        cached = SessionCache(store.db_path).read("2025-03-04", folder / "2025-03-04_long.csv")
+        assert len(cached) == 1500
+        assert cached["watts"].dtype == np.float32
+        assert MMPStore(store.db_path).session_count() == 2
+
+    def test_unchanged_files_are_skipped(self, folder, store):
+        import_training_folder(folder, max_workers=1, store=store)
+        changed = folder / "2025-03-01_tempo.csv"
+        _write_ride(changed, seconds=1000, seed=3)
+        os.utime(changed, ns=(1, 1))
+
+        ok, failed, messages = import_training_folder(folder, max_workers=1, store=store)
+
+        assert (ok, failed) == (1, 0)
+        assert messages[1].startswith("⏭️")
+        sessions = {s.filename: s for s in store.get_sessions(days=100000)}
+        assert sessions["2025-03-01_tempo.csv"].duration_sec == 1000
+
+    def test_deleted_session_is_imported_again(self, folder, store):
+        import_training_folder(folder, max_workers=1, store=store)
+        sessions = {s.filename: s for s in store.get_sessions(days=100000)}
+        assert store.delete_session(sessions["2025-03-04_long.csv"].id)
+
+        ok, failed, messages = import_training_folder(folder, max_workers=1, store=store)
+
+        assert (ok, failed) == (1, 0)
+        assert messages[0].startswith("⏭️") and messages[1].startswith("✅")
+        assert store.get_session_count() == 2
+        assert len(ImportManifest(store.db_path).entries()) == 2
+
+    def test_process_pool_matches_inline(self, folder, tmp_path, store):
+        pooled = SessionStore(tmp_path / "pool" / "history.db")
+
+        import_training_folder(folder, max_workers=1, store=store)
+        import_training_folder(folder, max_workers=2, store=pooled)
+
+        inline = sorted((s.filename, s.np, s.mmp_5m) for s in store.get_sessions(days=100000))
+        parallel = sorted((s.filename, s.np, s.mmp_5m) for s in pooled.get_sessions(days=100000))
+        assert inline == parallel
+
+    def test_missing_cache_is_rebuilt(self, folder, store):
+        import_training_folder(folder, max_workers=1, store=store)
+        SessionCache(store.db_path).remove("2025-03-04", folder / "2025-03-04_long.csv")
+
+        ok, failed, messages = import_training_folder(folder, max_workers=1, store=store)
+
+        assert (ok, failed) == (1, 0)
+        assert messages[0].startswith("⏭️") and messages[1].startswith("✅")
+        assert SessionCache(store.db_path).exists("2025-03-04", folder / "2025-03-04_long.csv")
+
+    def test_single_file_import_records_manifest(self, folder, store):
+        ok, _ = import_single_file(folder / "2025-03-01_tempo.csv", store=store)
+
+        assert ok
+        assert ImportManifest(store.db_path).entries() == [("2025-03-01", "2025-03-01_tempo.csv")]
+
+
+def test_tte_reads_cached_power(folder, store):
+    import_training_folder(folder, max_workers=1, store=store)
+    csv_path = folder / "2025-03-04_long.csv"
+    cache_path = SessionCache(store.db_path).path_for("2025-03-04", csv_path)
+
+    from_cache = _compute_single_session_tte(None, [80.0, 100.0], 250.0, 5.0, cache_path)
+    from_csv = _compute_single_session_tte(csv_path, [80.0, 100.0], 250.0, 5.0)
+
+    assert from_cache == from_csv
+
+
+def test_cache_files_are_per_source(tmp_path):
+    cache = SessionCache(tmp_path / "history.db")
+    a, b = tmp_path / "a" / "ride.csv", tmp_path / "b" / "ride.csv"
+    cache.write("2025-03-01", a, pd.DataFrame({"watts": [100.0]}))
+    cache.write("2025-03-01", b, pd.DataFrame({"watts": [200.0]}))
+
+    assert cache.read("2025-03-01", a)["watts"].tolist() == [100.0]
+    assert cache.read("2025-03-01", b)["watts"].tolist() == [200.0]
+    assert cache.path_for("2025-03-01", "ride a.csv") != cache.path_for("2025-03-01", "ride_a.csv")
+
+
+def test_training_sources_fall_back_per_file(folder, store, monkeypatch):
+    import train_history
+    from modules.config import Config
+
+    import_training_folder(folder, max_workers=1, store=store)
+    SessionCache(store.db_path).remove("2025-03-04", folder / "2025-03-04_long.csv")
+    _write_ride(folder / "2025-03-05_new.csv", seed=4)
+    (folder / "2025-03-06_notes.json").write_text("[]")
+    monkeypatch.setattr(train_history, "DATA_FOLDER", folder)
+    monkeypatch.setattr(Config, "DB_PATH", store.db_path)
+
+    sources = dict(train_history.get_training_sources())
+
+    assert sources["2025-03-01_tempo.csv"].suffix == ".parquet"
+    assert sources["2025-03-04_long.csv"] == folder / "2025-03-04_long.csv"
+    assert sources["2025-03-05_new.csv"] == folder / "2025-03-05_new.csv"
+    assert sources["2025-03-06_notes.json"] == folder / "2025-03-06_notes.json"
+    assert len(sources) == 4
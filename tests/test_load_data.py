@@ -0,0 +1,80 @@
+"""
+Tests for streaming CSV ingestion in modules.utils.
+"""
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.calculations import process_data
+from modules.utils import _load_csv_pandas, load_data_uncached, normalize_columns_pandas
+
+CSV = (
+    b"Time,Power,HR,hrv,Note\n"
+    b"0,100,120,50:60:55,a\n"
+    b"1,x,121,,b\n"
+    b"2,300, 122 ,5:x,c\n"
+    b"3,310,123,nan,d\n"
+    b"4,320,124,40,e\n"
+)
+
+
+class TestLoadData:
+
+    def test_aliases_and_dtypes(self):
+        df = load_data_uncached(io.BytesIO(CSV))
+        assert list(df.columns) == ["time", "watts", "heartrate", "hrv", "note"]
+        assert df["time"].dtype == np.float64
+        assert df["watts"].dtype == np.float32
+        assert df["heartrate"].dtype == np.float32
+        # Unparsable values become NaN instead of failing the load
+        assert np.isnan(df["watts"].iloc[1])
+        assert df["heartrate"].tolist() == [120, 121, 122, 123, 124]
+
+    def test_hrv_parsing(self):
+        df = load_data_uncached(io.BytesIO(CSV))
+        # "50:60:55" -> mean; missing, "5:x" and "nan" interpolated towards 40
+        np.testing.assert_allclose(df["hrv"], [55, 51.25, 47.5, 43.75, 40])
+
+    def test_semicolon_without_time(self):
+        df = load_data_uncached(io.BytesIO(b"Watts;Heart Rate\n100;120\n110;121\n"))
+        assert list(df.columns) == ["watts", "heartrate", "time"]
+        assert df["time"].tolist() == [0.0, 1.0]
+        assert df["watts"].tolist() == [100, 110]
+
+    def test_canonical_column_wins_over_alias(self):
+        df = normalize_columns_pandas(pd.DataFrame(columns=["Power", "watts", "VE", "hr", "HR"]))
+        assert list(df.columns) == ["power", "watts", "tymeventilation", "heartrate", "hr"]
+
+    def test_file_on_disk(self, tmp_path):
+        path = tmp_path / "ride.csv"
+        path.write_bytes(CSV)
+        with open(path, "rb") as f:
+            df = load_data_uncached(f)
+        pd.testing.assert_frame_equal(df, load_data_uncached(io.BytesIO(CSV)))
+
+    def test_upload_name_colliding_with_local_file(self, tmp_path, monkeypatch):
+        class Upload(io.BytesIO):
+            name = "ride.csv"
+
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "ride.csv").write_bytes(b"time,watts\n0,999\n")
+        df = load_data_uncached(Upload(CSV))
+        pd.testing.assert_frame_equal(df, load_data_uncached(io.BytesIO(CSV)))
+
+    def test_pandas_fallback_matches(self):
+        df = load_data_uncached(io.BytesIO(CSV))
+        pd.testing.assert_frame_equal(_load_csv_pandas(io.BytesIO(CSV)), df)
+
+    @pytest.mark.parametrize("chunk_size", [None, 7])
+    def test_process_data_fills_float32_like_float64(self, chunk_size):
+        # A leading gap longer than the post-resample edge fill (5 s)
+        rows = "".join(f"{t},{'' if t < 8 else 200}\n" for t in range(50)).encode()
+        df = load_data_uncached(io.BytesIO(b"time,watts\n" + rows), chunk_size)
+        assert df["watts"].dtype == np.float32 and df["watts"].isna().sum() == 8
+
+        processed = process_data(df)
+        expected = process_data(df.astype({"watts": np.float64}))
+        assert processed["watts"].notna().all()
+        np.testing.assert_allclose(processed["watts"], expected["watts"])
@@ -0,0 +1,103 @@
+"""Tests for the per-session MMP store and its envelope."""
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from modules.db import MMPStore, SessionRecord, SessionStore
+
+
+def _days_ago(n: int) -> str:
+    return (date.today() - timedelta(days=n)).isoformat()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return MMPStore(tmp_path / "history.db", max_duration=600)
+
+
+def _curve(level: float, length: int = 600) -> np.ndarray:
+    # Monotonically decreasing curve, like a real PDC
+    return level * (1.0 + 100.0 / np.arange(1, length + 1))
+
+
+class TestMMPStore:
+    def test_all_time_envelope_is_elementwise_max(self, store):
+        store.add_session_curve(1, _days_ago(100), curve=_curve(200))
+        store.add_session_curve(2, _days_ago(10), curve=_curve(250))
+
+        best = store.best_curve()
+
+        assert best[0] == pytest.approx(_curve(250)[0], rel=1e-6)
+        assert store.record_holders([1, 300]) == {1: 2, 300: 2}
+
+    def test_rolling_window_excludes_old_sessions(self, store):
+        store.add_session_curve(1, _days_ago(100), curve=_curve(300))
+        store.add_session_curve(2, _days_ago(5), curve=_curve(220))
+
+        assert store.best_pdc([60], days=30)[60] == pytest.approx(_curve(220)[59], rel=1e-6)
+        assert store.best_pdc([60])[60] == pytest.approx(_curve(300)[59], rel=1e-6)
+
+    def test_delete_repairs_envelope(self, store):
+        store.add_session_curve(1, _days_ago(50), curve=_curve(200))
+        store.add_session_curve(2, _days_ago(20), curve=_curve(260))
+
+        assert store.remove_session_curve(2)
+        assert store.best_pdc([5])[5] == pytest.approx(_curve(200)[4], rel=1e-6)
+        assert store.record_holders([5]) == {5: 1}
+
+    def test_short_session_leaves_long_durations_empty(self, store):
+        store.add_session_curve(1, _days_ago(1), power=np.full(120, 250.0))
+
+        pdc = store.best_pdc([60, 300])
+
+        assert pdc[60] == pytest.approx(250.0)
+        assert pdc[300] is None
+
+    def test_other_instance_sees_writes(self, store, tmp_path):
+        other = MMPStore(tmp_path / "history.db", max_duration=600)
+        assert other.session_count() == 0
+
+        store.add_session_curve(7, _days_ago(3), curve=_curve(240))
+
+        assert other.session_count() == 1
+        assert other.record_holders([10]) == {10: 7}
+
+    def test_session_delete_cascades(self, tmp_path):
+        sessions = SessionStore(tmp_path / "history.db")
+        mmp = MMPStore(tmp_path / "history.db")
+        sid = sessions.add_session(SessionRecord(date=_days_ago(2), filename="a.csv"))
+        mmp.add_session_curve(sid, _days_ago(2), power=np.full(400, 210.0))
+
+        assert sessions.delete_session(sid)
+        assert mmp.get_curve(sid) is None
+        assert mmp.best_pdc([300])[300] is None
+
+    def test_backfill_from_session_cache(self, tmp_path):
+        import pandas as pd
+
+        from modules.db import ImportManifest, SessionCache
+
+        db = tmp_path / "history.db"
+        sessions = SessionStore(db)
+        cached = sessions.add_session(
+            SessionRecord(date=_days_ago(9), filename="a.csv", avg_watts=210)
+        )
+        uncached = sessions.add_session(
+            SessionRecord(date=_days_ago(4), filename="b.csv", avg_watts=230)
+        )
+        sessions.add_session(SessionRecord(date=_days_ago(2), filename="run.csv"))
+        power = pd.DataFrame({"watts": np.full(400, 210.0)})
+        SessionCache(db).write(_days_ago(9), tmp_path / "a.csv", power)
+        ImportManifest(db).record_many([
+            (str(tmp_path / "a.csv"), 1, 1, _days_ago(9), "a.csv", cached),
+            (str(tmp_path / "b.csv"), 1, 1, _days_ago(4), "b.csv", uncached),
+        ])
+        mmp = MMPStore(db)
+        assert mmp.missing_count() == 2
+
+        assert mmp.backfill_from_cache() == 1
+        assert mmp.backfill_from_cache() == 0
+        assert mmp.missing_count() == 1
+        assert mmp.best_pdc([300])[300] == pytest.approx(210.0)
+        assert mmp.record_holders([300]) == {300: cached}
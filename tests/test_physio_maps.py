@@ -13,6 +13,7 @@ from modules.physio_maps import (
     scatter_power_hr,
     scatter_power_smo2,
     detect_constant_power_segments,
+    detect_constant_power_segments_multi,
     trend_at_constant_power,
     calculate_drift_metrics,
 )
@@ -109,6 +110,61 @@ class TestDetectConstantPowerSegments:
         # May find some by chance, but likely very few
         assert len(segments) <= 2
 
+    def test_matches_window_by_window_scan(self):
+        """Should return exactly the segments of the per-window median scan."""
+        rng = np.random.default_rng(7)
+        blocks = []
+        for base, noise, length in [(0, 0, 200), (200, 3, 400), (250, 30, 300),
+                                    (180, 2, 700), (45, 1, 250), (300, 6, 500)]:
+            blocks.append(base + rng.normal(0, noise, length))
+        watts = np.concatenate(blocks)
+        df = pd.DataFrame({'watts': watts})
+
+        for tol in (3, 5, 10):
+            for w in (120, 121, 180):
+                assert detect_constant_power_segments(df, tol, w) == _reference_segments(
+                    watts, tol, w
+                )
+        df32 = pd.DataFrame({'watts': watts.astype(np.float32)})
+        assert detect_constant_power_segments(df32, 5, 120) == _reference_segments(
+            watts.astype(np.float32), 5, 120
+        )
+
+    def test_multi_tolerance(self):
+        """Should match single-tolerance calls for each tolerance."""
+        df = pd.DataFrame({'watts': [200] * 300 + [210, 190] * 150 + [300] * 300})
+        result = detect_constant_power_segments_multi(df, [3, 10], min_duration_sec=120)
+        assert set(result) == {3, 10}
+        for tol, segments in result.items():
+            assert segments == detect_constant_power_segments(df, tol, 120)
+        # The wider band absorbs the +/-5% block into the first segment
+        assert result[3][0][1] == 300
+        assert result[10][0][1] == 600
+
+
+def _reference_segments(watts, tolerance_pct, window_size):
+    """The original O(n*w) window-by-window detector."""
+    n = len(watts)
+    segments = []
+    i = 0
+    while i < n - window_size:
+        window = watts[i:i + window_size]
+        median_power = np.median(window)
+        if median_power < 50:
+            i += window_size // 2
+            continue
+        lower = median_power * (1 - tolerance_pct / 100)
+        upper = median_power * (1 + tolerance_pct / 100)
+        if np.all((window >= lower) & (window <= upper)):
+            end_idx = i + window_size
+            while end_idx < n and lower <= watts[end_idx] <= upper:
+                end_idx += 1
+            segments.append((i, end_idx, np.mean(watts[i:end_idx])))
+            i = end_idx
+        else:
+            i += 1
+    return segments
+
 
 class TestTrendAtConstantPower:
     """Tests for trend_at_constant_power function."""
@@ -158,6 +158,25 @@ class TestMatchBurns:
         burns_50 = count_match_burns(w_bal, w_prime_value, threshold_pct=0.5)
         assert burns_50 == 2
 
+    def test_matches_python_loop(self, w_prime_value):
+        """Kernel should match the per-sample hysteresis loop, NaN included."""
+        rng = np.random.default_rng(7)
+        w_bal = w_prime_value * (0.5 + 0.5 * np.sin(np.arange(5000) / 40))
+        w_bal += rng.normal(0, 500, 5000)
+        w_bal[1000:1010] = np.nan
+
+        threshold = w_prime_value * 0.3
+        expected, below = 0, False
+        for val in w_bal:
+            if val < threshold and not below:
+                expected, below = expected + 1, True
+            elif val >= threshold * 1.5:
+                below = False
+
+        assert expected > 10
+        assert count_match_burns(w_bal, w_prime_value, threshold_pct=0.3) == expected
+        assert count_match_burns(list(w_bal), w_prime_value, threshold_pct=0.3) == expected
+
 
 class TestPowerZonesTime:
     """Tests for calculate_power_zones_time."""
@@ -206,3 +206,59 @@ class TestInterpolateTo1Hz:
         
         assert len(result) == 3  # 0, 1, 2 seconds
         assert result.iloc[1] == pytest.approx(210, abs=1)  # Interpolated value
+
+
+class TestMMPEngine:
+    """Tests for the shared cumulative-sum MMP engine."""
+
+    def test_curve_matches_rolling_mean(self):
+        """Every duration of the full curve matches pandas rolling max."""
+        from modules.calculations.mmp import compute_mmp_curve
+
+        rng = np.random.default_rng(7)
+        power = pd.Series(rng.gamma(4.0, 50.0, 2000))
+        power[rng.choice(2000, 50, replace=False)] = np.nan
+
+        curve = compute_mmp_curve(power, max_duration=600)
+        filled = power.fillna(0)
+        for d in (1, 2, 7, 30, 299, 600):
+            expected = filled.rolling(d, min_periods=d).mean().max()
+            assert curve[d - 1] == pytest.approx(expected, rel=1e-9)
+
+    @pytest.mark.parametrize("numba", [True, False])
+    def test_skip_nan_matches_pandas_rolling(self, monkeypatch, numba):
+        """skip_nan leaves out windows with a gap, like rolling(d).mean().max()."""
+        from modules.calculations import mmp
+
+        monkeypatch.setattr(mmp, "is_numba_available", lambda: numba)
+        rng = np.random.default_rng(7)
+        power = pd.Series(rng.gamma(4.0, 50.0, 2000))
+        power[rng.choice(2000, 50, replace=False)] = np.nan
+        power[:20] = 2000.0  # sprint next to a dropout: only its gap-free windows count
+        power[20] = np.nan
+
+        curve = mmp.compute_mmp_curve(power, max_duration=600, skip_nan=True)
+        for d in (1, 2, 7, 20, 21, 30, 299):
+            expected = power.rolling(d).mean().max()
+            assert curve[d - 1] == pytest.approx(expected, rel=1e-9, nan_ok=True)
+        assert np.isnan(curve[599])  # every 600 s window has a gap
+        assert curve[20] < mmp.compute_mmp_curve(power, max_duration=600)[20]
+
+    def test_curve_nan_beyond_session_length(self):
+        from modules.calculations.mmp import compute_mmp_curve
+
+        curve = compute_mmp_curve(np.full(100, 250.0), max_duration=120)
+
+        assert curve[99] == pytest.approx(250.0)
+        assert np.isnan(curve[100:]).all()
+
+    def test_pdc_functions_agree(self, sample_long_ride_df):
+        """calculate_power_duration_curve and compute_max_mean_power share the engine."""
+        from modules.calculations.power import calculate_power_duration_curve
+
+        durations = [1, 5, 60, 300, 1200, 3600]
+        pdc = calculate_power_duration_curve(sample_long_ride_df, durations)
+        mmp = compute_max_mean_power(sample_long_ride_df["watts"], durations)
+
+        assert pdc == mmp
+        assert pdc[3600] is None
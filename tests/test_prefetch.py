@@ -0,0 +1,92 @@
+"""
+Tests for background prefetch of tab analyses.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.ui import prefetch
+
+
+@pytest.fixture(autouse=True)
+def _clean():
+    prefetch.clear()
+    prefetch._transitions.clear()
+    yield
+    prefetch.clear()
+    prefetch._transitions.clear()
+
+
+def _counting(calls):
+    def analysis(df, scale=1.0):
+        calls.append(threading.current_thread().name)
+        return float(df["watts"].sum()) * scale
+
+    return analysis
+
+
+class TestPrefetch:
+
+    def test_compute_reuses_prefetched_result(self):
+        calls = []
+        analysis = _counting(calls)
+        df = pd.DataFrame({"watts": np.arange(100.0)})
+
+        prefetch.submit(analysis, df, scale=2.0).result()
+        assert prefetch.compute(analysis, df, scale=2.0) == 9900.0
+        assert len(calls) == 1
+        assert calls[0].startswith("tab-prefetch")
+
+    def test_keyed_by_content_and_arguments(self):
+        calls = []
+        analysis = _counting(calls)
+        df = pd.DataFrame({"watts": np.arange(100.0)})
+
+        prefetch.compute(analysis, df)
+        prefetch.compute(analysis, df.copy())  # same content, new object
+        assert len(calls) == 1
+
+        prefetch.compute(analysis, df, scale=2.0)
+        changed = df.copy()
+        changed.loc[0, "watts"] = 5.0
+        prefetch.compute(analysis, changed)
+        assert len(calls) == 3
+
+    def test_failed_prefetch_is_recomputed(self):
+        attempts = []
+
+        def flaky(x):
+            attempts.append(x)
+            if len(attempts) == 1:
+                raise RuntimeError("boom")
+            return x + 1
+
+        future = prefetch.submit(flaky, 1)
+        with pytest.raises(RuntimeError):
+            future.result()
+        assert prefetch.compute(flaky, 1) == 2
+        assert len(attempts) == 2
+
+    def test_results_bounded(self):
+        for i in range(prefetch.MAX_RESULTS + 5):
+            prefetch.compute(abs, i)
+        assert len(prefetch._futures) == prefetch.MAX_RESULTS
+
+
+class TestLikelyNext:
+
+    def test_falls_back_to_candidate_order(self):
+        assert prefetch.likely_next("hrv", ["smo2", "vent", "mpa"]) == ["smo2", "vent"]
+
+    def test_ranks_observed_switches(self):
+        for _ in range(3):
+            prefetch.record_transition("power", "mpa")
+        prefetch.record_transition("power", "tte")
+        prefetch.record_transition("power", "power")  # rerun of the same tab
+        prefetch.record_transition(None, "power")  # first render
+
+        assert prefetch.likely_next("power", ["tte", "drift_maps", "mpa"]) == ["mpa", "tte"]
+        assert prefetch.likely_next("power", ["drift_maps", "mpa"], n=1) == ["mpa"]
+        assert prefetch.likely_next("power", ["power"]) == []
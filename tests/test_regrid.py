@@ -0,0 +1,146 @@
+"""
+Regression tests for the 1 Hz regridder behind process_data.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.calculations import process_data
+from modules.calculations.common import WINDOW_LONG, WINDOW_SHORT
+from modules.calculations.regrid import (
+    _regrid_numpy,
+    _rolling_mean_numpy,
+    regrid,
+    rolling_means,
+)
+
+GAP = 30
+
+
+def _reference_process_data(df: pd.DataFrame) -> pd.DataFrame:
+    """The pandas implementation process_data replaced."""
+    df_pd = df.copy()
+    if 'time' not in df_pd.columns:
+        df_pd['time'] = np.arange(len(df_pd)).astype(float)
+    df_pd['time'] = pd.to_numeric(df_pd['time'], errors='coerce')
+    df_pd = df_pd.dropna(subset=['time'])
+    df_pd = df_pd.sort_values('time').reset_index(drop=True)
+
+    diffs = df_pd['time'].diff()
+    ends = np.flatnonzero(diffs > GAP)
+    gaps = [(df_pd['time'].iloc[i - 1], df_pd['time'].iloc[i]) for i in ends]
+
+    df_pd['time_dt'] = pd.to_timedelta(df_pd['time'], unit='s')
+    df_pd = df_pd.set_index('time_dt')
+    num_cols = df_pd.select_dtypes(include=['float64', 'float32', 'int64']).columns.tolist()
+    df_pd[num_cols] = df_pd[num_cols].interpolate(method='linear', limit=GAP).ffill().bfill()
+
+    out = df_pd.select_dtypes(include=[np.number]).resample('1s').mean()
+    out = out.interpolate(method='linear', limit=GAP).ffill(limit=5).bfill(limit=5)
+    out['time'] = out.index.total_seconds()
+    out['time_min'] = out['time'] / 60.0
+
+    cols = out.columns.difference(['time', 'time_min'])
+    for gap_start, gap_end in gaps:
+        in_gap = (out['time'] > gap_start) & (out['time'] < gap_end)
+        out.loc[in_gap, cols] = np.nan
+
+    for col in ['watts', 'heartrate', 'cadence', 'smo2', 'thb']:
+        if col in out.columns:
+            out[f'{col}_smooth'] = out[col].rolling(WINDOW_LONG, min_periods=1).mean()
+            out[f'{col}_smooth_5s'] = out[col].rolling(WINDOW_SHORT, min_periods=1).mean()
+    return out.reset_index(drop=True)
+
+
+@pytest.fixture
+def raw_session():
+    """Irregular 1-2 Hz recording with dropouts, pauses and mixed dtypes."""
+    rng = np.random.default_rng(7)
+    n = 6000
+    time = np.cumsum(rng.choice([0.5, 1.0, 1.0, 1.3], n)) + 0.25
+    time[2000:] += 45.7  # recording pause
+    time[4000:] += 31.2  # pause just over the threshold
+    time[3000:3002] = time[2999]  # duplicate stamps
+    watts = 200 + 50 * np.sin(time / 60) + rng.normal(0, 20, n)
+    watts[rng.random(n) < 0.05] = np.nan
+    watts[:7] = np.nan  # leading dropout
+    watts[1000:1060] = np.nan  # long dropout
+    hr = np.round(140 + 10 * np.sin(time / 300)).astype(np.int64)
+    smo2 = (60 + rng.normal(0, 3, n)).astype(np.float32)
+    smo2[500:540] = np.nan
+    df = pd.DataFrame({
+        "time": time,
+        "watts": watts,
+        "heartrate": hr,
+        "smo2": smo2,
+        "cadence": rng.integers(70, 100, n).astype(np.int32),
+        "empty": np.nan,
+        "lap": "1",
+        "standing": rng.random(n) < 0.1,
+    })
+    # Unsorted rows and a missing time stamp
+    df = df.sample(frac=1.0, random_state=1).reset_index(drop=True)
+    df.loc[5, "time"] = np.nan
+    return df
+
+
+class TestProcessData:
+
+    def test_matches_reference(self, raw_session):
+        expected = _reference_process_data(raw_session)
+        result = process_data(raw_session)
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+
+    def test_input_not_modified(self, raw_session):
+        before = raw_session.copy()
+        process_data(raw_session.drop(columns="time"))
+        process_data(raw_session)
+        pd.testing.assert_frame_equal(raw_session, before)
+
+    def test_without_time_column(self, raw_session):
+        df = raw_session.drop(columns="time")
+        pd.testing.assert_frame_equal(process_data(df), _reference_process_data(df))
+
+    def test_gap_is_masked(self, raw_session):
+        time = np.sort(raw_session["time"].dropna().to_numpy())
+        i = np.flatnonzero(np.diff(time) > 45)[0]
+        result = process_data(raw_session)
+        pause = result[(result["time"] > time[i]) & (result["time"] < time[i + 1])]
+        assert len(pause) >= 45
+        assert pause[["watts", "heartrate", "smo2", "cadence"]].isna().all().all()
+
+
+class TestKernels:
+
+    def test_numpy_fallback_matches(self, raw_session):
+        df = raw_session.dropna(subset=["time"]).sort_values("time", kind="stable")
+        time = df["time"].to_numpy()
+        bins = ((time - time[0]) // 1).astype(np.int64)
+        n_bins = int(bins[-1]) + 1
+        mask = np.zeros(n_bins, dtype=bool)
+        mask[100:140] = True
+        prefill = np.array([True, True, False])
+
+        values = df[["watts", "heartrate", "cadence"]].to_numpy(dtype=np.float64).T.copy()
+        grid = regrid(values, bins, n_bins, prefill, mask, GAP, 5)
+        fallback = _regrid_numpy(values, bins, n_bins, prefill, mask, GAP, 5)
+        np.testing.assert_allclose(fallback, grid, rtol=1e-12)
+
+        values32 = df[["smo2"]].to_numpy().T.copy()
+        grid32 = regrid(values32, bins, n_bins, prefill[:1], mask, GAP, 5)
+        assert grid32.dtype == np.float32
+        fallback = _regrid_numpy(values32, bins, n_bins, prefill[:1], mask, GAP, 5)
+        np.testing.assert_allclose(fallback, grid32, rtol=1e-6)
+
+        windows = np.array([WINDOW_LONG, WINDOW_SHORT])
+        np.testing.assert_allclose(
+            _rolling_mean_numpy(grid, windows), rolling_means(grid, windows), rtol=1e-9
+        )
+
+    def test_process_data_without_numba(self, raw_session, monkeypatch):
+        import modules.calculations.regrid as regrid_module
+
+        monkeypatch.setattr(regrid_module, "is_numba_available", lambda: False)
+        pd.testing.assert_frame_equal(
+            process_data(raw_session), _reference_process_data(raw_session), rtol=1e-6
+        )
@@ -0,0 +1,128 @@
+"""
+Tests for the concurrent ramp-test report enrichment stage.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("reportlab")  # modules.reporting builds PDFs on import
+
+from modules.reporting.enrichment import (  # noqa: E402
+    ANALYZERS,
+    Analyzer,
+    enrich_report,
+    normalize_source_frame,
+    run_analyzers,
+)
+
+
+@pytest.fixture
+def ramp_df():
+    rng = np.random.default_rng(1)
+    n = 1800
+    t = np.arange(n)
+    return pd.DataFrame({
+        "Time": t,
+        "Watts": 100 + t / 6 + rng.normal(0, 8, n),
+        "HeartRate": 100 + t / 25 + rng.normal(0, 2, n),
+        "SmO2": 75 - t / 60 + rng.normal(0, 1, n),
+        "tymeventilation": 30 + (t / 25) ** 1.3,
+        "cadence": rng.normal(90, 4, n),
+        "core_temperature": 37 + t / n,
+    })
+
+
+class TestNormalizeSourceFrame:
+
+    def test_aliases_and_read_only(self, ramp_df):
+        frame = normalize_source_frame(ramp_df)
+        assert {"time", "watts", "heartrate", "hr", "smo2", "SmO2", "seconds"} <= set(frame.columns)
+        np.testing.assert_array_equal(frame["hr"], ramp_df["HeartRate"])
+
+        shared = frame.copy(deep=False)
+        with pytest.raises(ValueError):
+            shared.loc[0, "watts"] = 0.0
+        assert ramp_df["Watts"].to_numpy().flags.writeable  # source untouched
+
+
+class TestRunAnalyzers:
+
+    def test_merge_is_deterministic(self, ramp_df):
+        frame = normalize_source_frame(ramp_df)
+
+        def slow(frame, data):
+            time.sleep(0.05)
+            return {"section": {"a": 1}, "order": "slow"}
+
+        def fast(frame, data):
+            return {"section": {"b": 2}, "order": "fast"}
+
+        data = {"section": {"z": 0}}
+        status = run_analyzers(frame, data, [Analyzer("slow", slow), Analyzer("fast", fast)])
+        assert status == {"slow": "ok", "fast": "ok"}
+        assert data == {"section": {"z": 0, "a": 1, "b": 2}, "order": "fast"}
+
+    def test_failure_and_timeout_are_isolated(self, ramp_df):
+        frame = normalize_source_frame(ramp_df)
+
+        def broken(frame, data):
+            raise RuntimeError("boom")
+
+        def stalled(frame, data):
+            time.sleep(2)
+            return {"stalled": True}
+
+        def writes_in_place(frame, data):
+            frame.loc[0, "watts"] = 0.0
+            return {"written": True}
+
+        data = {}
+        started = time.monotonic()
+        status = run_analyzers(
+            frame,
+            data,
+            [
+                Analyzer("broken", broken),
+                Analyzer("stalled", stalled, timeout=0.2),
+                Analyzer("in_place", writes_in_place),
+                Analyzer("VO2max", ANALYZERS[-1].func),
+            ],
+        )
+        assert time.monotonic() - started < 1.5
+        assert status == {
+            "broken": "failed",
+            "stalled": "timeout",
+            "in_place": "failed",
+            "VO2max": "ok",
+        }
+        assert set(data) == {"metrics"}
+
+
+class TestEnrichReport:
+
+    def test_sections(self, ramp_df):
+        data = {"metadata": {"rider_weight": 75}, "metrics": {"existing": 1}}
+        status = enrich_report(data, ramp_df, lambda factor: {"title": factor})
+
+        assert all(s == "ok" for s in status.values()), status
+        for key in (
+            "smo2_advanced",
+            "cardio_advanced",
+            "vent_advanced",
+            "thermo_analysis",
+            "canonical_physiology",
+            "limiter_analysis",
+        ):
+            assert key in data, key
+        assert "cardiac_drift" in data["thermo_analysis"]
+        assert data["metrics"]["existing"] == 1
+        assert data["metrics"]["vo2max"] > 0
+
+    def test_without_source_frame(self):
+        data = {"metadata": {}}
+        status = enrich_report(data, None, lambda factor: {})
+        assert status == {"Canonical Physio": "ok", "Limiter Analysis": "skipped"}
+        assert "canonical_physiology" in data
+
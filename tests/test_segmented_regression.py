@@ -0,0 +1,182 @@
+"""Tests for the closed-form segmented regression engine."""
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from modules.calculations.segmented_regression import (
+    PrefixSums,
+    three_segment_threshold_rss,
+    two_segment_index_fits,
+    two_segment_threshold_rss,
+)
+from modules.calculations.smo2_breakpoints import (
+    _fit_piecewise_2segment,
+    _fit_piecewise_3segment,
+    _search_breakpoint_2segment,
+    _two_phase_breakpoint_search,
+)
+from modules.calculations.ventilatory import (
+    _find_breakpoint_segmented,
+    _WindowSlopeScanner,
+    detect_vt_transition_zone,
+    run_sensitivity_analysis,
+)
+
+
+@pytest.fixture
+def ramp_smo2():
+    """Synthetic ramp: SmO2 flat to 290 W, moderate drop to 380 W, steep after."""
+    rng = np.random.default_rng(3)
+    x = np.linspace(150, 450, 900) + rng.normal(0, 3, 900)
+    y = np.where(x < 290, 70 - 0.01 * (x - 150), 68.6 - 0.08 * (x - 290))
+    y = np.where(x >= 380, y - 0.25 * (x - 380), y)
+    return x, y + rng.normal(0, 0.4, 900)
+
+
+class TestPrefixSums:
+    def test_ols_matches_linregress(self):
+        rng = np.random.default_rng(0)
+        x = rng.uniform(100, 400, 200)
+        y = 0.3 * x + rng.normal(0, 5, 200)
+        ps = PrefixSums(x, y)
+
+        slope, intercept, rss, valid = ps.ols(20, 150)
+        ref = stats.linregress(x[20:150], y[20:150])
+        resid = y[20:150] - (ref.slope * x[20:150] + ref.intercept)
+
+        assert valid
+        assert slope == pytest.approx(ref.slope, rel=1e-9)
+        assert intercept == pytest.approx(ref.intercept, rel=1e-9)
+        assert rss == pytest.approx(np.sum(resid**2), rel=1e-7)
+
+    def test_constant_x_segment_is_invalid(self):
+        ps = PrefixSums(np.array([1.0, 2.0, 2.0, 2.0]), np.array([1.0, 2.0, 3.0, 4.0]))
+
+        assert not ps.ols(1, 4)[3]
+
+
+class TestThresholdSearch:
+    def test_two_segment_rss_matches_loop(self, ramp_smo2):
+        x, y = ramp_smo2
+        grid = np.arange(250, 380, 7.0)
+
+        rss, s1, s2 = two_segment_threshold_rss(x, y, grid)
+
+        for k, bp in enumerate(grid):
+            ref_rss, ref_slopes = _fit_piecewise_2segment(x, y, bp)
+            assert rss[k] == pytest.approx(ref_rss, rel=1e-7)
+            assert (s1[k], s2[k]) == pytest.approx(ref_slopes, rel=1e-9)
+
+    def test_three_segment_rss_matches_loop(self, ramp_smo2):
+        x, y = ramp_smo2
+        bp1 = np.array([250.0, 270.0, 290.0])[:, None]
+        bp2 = np.array([340.0, 380.0, 410.0])[None, :]
+
+        rss, s1, s2, s3 = three_segment_threshold_rss(x, y, bp1, bp2)
+
+        for i in range(3):
+            for j in range(3):
+                ref_rss, ref_slopes = _fit_piecewise_3segment(x, y, bp1[i, 0], bp2[0, j])
+                assert rss[i, j] == pytest.approx(ref_rss, rel=1e-7)
+                assert (s1[i, j], s2[i, j], s3[i, j]) == pytest.approx(ref_slopes, rel=1e-9)
+
+    def test_exact_search_finds_true_breakpoints(self, ramp_smo2):
+        x, y = ramp_smo2
+
+        below = x < 370
+        bp, _, _ = _search_breakpoint_2segment(x[below], y[below], (250, 360))
+        bp1, bp2, _, rss = _two_phase_breakpoint_search(x, y, (250, 330), (340, 420), 40)
+
+        assert bp == pytest.approx(290, abs=5)
+        assert bp1 == pytest.approx(290, abs=5)
+        assert bp2 == pytest.approx(380, abs=5)
+        assert rss == pytest.approx(_fit_piecewise_3segment(x, y, bp1, bp2)[0], rel=1e-7)
+
+
+class TestVentilatoryBreakpoint:
+    @staticmethod
+    def _reference(x, y, m):
+        best_idx, best_sse = None, np.inf
+        for i in range(m, len(x) - m):
+            a = stats.linregress(x[:i], y[:i])
+            b = stats.linregress(x[i:], y[i:])
+            sse = np.sum((y[:i] - a.slope * x[:i] - a.intercept) ** 2) + np.sum(
+                (y[i:] - b.slope * x[i:] - b.intercept) ** 2
+            )
+            ratio = b.slope / a.slope if a.slope != 0 else b.slope
+            if sse < best_sse and ratio > 1.1:
+                best_idx, best_sse = i, sse
+        return best_idx
+
+    def test_matches_linregress_loop(self):
+        rng = np.random.default_rng(11)
+        power = np.arange(100, 420, 20, dtype=float)
+        ve_vo2 = np.where(power < 260, 25 + 0.005 * power, 26.3 + 0.06 * (power - 260))
+        ve_vo2 = ve_vo2 + rng.normal(0, 0.2, len(power))
+
+        idx = _find_breakpoint_segmented(power, ve_vo2, min_segment_size=3)
+
+        assert idx == self._reference(power, ve_vo2, 3)
+
+    def test_split_indices_cover_min_segment(self):
+        splits, sse, _, _, valid = two_segment_index_fits(np.arange(10.0), np.arange(10.0), 3)
+
+        assert splits.tolist() == [3, 4, 5, 6]
+        assert valid.all()
+        assert np.allclose(sse, 0.0)
+
+
+class TestTransitionZoneWindows:
+    @staticmethod
+    def _reference_candidates(df, window, step):
+        """Per-window mask + linregress scan used before the prefix-sum scanner."""
+        vt1, vt2 = [], []
+        for t in range(int(df["time"].min()), int(df["time"].max()) - window, step):
+            w = df[(df["time"] >= t) & (df["time"] < t + window)]
+            if len(w) < 10:
+                continue
+            ok = w["tymeventilation"].notna()
+            fit = stats.linregress(w["time"][ok], w["tymeventilation"][ok])
+            lo, hi = fit.slope - 1.96 * fit.stderr, fit.slope + 1.96 * fit.stderr
+            if lo <= 0.05 <= hi and 0.02 <= fit.slope <= 0.08:
+                vt1.append((w["watts"].mean(), w["hr"].mean()))
+            if lo <= 0.15 <= hi and 0.10 <= fit.slope <= 0.20:
+                vt2.append((w["watts"].mean(), w["hr"].mean()))
+        return vt1, vt2
+
+    @pytest.fixture
+    def ramp_ve(self):
+        rng = np.random.default_rng(5)
+        time = np.arange(0, 1200, dtype=float)
+        slope = np.where(time < 400, 0.02, np.where(time < 800, 0.06, 0.16))
+        ve = 20 + np.cumsum(slope) + rng.normal(0, 0.3, len(time))
+        ve[rng.choice(len(time), 40, replace=False)] = np.nan
+        return pd.DataFrame(
+            {
+                "time": time,
+                "watts": 100 + time / 4,
+                "tymeventilation": ve,
+                "hr": 100 + time / 15,
+            }
+        ).sample(frac=1.0, random_state=1)
+
+    @pytest.mark.parametrize("window", [30, 45, 60, 90])
+    def test_candidates_match_linregress_scan(self, ramp_ve, window):
+        scanner = _WindowSlopeScanner(ramp_ve, "tymeventilation", "watts", "hr", "time")
+
+        vt1, vt2 = scanner.candidates(window, 5)
+        ref1, ref2 = self._reference_candidates(ramp_ve, window, 5)
+
+        for got, ref in ((vt1, ref1), (vt2, ref2)):
+            assert len(got) == len(ref)
+            got = np.array([(c["avg_watts"], c["avg_hr"]) for c in got]).reshape(-1, 2)
+            assert np.allclose(got, np.array(ref).reshape(-1, 2), rtol=1e-9)
+
+    def test_zones_and_sensitivity(self, ramp_ve):
+        vt1, vt2 = detect_vt_transition_zone(ramp_ve, window_duration=60, step_size=5)
+        result = run_sensitivity_analysis(ramp_ve, "tymeventilation", "watts", "hr", "time")
+
+        assert vt1.range_watts[0] < vt1.range_watts[1] < vt2.range_watts[0]
+        assert vt1.range_hr is not None
+        assert len(result.details) == 2
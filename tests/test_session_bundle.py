@@ -0,0 +1,102 @@
+"""
+Tests for the memoized session-analysis bundle.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from services import calculate_extended_metrics
+from services.session_bundle import RiderParams, SessionBundle, content_hash
+
+
+@pytest.fixture
+def session_df():
+    rng = np.random.default_rng(0)
+    n = 1800
+    t = np.arange(n, dtype=float)
+    return pd.DataFrame({
+        "time": t,
+        "watts": np.clip(rng.normal(220, 60, n), 0, None),
+        "heartrate": 130 + 20 * np.sin(t / 600) + rng.normal(0, 2, n),
+        "cadence": rng.normal(88, 5, n),
+        "smo2": 60 + 5 * np.sin(t / 300),
+        "core_temperature": 37 + t / n,
+    })
+
+
+PARAMS = RiderParams(cp=280, w_prime=20000, rider_weight=75, vt1_watts=200, vt2_watts=280)
+
+
+class TestSessionBundle:
+
+    def test_matches_pipeline(self, session_df):
+        from modules.calculations import (
+            calculate_advanced_kpi,
+            calculate_heat_strain_index,
+            calculate_metrics,
+            calculate_w_prime_balance,
+            process_data,
+        )
+
+        clean = process_data(session_df.copy())
+        _, ef_factor = calculate_advanced_kpi(clean)
+        df_plot = calculate_heat_strain_index(calculate_w_prime_balance(clean, 280, 20000))
+        expected = calculate_extended_metrics(
+            df_plot, calculate_metrics(clean, 280), 75, 200, 280, ef_factor
+        )
+
+        analysis, error = SessionBundle(session_df, "h").analyze(PARAMS)
+        assert error is None
+        assert analysis.metrics.keys() == expected.keys()
+        for key, value in expected.items():
+            assert analysis.metrics[key] == pytest.approx(value, nan_ok=True), key
+        pd.testing.assert_series_equal(
+            analysis.df_plot["w_prime_balance"], df_plot["w_prime_balance"]
+        )
+        assert "smo2_smooth_ultra" in analysis.df_plot.columns
+
+    def test_artifacts_invalidated_by_own_inputs_only(self, session_df):
+        bundle = SessionBundle(session_df, "h")
+        bundle.analyze(PARAMS)
+        bundle.analyze(PARAMS)
+        assert set(bundle.compute_counts.values()) == {1}
+
+        bundle.analyze(RiderParams(280, 20000, 75, 210, 280))  # VT1
+        assert bundle.compute_counts["carbs"] == 2
+        assert bundle.compute_counts["power_profile"] == 1
+        assert bundle.compute_counts["plot_frame"] == 1
+
+        bundle.analyze(RiderParams(280, 20000, 70, 210, 280))  # weight
+        assert bundle.compute_counts["physiology"] == 2
+        assert bundle.compute_counts["carbs"] == 2
+
+        bundle.analyze(RiderParams(300, 20000, 70, 210, 280))  # CP
+        assert bundle.compute_counts["plot_frame"] == 2
+        assert bundle.compute_counts["base_metrics"] == 2
+        assert bundle.compute_counts["clean"] == 1
+        assert bundle.compute_counts["power_profile"] == 1
+
+        bundle.analyze(PARAMS)  # back to the first variant: still cached
+        assert bundle.compute_counts["plot_frame"] == 2
+
+    def test_returned_frames_do_not_leak(self, session_df):
+        bundle = SessionBundle(session_df, "h")
+        first, _ = bundle.analyze(PARAMS)
+        first.df_plot["extra"] = 1.0
+        first.df_plot.rename(columns={"heartrate": "hr"}, inplace=True)
+        first.metrics["np"] = -1
+
+        second, _ = bundle.analyze(PARAMS)
+        assert "extra" not in second.df_plot.columns
+        assert "heartrate" in second.df_plot.columns
+        assert second.metrics["np"] > 0
+
+    def test_invalid_session(self):
+        bundle = SessionBundle(pd.DataFrame({"time": range(50)}), "h")
+        analysis, error = bundle.analyze(PARAMS)
+        assert analysis is None
+        assert error
+
+    def test_content_hash(self):
+        assert content_hash(b"abc") == content_hash(bytes(b"abc"))
+        assert content_hash(b"abc") != content_hash(b"abd")
@@ -0,0 +1,69 @@
+"""Tests for the pooled SQLite layer and SessionStore batch APIs."""
+import threading
+from datetime import date, timedelta
+
+import pytest
+
+from modules.db import SessionRecord, SessionStore
+from modules.db.connection import close_connection, get_connection
+
+
+def _record(i: int, **kwargs) -> SessionRecord:
+    day = (date.today() - timedelta(days=i % 300)).isoformat()
+    return SessionRecord(date=day, filename=f"ride_{i}.csv", tss=float(i), **kwargs)
+
+
+@pytest.fixture
+def store(tmp_path):
+    yield SessionStore(tmp_path / "history.db")
+    close_connection(tmp_path / "history.db")
+
+
+class TestConnectionPool:
+    def test_wal_mode_and_reuse(self, store):
+        conn = get_connection(store.db_path)
+
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert get_connection(store.db_path) is conn
+
+    def test_threads_get_their_own_connection(self, store):
+        seen = []
+        thread = threading.Thread(target=lambda: seen.append(get_connection(store.db_path)))
+        thread.start()
+        thread.join()
+
+        assert seen[0] is not get_connection(store.db_path)
+
+
+class TestBulkSessions:
+    def test_bulk_insert_returns_ids_in_order(self, store):
+        records = [_record(i) for i in range(25)]
+
+        ids = store.add_sessions_bulk(records)
+
+        assert len(set(ids)) == 25
+        assert store.get_session_count() == 25
+        by_id = {s.id: s for s in store.get_sessions(days=400)}
+        assert [by_id[i].filename for i in ids] == [r.filename for r in records]
+
+    def test_bulk_upsert_keeps_ids(self, store):
+        first = store.add_sessions_bulk([_record(i) for i in range(5)])
+
+        again = store.add_sessions_bulk([_record(i, np=250.0) for i in range(5)])
+
+        assert again == first
+        assert store.get_session_count() == 5
+        assert all(s.np == 250.0 for s in store.get_sessions(days=400))
+
+    def test_iter_sessions_streams_full_history(self, store):
+        store.add_sessions_bulk([_record(i) for i in range(40)])
+        old = SessionRecord(date="2001-01-01", filename="old.csv")
+        store.add_session(old)
+
+        streamed = list(store.iter_sessions(batch_size=7))
+
+        assert len(streamed) == 41
+        assert streamed[-1].filename == "old.csv"
+        assert [s.id for s in store.iter_sessions(days=400)] == [
+            s.id for s in store.get_sessions(days=400)
+        ]
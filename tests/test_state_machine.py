@@ -2,6 +2,7 @@
 import pandas as pd
 import numpy as np
 import sys
+import pytest
 import os
 
 # Set random seed for reproducibility
@@ -97,5 +98,51 @@ def test_state_machine():
     
     print("\nState Machine Verification Passed!")
 
+
+
+def _reference_timeline(df, window_size_sec, step_sec):
+    """Window-by-window detect_physiological_state loop (pre-vectorization)."""
+    from modules.calculations.kinetics import detect_physiological_state
+
+    t_min, t_max = df["time"].min(), df["time"].max()
+    segments, current, start, confs = [], None, t_min, []
+    for t_start in np.arange(t_min, t_max - window_size_sec, step_sec):
+        window = df.loc[(df["time"] >= t_start) & (df["time"] < t_start + window_size_sec)]
+        if len(window) < 5:
+            continue
+        res = detect_physiological_state(window)
+        if current is None:
+            current, start, confs = res["state"], t_start, [res["confidence"]]
+        elif res["state"] != current:
+            segments.append((float(start), float(t_start), current, sum(confs) / len(confs)))
+            current, start, confs = res["state"], t_start, [res["confidence"]]
+        else:
+            confs.append(res["confidence"])
+    if current:
+        segments.append((float(start), float(t_max), current, sum(confs) / len(confs)))
+    return segments
+
+
+def test_timeline_matches_window_loop():
+    rng = np.random.default_rng(7)
+    parts = [
+        create_interval_segment(0, 180, "STEADY_STATE"),
+        create_interval_segment(180, 180, "NON_STEADY"),
+        create_interval_segment(360, 180, "RECOVERY"),
+        create_interval_segment(540, 120, "STEADY_STATE"),
+    ]
+    df = pd.concat(parts, ignore_index=True)
+    df.loc[600:603, "watts"] = np.linspace(300, 60, 4)  # power ramp-down inside steady block
+    df.loc[rng.choice(len(df), 15, replace=False), "hr"] = np.nan
+    df = df.drop(index=range(250, 262))  # recording gap
+
+    for window, step in [(30, 10), (60, 30), (20, 5)]:
+        timeline = generate_state_timeline(df, window_size_sec=window, step_sec=step)
+        reference = _reference_timeline(df, window, step)
+
+        assert [(s["start"], s["end"], s["state"]) for s in timeline] == [r[:3] for r in reference]
+        assert [s["confidence"] for s in timeline] == pytest.approx([r[3] for r in reference])
+
+
 if __name__ == "__main__":
     test_state_machine()
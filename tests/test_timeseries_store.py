@@ -0,0 +1,81 @@
+"""
+Tests for the ramp-test report time-series sidecar.
+"""
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("reportlab")  # modules.reporting builds PDFs on import
+
+from modules.reporting.persistence import load_ramp_test_report
+from modules.reporting.timeseries_store import (
+    LazyTimeSeries,
+    migrate_archive,
+    sidecar_path,
+    write_time_series,
+)
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(0)
+    n = 600
+    return {
+        "time_sec": list(range(n)),
+        "power_watts": np.round(100 + np.arange(n) * 0.5 + rng.normal(0, 5, n)).tolist(),
+        "hr_bpm": np.round(110 + np.arange(n) * 0.1).tolist(),
+        "smo2_pct": np.round(70 - np.arange(n) * 0.05, 1).tolist(),
+    }
+
+
+def _write_legacy(path, series):
+    report = {"metadata": {"session_id": "abc"}, "time_series": series}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+class TestTimeSeriesSidecar:
+
+    def test_round_trip_is_lazy(self, tmp_path, series):
+        json_path = tmp_path / "ramp_test_2026-01-02_abc.json"
+        reference = write_time_series(json_path, series)
+        json_path.write_text(json.dumps({"time_series": reference}), encoding="utf-8")
+
+        report = load_ramp_test_report(json_path)
+        ts = report["time_series"]
+        assert isinstance(ts, LazyTimeSeries)
+        assert list(ts) == list(series)
+        assert ts._cache == {}
+        np.testing.assert_allclose(ts["power_watts"], series["power_watts"])
+        np.testing.assert_allclose(ts.get("smo2_pct"), series["smo2_pct"], rtol=1e-6)
+        assert set(ts._cache) == {"power_watts", "smo2_pct"}
+        assert ts.get("core_temp", []) == []
+
+    def test_legacy_report_still_loads(self, tmp_path, series):
+        json_path = tmp_path / "legacy.json"
+        _write_legacy(json_path, series)
+        assert load_ramp_test_report(json_path)["time_series"] == series
+
+    def test_migration(self, tmp_path, series):
+        paths = [tmp_path / "2026" / "01" / f"ramp_test_{i}.json" for i in range(3)]
+        for path in paths:
+            _write_legacy(path, series)
+        size_before = sum(p.stat().st_size for p in paths)
+
+        assert migrate_archive(tmp_path) == (3, 0)
+        assert migrate_archive(tmp_path) == (0, 3)  # idempotent
+
+        size_after = sum(p.stat().st_size + sidecar_path(p).stat().st_size for p in paths)
+        assert size_after < size_before / 5
+
+        report = load_ramp_test_report(paths[0])
+        assert report["metadata"] == {"session_id": "abc"}
+        np.testing.assert_allclose(report["time_series"]["hr_bpm"], series["hr_bpm"])
+
+    def test_missing_sidecar(self, tmp_path, series):
+        json_path = tmp_path / "ramp_test_x.json"
+        _write_legacy(json_path, series)
+        migrate_archive(tmp_path)
+        sidecar_path(json_path).unlink()
+        assert load_ramp_test_report(json_path)["time_series"] == {}
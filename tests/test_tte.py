@@ -3,9 +3,15 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 
+import pytest
+
+import modules.tte as tte_module
 from modules.tte import (
+    TTE_CURVE_PCTS,
     compute_tte,
+    compute_tte_curve,
     compute_tte_result,
+    longest_runs,
     rolling_tte,
     format_tte,
     TTEResult
@@ -93,6 +99,53 @@ class TestComputeTTE:
         assert result_110 == 45
 
 
+def _reference_tte(power, target_pct, ftp, tol_pct):
+    """The per-sample run-length loop compute_tte used before."""
+    target_power = ftp * (target_pct / 100.0)
+    in_range = (power >= target_power * (1 - tol_pct / 100.0)) & (
+        power <= target_power * (1 + tol_pct / 100.0)
+    )
+    best = current = 0
+    for val in in_range:
+        current = current + 1 if val else 0
+        best = max(best, current)
+    return best
+
+
+class TestLongestRuns:
+    """Tests for multi-target TTE in one pass."""
+
+    @pytest.fixture
+    def power(self):
+        rng = np.random.default_rng(11)
+        steps = rng.choice([200.0, 230.0, 250.0, 270.0, 300.0], 120)
+        power = np.repeat(steps, rng.integers(5, 300, 120))
+        power += rng.normal(0, 6, len(power))
+        power[rng.random(len(power)) < 0.01] = np.nan
+        return pd.Series(power)
+
+    def test_matches_per_target_loop(self, power):
+        pcts = np.arange(80.0, 121.0, 2.5)
+        expected = [_reference_tte(power.fillna(0).values, p, 250, 5) for p in pcts]
+
+        np.testing.assert_array_equal(longest_runs(power, pcts, 250, 5), expected)
+        assert compute_tte(power, 100, 250, 5) == expected[8]
+
+    def test_numpy_fallback(self, power, monkeypatch):
+        expected = longest_runs(power, TTE_CURVE_PCTS, 250, 3)
+        monkeypatch.setattr(tte_module, "is_numba_available", lambda: False)
+        np.testing.assert_array_equal(longest_runs(power, TTE_CURVE_PCTS, 250, 3), expected)
+        assert longest_runs(pd.Series([], dtype=float), [90, 100], 250).tolist() == [0, 0]
+
+    def test_curve_frame(self, power):
+        curve = compute_tte_curve(power, ftp=250)
+
+        assert curve["target_pct"].tolist() == list(TTE_CURVE_PCTS)
+        row = curve[curve["target_pct"] == 100].iloc[0]
+        assert (row["power_min"], row["power_max"]) == (237.5, 262.5)
+        assert row["tte_seconds"] == compute_tte(power, 100, 250, 5)
+
+
 class TestComputeTTEResult:
     """Tests for compute_tte_result function."""
     
@@ -0,0 +1,25 @@
+"""
+Tests for the ventilation analysis.
+"""
+import numpy as np
+
+from modules.calculations.vent_advanced import _compute_segment_slopes
+
+
+def test_segment_slopes_match_linregress():
+    from scipy import stats
+
+    rng = np.random.default_rng(0)
+    n = 400
+    power = np.round(100 + np.arange(n) / 2 + rng.normal(0, 3, n))
+    power[50:90] = 200.0  # constant-power segments are skipped
+    ve = rng.normal(50, 5, n).cumsum() / 10
+
+    expected = [
+        (power[i + 10], stats.linregress(power[i : i + 20], ve[i : i + 20])[0])
+        for i in range(0, n - 20, 10)
+        if np.unique(power[i : i + 20]).size > 1
+    ]
+    np.testing.assert_allclose(
+        np.array(_compute_segment_slopes(power, ve)), np.array(expected), rtol=1e-9
+    )
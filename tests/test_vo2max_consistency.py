@@ -152,6 +152,47 @@ class TestVO2maxConsistency:
         assert metadata["method"] == "rolling_300s_mean_max"
         assert metadata["confidence"] == 0.70
 
+    def test_mmp_fallback_matches_rolling(self, sample_power_data):
+        """Without metrics.vo2max, canonical uses the time-series 5-min MMP."""
+        from modules.calculations.canonical_physio import (
+            build_canonical_physiology,
+            calculate_vo2max_acsm,
+        )
+
+        watts = sample_power_data["watts"]
+        data = {"metadata": {"athlete_weight_kg": 75}}
+        canonical = build_canonical_physiology(data, {"power_watts": watts.tolist()})
+
+        expected = calculate_vo2max_acsm(watts.rolling(window=300).mean().max(), 75)
+        assert canonical.vo2max.source == "acsm_5min"
+        assert canonical.vo2max.value == pytest.approx(expected, rel=1e-9)
+        assert canonical.pmax_watts.value == pytest.approx(watts.max())
+
+    def test_precomputed_session_mmp_is_preferred(self, sample_power_data):
+        """A stored power-duration curve is used instead of the raw series."""
+        from modules.calculations.canonical_physio import (
+            build_canonical_physiology,
+            calculate_vo2max_acsm,
+            session_mmp,
+        )
+
+        data = {
+            "metadata": {"athlete_weight_kg": 75},
+            "power_duration_curve": {"durations_sec": [1, 300], "powers_watts": [900, 350]},
+            "cp_model": {"cp_watts": 300},
+        }
+        time_series = {"power_watts": sample_power_data["watts"].tolist()}
+        assert session_mmp(data, time_series, (1, 300, 600)) == {
+            1: 900,
+            300: 350,
+            600: pytest.approx(sample_power_data["watts"].rolling(600).mean().max()),
+        }
+
+        canonical = build_canonical_physiology(data)
+        assert canonical.vo2max.value == pytest.approx(calculate_vo2max_acsm(350, 75))
+        assert canonical.pmax_watts.value == 900
+        assert canonical.vlamax.is_valid()
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
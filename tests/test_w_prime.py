@@ -0,0 +1,217 @@
+"""
+Tests for the shared W' balance engine.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.calculations import (
+    calculate_w_prime_balance,
+    compute_w_prime_reconstitution_map,
+    fit_cp_w_prime,
+    w_prime_balance,
+    w_prime_sweep,
+)
+from modules.calculations.w_prime import (
+    calculate_w_prime_biexp,
+    calculate_w_prime_fast,
+)
+from modules.numba_utils import calculate_w_prime_balance_numba
+
+CP = 260.0
+W_PRIME = 20000.0
+
+
+def _reference_skiba(watts, time, cp, w_prime_cap):
+    """The differential kernel calculate_w_prime_fast replaced."""
+    w_bal = np.empty(len(watts))
+    curr_w = w_prime_cap
+    prev_time = time[0]
+    tau_base = w_prime_cap / cp * 300.0
+    for i in range(len(watts)):
+        if i == 0:
+            dt = 1.0
+        else:
+            dt = time[i] - prev_time
+            if dt <= 0:
+                dt = 1.0
+            prev_time = time[i]
+        power_diff = cp - watts[i]
+        if power_diff > 0:
+            tau = tau_base * (cp / max(watts[i], 1.0))
+            curr_w += (w_prime_cap - curr_w) / tau * dt
+        else:
+            curr_w += power_diff * dt
+        curr_w = min(max(curr_w, 0.0), w_prime_cap)
+        w_bal[i] = curr_w
+    return w_bal
+
+
+def _reference_biexp(watts, time, cp, w_prime_cap, tau_f=30.0, tau_s=300.0, a_f=0.70):
+    """The pure-Python bi-exponential loop (running parameters)."""
+    w_bal = np.empty(len(watts))
+    curr_w = w_prime_cap
+    prev_time = time[0]
+    for i in range(len(watts)):
+        if i == 0:
+            dt = 1.0
+        else:
+            dt = time[i] - prev_time
+            if dt <= 0:
+                dt = 1.0
+            prev_time = time[i]
+        if cp - watts[i] > 0:
+            factor = a_f * np.exp(-dt / tau_f) + (1 - a_f) * np.exp(-dt / tau_s)
+            curr_w = w_prime_cap - (w_prime_cap - curr_w) * factor
+        else:
+            curr_w += (cp - watts[i]) * dt
+        curr_w = min(max(curr_w, 0.0), w_prime_cap)
+        w_bal[i] = curr_w
+    return w_bal
+
+
+def _reference_constant_tau(power, cp, w_prime, tau=546.0):
+    w_bal = np.empty(len(power))
+    w_bal[0] = w_prime
+    for i in range(1, len(power)):
+        if power[i] > cp:
+            w_bal[i] = w_bal[i - 1] - (power[i] - cp)
+        else:
+            w_bal[i] = w_bal[i - 1] + (w_prime - w_bal[i - 1]) * (1 - np.exp(-1.0 / tau))
+        w_bal[i] = max(0.0, min(w_prime, w_bal[i]))
+    return w_bal
+
+
+@pytest.fixture
+def ride():
+    """Interval session with irregular sampling and a repeated time stamp."""
+    rng = np.random.default_rng(3)
+    n = 3000
+    watts = np.clip(240 + 150 * np.sin(np.arange(n) / 60) + rng.normal(0, 30, n), 0, None)
+    time = np.cumsum(rng.choice([1.0, 1.0, 1.0, 2.0], n))
+    time[1500] = time[1499]
+    return pd.DataFrame({"time": time, "watts": watts, "heartrate": 150.0})
+
+
+class TestModels:
+
+    def test_skiba_matches_reference(self, ride):
+        watts, time = ride["watts"].to_numpy(), ride["time"].to_numpy()
+        np.testing.assert_allclose(
+            calculate_w_prime_fast(watts, time, CP, W_PRIME),
+            _reference_skiba(watts, time, CP, W_PRIME),
+            rtol=1e-12,
+        )
+
+    def test_biexp_matches_reference(self, ride):
+        watts, time = ride["watts"].to_numpy(), ride["time"].to_numpy()
+        np.testing.assert_allclose(
+            calculate_w_prime_biexp(watts, time, CP, W_PRIME, sport=1),
+            _reference_biexp(watts, time, CP, W_PRIME),
+            rtol=1e-12,
+        )
+
+    def test_constant_tau_matches_reference(self, ride):
+        watts = ride["watts"].to_numpy()
+        np.testing.assert_allclose(
+            calculate_w_prime_balance_numba(watts, CP, W_PRIME),
+            _reference_constant_tau(watts, CP, W_PRIME),
+            rtol=1e-12,
+        )
+
+    def test_missing_power_counts_as_recovery(self, ride):
+        watts = ride["watts"].to_numpy().copy()
+        watts[1000:1100] = np.nan
+        filled = np.where(np.isnan(watts), 0.0, watts)
+        for model in ("skiba", "biexp", "constant_tau"):
+            np.testing.assert_array_equal(
+                w_prime_balance(watts, ride["time"], CP, W_PRIME, model=model),
+                w_prime_balance(filled, ride["time"], CP, W_PRIME, model=model),
+            )
+
+    def test_unknown_model(self, ride):
+        with pytest.raises(ValueError):
+            w_prime_balance(ride["watts"], None, CP, W_PRIME, model="mono")
+
+
+class TestEngine:
+
+    def test_memoized_by_content(self, ride):
+        first = w_prime_balance(ride["watts"], ride["time"], CP, W_PRIME)
+        assert not first.flags.writeable
+        assert w_prime_balance(ride["watts"].copy(), ride["time"], CP, W_PRIME) is first
+        assert w_prime_balance(ride["watts"] + 1, ride["time"], CP, W_PRIME) is not first
+        assert w_prime_balance(ride["watts"], ride["time"], CP + 1, W_PRIME) is not first
+
+    def test_balance_frame_shares_input_columns(self, ride):
+        before = ride.copy()
+        result = calculate_w_prime_balance(ride, CP, W_PRIME)
+        pd.testing.assert_frame_equal(ride, before)
+        assert np.shares_memory(result["watts"].to_numpy(), ride["watts"].to_numpy())
+        np.testing.assert_allclose(
+            result["w_prime_balance"],
+            _reference_skiba(ride["watts"].to_numpy(), ride["time"].to_numpy(), CP, W_PRIME),
+            rtol=1e-12,
+        )
+
+    def test_balance_frame_without_time_or_power(self, ride):
+        result = calculate_w_prime_balance(ride.drop(columns="time"), CP, W_PRIME)
+        assert result["time"].tolist() == list(range(len(ride)))
+        expected = calculate_w_prime_fast(ride["watts"], np.arange(len(ride)), CP, W_PRIME)
+        np.testing.assert_array_equal(result["w_prime_balance"], expected)
+
+        result = calculate_w_prime_balance(ride.drop(columns="watts"), CP, W_PRIME)
+        assert result["w_prime_balance"].isna().all()
+
+    def test_balance_frame_unparsable_power(self):
+        df = pd.DataFrame({"time": [0.0, 1.0], "watts": ["a", "b"]})
+        assert calculate_w_prime_balance(df, CP, W_PRIME)["w_prime_balance"].tolist() == [0, 0]
+
+
+def _cp_trials(cp, w_prime, powers=(450.0, 360.0, 320.0), rest=3600):
+    """Constant-power trials to exhaustion separated by full rest."""
+    segments, exhaustion, t = [], [], 0
+    for power in powers:
+        duration = int(round(w_prime / (power - cp)))
+        segments += [np.full(duration, power), np.zeros(rest)]
+        exhaustion.append(t + duration - 1)
+        t += duration + rest
+    return np.concatenate(segments), np.array(exhaustion, dtype=float)
+
+
+class TestSweep:
+
+    @pytest.mark.parametrize("model", ["skiba", "biexp", "constant_tau"])
+    def test_matches_single_runs(self, ride, model):
+        cps, caps, scales = [240.0, 260.0], [18000.0, 20000.0, 22000.0], [0.8, 1.0]
+        sweep = w_prime_sweep(ride["watts"], ride["time"], cps, caps, scales, model=model)
+        assert sweep.shape == (2, 3, 2, len(ride))
+        for i, cp in enumerate(cps):
+            for j, cap in enumerate(caps):
+                np.testing.assert_array_equal(
+                    sweep[i, j, 1], w_prime_balance(ride["watts"], ride["time"], cp, cap, model)
+                )
+        # A shorter recovery time constant never leaves less W' in the tank
+        assert (sweep[:, :, 0] >= sweep[:, :, 1] - 1e-9).all()
+
+    def test_fit_recovers_cp_and_w_prime(self):
+        watts, exhaustion = _cp_trials(270.0, 18000.0)
+        fit = fit_cp_w_prime(watts, np.arange(len(watts), dtype=float), exhaustion, model="biexp")
+        assert fit.cp == pytest.approx(270.0, abs=0.5)
+        assert fit.w_prime == pytest.approx(18000.0, rel=0.01)
+        assert fit.rmse_j < 1.0
+        assert fit.residuals_j.shape == (3,)
+
+    def test_fit_needs_exhaustion_points(self, ride):
+        with pytest.raises(ValueError):
+            fit_cp_w_prime(ride["watts"], ride["time"], [])
+
+    def test_reconstitution_map_band(self, ride):
+        result, _ = compute_w_prime_reconstitution_map(ride, CP, W_PRIME, model="biexp")
+        low, high = result["w_prime_balance_low"], result["w_prime_balance_high"]
+        assert (low <= result["w_prime_balance"]).all()
+        assert (result["w_prime_balance"] <= high).all()
+        assert (high - low).max() > 0
+
+        result, _ = compute_w_prime_reconstitution_map(ride, CP, W_PRIME, band_pct=None)
+        assert "w_prime_balance_low" not in result.columns
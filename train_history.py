@@ -39,6 +39,7 @@ except ImportError:
 # Import bazy danych sesji
 try:
     from modules.db.session_store import SessionStore, SessionRecord
+    from modules.db.session_cache import ImportManifest, SessionCache
     DB_AVAILABLE = True
 except ImportError:
     DB_AVAILABLE = False
@@ -72,13 +73,20 @@ if MLX_AVAILABLE:
 
 # --- FUNKCJE POMOCNICZE ---
 
+# Kolumny potrzebne do treningu (czytane z cache Parquet)
+ML_COLUMNS = ['time', 'watts', 'heartrate', 'cadence']
+
 def load_data(filepath: Path) -> pd.DataFrame:  # noqa: C901
     """Smart Loader: Radzi sobie z zagnieżdżonymi JSONami i CSV."""
     file_ext = filepath.suffix.lower()
     filename = filepath.name
     
     try:
-        if file_ext == '.json':
+        if file_ext == '.parquet':
+            # Cache sesji z importu historii: dane już przetworzone do 1 Hz
+            df = pd.read_parquet(filepath)
+            df = df[[c for c in ML_COLUMNS if c in df.columns]].astype('float64')
+        elif file_ext == '.json':
             with open(filepath, 'r') as f:
                 data = json.load(f)
             
@@ -286,19 +294,43 @@ def get_folder_stats():
     return files
 
 
+def get_training_sources():
+    """Źródła treningu jako (nazwa, ścieżka).
+
+    Sesje z cache Parquet zapisanego przez import historii są czytane z
+    cache (bez ponownego parsowania CSV); pliki z folderu, których nie ma w
+    manifeście importu lub których cache brakuje, są czytane bezpośrednio.
+    """
+    files = sorted(get_folder_stats())
+    if not DB_AVAILABLE:
+        return [(f.name, f) for f in files]
+
+    cache = SessionCache()
+    sources = []
+    covered = set()
+    for date, filename, source in ImportManifest().sources():
+        path = cache.path_for(date, source)
+        if path.exists():
+            sources.append((filename, path))
+            covered.add(source)
+    if sources:
+        print(f"\n📦 Cache sesji: {len(sources)} plików ({cache.cache_dir})")
+
+    return sources + [(f.name, f) for f in files if str(f.resolve()) not in covered]
+
+
 def train_loop():  # noqa: C901
     """Główna pętla treningowa."""
     if not MLX_AVAILABLE:
         print("❌ MLX wymagany do treningu. Przerwano.")
         return
     
-    files = get_folder_stats()
+    files = get_training_sources()
     if not files:
         print(f"⚠️ Nie znaleziono plików w folderze '{DATA_FOLDER}'.")
         return
 
     print(f"\n🚀 Rozpoczynam przetwarzanie {len(files)} plików...\n")
-    files.sort()
 
     # Model
     model = PhysioNet()
@@ -325,8 +357,7 @@ def train_loop():  # noqa: C901
     total_start = time.time()
     processed = 0
     
-    for idx, file_path in enumerate(files):
-        filename = file_path.name
+    for idx, (filename, file_path) in enumerate(files):
         print(f"[{idx+1}/{len(files)}] {filename}")
         
         try: